@@ -0,0 +1,278 @@
+"""
+Backplane de mensajes WebSocket entre procesos.
+
+ConnectionManager publica cada mensaje (broadcast o alerta con sus tópicos)
+en el backplane, y este lo entrega al manager de cada proceso, que lo reparte
+entre sus propios clientes. Así una alerta generada en un worker de uvicorn
+llega a los dashboards conectados a cualquier otro.
+
+- InMemoryBackplane: un solo proceso, entrega directa.
+- UnixSocketBackplane: varios workers en el mismo host. El worker que toma el
+  lock de archivo abre el socket Unix y hace de hub: reenvía cada mensaje de
+  un worker a los demás. El resto se conecta al hub y, si el hub cae, el
+  primero que toma el lock lo reemplaza. Entrega best-effort: lo publicado
+  mientras un worker se reconecta no le llega.
+
+Los mensajes son dicts ("envelopes") con el texto ya serializado del mensaje
+para los clientes; entre procesos viajan como JSON con prefijo de longitud.
+"""
+import asyncio
+import fcntl
+import logging
+import os
+import struct
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+Envelope = Dict[str, Any]
+Handler = Callable[[Envelope], Awaitable[int]]
+
+_HEADER = struct.Struct("!I")
+
+
+def _frame(envelope: Envelope) -> bytes:
+    payload = orjson.dumps(envelope)
+    return _HEADER.pack(len(payload)) + payload
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return await reader.readexactly(size)
+
+
+class Backplane(ABC):
+    """Interfaz: `attach` registra la entrega local, `publish` difunde a todos los procesos"""
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+        self._published = 0
+        self._received = 0
+
+    def attach(self, handler: Handler):
+        self._handler = handler
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @property
+    def has_peers(self) -> bool:
+        """True si hay otros procesos que pueden tener clientes conectados"""
+        return False
+
+    async def _deliver(self, envelope: Envelope) -> int:
+        if self._handler is None:
+            return 0
+        return await self._handler(envelope)
+
+    @abstractmethod
+    async def publish(self, envelope: Envelope) -> int:
+        """Entrega en este proceso (retorna a cuántos clientes locales) y en los demás"""
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "published": self._published,
+            "received": self._received,
+        }
+
+
+class InMemoryBackplane(Backplane):
+    """Un solo proceso: la publicación es la entrega local"""
+
+    async def publish(self, envelope: Envelope) -> int:
+        self._published += 1
+        return await self._deliver(envelope)
+
+
+class UnixSocketBackplane(Backplane):
+    """Workers de un mismo host conectados a un hub elegido por lock de archivo"""
+
+    def __init__(self, path: str, retry_interval: float = 1.0, max_peer_buffer: int = 4 * 1024 * 1024):
+        super().__init__()
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.retry_interval = retry_interval
+        self.max_peer_buffer = max_peer_buffer
+
+        self.is_hub = False
+        self._lock_fd: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        # Como hub: workers conectados; como worker: la conexión al hub
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._hub: Optional[asyncio.StreamWriter] = None
+        self._peer_tasks: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+        self._dropped = 0
+        self._reconnects = 0
+
+    @property
+    def has_peers(self) -> bool:
+        return bool(self._peers) or self._hub is not None
+
+    async def start(self):
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._close_connections()
+
+    async def _close_connections(self):
+        writers = list(self._peers) + ([self._hub] if self._hub is not None else [])
+        self._peers.clear()
+        self._hub = None
+        for writer in writers:
+            writer.close()
+        for task in list(self._peer_tasks):
+            task.cancel()
+        if self._peer_tasks:
+            await asyncio.gather(*self._peer_tasks, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self.is_hub:
+            self.is_hub = False
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        self._release_lock()
+
+    def _release_lock(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _try_lock(self) -> bool:
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                if self._try_lock():
+                    await self._serve_as_hub()
+                else:
+                    await self._connect_to_hub()
+            except asyncio.CancelledError:
+                raise
+            except OSError as e:
+                logger.debug(f"Backplane no disponible en {self.path}: {e}")
+            except Exception as e:
+                logger.error(f"Error en el backplane WebSocket: {str(e)}")
+            if not self.is_hub:
+                self._release_lock()
+            if not self._stopping.is_set():
+                self._reconnects += 1
+                await asyncio.sleep(self.retry_interval)
+
+    async def _serve_as_hub(self):
+        # Con el lock tomado, un socket existente es de un hub que ya no está
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self._server = await asyncio.start_unix_server(self._on_peer, path=self.path)
+        self.is_hub = True
+        logger.info(f"Backplane WebSocket: hub en {self.path} (pid {os.getpid()})")
+        await self._stopping.wait()
+
+    async def _on_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._peer_tasks.add(task)
+        self._peers.add(writer)
+        try:
+            while True:
+                payload = await _read_frame(reader)
+                frame = _HEADER.pack(len(payload)) + payload
+                for peer in list(self._peers):
+                    if peer is not writer:
+                        self._write(peer, frame)
+                await self._receive(payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # Cierre del hub: la conexión termina sin propagar la cancelación al servidor
+            pass
+        finally:
+            self._peer_tasks.discard(task)
+            self._peers.discard(writer)
+            writer.close()
+
+    async def _connect_to_hub(self):
+        reader, writer = await asyncio.open_unix_connection(path=self.path)
+        self._hub = writer
+        logger.info(f"Backplane WebSocket: conectado al hub {self.path} (pid {os.getpid()})")
+        try:
+            while True:
+                await self._receive(await _read_frame(reader))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.warning("Backplane WebSocket: se perdió la conexión con el hub")
+        finally:
+            self._hub = None
+            writer.close()
+
+    async def _receive(self, payload: bytes):
+        self._received += 1
+        try:
+            await self._deliver(orjson.loads(payload))
+        except Exception as e:
+            logger.error(f"Error entregando un mensaje del backplane: {str(e)}")
+
+    def _write(self, writer: asyncio.StreamWriter, frame: bytes):
+        # Un worker que no lee no debe hacer crecer el buffer sin límite
+        if writer.transport.get_write_buffer_size() > self.max_peer_buffer:
+            self._dropped += 1
+            return
+        writer.write(frame)
+
+    async def publish(self, envelope: Envelope) -> int:
+        self._published += 1
+        if self.has_peers:
+            frame = _frame(envelope)
+            if self._hub is not None:
+                self._write(self._hub, frame)
+            for peer in list(self._peers):
+                self._write(peer, frame)
+        return await self._deliver(envelope)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **super().get_stats(),
+            "path": self.path,
+            "role": "hub" if self.is_hub else ("worker" if self._hub is not None else "disconnected"),
+            "peers": len(self._peers) if self.is_hub else int(self._hub is not None),
+            "dropped": self._dropped,
+            "reconnects": self._reconnects,
+        }
+
+
+def create_backplane(kind: str, path: str) -> Backplane:
+    """Backplane configurado: "memory" (un proceso) o "unix" (workers de un host)"""
+    if kind == "unix":
+        return UnixSocketBackplane(path)
+    if kind != "memory":
+        logger.warning(f"Backplane WebSocket desconocido '{kind}', se usa memory")
+    return InMemoryBackplane()
@@ -13,4 +13,77 @@ class Settings:
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 
+    # Ingesta de lecturas con escritura diferida (write-behind)
+    READING_WRITE_BEHIND: bool = os.getenv("READING_WRITE_BEHIND", "false").lower() == "true"
+    READING_FLUSH_INTERVAL_MS: int = int(os.getenv("READING_FLUSH_INTERVAL_MS", "200"))
+    READING_FLUSH_MAX_ROWS: int = int(os.getenv("READING_FLUSH_MAX_ROWS", "500"))
+    READING_BUFFER_MAX_SIZE: int = int(os.getenv("READING_BUFFER_MAX_SIZE", "10000"))
+    # Reintentos de un flush fallido antes de dar sus lecturas por perdidas (espera que se duplica)
+    READING_FLUSH_RETRIES: int = int(os.getenv("READING_FLUSH_RETRIES", "3"))
+    READING_FLUSH_RETRY_BACKOFF_MS: int = int(os.getenv("READING_FLUSH_RETRY_BACKOFF_MS", "500"))
+
+    # Deduplicación de reintentos por número de secuencia del dispositivo
+    READING_DEDUP_WINDOW: int = int(os.getenv("READING_DEDUP_WINDOW", "256"))
+    READING_DEDUP_MAX_DEVICES: int = int(os.getenv("READING_DEDUP_MAX_DEVICES", "5000"))
+
+    # Vigencia máxima de las reglas de alertas cacheadas (umbrales por sensor)
+    ALERT_RULES_TTL_SECONDS: int = int(os.getenv("ALERT_RULES_TTL_SECONDS", "300"))
+
+    # Supresión de alertas repetidas por (usuario, tipo de alerta)
+    ALERT_DEBOUNCE_SAMPLES: int = int(os.getenv("ALERT_DEBOUNCE_SAMPLES", "2"))
+    ALERT_REALERT_INTERVAL_SECONDS: int = int(os.getenv("ALERT_REALERT_INTERVAL_SECONDS", "300"))
+    ALERT_STATE_MAX_USERS: int = int(os.getenv("ALERT_STATE_MAX_USERS", "5000"))
+
+    # Etapa asíncrona de alertas (evaluación, persistencia y broadcast fuera de la ingesta)
+    ALERT_PIPELINE: bool = os.getenv("ALERT_PIPELINE", "true").lower() == "true"
+    ALERT_PIPELINE_WORKERS: int = int(os.getenv("ALERT_PIPELINE_WORKERS", "2"))
+    ALERT_PIPELINE_BATCH_MAX: int = int(os.getenv("ALERT_PIPELINE_BATCH_MAX", "500"))
+    ALERT_QUEUE_MAX_SIZE: int = int(os.getenv("ALERT_QUEUE_MAX_SIZE", "10000"))
+    # Reintentos del guardado de un lote de alertas (espera que se duplica en cada uno)
+    ALERT_PIPELINE_RETRIES: int = int(os.getenv("ALERT_PIPELINE_RETRIES", "3"))
+    ALERT_PIPELINE_RETRY_BACKOFF_MS: int = int(os.getenv("ALERT_PIPELINE_RETRY_BACKOFF_MS", "500"))
+
+    # Período de muestreo del firmware del casco
+    READING_SAMPLE_PERIOD_S: float = float(os.getenv("READING_SAMPLE_PERIOD_S", "2.5"))
+
+    # Detector de caídas e impactos (ventana por casco, en muestras)
+    MOTION_WINDOW_SAMPLES: int = int(os.getenv("MOTION_WINDOW_SAMPLES", "8"))
+    MOTION_MAX_DEVICES: int = int(os.getenv("MOTION_MAX_DEVICES", "5000"))
+    MOTION_IMPACT_G: float = float(os.getenv("MOTION_IMPACT_G", "3.0"))
+    MOTION_FALL_ANGLE_DEG: float = float(os.getenv("MOTION_FALL_ANGLE_DEG", "60"))
+
+    # Exposición a CO por trabajador (límites TWA 8 h y STEL 15 min, en ppm)
+    CO_TWA_LIMIT_PPM: float = float(os.getenv("CO_TWA_LIMIT_PPM", "25"))
+    CO_STEL_LIMIT_PPM: float = float(os.getenv("CO_STEL_LIMIT_PPM", "100"))
+    CO_EXPOSURE_MAX_GAP_S: float = float(os.getenv("CO_EXPOSURE_MAX_GAP_S", "10"))
+    CO_EXPOSURE_SESSION_GAP_S: float = float(os.getenv("CO_EXPOSURE_SESSION_GAP_S", "3600"))
+    SHIFT_CALENDAR_TTL_SECONDS: int = int(os.getenv("SHIFT_CALENDAR_TTL_SECONDS", "300"))
+
+    # Envío por WebSocket: cola de salida por cliente y timeout de cada envío
+    WS_SEND_QUEUE_SIZE: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "100"))
+    WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+
+    # Reenvío de alertas perdidas al reconectarse (?last_alert_id=): alertas en
+    # memoria por proceso y máximo reenviado por conexión
+    WS_ALERT_HISTORY_SIZE: int = int(os.getenv("WS_ALERT_HISTORY_SIZE", "1000"))
+    WS_REPLAY_LIMIT: int = int(os.getenv("WS_REPLAY_LIMIT", "50"))
+
+    # Telemetría en vivo (/ws/live): intervalo entre deltas
+    LIVE_TICK_MS: int = int(os.getenv("LIVE_TICK_MS", "1000"))
+
+    # Backplane entre workers: "memory" (un proceso) o "unix" (varios workers en el host)
+    WS_BACKPLANE: str = os.getenv("WS_BACKPLANE", "memory")
+    WS_BACKPLANE_SOCKET: str = os.getenv("WS_BACKPLANE_SOCKET", "/tmp/mineguard-ws.sock")
+
+    # Vigencia del nombre y área de los trabajadores cacheados para las alertas
+    WORKER_CACHE_TTL_SECONDS: int = int(os.getenv("WORKER_CACHE_TTL_SECONDS", "300"))
+
+    # Estado vivo de cascos y trabajadores en memoria: relectura de cascos y
+    # trabajadores desde la base y envío de lo observado a los demás procesos
+    WORKER_STATE_REFRESH_S: float = float(os.getenv("WORKER_STATE_REFRESH_S", "30"))
+    WORKER_STATE_SYNC_MS: int = int(os.getenv("WORKER_STATE_SYNC_MS", "250"))
+
+    # Vigencia de /dashboard/device-stats (conteo de cascos conectados)
+    DEVICE_STATS_TTL_SECONDS: float = float(os.getenv("DEVICE_STATS_TTL_SECONDS", "5"))
+
 settings = Settings()
@@ -1,7 +1,10 @@
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, create_engine, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from urllib.parse import quote_plus
+import copy
+import ssl
 import os
 from dotenv import load_dotenv
 
@@ -17,10 +20,12 @@ DB_NAME = os.getenv("DB_NAME")
 DB_SSL_CERT = os.getenv("DB_SSL_CERT")  # Ruta al certificado SSL
 
 # Codificar la contraseña para URL (maneja caracteres especiales como !, @, etc.)
-encoded_password = quote_plus(DB_PASSWORD)
+encoded_password = quote_plus(DB_PASSWORD or "")
 
 # URL de conexion (pymysql se usa mucho en FastAPI)
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# DATABASE_URL / ASYNC_DATABASE_URL permiten apuntar a una BD local (p. ej. benchmarks)
+DATABASE_URL = os.getenv("DATABASE_URL") or f"mysql+pymysql://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+IS_MYSQL = DATABASE_URL.startswith("mysql")
 
 # Crear engine con conexión segura (SSL)
 engine = create_engine(
@@ -33,15 +38,63 @@ engine = create_engine(
         "ssl": {
             "ssl_ca": DB_SSL_CERT
         }
-    }
+    } if IS_MYSQL else {}
 )
 
 # SessionLocal para manejar sesiones con la BD
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# URL de conexion asíncrona (aiomysql) para la ruta de ingesta y alertas,
+# así un commit lento no bloquea el event loop ni al resto de WebSockets
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or f"mysql+aiomysql://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# aiomysql recibe el SSL como SSLContext en lugar del dict de pymysql
+async_ssl_context = ssl.create_default_context(
+    cafile=DB_SSL_CERT if DB_SSL_CERT and os.path.exists(DB_SSL_CERT) else None
+)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
+    echo=False,
+    connect_args={
+        "ssl": async_ssl_context
+    } if ASYNC_DATABASE_URL.startswith("mysql") else {}
+)
+
+# AsyncSessionLocal para sesiones asíncronas (los objetos siguen usables tras el commit)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base para modelos
 Base = declarative_base()
 
+
+def precompiled(statement, dialect, column_keys):
+    """
+    Compila `statement` una sola vez para `dialect` (con las columnas
+    `column_keys`) y la retorna como text() con los mismos parámetros.
+
+    Los insert de los dialectos (ON DUPLICATE KEY UPDATE / ON CONFLICT) no usan
+    la caché de compilación de SQLAlchemy y se recompilan en cada execute; un
+    text() sí queda en la caché.
+    """
+    # Mismo dialecto (y versión del servidor), con parámetros :nombre como text()
+    named = copy.copy(dialect)
+    named.paramstyle, named.positional = "named", False
+    compiled = statement.compile(dialect=named, column_keys=list(column_keys))
+    params = [
+        bindparam(name, value=bind.value, type_=bind.type, required=bind.required)
+        for bind, name in compiled.bind_names.items()
+    ]
+    return text(compiled.string).bindparams(*params)
+
 # Dependency para FastAPI
 def get_db():
     db = SessionLocal()
@@ -53,3 +106,14 @@ def get_db():
         raise
     finally:
         db.close()
+
+
+# Dependency asíncrona para FastAPI
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except SQLAlchemyError as e:
+            print(f"❌ Error en la sesión asíncrona de BD: {e}")
+            await db.rollback()
+            raise
@@ -1,75 +1,590 @@
 """
 Manager de WebSocket para alertas en tiempo real
 """
-from typing import List, Set
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 from fastapi import WebSocket
+import asyncio
 import logging
-import json
+import os
+import time
+from collections import deque
 from datetime import datetime
 
+import orjson
+
+from app.core.backplane import Backplane, Envelope, InMemoryBackplane, create_backplane
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+# Código de cierre para clientes que no consumen sus mensajes a tiempo
+CLOSE_SLOW_CONSUMER = 1013
+
+# Canal de /ws/alerts; otros endpoints (p. ej. /ws/live) usan su propio canal
+ALERTS_CHANNEL = "alerts"
+
+
+def encode_message(message: dict) -> str:
+    """
+    Serializa un mensaje una sola vez; el mismo texto se envía a todos los
+    clientes. Se envía como frame de texto (los clientes hacen JSON.parse).
+    """
+    return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Tópicos de alcance: una alerta llega a quien esté suscrito a su área, al
+# supervisor del trabajador o al trabajador mismo
+SCOPE_TOPICS = ("area_id", "supervisor_id", "user_id")
+
+
+def _values(raw: Any) -> List[str]:
+    """Acepta un valor, una lista o un texto separado por comas"""
+    if raw is None:
+        return []
+    items = raw if isinstance(raw, (list, tuple, set)) else [raw]
+    values = []
+    for item in items:
+        values.extend(part.strip() for part in str(item).split(",") if part.strip())
+    return values
+
+
+class Subscription:
+    """
+    Filtros de un cliente. Áreas, supervisores y usuarios se suman (basta con
+    coincidir en uno); la severidad se aplica encima. Sin tópicos de alcance el
+    cliente recibe las alertas de toda la mina; sin severidades, todas.
+    """
+
+    __slots__ = ("area_id", "supervisor_id", "user_id", "severity")
+
+    def __init__(self, area_id: Iterable[int] = (), supervisor_id: Iterable[int] = (),
+                 user_id: Iterable[int] = (), severity: Iterable[str] = ()):
+        self.area_id = frozenset(area_id)
+        self.supervisor_id = frozenset(supervisor_id)
+        self.user_id = frozenset(user_id)
+        self.severity = frozenset(severity)
+
+    @classmethod
+    def parse(cls, params: Mapping[str, Any]) -> "Subscription":
+        """Construye la suscripción desde query params o un mensaje; ValueError si un id no es entero"""
+        scopes = {}
+        for topic in SCOPE_TOPICS:
+            try:
+                scopes[topic] = [int(value) for value in _values(params.get(topic))]
+            except ValueError:
+                raise ValueError(f"{topic} debe ser un entero o una lista de enteros")
+        return cls(**scopes, severity=[value.lower() for value in _values(params.get("severity"))])
+
+    @property
+    def topics(self) -> List[Tuple[str, int]]:
+        return [(topic, value) for topic in SCOPE_TOPICS for value in getattr(self, topic)]
+
+    def accepts(self, severity: Optional[str]) -> bool:
+        return not self.severity or severity in self.severity
+
+    def matches(self, severity: Optional[str], scopes: Mapping[str, Optional[int]]) -> bool:
+        """Si una alerta con esa severidad y alcance le llega a esta suscripción"""
+        if not self.accepts(severity):
+            return False
+        if not (self.area_id or self.supervisor_id or self.user_id):
+            return True
+        return any(scopes.get(topic) in getattr(self, topic) for topic in SCOPE_TOPICS)
+
+    def as_dict(self) -> Dict[str, List[Any]]:
+        return {
+            "area_id": sorted(self.area_id),
+            "supervisor_id": sorted(self.supervisor_id),
+            "user_id": sorted(self.user_id),
+            "severity": sorted(self.severity),
+        }
+
+
+class AlertHistory:
+    """
+    Últimas alertas enviadas, en orden de id, con su severidad, alcance y el
+    texto ya serializado, para reenviar a un cliente que se reconecta con
+    `last_alert_id` las que se perdió mientras estaba desconectado.
+
+    `floor` es el id a partir del cual el buffer está completo: todas las
+    alertas con id mayor pasaron por este proceso y siguen en memoria. Se fija
+    al iniciar (el último id de la tabla alert) y sube al descartar las más
+    viejas. Sin `floor`, o con un last_alert_id menor, hay que ir a la base.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.floor: Optional[int] = None
+        # (id, severidad, alcance, texto)
+        self._entries: Deque[Tuple[int, Optional[str], Mapping[str, Optional[int]], str]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def last_id(self) -> Optional[int]:
+        return self._entries[-1][0] if self._entries else None
+
+    def reset(self, floor: int):
+        """Fija el piso al iniciar; conserva lo que ya llegó con id mayor"""
+        self.floor = floor
+        while self._entries and self._entries[0][0] <= floor:
+            self._entries.popleft()
+
+    def covers(self, last_alert_id: int) -> bool:
+        return self.floor is not None and last_alert_id >= self.floor
+
+    def record(self, alert_id: int, severity: Optional[str], scopes: Mapping[str, Optional[int]], text: str):
+        if self.floor is not None and alert_id <= self.floor:
+            return
+        while self._entries and len(self._entries) >= self.capacity:
+            evicted_id = self._entries.popleft()[0]
+            if self.floor is not None:
+                self.floor = max(self.floor, evicted_id)
+        entry = (alert_id, severity, scopes, text)
+        if not self._entries or alert_id > self._entries[-1][0]:
+            self._entries.append(entry)
+            return
+        # Con varios procesos una alerta puede llegar después de otra con id mayor
+        position = len(self._entries)
+        while position > 0 and self._entries[position - 1][0] > alert_id:
+            position -= 1
+        if position > 0 and self._entries[position - 1][0] == alert_id:
+            return
+        self._entries.insert(position, entry)
+
+    def since(self, last_alert_id: int, subscription: "Subscription", limit: int) -> List[Tuple[int, str]]:
+        """
+        Alertas con id mayor a `last_alert_id` que le llegan a `subscription`,
+        en orden. Retorna hasta `limit + 1` (las más nuevas) para que quien
+        llama sepa si hubo más de `limit`.
+        """
+        found = []
+        for alert_id, severity, scopes, text in reversed(self._entries):
+            if alert_id <= last_alert_id or len(found) > limit:
+                break
+            if subscription.matches(severity, scopes):
+                found.append((alert_id, text))
+        found.reverse()
+        return found
+
+
+# (last_alert_id, suscripción, límite) -> [(id, texto)] de la base, del más viejo al más nuevo
+ReplayLoader = Callable[[int, Subscription, int], Awaitable[List[Tuple[int, str]]]]
+
+
+class _Client:
+    """Conexión con su cola de salida y la tarea que la escribe en el socket"""
+
+    __slots__ = (
+        "websocket", "client_id", "channel", "subscription", "queue", "task", "sent", "sending_since",
+        "connected_at", "closed",
+    )
+
+    def __init__(self, websocket: WebSocket, client_id: str, channel: str, subscription: Subscription,
+                 queue_size: int):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.channel = channel
+        self.subscription = subscription
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.sent = 0
+        # Inicio (monotónico) del envío en curso; None si la tarea está esperando mensajes
+        self.sending_since: Optional[float] = None
+        self.connected_at = datetime.utcnow()
+        self.closed = False
+
 
 class ConnectionManager:
-    """Gestiona las conexiones WebSocket activas"""
-    
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.connection_ids: Set[str] = set()
-    
-    async def connect(self, websocket: WebSocket, client_id: str):
-        """Acepta una nueva conexión WebSocket"""
+    """
+    Gestiona las conexiones WebSocket activas.
+
+    Cada cliente tiene una cola acotada y una tarea que le envía los mensajes
+    en orden: `broadcast` solo encola y vuelve, así un cliente lento no demora
+    a los demás. Un cliente cuya cola se llena, o con un envío en curso hace
+    más de `send_timeout` segundos al llegar un mensaje nuevo, se desconecta
+    (slow consumer). El timeout se controla al encolar y no con wait_for, que
+    crearía una tarea extra por envío. Las conexiones se guardan por WebSocket,
+    por lo que conectar y desconectar es O(1).
+
+    Las alertas se enrutan con un índice tópico -> clientes: cada alerta llega
+    solo a los suscritos a su área, supervisor o trabajador, más los clientes
+    sin tópicos de alcance, y luego se filtra por severidad.
+
+    `broadcast` y `broadcast_alert` publican en el backplane, que entrega el
+    mensaje al manager de cada proceso (ver app.core.backplane).
+
+    Cada proceso guarda las últimas alertas en `alert_history` (haya o no
+    clientes) y `connect` reenvía desde ahí las que un cliente se perdió.
+
+    Cada conexión pertenece a un canal (el endpoint por el que entró). Las
+    alertas van al canal "alerts"; `broadcast` acepta otro canal y datos para
+    el listener que ese canal registre en los demás procesos, y `publish_data`
+    envía solo datos, sin mensaje para los clientes.
+    """
+
+    def __init__(self, queue_size: int = 100, send_timeout: float = 5.0, backplane: Optional[Backplane] = None,
+                 history_size: int = 1000, replay_limit: int = 50):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.alert_history = AlertHistory(history_size)
+        # Deja lugar en la cola para el mensaje de conexión y lo que llegue mientras tanto
+        self.replay_limit = max(min(replay_limit, queue_size - 10), 0)
+        self._replay_loader: Optional[ReplayLoader] = None
+        self.backplane = backplane or InMemoryBackplane()
+        self.backplane.attach(self._deliver)
+        self._clients: Dict[WebSocket, _Client] = {}
+        self._topics: Dict[Tuple[str, int], Set[_Client]] = {}
+        # Clientes sin tópicos de alcance: reciben las alertas de toda la mina
+        self._unscoped: Set[_Client] = set()
+        self._channels: Dict[str, Set[_Client]] = {}
+        # canal -> función que recibe los datos publicados por otros procesos
+        self._listeners: Dict[str, Callable[[Any], None]] = {}
+
+        self._broadcasts = 0
+        self._replays_memory = 0
+        self._replays_database = 0
+        self._replayed_alerts = 0
+        self._evicted_queue_full = 0
+        self._evicted_timeout = 0
+        self._send_errors = 0
+
+    @property
+    def active_connections(self):
+        """Vista de los WebSockets conectados (admite len() y evaluación booleana)"""
+        return self._clients.keys()
+
+    @property
+    def has_audience(self) -> bool:
+        """True si algún cliente, de este u otro proceso, puede recibir mensajes"""
+        return bool(self._clients) or self.backplane.has_peers
+
+    @property
+    def connection_ids(self) -> Set[str]:
+        return {client.client_id for client in self._clients.values()}
+
+    def channel_size(self, channel: str) -> int:
+        return len(self._channels.get(channel, ()))
+
+    def add_listener(self, channel: str, listener: Callable[[Any], None]):
+        """Registra quién aplica los datos de `channel` publicados por otros procesos"""
+        self._listeners[channel] = listener
+
+    def set_replay_loader(self, loader: ReplayLoader):
+        """Registra la consulta a la base para reconexiones anteriores a `alert_history`"""
+        self._replay_loader = loader
+
+    def _index(self, client: _Client):
+        self._channels.setdefault(client.channel, set()).add(client)
+        if client.channel != ALERTS_CHANNEL:
+            return
+        topics = client.subscription.topics
+        if not topics:
+            self._unscoped.add(client)
+        for topic in topics:
+            self._topics.setdefault(topic, set()).add(client)
+
+    def _unindex(self, client: _Client):
+        members = self._channels.get(client.channel)
+        if members is not None:
+            members.discard(client)
+            if not members:
+                del self._channels[client.channel]
+        self._unscoped.discard(client)
+        for topic in client.subscription.topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self._topics[topic]
+
+    async def connect(self, websocket: WebSocket, client_id: str, subscription: Optional[Subscription] = None,
+                      channel: str = ALERTS_CHANNEL, last_alert_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Acepta una nueva conexión WebSocket e inicia su tarea de envío.
+
+        Con `last_alert_id` encola primero las alertas posteriores que le
+        corresponden por su suscripción (hasta `replay_limit`, las más nuevas)
+        y retorna un resumen del reenvío.
+        """
         await websocket.accept()
-        self.active_connections.append(websocket)
-        self.connection_ids.add(client_id)
-        logger.info(f"WebSocket conectado: {client_id}. Total conexiones: {len(self.active_connections)}")
-    
-    def disconnect(self, websocket: WebSocket, client_id: str):
-        """Remueve una conexión WebSocket"""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        if client_id in self.connection_ids:
-            self.connection_ids.remove(client_id)
-        logger.info(f"WebSocket desconectado: {client_id}. Total conexiones: {len(self.active_connections)}")
-    
-    async def send_personal_message(self, message: dict, websocket: WebSocket):
-        """Envía un mensaje a un WebSocket específico"""
+        subscription = subscription or Subscription()
+
+        missed: List[Tuple[int, str]] = []
+        source = "memory"
+        if last_alert_id is not None and not self.alert_history.covers(last_alert_id):
+            missed = await self._load_missed(last_alert_id, subscription)
+            source = "database"
+
+        client = _Client(websocket, client_id, channel, subscription, self.queue_size)
+        client.task = asyncio.create_task(self._writer(client))
+        self._clients[websocket] = client
+        self._index(client)
+        logger.info(f"WebSocket conectado: {client_id}. Total conexiones: {len(self._clients)}")
+        if last_alert_id is None:
+            return None
+
+        # Sin await desde el registro: lo que se entregue después llega en vivo, sin repetirse.
+        # Lo que llegó a la memoria durante la consulta a la base se toma de ahí.
+        after = max(missed[-1][0], last_alert_id) if missed else last_alert_id
+        missed.extend(self.alert_history.since(after, subscription, self.replay_limit))
+        truncated = len(missed) > self.replay_limit
+        if truncated:
+            missed = missed[len(missed) - self.replay_limit:]
+        now = time.monotonic()
+        for _, text in missed:
+            self._enqueue(client, text, now)
+
+        if source == "memory":
+            self._replays_memory += 1
+        else:
+            self._replays_database += 1
+        self._replayed_alerts += len(missed)
+        return {
+            "replayed": len(missed),
+            "source": source,
+            "truncated": truncated,
+            "last_alert_id": missed[-1][0] if missed else last_alert_id,
+        }
+
+    async def _load_missed(self, last_alert_id: int, subscription: Subscription) -> List[Tuple[int, str]]:
+        if self._replay_loader is None:
+            return []
         try:
-            await websocket.send_json(message)
+            return await self._replay_loader(last_alert_id, subscription, self.replay_limit)
         except Exception as e:
-            logger.error(f"Error enviando mensaje personal: {str(e)}")
-    
-    async def broadcast(self, message: dict):
-        """Envía un mensaje a todos los WebSockets conectados"""
-        disconnected = []
-        for connection in self.active_connections:
+            logger.error(f"Error cargando alertas perdidas desde la base: {str(e)}")
+            return []
+
+    def subscribe(self, websocket: WebSocket, subscription: Subscription) -> bool:
+        """Reemplaza los tópicos de una conexión; False si no está conectada"""
+        client = self._clients.get(websocket)
+        if client is None:
+            return False
+        self._unindex(client)
+        client.subscription = subscription
+        self._index(client)
+        return True
+
+    def get_subscription(self, websocket: WebSocket) -> Optional[Subscription]:
+        client = self._clients.get(websocket)
+        return client.subscription if client is not None else None
+
+    def disconnect(self, websocket: WebSocket, client_id: Optional[str] = None):
+        """Remueve una conexión WebSocket y detiene su tarea de envío"""
+        client = self._clients.pop(websocket, None)
+        if client is None:
+            return
+        self._unindex(client)
+        client.closed = True
+        if client.task is not None and client.task is not asyncio.current_task():
+            client.task.cancel()
+        logger.info(f"WebSocket desconectado: {client.client_id}. Total conexiones: {len(self._clients)}")
+
+    async def _evict(self, client: _Client, reason: str):
+        """Desconecta a un cliente que no consume sus mensajes"""
+        if self._clients.get(client.websocket) is not client:
+            return
+        self.disconnect(client.websocket)
+        logger.warning(f"WebSocket {client.client_id} desconectado por {reason}")
+        try:
+            await asyncio.wait_for(client.websocket.close(code=CLOSE_SLOW_CONSUMER), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    async def _writer(self, client: _Client):
+        """Envía en orden los mensajes encolados para un cliente"""
+        while not client.closed:
+            text = await client.queue.get()
+            client.sending_since = time.monotonic()
             try:
-                await connection.send_json(message)
+                await client.websocket.send_text(text)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"Error en broadcast: {str(e)}")
-                disconnected.append(connection)
-        
-        # Limpiar conexiones muertas
-        for connection in disconnected:
-            if connection in self.active_connections:
-                self.active_connections.remove(connection)
-        
-        if disconnected:
-            logger.info(f"Limpiadas {len(disconnected)} conexiones muertas")
-    
-    async def broadcast_alert(self, alert_data: dict):
+                self._send_errors += 1
+                logger.error(f"Error enviando mensaje a {client.client_id}: {str(e)}")
+                await self._evict(client, "error de envío")
+                return
+            client.sending_since = None
+            client.sent += 1
+
+    def _enqueue(self, client: _Client, text: str, now: float) -> bool:
+        if client.sending_since is not None and now - client.sending_since > self.send_timeout:
+            self._evicted_timeout += 1
+            # El cierre se hace en segundo plano para no bloquear al resto
+            asyncio.create_task(self._evict(client, f"timeout de envío ({self.send_timeout}s)"))
+            return False
+        try:
+            client.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            self._evicted_queue_full += 1
+            asyncio.create_task(self._evict(client, "cola de salida llena"))
+            return False
+
+    async def send_personal_message(self, message: dict, websocket: WebSocket):
+        """Envía un mensaje a un WebSocket específico (detrás de los ya encolados)"""
+        text = encode_message(message)
+        client = self._clients.get(websocket)
+        if client is not None:
+            self._enqueue(client, text, time.monotonic())
+            return
+        try:
+            await asyncio.wait_for(websocket.send_text(text), timeout=self.send_timeout)
+        except Exception as e:
+            logger.error(f"Error enviando mensaje personal: {str(e)}")
+
+    async def send_local(self, message: dict, channel: str) -> int:
+        """
+        Envía un mensaje solo a los WebSockets de `channel` conectados a este
+        proceso, sin pasar por el backplane; retorna a cuántos se encoló.
+        """
+        self._broadcasts += 1
+        clients = list(self._channels.get(channel, ()))
+        if not clients:
+            return 0
+        return await self._fan_out(clients, encode_message(message))
+
+    async def _fan_out(self, clients: Iterable[_Client], text: str) -> int:
+        queued = 0
+        now = time.monotonic()
+        for client in clients:
+            if self._enqueue(client, text, now):
+                queued += 1
+        # Ceder el loop: las tareas de envío vacían las colas entre broadcasts seguidos
+        await asyncio.sleep(0)
+        return queued
+
+    def _subscribers(self, severity: Optional[str], scopes: Mapping[str, Optional[int]]) -> List[_Client]:
+        recipients = set(self._unscoped)
+        for topic, value in scopes.items():
+            if value is not None:
+                recipients.update(self._topics.get((topic, value), ()))
+        return [client for client in recipients if client.subscription.accepts(severity)]
+
+    async def _deliver(self, envelope: Envelope) -> int:
+        """Reparte un mensaje del backplane entre los clientes de este proceso"""
+        if envelope["kind"] == "data":
+            listener = self._listeners.get(envelope["channel"])
+            if listener is not None and envelope["origin"] != os.getpid():
+                listener(envelope["data"])
+            return 0
+        if envelope["kind"] == "alert":
+            if envelope.get("id") is not None:
+                self.alert_history.record(envelope["id"], envelope["severity"], envelope["scopes"], envelope["text"])
+            clients = self._subscribers(envelope["severity"], envelope["scopes"])
+        else:
+            channel = envelope.get("channel", ALERTS_CHANNEL)
+            listener = self._listeners.get(channel)
+            if listener is not None and "data" in envelope and envelope.get("origin") != os.getpid():
+                listener(envelope["data"])
+            clients = list(self._channels.get(channel, ()))
+        if not clients:
+            return 0
+        return await self._fan_out(clients, envelope["text"])
+
+    async def broadcast(self, message: dict, channel: str = ALERTS_CHANNEL, data: Any = None) -> int:
+        """
+        Envía un mensaje a todos los WebSockets del canal; retorna a cuántos
+        locales se encoló. `data` llega al listener del canal en los demás procesos.
+        """
+        self._broadcasts += 1
+        if not self.has_audience:
+            return 0
+        envelope = {"kind": "broadcast", "channel": channel, "text": encode_message(message)}
+        if data is not None:
+            envelope["data"] = data
+            envelope["origin"] = os.getpid()
+        return await self.backplane.publish(envelope)
+
+    async def publish_data(self, channel: str, data: Any):
+        """Entrega `data` al listener de `channel` en los demás procesos, sin enviar nada a clientes"""
+        if not self.backplane.has_peers:
+            return
+        await self.backplane.publish({"kind": "data", "channel": channel, "data": data, "origin": os.getpid()})
+
+    async def broadcast_alert(self, alert_data: dict, area_id: Optional[int] = None,
+                              supervisor_id: Optional[int] = None, user_id: Optional[int] = None) -> int:
         """
-        Envía una alerta a todos los clientes conectados
+        Envía una alerta a los clientes suscritos a su área, supervisor o
+        trabajador (y a los que no filtran por alcance), según su severidad.
         alert_data debe contener: id, type, severity, worker_name, area, value, timestamp
         """
+        self._broadcasts += 1
         message = {
             "type": "alert",
             "data": alert_data,
             "timestamp": datetime.utcnow().isoformat()
         }
-        await self.broadcast(message)
-        logger.info(f"Alerta broadcast enviada: {alert_data.get('type')} - Severidad: {alert_data.get('severity')}")
+        envelope = {
+            "kind": "alert",
+            "id": alert_data.get("id"),
+            "severity": alert_data.get("severity"),
+            "scopes": {"area_id": area_id, "supervisor_id": supervisor_id, "user_id": user_id},
+            "text": encode_message(message),
+        }
+        if not self.has_audience:
+            # Nadie conectado: solo queda en memoria para quien se reconecte
+            if envelope["id"] is not None:
+                self.alert_history.record(envelope["id"], envelope["severity"], envelope["scopes"], envelope["text"])
+            return 0
+        queued = await self.backplane.publish(envelope)
+        logger.info(f"Alerta enviada a {queued} clientes: {alert_data.get('type')} - Severidad: {alert_data.get('severity')}")
+        return queued
+
+    async def start(self):
+        """Conecta el backplane entre procesos (al iniciar la app)"""
+        await self.backplane.start()
+
+    async def stop(self):
+        """Cierra las conexiones locales y el backplane (al apagar)"""
+        await self.close_all()
+        await self.backplane.stop()
+
+    async def close_all(self):
+        """Detiene las tareas de envío de todas las conexiones (al apagar)"""
+        clients = list(self._clients.values())
+        for client in clients:
+            self.disconnect(client.websocket)
+        tasks = [client.task for client in clients if client.task is not None]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Conexiones, tópicos, profundidad de las colas de salida y desconexiones por lentitud"""
+        depths = [client.queue.qsize() for client in self._clients.values()]
+        return {
+            "active_connections": len(self._clients),
+            "connections_by_channel": {channel: len(members) for channel, members in self._channels.items()},
+            "unscoped_connections": len(self._unscoped),
+            "topics": len(self._topics),
+            "queue_size": self.queue_size,
+            "send_timeout_seconds": self.send_timeout,
+            "max_queue_depth": max(depths, default=0),
+            "pending_messages": sum(depths),
+            "broadcasts": self._broadcasts,
+            "alert_history": {
+                "size": len(self.alert_history),
+                "capacity": self.alert_history.capacity,
+                "floor": self.alert_history.floor,
+                "last_id": self.alert_history.last_id,
+            },
+            "replays_memory": self._replays_memory,
+            "replays_database": self._replays_database,
+            "replayed_alerts": self._replayed_alerts,
+            "evicted_queue_full": self._evicted_queue_full,
+            "evicted_timeout": self._evicted_timeout,
+            "send_errors": self._send_errors,
+            "backplane": self.backplane.get_stats(),
+        }
 
 
 # Instancia global del manager
-manager = ConnectionManager()
+manager = ConnectionManager(
+    queue_size=settings.WS_SEND_QUEUE_SIZE,
+    send_timeout=settings.WS_SEND_TIMEOUT_SECONDS,
+    backplane=create_backplane(settings.WS_BACKPLANE, settings.WS_BACKPLANE_SOCKET),
+    history_size=settings.WS_ALERT_HISTORY_SIZE,
+    replay_limit=settings.WS_REPLAY_LIMIT,
+)
@@ -1,9 +1,14 @@
 """
 Router de WebSocket para alertas en tiempo real
 """
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-from app.core.websocket import manager
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, status
+from app.core.websocket import Subscription, manager
+from app.modules.alert.replay import init_alert_replay
+from app.modules.dashboard.live import LIVE_CHANNEL, live_telemetry
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -13,13 +18,37 @@ websocket_router = APIRouter()
 @websocket_router.websocket("/ws/alerts")
 async def websocket_alerts_endpoint(
     websocket: WebSocket,
-    client_id: str = Query(default="unknown")
+    client_id: str = Query(default="unknown"),
+    last_alert_id: Optional[int] = Query(default=None)
 ):
     """
     WebSocket endpoint para recibir alertas en tiempo real.
     
     Uso desde el cliente:
     ws://localhost:8000/ws/alerts?client_id=tablet_supervisor_1
+
+    Suscripción opcional por tópicos (repetidos o separados por comas):
+    ws://localhost:8000/ws/alerts?client_id=tablet_1&area_id=3,4&severity=critical
+
+    - area_id, supervisor_id, user_id: alertas del área, de los trabajadores del
+      supervisor o del trabajador (basta con coincidir en uno). Sin ninguno se
+      reciben las alertas de toda la mina.
+    - severity: warning / critical. Sin ninguna se reciben todas.
+
+    La suscripción se puede reemplazar con un mensaje:
+    {"action": "subscribe", "area_id": [3], "severity": ["critical"]}
+    y se responde con {"type": "subscribed", "subscription": {...}}
+
+    Al reconectarse, el cliente indica la última alerta que recibió:
+    ws://localhost:8000/ws/alerts?client_id=tablet_1&last_alert_id=1234
+
+    y antes de "connection_established" recibe las alertas posteriores que le
+    corresponden por su suscripción (hasta WS_REPLAY_LIMIT, las más nuevas),
+    con el mismo formato que las alertas en vivo. El mensaje de conexión
+    incluye el resumen: "replay": {"replayed": 3, "source": "memory",
+    "truncated": false, "last_alert_id": 1237}. Con "truncated" conviene
+    consultar /dashboard/alerts/recent. Una alerta puede llegar repetida en
+    el borde entre el reenvío y las alertas en vivo: deduplicar por id.
     
     Mensajes que recibirá el cliente:
     {
@@ -36,14 +65,24 @@ async def websocket_alerts_endpoint(
         "timestamp": "2025-12-02T10:30:00"
     }
     """
-    await manager.connect(websocket, client_id)
+    query = websocket.query_params
+    try:
+        subscription = Subscription.parse({key: query.getlist(key) for key in query.keys()})
+    except ValueError as e:
+        logger.warning(f"Suscripción inválida de {client_id}: {str(e)}")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    replay = await manager.connect(websocket, client_id, subscription, last_alert_id=last_alert_id)
     
     try:
         # Enviar mensaje de confirmación de conexión
         await manager.send_personal_message({
             "type": "connection_established",
             "message": f"Conectado exitosamente como {client_id}",
-            "active_connections": len(manager.active_connections)
+            "active_connections": len(manager.active_connections),
+            "subscription": subscription.as_dict(),
+            "replay": replay
         }, websocket)
         
         # Mantener la conexión abierta y esperar mensajes del cliente
@@ -55,8 +94,11 @@ async def websocket_alerts_endpoint(
             if data == "ping":
                 await manager.send_personal_message({
                     "type": "pong",
-                    "timestamp": str(manager)
+                    "timestamp": datetime.now().isoformat()
                 }, websocket)
+                continue
+
+            await _handle_client_message(websocket, data)
                 
     except WebSocketDisconnect:
         manager.disconnect(websocket, client_id)
@@ -66,10 +108,87 @@ async def websocket_alerts_endpoint(
         manager.disconnect(websocket, client_id)
 
 
+async def _handle_client_message(websocket: WebSocket, data: str):
+    """Procesa los mensajes JSON del cliente (por ahora, cambios de suscripción)"""
+    try:
+        message = orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return
+    if not isinstance(message, dict) or message.get("action") != "subscribe":
+        return
+
+    try:
+        subscription = Subscription.parse(message)
+    except ValueError as e:
+        await manager.send_personal_message({"type": "error", "message": str(e)}, websocket)
+        return
+
+    manager.subscribe(websocket, subscription)
+    await manager.send_personal_message({
+        "type": "subscribed",
+        "subscription": subscription.as_dict()
+    }, websocket)
+
+
+@websocket_router.websocket("/ws/live")
+async def websocket_live_endpoint(
+    websocket: WebSocket,
+    client_id: str = Query(default="unknown")
+):
+    """
+    WebSocket con la telemetría en vivo de los trabajadores activos, en lugar
+    de consultar /dashboard/active-workers periódicamente.
+
+    Uso desde el cliente:
+    ws://localhost:8000/ws/live?client_id=dashboard_sala_control
+
+    Al conectarse se recibe el estado completo y luego, cada LIVE_TICK_MS,
+    solo los campos que cambiaron (los trabajadores sin cambios no aparecen):
+    {"type": "snapshot", "seq": 41, "workers": [{"id": 7, "nombre": "Juan Pérez", "ritmoCardiaco": 80, ...}]}
+    {"type": "telemetry", "seq": 42, "workers": [{"id": 7, "ritmoCardiaco": 81}]}
+
+    `seq` aumenta en uno por delta; si el cliente ve un salto, se reconecta
+    para recibir un snapshot nuevo.
+    """
+    await manager.connect(websocket, client_id, channel=LIVE_CHANNEL)
+
+    try:
+        await manager.send_personal_message(live_telemetry.snapshot_message(), websocket)
+
+        while True:
+            data = await websocket.receive_text()
+            if data == "ping":
+                await manager.send_personal_message({
+                    "type": "pong",
+                    "timestamp": datetime.now().isoformat()
+                }, websocket)
+
+    except WebSocketDisconnect:
+        manager.disconnect(websocket, client_id)
+        logger.info(f"Cliente {client_id} desconectado de /ws/live")
+    except Exception as e:
+        logger.error(f"Error en WebSocket /ws/live para {client_id}: {str(e)}")
+        manager.disconnect(websocket, client_id)
+
+
+@websocket_router.on_event("startup")
+async def start_websocket_backplane():
+    await init_alert_replay(manager)
+    await manager.start()
+    await live_telemetry.start()
+
+
+@websocket_router.on_event("shutdown")
+async def close_websocket_connections():
+    await live_telemetry.stop()
+    await manager.stop()
+
+
 @websocket_router.get("/ws/status")
 async def websocket_status():
-    """Retorna el estado de las conexiones WebSocket activas"""
+    """Retorna el estado de las conexiones WebSocket activas y de sus colas de salida"""
     return {
-        "active_connections": len(manager.active_connections),
-        "connection_ids": list(manager.connection_ids)
+        **manager.get_stats(),
+        "connection_ids": list(manager.connection_ids),
+        "live": live_telemetry.get_stats()
     }
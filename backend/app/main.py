@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core import logging_config  # Cargar configuración de logs
+from app.core.database import async_engine
 
 # Importar todos los routers de módulos
 from app.modules.auth.router import auth_router
@@ -61,6 +62,11 @@ app.include_router(user_router, prefix="/users", tags=["Users"])
 app.include_router(user_shift_router, prefix="/user-shifts", tags=["UserShifts"])
 app.include_router(websocket_router, tags=["WebSocket"])
 
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    # Cerrar las conexiones del pool asíncrono al apagar
+    await async_engine.dispose()
+
 @app.get("/")
 def root():
     return {"message": "MineGuard API is running 🚀"}
@@ -0,0 +1,44 @@
+# Categorías de alerta que agrupa el dashboard
+"""
+Cada tipo de alerta (los de las reglas de umbral, movimiento y exposición a CO,
+y los nombres que se usaron antes o se cargan a mano) pertenece a una de las
+cuatro categorías de los gráficos del dashboard. La categoría se resuelve al
+guardar la alerta (columna alert.category, indexada) para que el dashboard
+agrupe por ella sin comparar LOWER(alert_type) contra listas de alias.
+
+La migración 003_alert_category.sql rellena las alertas anteriores con estas
+mismas listas: si se agrega un alias aquí, agregarlo también allí.
+"""
+from typing import Dict, Optional, Tuple
+
+TOXIC_GAS = "toxic_gas"
+HEART_RATE = "heart_rate"
+BODY_TEMPERATURE = "body_temperature"
+FALL_IMPACT = "fall_impact"
+
+# Categoría -> tipos de alerta (en minúsculas)
+ALERT_CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    TOXIC_GAS: (
+        'toxic_gas', 'toxic gas', 'gases toxicos', 'gases_toxicos', 'toxicgas',
+        'co_exposure_twa', 'co_exposure_stel',
+    ),
+    HEART_RATE: (
+        'heart_rate_anomaly', 'heart rate anomaly', 'heart_rate_high', 'heart rate high',
+        'heart_rate_low', 'heart rate low', 'ritmo_cardiaco_anormal', 'ritmo cardiaco anormal',
+    ),
+    BODY_TEMPERATURE: (
+        'high_body_temperature', 'body temperature high', 'temperatura_corporal_alta', 'temperatura corporal alta',
+    ),
+    FALL_IMPACT: (
+        'fall_detected', 'impact_detected', 'caida', 'impacto', 'caidas_impactos', 'caidas impactos',
+    ),
+}
+
+_CATEGORY_BY_TYPE = {alert_type: category for category, types in ALERT_CATEGORIES.items() for alert_type in types}
+
+
+def alert_category(alert_type: Optional[str]) -> Optional[str]:
+    """Categoría del tipo de alerta (sin distinguir mayúsculas); None si no pertenece a ninguna"""
+    if not alert_type:
+        return None
+    return _CATEGORY_BY_TYPE.get(alert_type.lower())
@@ -2,7 +2,7 @@
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional, Literal
-from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, BigInteger
+from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, BigInteger, Float
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -12,8 +12,10 @@ class Alert(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True, unique=True)
     alert_type = Column(String(50), nullable=False)
+    category = Column(String(20), nullable=True)  # ver app.modules.alert.categories
     severity = Column(String(10), nullable=False)  # low|medium|high|critical
     message = Column(String(500), nullable=False)
+    value = Column(Float, nullable=True)  # valor que disparó la alerta, el mismo que se envía en vivo
     reading_id = Column(BigInteger, ForeignKey("reading.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     timestamp = Column(TIMESTAMP, nullable=False, server_default=func.now())
@@ -23,6 +25,7 @@ class AlertCreateSchema(BaseModel):
     alert_type: str
     severity: Literal['low', 'medium', 'high', 'critical']
     message: str
+    value: Optional[float] = None
     reading_id: int
     user_id: int
 
@@ -31,6 +34,7 @@ class AlertUpdateSchema(BaseModel):
     alert_type: Optional[str] = None
     severity: Optional[Literal['low', 'medium', 'high', 'critical']] = None
     message: Optional[str] = None
+    value: Optional[float] = None
     reading_id: Optional[int] = None
     user_id: Optional[int] = None
 
@@ -38,8 +42,10 @@ class AlertUpdateSchema(BaseModel):
 class AlertSchema(BaseModel):
     id: int
     alert_type: str
+    category: Optional[str] = None
     severity: str
     message: str
+    value: Optional[float] = None
     reading_id: int
     user_id: int
     timestamp: datetime
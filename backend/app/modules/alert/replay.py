@@ -0,0 +1,67 @@
+# Reenvío de alertas perdidas a los clientes de /ws/alerts que se reconectan
+"""
+ConnectionManager reenvía desde memoria (AlertHistory) las alertas que un
+cliente se perdió. Este módulo cubre lo que la memoria no tiene: fija al
+iniciar el piso del historial (el último id de la tabla alert) y, para un
+last_alert_id anterior, arma los mensajes desde la base con una consulta por
+la clave primaria.
+"""
+import logging
+from typing import List, Tuple
+
+from app.core.database import AsyncSessionLocal
+from app.core.websocket import ConnectionManager, Subscription, encode_message
+from app.modules.alert.repository import AsyncAlertRepository
+
+logger = logging.getLogger(__name__)
+
+# La severidad se guarda como high/medium y se envía como critical/warning (ver ReadingService)
+STORED_SEVERITY = {"critical": "high", "warning": "medium"}
+SENT_SEVERITY = {stored: sent for sent, stored in STORED_SEVERITY.items()}
+
+_repository = AsyncAlertRepository()
+
+
+async def load_missed_alerts(last_alert_id: int, subscription: Subscription, limit: int) -> List[Tuple[int, str]]:
+    """Mensajes de las alertas posteriores a `last_alert_id` para la suscripción (hasta `limit + 1`)"""
+    severities = [STORED_SEVERITY.get(severity, severity) for severity in subscription.severity]
+    async with AsyncSessionLocal() as db:
+        rows = await _repository.get_after(
+            last_alert_id, db,
+            area_ids=subscription.area_id,
+            supervisor_ids=subscription.supervisor_id,
+            user_ids=subscription.user_id,
+            severities=severities,
+            limit=limit + 1,
+        )
+
+    messages = []
+    for row in rows:
+        timestamp = row.timestamp.isoformat() if row.timestamp else None
+        messages.append((row.id, encode_message({
+            "type": "alert",
+            "data": {
+                "id": row.id,
+                "type": row.alert_type,
+                "severity": SENT_SEVERITY.get(row.severity, row.severity),
+                "worker_name": f"{row.first_name} {row.last_name}",
+                "area": row.area_name,
+                "value": row.value,
+                "timestamp": timestamp,
+            },
+            "timestamp": timestamp,
+        })))
+    return messages
+
+
+async def init_alert_replay(manager: ConnectionManager):
+    """Fija el piso del historial en memoria y registra la consulta de respaldo (al iniciar)"""
+    manager.set_replay_loader(load_missed_alerts)
+    try:
+        async with AsyncSessionLocal() as db:
+            floor = await _repository.get_max_id(db)
+    except Exception as e:
+        # Sin piso toda reconexión con last_alert_id consulta la base
+        logger.error(f"No se pudo obtener el último id de alerta: {str(e)}")
+        return
+    manager.alert_history.reset(floor)
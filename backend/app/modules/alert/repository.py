@@ -1,7 +1,12 @@
 # Repositorio del módulo Alert
-from typing import List
-from app.shared.base_repository import BaseRepository
+from typing import List, Dict, Any, Iterable, Optional
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.shared.base_repository import BaseRepository, async_auto_increment_step, inserted_ids
 from app.modules.alert.models import Alert
+from app.modules.alert.categories import alert_category
 from app.core.database import SessionLocal
 
 
@@ -9,6 +14,99 @@ class AlertRepository(BaseRepository[Alert]):
     def __init__(self):
         super().__init__(Alert)
 
+    def create(self, data: Dict[str, Any], db: Optional[Session] = None) -> Alert:
+        data["category"] = alert_category(data.get("alert_type"))
+        return super().create(data, db)
+
+    def update(self, id: int, data: Dict[str, Any], db: Optional[Session] = None) -> Optional[Alert]:
+        if data.get("alert_type") is None:
+            return super().update(id, data, db)
+        if db is None:
+            with SessionLocal() as db:
+                try:
+                    instance = self.update(id, data, db)
+                    if instance:
+                        db.commit()
+                        db.refresh(instance)
+                    return instance
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    raise e
+        instance = super().update(id, data, db)
+        if instance:
+            # Asignada aparte: el update base omite los None (tipo sin categoría)
+            instance.category = alert_category(instance.alert_type)
+        return instance
+
     def get_by_reading(self, reading_id: int) -> List[Alert]:
         with SessionLocal() as db:
             return db.query(self.model).filter(self.model.reading_id == reading_id).all()
+
+
+class AsyncAlertRepository:
+    """Inserción asíncrona de alertas desde el pipeline de lecturas"""
+
+    def __init__(self):
+        self.model = Alert
+
+    async def create_many(self, rows: List[Dict[str, Any]], db: AsyncSession) -> List[int]:
+        """
+        Inserta varias alertas con un único INSERT multi-fila dentro de la
+        transacción de `db` y devuelve sus IDs en el mismo orden de `rows`.
+        La categoría de cada una se resuelve aquí desde su alert_type.
+        """
+        if not rows:
+            return []
+        values = [{**row, "category": alert_category(row["alert_type"])} for row in rows]
+        result = await db.execute(insert(Alert).values(values))
+        return inserted_ids(result, len(rows), await async_auto_increment_step(db))
+
+    async def get_max_id(self, db: AsyncSession) -> int:
+        result = await db.execute(select(func.max(Alert.id)))
+        return result.scalar() or 0
+
+    async def get_after(
+        self,
+        last_id: int,
+        db: AsyncSession,
+        area_ids: Iterable[int] = (),
+        supervisor_ids: Iterable[int] = (),
+        user_ids: Iterable[int] = (),
+        severities: Iterable[str] = (),
+        limit: int = 50,
+    ) -> List[Any]:
+        """
+        Las `limit` alertas más nuevas con id mayor a `last_id` (por la clave
+        primaria), con su valor, trabajador, área y supervisor.
+        Área, supervisor y usuario se combinan con OR, como en las suscripciones.
+        Retorna las filas del id más viejo al más nuevo.
+        """
+        # Import diferido: el módulo auth importa users, que importa auth
+        from app.modules.auth.models import User
+        from app.modules.area.models import Area
+
+        stmt = (
+            select(
+                Alert.id, Alert.alert_type, Alert.severity, Alert.value, Alert.timestamp, Alert.user_id,
+                User.first_name, User.last_name, User.area_id, User.supervisor_id, Area.name.label("area_name"),
+            )
+            .join(User, User.id == Alert.user_id)
+            .outerjoin(Area, Area.id == User.area_id)
+            .where(Alert.id > last_id)
+        )
+        scopes = []
+        area_ids, supervisor_ids, user_ids = list(area_ids), list(supervisor_ids), list(user_ids)
+        if area_ids:
+            scopes.append(User.area_id.in_(area_ids))
+        if supervisor_ids:
+            scopes.append(User.supervisor_id.in_(supervisor_ids))
+        if user_ids:
+            scopes.append(Alert.user_id.in_(user_ids))
+        if scopes:
+            stmt = stmt.where(or_(*scopes))
+        severities = list(severities)
+        if severities:
+            stmt = stmt.where(Alert.severity.in_(severities))
+
+        result = await db.execute(stmt.order_by(Alert.id.desc()).limit(limit))
+        return list(reversed(result.all()))
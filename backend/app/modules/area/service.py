@@ -43,6 +43,25 @@ class AreaService(BaseService[Area, AreaCreateSchema, AreaUpdateSchema, AreaSche
         
         return area_data
     
+    def update(self, id: int, data: AreaUpdateSchema) -> AreaSchema:
+        from app.modules.users.cache import worker_info_cache
+        from app.modules.reading.state import worker_state
+
+        result = super().update(id, data)
+        # El nombre del área viaja en las alertas y el dashboard de sus trabajadores
+        worker_info_cache.invalidate_area(id)
+        worker_state.invalidate_workers()
+        return result
+
+    def delete(self, id: int) -> Dict[str, str]:
+        from app.modules.users.cache import worker_info_cache
+        from app.modules.reading.state import worker_state
+
+        result = super().delete(id)
+        worker_info_cache.invalidate_area(id)
+        worker_state.invalidate_workers()
+        return result
+
     def _to_response_schema(self, entity: Area) -> AreaSchema:
         """Convierte entidad Area a AreaSchema"""
         return AreaSchema.from_orm(entity)
\ No newline at end of file
@@ -1,14 +1,56 @@
 # Repositorio del módulo Connection
-from typing import List
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
 from app.shared.base_repository import BaseRepository
 from app.modules.connection.models import Connection
+from app.modules.device.repository import connection_status_upsert
 from app.core.database import SessionLocal
 
 
 class ConnectionRepository(BaseRepository[Connection]):
+    """Cada alta o cambio de conexión actualiza device_status en la misma transacción"""
+
     def __init__(self):
         super().__init__(Connection)
 
+    def create(self, data: Dict[str, Any], db: Optional[Session] = None) -> Connection:
+        if db is None:
+            with SessionLocal() as db:
+                try:
+                    instance = self.create(data, db)
+                    db.commit()
+                    db.refresh(instance)
+                    return instance
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    raise e
+        instance = super().create(data, db)
+        self._track_status(instance, db)
+        return instance
+
+    def update(self, id: int, data: Dict[str, Any], db: Optional[Session] = None) -> Optional[Connection]:
+        if db is None:
+            with SessionLocal() as db:
+                try:
+                    instance = self.update(id, data, db)
+                    if instance:
+                        db.commit()
+                        db.refresh(instance)
+                    return instance
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    raise e
+        instance = super().update(id, data, db)
+        if instance:
+            self._track_status(instance, db)
+        return instance
+
+    def _track_status(self, instance: Connection, db: Session):
+        # El flush asigna id y timestamp del servidor, que se copian a device_status
+        db.flush()
+        db.execute(*connection_status_upsert(db.get_bind().dialect, instance))
+
     def get_by_device(self, device_id: int) -> List[Connection]:
         with SessionLocal() as db:
             return db.query(self.model).filter(self.model.device_id == device_id).all()
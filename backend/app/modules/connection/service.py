@@ -6,6 +6,9 @@ from fastapi import HTTPException, status
 from app.shared.base_service import BaseService
 from app.modules.connection.models import Connection, ConnectionCreateSchema, ConnectionUpdateSchema, ConnectionSchema
 from app.modules.connection.repository import ConnectionRepository
+from app.modules.device.repository import DeviceRepository
+from app.modules.dashboard.live import live_telemetry
+from app.modules.reading.state import worker_state
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +27,27 @@ class ConnectionService(BaseService[Connection, ConnectionCreateSchema, Connecti
     def _to_response_schema(self, entity: Connection) -> ConnectionSchema:
         return ConnectionSchema.from_orm(entity)
 
+    def create(self, data: ConnectionCreateSchema) -> ConnectionSchema:
+        connection = super().create(data)
+        self._track(connection)
+        return connection
+
+    def update(self, id: int, data: ConnectionUpdateSchema) -> ConnectionSchema:
+        connection = super().update(id, data)
+        self._track(connection)
+        return connection
+
+    def _track(self, connection: ConnectionSchema):
+        """Estado del casco en memoria (dashboard y /ws/live); el casco se lee de la base solo si no se conoce"""
+        device_id = connection.device_id
+        if not worker_state.knows_device(device_id):
+            device = DeviceRepository().get_by_id(device_id)
+            if device:
+                worker_state.set_device(device.id, device.user_id, device.is_active, device.battery)
+        worker_state.set_connection(device_id, connection.status, connection.timestamp)
+        live_telemetry.set_connection(device_id, connection.status, connection.timestamp,
+                                      worker_state.device_user(device_id))
+
     def get_by_device(self, device_id: int) -> List[ConnectionSchema]:
         try:
             items = self.repository.get_by_device(device_id)
@@ -0,0 +1,247 @@
+# Telemetría en vivo de los trabajadores para /ws/live
+"""
+Último valor de cada trabajador (pulso, temperatura, CO, batería y estado de
+conexión) mantenido en memoria a partir de la ingesta, en lugar de que cada
+dashboard consulte /dashboard/active-workers periódicamente. Las lecturas y
+los cambios de conexión actualizan el estado al llegar; la batería se toma en
+cada tick del estado de cascos en memoria (app.modules.reading.state).
+
+Los cambios se acumulan por trabajador y se envían a un ritmo fijo (`tick_ms`)
+como deltas con solo los campos que cambiaron desde el tick anterior:
+
+    {"type": "telemetry", "seq": 42, "workers": [{"id": 7, "ritmoCardiaco": 81}]}
+
+Al conectarse, el cliente recibe primero un snapshot completo:
+
+    {"type": "snapshot", "seq": 41, "workers": [{"id": 7, "nombre": "...", ...}]}
+
+`seq` es propio de cada proceso: los frames `telemetry` solo van a los clientes
+conectados al proceso que los numera, así un salto en `seq` siempre es un
+delta perdido y el cliente pide un snapshot nuevo. Con varios workers de
+uvicorn cada proceso publica por el backplane los cambios de sus lecturas (sin
+frame) y aplica los de los demás; esos cambios salen hacia sus propios clientes
+en su siguiente tick, con su propia numeración, y no se vuelven a publicar.
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.websocket import manager
+from app.modules.reading.state import worker_state
+
+logger = logging.getLogger(__name__)
+
+LIVE_CHANNEL = "live"
+
+# Campo de la lectura -> clave que usa el dashboard (como en ActiveWorkerSchema)
+READING_FIELDS = (
+    ("pulse", "ritmoCardiaco"),
+    ("body_temp", "temperaturaCorporal"),
+    ("mq7", "nivelCO"),
+)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+class LiveTelemetry:
+    def __init__(self, tick_ms: int = 1000):
+        self.tick_seconds = tick_ms / 1000
+        # user_id -> registro con las claves del dashboard
+        self._workers: Dict[int, Dict[str, Any]] = {}
+        # user_id -> campos cambiados desde el último tick (aquí y en otros procesos)
+        self._dirty: Dict[int, Set[str]] = {}
+        self._remote_dirty: Dict[int, Set[str]] = {}
+        self._device_users: Dict[int, int] = {}
+        # Las rutas síncronas (conexiones) actualizan desde el threadpool
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._task: Optional[asyncio.Task] = None
+
+        self._deltas_sent = 0
+        self._fields_sent = 0
+        self._observed = 0
+
+        manager.add_listener(LIVE_CHANNEL, self._apply_remote)
+
+    def _set(self, user_id: int, field: str, value: Any, remote: bool = False):
+        record = self._workers.get(user_id)
+        if record is None:
+            record = self._workers[user_id] = {"id": user_id}
+        if field not in record or record[field] != value:
+            record[field] = value
+            (self._remote_dirty if remote else self._dirty).setdefault(user_id, set()).add(field)
+
+    # ------------------------------------------------------------------ entradas
+
+    def observe(self, readings: Iterable[Any]):
+        """Incorpora lecturas guardadas (llamado desde la ingesta)"""
+        with self._lock:
+            for reading in readings:
+                user_id = reading.user_id
+                self._observed += 1
+                self._device_users[reading.device_id] = user_id
+                self._set(user_id, "cascoId", reading.device_id)
+                for attr, field in READING_FIELDS:
+                    value = getattr(reading, attr)
+                    if value is not None:
+                        self._set(user_id, field, value)
+                self._set(user_id, "ultimaLectura", _iso(reading.timestamp or datetime.now()))
+                record = self._workers[user_id]
+                if record.get("estado") != "online":
+                    self._set(user_id, "estado", "online")
+                    self._set(user_id, "conectadoDesde", record["ultimaLectura"])
+
+    def knows_device(self, device_id: int) -> bool:
+        return device_id in self._device_users
+
+    def set_connection(self, device_id: int, status: str, at: Optional[datetime] = None,
+                       user_id: Optional[int] = None):
+        """Estado online/offline del casco (ConnectionService)"""
+        with self._lock:
+            if user_id is None:
+                user_id = self._device_users.get(device_id)
+            if user_id is None:
+                return
+            self._device_users[device_id] = user_id
+            self._set(user_id, "cascoId", device_id)
+            self._set(user_id, "estado", status)
+            if status == "online":
+                self._set(user_id, "conectadoDesde", _iso(at or datetime.now()))
+
+    def _apply_remote(self, workers: List[Dict[str, Any]]):
+        """Cambios publicados por otro proceso: se envían a los clientes locales sin volver a publicarse"""
+        with self._lock:
+            for item in workers:
+                user_id = item["id"]
+                for field, value in item.items():
+                    if field != "id":
+                        self._set(user_id, field, value, remote=True)
+                if "cascoId" in item:
+                    self._device_users[item["cascoId"]] = user_id
+
+    # ------------------------------------------------------------------ salidas
+
+    def snapshot_message(self) -> Dict[str, Any]:
+        with self._lock:
+            workers = [dict(record) for record in self._workers.values()]
+        return {"type": "snapshot", "seq": self._seq, "workers": workers}
+
+    async def _resolve_names(self, user_ids: List[int]):
+        # Import diferido: el módulo users importa auth, que importa users
+        from app.modules.users.cache import worker_info_cache
+
+        workers = await worker_info_cache.get_many(user_ids)
+        with self._lock:
+            for user_id, info in workers.items():
+                self._set(user_id, "nombre", info.worker_name)
+                self._set(user_id, "area", info.area_name)
+
+    def _refresh_batteries(self):
+        # Solo el casco vigente de cada trabajador
+        for user_id, record in self._workers.items():
+            device_id = record.get("cascoId")
+            if device_id is not None and worker_state.device_user(device_id) == user_id:
+                self._set(user_id, "nivelBateria", worker_state.battery(device_id))
+
+    async def tick(self):
+        """Envía los cambios acumulados desde el tick anterior"""
+        with self._lock:
+            self._refresh_batteries()
+            unnamed = [uid for uid in self._dirty if "nombre" not in self._workers[uid]]
+        if unnamed:
+            await self._resolve_names(unnamed)
+
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            remote_dirty, self._remote_dirty = self._remote_dirty, {}
+            if not dirty and not remote_dirty:
+                return
+            self._seq += 1
+            seq = self._seq
+            # A los demás procesos solo lo originado aquí
+            published = [
+                {"id": user_id, **{field: self._workers[user_id][field] for field in fields}}
+                for user_id, fields in dirty.items()
+            ]
+            for user_id, fields in remote_dirty.items():
+                dirty.setdefault(user_id, set()).update(fields)
+            workers = [
+                {"id": user_id, **{field: self._workers[user_id][field] for field in fields}}
+                for user_id, fields in dirty.items()
+            ]
+
+        self._deltas_sent += 1
+        self._fields_sent += sum(len(fields) for fields in dirty.values())
+        if published:
+            await manager.publish_data(LIVE_CHANNEL, published)
+        await manager.send_local({"type": "telemetry", "seq": seq, "workers": workers}, LIVE_CHANNEL)
+
+    async def _run(self):
+        await self._seed()
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"Error en el tick de telemetría en vivo: {str(e)}")
+
+    async def _seed(self):
+        """Estado inicial con los trabajadores activos (una sola vez al iniciar)"""
+        from app.modules.dashboard.repository import DashboardRepository
+
+        try:
+            if worker_state.ready:
+                rows = await asyncio.to_thread(worker_state.active_workers)
+            else:
+                rows = await asyncio.to_thread(DashboardRepository().get_active_workers)
+        except Exception as e:
+            logger.error(f"No se pudo cargar el estado inicial de la telemetría en vivo: {str(e)}")
+            return
+        with self._lock:
+            for row in rows:
+                user_id = row["id"]
+                self._device_users[row["cascoId"]] = user_id
+                record = self._workers.setdefault(user_id, {"id": user_id})
+                # Lo que ya llegó por la ingesta es más reciente que la consulta
+                for field, value in (
+                    ("nombre", row["nombre"]),
+                    ("numeroEmpleado", row["numeroEmpleado"]),
+                    ("area", row.get("area")),
+                    ("cascoId", row["cascoId"]),
+                    ("ritmoCardiaco", row.get("ritmoCardiaco")),
+                    ("temperaturaCorporal", row.get("temperaturaCorporal")),
+                    ("nivelBateria", row.get("nivelBateria")),
+                    ("estado", "online"),
+                    ("conectadoDesde", _iso(row.get("tiempoActivo_ts"))),
+                ):
+                    record.setdefault(field, value)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "pending": len(self._dirty.keys() | self._remote_dirty.keys()),
+            "seq": self._seq,
+            "tick_ms": int(self.tick_seconds * 1000),
+            "readings_observed": self._observed,
+            "deltas_sent": self._deltas_sent,
+            "fields_sent": self._fields_sent,
+            "clients": manager.channel_size(LIVE_CHANNEL),
+        }
+
+
+live_telemetry = LiveTelemetry(tick_ms=settings.LIVE_TICK_MS)
@@ -116,3 +116,26 @@ class RiskLevelSchema(BaseModel):
     critical_alerts_count: int = Field(..., description="Número de alertas críticas/high en últimas 24h")
     affected_areas_count: int = Field(..., description="Número de áreas afectadas")
     recommendation: str = Field(..., description="Recomendación para el manager")
+
+
+class CoExposureWorkerSchema(BaseModel):
+    """Exposición acumulada a CO de un trabajador en su turno actual"""
+    id: int
+    nombre: Optional[str] = None
+    area: Optional[str] = None
+    twaPpm: float = Field(..., description="Promedio ponderado de 8 h acumulado desde el inicio del turno")
+    stelPpm: float = Field(..., description="Promedio de los últimos 15 minutos")
+    twaPorcentaje: float = Field(..., description="TWA como porcentaje del límite")
+    stelPorcentaje: float = Field(..., description="STEL como porcentaje del límite")
+    picoPpm: float
+    ultimoPpm: float
+    inicioPeriodo: datetime = Field(..., description="Inicio del turno (o de la sesión del casco si no tiene turno)")
+    ancladoATurno: bool
+    ultimaLectura: Optional[datetime] = None
+
+
+class CoExposureSchema(BaseModel):
+    """Exposición a CO de los trabajadores con lecturas recientes"""
+    limiteTwaPpm: float
+    limiteStelPpm: float
+    trabajadores: list[CoExposureWorkerSchema]
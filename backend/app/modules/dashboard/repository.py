@@ -1,16 +1,26 @@
 # Repositorio del módulo Dashboard
-from typing import List, Dict, Any
-from sqlalchemy import func, and_, or_
+import time
+from typing import List, Dict, Any, Optional
+from sqlalchemy import case, func, or_, select, union_all
+from sqlalchemy.orm import aliased
 
 from app.core.database import SessionLocal
 from app.modules.auth.models import User
 from app.modules.position.models import Position
-from app.modules.device.models import Device
+from app.modules.device.models import Device, DeviceStatus
 from app.modules.area.models import Area
-from app.modules.connection.models import Connection
 from app.modules.sensor.models import Sensor
-from app.modules.reading.models import Reading
+from app.modules.reading.models import Reading, ReadingHourlyRollup, ReadingDailyRollup
 from app.modules.alert.models import Alert
+from app.modules.alert.categories import TOXIC_GAS, HEART_RATE, BODY_TEMPERATURE, FALL_IMPACT
+
+# Categoría de alerta (alert.category) -> clave de los gráficos del dashboard
+ALERT_CATEGORY_KEYS = {
+    TOXIC_GAS: 'gasesToxicos',
+    HEART_RATE: 'ritmoCardiacoAnormal',
+    BODY_TEMPERATURE: 'temperaturaCorporalAlta',
+    FALL_IMPACT: 'caidasImpactos',
+}
 
 
 class DashboardRepository:
@@ -34,178 +44,79 @@ class DashboardRepository:
 
     def get_active_workers(self) -> List[Dict[str, Any]]:
         """Trabajadores activos por última conexión online del casco con métricas recientes."""
-        results: List[Dict[str, Any]] = []
-        with SessionLocal() as db:
-            # Subconsulta: última conexión por dispositivo
-            last_conn_sq = (
-                db.query(
-                    Connection.device_id.label('device_id'),
-                    func.max(Connection.timestamp).label('max_ts')
-                )
-                .group_by(Connection.device_id)
-                .subquery()
-            )
-
-            # Subconsulta: usuarios que tienen al menos una lectura con valores válidos
-            users_with_readings_sq = (
-                db.query(Reading.user_id.distinct())
-                .filter(
-                    Reading.pulse.isnot(None),
-                    Reading.body_temp.isnot(None)
-                )
-                .subquery()
-            )
-
-            q = (
-                db.query(
-                    User.id.label('user_id'),
-                    User.first_name,
-                    User.last_name,
-                    User.employee_number,
-                    Area.name.label('area_name'),
-                    Device.id.label('device_id'),
-                    Device.battery.label('battery'),
-                    Connection.status.label('conn_status'),
-                    Connection.timestamp.label('conn_ts')
-                )
-                .join(Device, Device.user_id == User.id)
-                .outerjoin(Area, Area.id == User.area_id)
-                .join(last_conn_sq, last_conn_sq.c.device_id == Device.id)
-                .join(Connection, and_(
-                    Connection.device_id == last_conn_sq.c.device_id,
-                    Connection.timestamp == last_conn_sq.c.max_ts
-                ))
-                .filter(
-                    User.is_active == True,
-                    Device.is_active == True,
-                    Connection.status == 'online',
-                    or_(Area.id == None, Area.is_active == True),
-                    User.id.in_(users_with_readings_sq)
-                )
-            )
-
-            rows = q.all()
-
-            for r in rows:
-                # Obtener la última lectura con valores válidos del dispositivo para el usuario
-                last_reading = (
-                    db.query(Reading)
-                    .filter(
-                        Reading.user_id == r.user_id,
-                        Reading.device_id == r.device_id,
-                        Reading.pulse.isnot(None),
-                        Reading.body_temp.isnot(None)
-                    )
-                    .order_by(Reading.timestamp.desc())
-                    .first()
-                )
-
-                # Extraer valores
-                ritmo_cardiaco = None
-                temperatura_corporal = None
-                
-                if last_reading:
-                    ritmo_cardiaco = last_reading.pulse
-                    temperatura_corporal = last_reading.body_temp
-
-                results.append({
-                    'id': r.user_id,
-                    'nombre': f"{r.first_name} {r.last_name}",
-                    'numeroEmpleado': r.employee_number,
-                    'area': r.area_name,
-                    'ritmoCardiaco': ritmo_cardiaco,
-                    'temperaturaCorporal': temperatura_corporal,
-                    'nivelBateria': r.battery,
-                    'tiempoActivo_ts': r.conn_ts,
-                    'cascoId': r.device_id,
-                })
-
-        return results
+        return self._get_active_workers()
 
     def get_active_workers_by_supervisor(self, supervisor_id: int) -> List[Dict[str, Any]]:
         """Trabajadores activos filtrados por supervisor_id con métricas recientes."""
-        results: List[Dict[str, Any]] = []
-        with SessionLocal() as db:
-            # Subconsulta: última conexión por dispositivo
-            last_conn_sq = (
-                db.query(
-                    Connection.device_id.label('device_id'),
-                    func.max(Connection.timestamp).label('max_ts')
-                )
-                .group_by(Connection.device_id)
-                .subquery()
+        return self._get_active_workers(supervisor_id)
+
+    @staticmethod
+    def _online_workers_query(db, *columns):
+        """
+        Usuarios activos con su casco activo en línea y alguna lectura válida.
+
+        La última conexión de cada casco sale de device_status (una fila por
+        casco, mantenida por la ingesta y las conexiones), sin agrupar la tabla
+        connection. Que el usuario tenga alguna lectura válida se comprueba con
+        EXISTS sobre idx_user_timestamp.
+        """
+        # Usuarios que tienen al menos una lectura con valores válidos (en cualquier casco)
+        valid = aliased(Reading)
+        has_valid_reading = (
+            select(valid.id)
+            .where(
+                valid.user_id == User.id,
+                valid.pulse.isnot(None),
+                valid.body_temp.isnot(None)
             )
-
-            # Subconsulta: usuarios que tienen al menos una lectura con valores válidos
-            users_with_readings_sq = (
-                db.query(Reading.user_id.distinct())
-                .filter(
-                    Reading.pulse.isnot(None),
-                    Reading.body_temp.isnot(None)
-                )
-                .subquery()
+            .correlate(User)
+            .exists()
+        )
+
+        return (
+            db.query(*columns)
+            .select_from(User)
+            .join(Device, Device.user_id == User.id)
+            .outerjoin(Area, Area.id == User.area_id)
+            .join(DeviceStatus, DeviceStatus.device_id == Device.id)
+            .filter(
+                User.is_active == True,
+                Device.is_active == True,
+                DeviceStatus.connection_status == 'online',
+                or_(Area.id == None, Area.is_active == True),
+                has_valid_reading
             )
+        )
 
-            q = (
-                db.query(
-                    User.id.label('user_id'),
-                    User.first_name,
-                    User.last_name,
-                    User.employee_number,
-                    Area.name.label('area_name'),
-                    Device.id.label('device_id'),
-                    Device.battery.label('battery'),
-                    Connection.status.label('conn_status'),
-                    Connection.timestamp.label('conn_ts')
-                )
-                .join(Device, Device.user_id == User.id)
-                .outerjoin(Area, Area.id == User.area_id)
-                .join(last_conn_sq, last_conn_sq.c.device_id == Device.id)
-                .join(Connection, and_(
-                    Connection.device_id == last_conn_sq.c.device_id,
-                    Connection.timestamp == last_conn_sq.c.max_ts
-                ))
-                .filter(
-                    User.supervisor_id == supervisor_id,
-                    User.is_active == True,
-                    Device.is_active == True,
-                    Connection.status == 'online',
-                    or_(Area.id == None, Area.is_active == True),
-                    User.id.in_(users_with_readings_sq)
-                )
+    def _get_active_workers(self, supervisor_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Trabajadores con su casco en línea y sus últimos signos vitales (device_status), en una sola consulta."""
+        results: List[Dict[str, Any]] = []
+        with SessionLocal() as db:
+            q = self._online_workers_query(
+                db,
+                User.id.label('user_id'),
+                User.first_name,
+                User.last_name,
+                User.employee_number,
+                Area.name.label('area_name'),
+                Device.id.label('device_id'),
+                Device.battery.label('battery'),
+                DeviceStatus.connection_at.label('conn_ts'),
+                # Signos vitales del trabajador actual del casco
+                case((DeviceStatus.vitals_user_id == User.id, DeviceStatus.pulse)).label('pulse'),
+                case((DeviceStatus.vitals_user_id == User.id, DeviceStatus.body_temp)).label('body_temp')
             )
+            if supervisor_id is not None:
+                q = q.filter(User.supervisor_id == supervisor_id)
 
-            rows = q.all()
-
-            for r in rows:
-                # Obtener la última lectura con valores válidos del dispositivo para el usuario
-                last_reading = (
-                    db.query(Reading)
-                    .filter(
-                        Reading.user_id == r.user_id,
-                        Reading.device_id == r.device_id,
-                        Reading.pulse.isnot(None),
-                        Reading.body_temp.isnot(None)
-                    )
-                    .order_by(Reading.timestamp.desc())
-                    .first()
-                )
-
-                # Extraer valores
-                ritmo_cardiaco = None
-                temperatura_corporal = None
-                
-                if last_reading:
-                    ritmo_cardiaco = last_reading.pulse
-                    temperatura_corporal = last_reading.body_temp
-
+            for r in q.all():
                 results.append({
                     'id': r.user_id,
                     'nombre': f"{r.first_name} {r.last_name}",
                     'numeroEmpleado': r.employee_number,
                     'area': r.area_name,
-                    'ritmoCardiaco': ritmo_cardiaco,
-                    'temperaturaCorporal': temperatura_corporal,
+                    'ritmoCardiaco': r.pulse,
+                    'temperaturaCorporal': r.body_temp,
                     'nivelBateria': r.battery,
                     'tiempoActivo_ts': r.conn_ts,
                     'cascoId': r.device_id,
@@ -245,23 +156,25 @@ class DashboardRepository:
             }
 
     def get_device_stats(self) -> Dict[str, any]:
-        """Obtiene estadísticas de dispositivos activos y totales."""
-        from app.modules.device.models import Device
-        
+        """
+        Obtiene estadísticas de dispositivos activos y totales.
+        Solo cuenta: los cascos conectados con las mismas condiciones que
+        get_active_workers, sin traer las filas de los trabajadores.
+        """
         with SessionLocal() as db:
             # Total de dispositivos activos en el sistema
             total_devices = (
-                db.query(Device)
+                db.query(func.count(Device.id))
                 .filter(Device.is_active == True)
-                .count()
+                .scalar()
             )
-            
-            # Dispositivos actualmente conectados (desde active_workers)
-            active_devices_count = len(self.get_active_workers())
-            
+
+            # Dispositivos actualmente conectados (mismas condiciones que active_workers)
+            active_devices_count = self._online_workers_query(db, func.count(Device.id)).scalar()
+
             # Calcular porcentaje de conexión
             connection_rate = round((active_devices_count / total_devices * 100), 2) if total_devices > 0 else 0.0
-            
+
             return {
                 'active_devices': active_devices_count,
                 'total_devices': total_devices,
@@ -328,217 +241,165 @@ class DashboardRepository:
             }
 
     def get_alert_counts_last_month_by_type(self) -> Dict[str, int]:
-        """Cuenta alertas del último mes por categorías de dashboard."""
+        """Cuenta alertas del último mes por categorías de dashboard (un GROUP BY sobre alert.category)."""
         from datetime import datetime, timedelta, timezone
         start_ts = datetime.now(timezone.utc) - timedelta(days=30)
 
-        # Aliases por categoría (lowercase para comparación case-insensitive)
-        gases_aliases = [
-            'toxic_gas', 'toxic gas', 'gases toxicos', 'gases_toxicos', 'toxicgas'
-        ]
-        hr_aliases = [
-            'heart_rate_anomaly', 'heart rate anomaly', 'heart_rate_high', 'heart rate high',
-            'heart_rate_low', 'heart rate low', 'ritmo_cardiaco_anormal', 'ritmo cardiaco anormal'
-        ]
-        temp_aliases = [
-            'high_body_temperature', 'body temperature high', 'temperatura_corporal_alta', 'temperatura corporal alta'
-        ]
-        impact_aliases = [
-            'fall_detected', 'impact_detected', 'caida', 'impacto', 'caidas_impactos', 'caidas impactos'
-        ]
-
         with SessionLocal() as db:
-            def count_for(aliases: List[str]) -> int:
-                return db.query(func.count(Alert.id)).filter(
+            rows = (
+                db.query(Alert.category, func.count(Alert.id))
+                .filter(
                     Alert.timestamp >= start_ts,
-                    func.lower(Alert.alert_type).in_([a.lower() for a in aliases])
-                ).scalar() or 0
+                    Alert.category.in_(ALERT_CATEGORY_KEYS)
+                )
+                .group_by(Alert.category)
+                .all()
+            )
 
-            return {
-                'gasesToxicos': count_for(gases_aliases),
-                'ritmoCardiacoAnormal': count_for(hr_aliases),
-                'temperaturaCorporalAlta': count_for(temp_aliases),
-                'caidasImpactos': count_for(impact_aliases)
-            }
+        counts = dict(rows)
+        return {key: counts.get(category, 0) for category, key in ALERT_CATEGORY_KEYS.items()}
 
     def get_alerts_by_type_weekly(self) -> Dict[str, any]:
-        """Cuenta alertas de las últimas 4 semanas por categorías, agrupadas por semana."""
+        """
+        Cuenta alertas de las últimas 4 semanas por categorías, agrupadas por semana,
+        en una sola consulta agrupada por (semana, categoría).
+        """
         from datetime import datetime, timedelta, timezone
-        from app.modules.alert.models import Alert
-        
-        now = datetime.now(timezone.utc)
-        
-        # Aliases por categoría
-        gases_aliases = [
-            'toxic_gas', 'toxic gas', 'gases toxicos', 'gases_toxicos', 'toxicgas'
-        ]
-        hr_aliases = [
-            'heart_rate_anomaly', 'heart rate anomaly', 'heart_rate_high', 'heart rate high',
-            'heart_rate_low', 'heart rate low', 'ritmo_cardiaco_anormal', 'ritmo cardiaco anormal'
-        ]
-        temp_aliases = [
-            'high_body_temperature', 'body temperature high', 'temperatura_corporal_alta', 'temperatura corporal alta'
-        ]
-        impact_aliases = [
-            'fall_detected', 'impact_detected', 'caida', 'impacto', 'caidas_impactos', 'caidas impactos'
-        ]
 
-        with SessionLocal() as db:
-            def count_for_week(aliases: List[str], week_start: datetime, week_end: datetime) -> int:
-                return db.query(func.count(Alert.id)).filter(
-                    Alert.timestamp >= week_start,
-                    Alert.timestamp < week_end,
-                    func.lower(Alert.alert_type).in_([a.lower() for a in aliases])
-                ).scalar() or 0
-
-            # Calcular rangos de 4 semanas (28 días hacia atrás)
-            weeks = []
-            gases_data = []
-            hr_data = []
-            temp_data = []
-            impact_data = []
-            
-            for i in range(4):
-                week_end = now - timedelta(days=i*7)
-                week_start = week_end - timedelta(days=7)
-                weeks.insert(0, f'Semana {4-i}')
-                
-                gases_data.insert(0, count_for_week(gases_aliases, week_start, week_end))
-                hr_data.insert(0, count_for_week(hr_aliases, week_start, week_end))
-                temp_data.insert(0, count_for_week(temp_aliases, week_start, week_end))
-                impact_data.insert(0, count_for_week(impact_aliases, week_start, week_end))
-
-            return {
-                'labels': weeks,
-                'gasesToxicos': gases_data,
-                'ritmoCardiacoAnormal': hr_data,
-                'temperaturaCorporalAlta': temp_data,
-                'caidasImpactos': impact_data
-            }
-
-    def get_biometrics_avg_by_area(self, days: int = 30) -> List[Dict[str, Any]]:
-        """Promedios de ritmo cardiaco y temperatura corporal por área en el rango indicado (máximo 4 áreas)."""
-        from datetime import datetime, timedelta, timezone
-        start_ts = datetime.now(timezone.utc) - timedelta(days=days)
+        now = datetime.now(timezone.utc)
+        # Inicio de cada semana, de la más antigua (Semana 1) a la más reciente (Semana 4)
+        week_starts = [now - timedelta(days=7 * (4 - i)) for i in range(4)]
 
         with SessionLocal() as db:
-            # Promedios de ritmo cardíaco (pulse) por área
-            hr_rows = (
-                db.query(
-                    Area.name.label('area_name'),
-                    func.avg(Reading.pulse).label('hr_avg')
-                )
-                .join(User, User.id == Reading.user_id)
-                .join(Area, Area.id == User.area_id)
+            # Índice de semana de cada alerta: se prueba desde la más reciente
+            week = case(*[(Alert.timestamp >= week_starts[i], i) for i in reversed(range(4))])
+            in_range = (
+                db.query(week.label('week'), Alert.category.label('category'))
                 .filter(
-                    Reading.timestamp >= start_ts,
-                    Reading.pulse != None,
-                    User.is_active == True,
-                    Area.is_active == True
+                    Alert.timestamp >= week_starts[0],
+                    Alert.timestamp < now,
+                    Alert.category.in_(ALERT_CATEGORY_KEYS)
                 )
-                .group_by(Area.name)
-                .order_by(func.count(Reading.id).desc())  # Ordenar por cantidad de lecturas
-                .limit(4)  # Limitar a 4 áreas
+                .subquery()
+            )
+            rows = (
+                db.query(in_range.c.week, in_range.c.category, func.count())
+                .group_by(in_range.c.week, in_range.c.category)
                 .all()
             )
 
-            # Promedios de temperatura corporal (body_temp) por área
-            temp_rows = (
+        data = {key: [0, 0, 0, 0] for key in ALERT_CATEGORY_KEYS.values()}
+        for week_index, category, count in rows:
+            data[ALERT_CATEGORY_KEYS[category]][week_index] = count
+
+        return {'labels': [f'Semana {i + 1}' for i in range(4)], **data}
+
+    @staticmethod
+    def _rollup_window(days: int):
+        """
+        Agregados de lecturas de los últimos `days` días con resolución de una
+        hora: los días completos de la tabla diaria y los bordes (el inicio del
+        rango y el día en curso) de la horaria. Subconsulta con user_id y las
+        sumas y conteos de cada fila.
+        """
+        from app.modules.reading.rollup import DAY_SECONDS, HOUR_SECONDS, current_period
+
+        now = time.time()
+        hours_per_day = DAY_SECONDS // HOUR_SECONDS
+        start_hour = current_period(HOUR_SECONDS, now - days * DAY_SECONDS)
+        first_day = -(-start_hour // hours_per_day)  # primer día completo del rango
+        today = current_period(DAY_SECONDS, now)
+
+        def sums(model):
+            return select(
+                model.user_id,
+                model.pulse_count, model.pulse_sum,
+                model.body_temp_count, model.body_temp_sum,
+                model.vitals_count, model.vitals_pulse_sum, model.vitals_body_temp_sum,
+            )
+
+        hourly, daily = ReadingHourlyRollup, ReadingDailyRollup
+        if first_day >= today:
+            return sums(hourly).where(hourly.period >= start_hour).subquery()
+        return union_all(
+            sums(hourly).where(hourly.period >= start_hour, hourly.period < first_day * hours_per_day),
+            sums(daily).where(daily.period >= first_day, daily.period < today),
+            sums(hourly).where(hourly.period >= today * hours_per_day),
+        ).subquery()
+
+    def _biometrics_by_area(self, days: int, supervisor_id: Optional[int] = None) -> List[Any]:
+        """Conteos y sumas de pulso y temperatura por área (trabajadores y áreas activos)"""
+        with SessionLocal() as db:
+            rollup = self._rollup_window(days)
+            q = (
                 db.query(
                     Area.name.label('area_name'),
-                    func.avg(Reading.body_temp).label('temp_avg')
+                    func.sum(rollup.c.pulse_count).label('hr_count'),
+                    func.sum(rollup.c.pulse_sum).label('hr_sum'),
+                    func.sum(rollup.c.body_temp_count).label('temp_count'),
+                    func.sum(rollup.c.body_temp_sum).label('temp_sum')
                 )
-                .join(User, User.id == Reading.user_id)
+                .select_from(rollup)
+                .join(User, User.id == rollup.c.user_id)
                 .join(Area, Area.id == User.area_id)
                 .filter(
-                    Reading.timestamp >= start_ts,
-                    Reading.body_temp != None,
                     User.is_active == True,
                     Area.is_active == True
                 )
                 .group_by(Area.name)
-                .order_by(func.count(Reading.id).desc())  # Ordenar por cantidad de lecturas
-                .limit(4)  # Limitar a 4 áreas
-                .all()
             )
+            if supervisor_id is not None:
+                q = q.filter(User.supervisor_id == supervisor_id)
+            return q.all()
 
-            # Combinar resultados por área
-            hr_map = {r.area_name: float(r.hr_avg) for r in hr_rows if r.hr_avg is not None}
-            temp_map = {r.area_name: float(r.temp_avg) for r in temp_rows if r.temp_avg is not None}
+    def get_biometrics_avg_by_area(self, days: int = 30) -> List[Dict[str, Any]]:
+        """
+        Promedios de ritmo cardiaco y temperatura corporal por área en el rango indicado (máximo 4 áreas).
+        Se calculan desde los agregados horarios y diarios (app.modules.reading.rollup), no desde reading.
+        """
+        rows = self._biometrics_by_area(days)
 
-            # Áreas presentes en cualquiera de los dos mapas (máximo 4)
-            all_areas = sorted(set(hr_map.keys()) | set(temp_map.keys()))[:4]
+        # Por métrica, las 4 áreas con más lecturas
+        hr_rows = sorted((r for r in rows if r.hr_count), key=lambda r: r.hr_count, reverse=True)[:4]
+        temp_rows = sorted((r for r in rows if r.temp_count), key=lambda r: r.temp_count, reverse=True)[:4]
 
-            results: List[Dict[str, Any]] = []
-            for area in all_areas:
-                results.append({
-                    'area': area,
-                    'hr_avg': hr_map.get(area),
-                    'temp_avg': temp_map.get(area)
-                })
+        # Combinar resultados por área
+        hr_map = {r.area_name: float(r.hr_sum) / r.hr_count for r in hr_rows}
+        temp_map = {r.area_name: float(r.temp_sum) / r.temp_count for r in temp_rows}
 
-            return results
+        # Áreas presentes en cualquiera de los dos mapas (máximo 4)
+        all_areas = sorted(set(hr_map.keys()) | set(temp_map.keys()))[:4]
 
-    def get_biometrics_avg_by_area_by_supervisor(self, supervisor_id: int, days: int = 30) -> List[Dict[str, Any]]:
-        """Promedios de ritmo cardiaco y temperatura corporal por área filtrados por supervisor."""
-        from datetime import datetime, timedelta, timezone
-        start_ts = datetime.now(timezone.utc) - timedelta(days=days)
+        results: List[Dict[str, Any]] = []
+        for area in all_areas:
+            results.append({
+                'area': area,
+                'hr_avg': hr_map.get(area),
+                'temp_avg': temp_map.get(area)
+            })
 
-        with SessionLocal() as db:
-            # Promedios de ritmo cardíaco (pulse) por área
-            hr_rows = (
-                db.query(
-                    Area.name.label('area_name'),
-                    func.avg(Reading.pulse).label('hr_avg')
-                )
-                .join(User, User.id == Reading.user_id)
-                .join(Area, Area.id == User.area_id)
-                .filter(
-                    User.supervisor_id == supervisor_id,
-                    Reading.timestamp >= start_ts,
-                    Reading.pulse != None,
-                    User.is_active == True,
-                    Area.is_active == True
-                )
-                .group_by(Area.name)
-                .all()
-            )
+        return results
 
-            # Promedios de temperatura corporal (body_temp) por área
-            temp_rows = (
-                db.query(
-                    Area.name.label('area_name'),
-                    func.avg(Reading.body_temp).label('temp_avg')
-                )
-                .join(User, User.id == Reading.user_id)
-                .join(Area, Area.id == User.area_id)
-                .filter(
-                    User.supervisor_id == supervisor_id,
-                    Reading.timestamp >= start_ts,
-                    Reading.body_temp != None,
-                    User.is_active == True,
-                    Area.is_active == True
-                )
-                .group_by(Area.name)
-                .all()
-            )
+    def get_biometrics_avg_by_area_by_supervisor(self, supervisor_id: int, days: int = 30) -> List[Dict[str, Any]]:
+        """Promedios de ritmo cardiaco y temperatura corporal por área filtrados por supervisor (desde los agregados)."""
+        rows = self._biometrics_by_area(days, supervisor_id)
 
-            # Combinar resultados por área
-            hr_map = {r.area_name: float(r.hr_avg) for r in hr_rows if r.hr_avg is not None}
-            temp_map = {r.area_name: float(r.temp_avg) for r in temp_rows if r.temp_avg is not None}
+        # Combinar resultados por área
+        hr_map = {r.area_name: float(r.hr_sum) / r.hr_count for r in rows if r.hr_count}
+        temp_map = {r.area_name: float(r.temp_sum) / r.temp_count for r in rows if r.temp_count}
 
-            # Áreas presentes en cualquiera de los dos mapas
-            all_areas = sorted(set(hr_map.keys()) | set(temp_map.keys()))
+        # Áreas presentes en cualquiera de los dos mapas
+        all_areas = sorted(set(hr_map.keys()) | set(temp_map.keys()))
 
-            results: List[Dict[str, Any]] = []
-            for area in all_areas:
-                results.append({
-                    'area': area,
-                    'hr_avg': hr_map.get(area),
-                    'temp_avg': temp_map.get(area)
-                })
+        results: List[Dict[str, Any]] = []
+        for area in all_areas:
+            results.append({
+                'area': area,
+                'hr_avg': hr_map.get(area),
+                'temp_avg': temp_map.get(area)
+            })
 
-            return results
+        return results
 
     def get_recent_alerts(self, days: int = 7, limit: int = 20) -> List[Dict[str, Any]]:
         """Obtiene alertas recientes con datos enriquecidos de trabajador, área, estado de dispositivo y valor."""
@@ -546,16 +407,6 @@ class DashboardRepository:
         start_ts = datetime.now(timezone.utc) - timedelta(days=days)
 
         with SessionLocal() as db:
-            # Última conexión por dispositivo (puede no existir, usamos outer join)
-            last_conn_sq = (
-                db.query(
-                    Connection.device_id.label('device_id'),
-                    func.max(Connection.timestamp).label('max_ts')
-                )
-                .group_by(Connection.device_id)
-                .subquery()
-            )
-
             q = (
                 db.query(
                     Alert.id.label('id'),
@@ -567,7 +418,7 @@ class DashboardRepository:
                     Area.name.label('area'),
                     Alert.severity.label('severidad'),
                     Alert.timestamp.label('timestamp'),
-                    Connection.status.label('estado'),
+                    DeviceStatus.connection_status.label('estado'),
                     Device.id.label('device_id'),
                     Reading.pulse.label('pulse'),
                     Reading.body_temp.label('body_temp'),
@@ -577,11 +428,8 @@ class DashboardRepository:
                 .join(User, User.id == Reading.user_id)
                 .outerjoin(Area, Area.id == User.area_id)
                 .join(Device, Device.user_id == User.id)
-                .outerjoin(last_conn_sq, last_conn_sq.c.device_id == Device.id)
-                .outerjoin(Connection, and_(
-                    Connection.device_id == last_conn_sq.c.device_id,
-                    Connection.timestamp == last_conn_sq.c.max_ts
-                ))
+                # Última conexión del casco (puede no tener, usamos outer join)
+                .outerjoin(DeviceStatus, DeviceStatus.device_id == Device.id)
                 .filter(
                     Alert.timestamp >= start_ts,
                     User.is_active == True,
@@ -628,16 +476,6 @@ class DashboardRepository:
         start_ts = datetime.now(timezone.utc) - timedelta(days=days)
 
         with SessionLocal() as db:
-            # Última conexión por dispositivo (puede no existir, usamos outer join)
-            last_conn_sq = (
-                db.query(
-                    Connection.device_id.label('device_id'),
-                    func.max(Connection.timestamp).label('max_ts')
-                )
-                .group_by(Connection.device_id)
-                .subquery()
-            )
-
             q = (
                 db.query(
                     Alert.id.label('id'),
@@ -649,7 +487,7 @@ class DashboardRepository:
                     Area.name.label('area'),
                     Alert.severity.label('severidad'),
                     Alert.timestamp.label('timestamp'),
-                    Connection.status.label('estado'),
+                    DeviceStatus.connection_status.label('estado'),
                     Device.id.label('device_id'),
                     Reading.pulse.label('pulse'),
                     Reading.body_temp.label('body_temp'),
@@ -659,11 +497,8 @@ class DashboardRepository:
                 .join(User, User.id == Reading.user_id)
                 .outerjoin(Area, Area.id == User.area_id)
                 .join(Device, Device.user_id == User.id)
-                .outerjoin(last_conn_sq, last_conn_sq.c.device_id == Device.id)
-                .outerjoin(Connection, and_(
-                    Connection.device_id == last_conn_sq.c.device_id,
-                    Connection.timestamp == last_conn_sq.c.max_ts
-                ))
+                # Última conexión del casco (puede no tener, usamos outer join)
+                .outerjoin(DeviceStatus, DeviceStatus.device_id == Device.id)
                 .filter(
                     User.supervisor_id == supervisor_id,
                     Alert.timestamp >= start_ts,
@@ -706,10 +541,7 @@ class DashboardRepository:
             return results
 
     def get_supervisor_area_biometrics(self, supervisor_id: int, days: int = 30) -> Dict[str, Any]:
-        """Obtiene promedios biométricos del área del supervisor."""
-        from datetime import datetime, timedelta, timezone
-        start_ts = datetime.now(timezone.utc) - timedelta(days=days)
-
+        """Obtiene promedios biométricos del área del supervisor (lecturas con pulso y temperatura, desde los agregados)."""
         with SessionLocal() as db:
             # Primero obtener el área del supervisor
             supervisor = db.query(User).filter(User.id == supervisor_id).first()
@@ -717,22 +549,23 @@ class DashboardRepository:
                 return None
 
             # Calcular promedios para el área del supervisor
+            rollup = self._rollup_window(days)
             result = (
                 db.query(
                     Area.name.label('area'),
-                    func.avg(Reading.pulse).label('hr_avg'),
-                    func.avg(Reading.body_temp).label('temp_avg'),
+                    func.sum(rollup.c.vitals_count).label('vitals_count'),
+                    func.sum(rollup.c.vitals_pulse_sum).label('hr_sum'),
+                    func.sum(rollup.c.vitals_body_temp_sum).label('temp_sum'),
                     func.count(func.distinct(User.id)).label('worker_count')
                 )
-                .join(User, User.area_id == Area.id)
-                .join(Reading, Reading.user_id == User.id)
+                .select_from(rollup)
+                .join(User, User.id == rollup.c.user_id)
+                .join(Area, Area.id == User.area_id)
                 .filter(
                     Area.id == supervisor.area_id,
                     Area.is_active == True,
                     User.is_active == True,
-                    Reading.timestamp >= start_ts,
-                    Reading.pulse.isnot(None),
-                    Reading.body_temp.isnot(None)
+                    rollup.c.vitals_count > 0
                 )
                 .group_by(Area.name)
                 .first()
@@ -743,8 +576,8 @@ class DashboardRepository:
 
             return {
                 'area': result.area,
-                'hr_avg': float(result.hr_avg) if result.hr_avg else 0.0,
-                'temp_avg': float(result.temp_avg) if result.temp_avg else 0.0,
+                'hr_avg': float(result.hr_sum) / result.vitals_count,
+                'temp_avg': float(result.temp_sum) / result.vitals_count,
                 'worker_count': result.worker_count or 0
             }
 
@@ -804,3 +637,19 @@ class DashboardRepository:
                 .order_by(Reading.timestamp.desc())
                 .first()
             )
+
+    def get_worker_labels(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Nombre y área de varios usuarios en una sola consulta."""
+        if not user_ids:
+            return {}
+        with SessionLocal() as db:
+            rows = (
+                db.query(User.id, User.first_name, User.last_name, Area.name)
+                .outerjoin(Area, Area.id == User.area_id)
+                .filter(User.id.in_(user_ids))
+                .all()
+            )
+            return {
+                row[0]: {'nombre': f"{row[1]} {row[2]}", 'area': row[3]}
+                for row in rows
+            }
@@ -16,7 +16,8 @@ from app.modules.dashboard.models import (
     CriticalAlertsStatsSchema,
     DeviceStatsSchema,
     RiskLevelSchema,
-    AlertsByTypeWeeklySchema
+    AlertsByTypeWeeklySchema,
+    CoExposureSchema
 )
 from app.modules.dashboard.service import DashboardService
 
@@ -84,6 +85,14 @@ def get_risk_level(
     return _dashboard_service.get_risk_level()
 
 
+@dashboard_router.get("/exposure/co", response_model=CoExposureSchema)
+def get_co_exposure(
+    current_user: User = Depends(get_current_user)
+):
+    """Exposición a CO por trabajador: TWA de 8 h del turno actual y STEL de 15 minutos"""
+    return _dashboard_service.get_co_exposure()
+
+
 @dashboard_router.get("/biometrics/avg-by-area", response_model=BiometricsByAreaSchema)
 def get_biometrics_avg_by_area(
     days: int = Query(30, ge=1, le=365, description="Rango en días para calcular los promedios"),
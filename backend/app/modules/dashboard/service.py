@@ -2,6 +2,7 @@
 from typing import List
 from fastapi import HTTPException, status
 import logging
+import time
 
 from app.shared.base_service import BaseService
 from app.modules.users.models import UserSchema
@@ -14,6 +15,8 @@ from app.modules.dashboard.models import (
     IncidentCreatedResponseSchema
 )
 from app.modules.dashboard.repository import DashboardRepository
+from app.modules.reading.state import worker_state
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +26,9 @@ class DashboardService:
 
     def __init__(self):
         self.repository = DashboardRepository()
+        # Última respuesta de device-stats y cuándo se calculó (monotonic)
+        self._device_stats = None
+        self._device_stats_at = 0.0
 
     def get_miners_by_supervisor(self, supervisor_id: int) -> List[UserSchema]:
         try:
@@ -38,7 +44,8 @@ class DashboardService:
     def get_active_workers(self) -> List[ActiveWorkerSchema]:
         from datetime import datetime, timezone
         try:
-            rows = self.repository.get_active_workers()
+            # Desde el estado en memoria; la consulta queda para cuando no se pudo cargar
+            rows = worker_state.active_workers() if worker_state.ready else self.repository.get_active_workers()
             result: List[ActiveWorkerSchema] = []
             now = datetime.now(timezone.utc)
             for r in rows:
@@ -69,7 +76,10 @@ class DashboardService:
     def get_active_workers_by_supervisor(self, supervisor_id: int) -> List[ActiveWorkerSchema]:
         from datetime import datetime, timezone
         try:
-            rows = self.repository.get_active_workers_by_supervisor(supervisor_id)
+            if worker_state.ready:
+                rows = worker_state.active_workers(supervisor_id)
+            else:
+                rows = self.repository.get_active_workers_by_supervisor(supervisor_id)
             result: List[ActiveWorkerSchema] = []
             now = datetime.now(timezone.utc)
             for r in rows:
@@ -144,11 +154,18 @@ class DashboardService:
             )
 
     def get_device_stats(self):
-        """Devuelve estadísticas de dispositivos para el dashboard"""
+        """
+        Devuelve estadísticas de dispositivos para el dashboard. Cada panel la
+        pide junto con active-workers: se reutiliza el último resultado durante
+        DEVICE_STATS_TTL_SECONDS.
+        """
         from app.modules.dashboard.models import DeviceStatsSchema
         try:
-            stats = self.repository.get_device_stats()
-            return DeviceStatsSchema(**stats)
+            now = time.monotonic()
+            if self._device_stats is None or now - self._device_stats_at >= settings.DEVICE_STATS_TTL_SECONDS:
+                stats = worker_state.device_stats() if worker_state.ready else self.repository.get_device_stats()
+                self._device_stats, self._device_stats_at = DeviceStatsSchema(**stats), now
+            return self._device_stats
         except Exception as e:
             logger.error(f"Error al obtener estadísticas de dispositivos: {str(e)}")
             raise HTTPException(
@@ -288,12 +305,16 @@ class DashboardService:
         """Obtiene la última lectura del usuario autenticado"""
         try:
             from app.modules.reading.models import ReadingSchema
+            row = worker_state.latest_by_user(user_id)
+            if row is not None:
+                return ReadingSchema(**row)
             reading = self.repository.get_my_latest_reading(user_id)
             if not reading:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="No se encontraron lecturas para el usuario"
                 )
+            worker_state.remember(reading)
             return ReadingSchema.from_orm(reading)
         except HTTPException:
             raise
@@ -303,3 +324,40 @@ class DashboardService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error interno del servidor al obtener lectura"
             )
+
+    def get_co_exposure(self):
+        """Exposición a CO (TWA del turno y STEL de 15 min) desde el integrador en memoria"""
+        from app.modules.dashboard.models import CoExposureSchema, CoExposureWorkerSchema
+        from app.modules.reading.exposure import co_exposure
+        try:
+            items = co_exposure.snapshot()
+            labels = self.repository.get_worker_labels([item["user_id"] for item in items])
+            workers = [
+                CoExposureWorkerSchema(
+                    id=item["user_id"],
+                    nombre=labels.get(item["user_id"], {}).get("nombre"),
+                    area=labels.get(item["user_id"], {}).get("area"),
+                    twaPpm=item["twa_ppm"],
+                    stelPpm=item["stel_ppm"],
+                    twaPorcentaje=item["twa_percent"],
+                    stelPorcentaje=item["stel_percent"],
+                    picoPpm=item["peak_ppm"],
+                    ultimoPpm=item["last_ppm"],
+                    inicioPeriodo=item["period_start"],
+                    ancladoATurno=item["anchored_to_shift"],
+                    ultimaLectura=item["last_reading_at"],
+                )
+                for item in items
+            ]
+            workers.sort(key=lambda w: max(w.twaPorcentaje, w.stelPorcentaje), reverse=True)
+            return CoExposureSchema(
+                limiteTwaPpm=co_exposure.twa_limit,
+                limiteStelPpm=co_exposure.stel_limit,
+                trabajadores=workers,
+            )
+        except Exception as e:
+            logger.error(f"Error al obtener exposición a CO: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error interno del servidor al obtener exposición a CO"
+            )
@@ -2,7 +2,7 @@
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP, ForeignKey, BigInteger, Float
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -21,6 +21,29 @@ class Device(Base):
     updated_at = Column(TIMESTAMP, nullable=True, onupdate=func.now())
 
 
+class DeviceStatus(Base):
+    """
+    Estado actual del casco, una fila por dispositivo: última lectura, últimos
+    signos vitales y última conexión. Lo mantienen la ingesta y ConnectionService
+    (ver reading_status_upsert y connection_status_upsert en device/repository.py);
+    la batería sigue en Device.
+    """
+    __tablename__ = "device_status"
+
+    device_id = Column(Integer, ForeignKey("device.id"), primary_key=True, autoincrement=False)
+    last_reading_id = Column(BigInteger, nullable=True)
+    last_reading_at = Column(TIMESTAMP, nullable=True)
+    vitals_reading_id = Column(BigInteger, nullable=True)
+    vitals_user_id = Column(Integer, nullable=True)
+    pulse = Column(Integer, nullable=True)
+    body_temp = Column(Float, nullable=True)
+    vitals_at = Column(TIMESTAMP, nullable=True)
+    connection_id = Column(Integer, nullable=True)
+    connection_status = Column(String(10), nullable=True)  # online|offline
+    connection_at = Column(TIMESTAMP, nullable=True)
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
+
+
 class DeviceCreateSchema(BaseModel):
     model: str
     user_id: int
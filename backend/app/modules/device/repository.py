@@ -1,8 +1,112 @@
 # Repositorio del módulo Device
-from typing import List
+from typing import Any, Dict, List, Tuple
+from datetime import datetime
+from sqlalchemy import case, func
 from app.shared.base_repository import BaseRepository
-from app.modules.device.models import Device
-from app.core.database import SessionLocal
+from app.modules.device.models import Device, DeviceStatus
+from app.core.database import SessionLocal, precompiled
+
+# Columnas de device_status que actualiza cada escritura, agrupadas por el id que
+# decide si el valor entrante es más nuevo que el guardado (la guarda va última)
+READING_STATUS_COLUMNS = {
+    "last_reading_id": ("last_reading_at", "last_reading_id"),
+    "vitals_reading_id": ("vitals_user_id", "pulse", "body_temp", "vitals_at", "vitals_reading_id"),
+}
+CONNECTION_STATUS_COLUMNS = {
+    "connection_id": ("connection_status", "connection_at", "connection_id"),
+}
+
+
+# Sentencias de upsert ya construidas por (dialecto, tipo de escritura)
+_status_upserts: Dict[Tuple[str, str], Any] = {}
+
+
+def _status_upsert(dialect, kind: str):
+    """
+    Upsert de device_status: INSERT ... ON DUPLICATE KEY UPDATE en MySQL y
+    ON CONFLICT DO UPDATE en SQLite (BD local de benchmarks). Cada grupo de
+    columnas solo se pisa si su id entrante es mayor o igual al guardado, así
+    una escritura que confirma tarde no retrocede el estado; un id NULL deja el
+    grupo como está. Se construye y compila una vez y se ejecuta con los
+    valores como parámetros (una fila por casco).
+    """
+    dialect_name = dialect.name
+    stmt = _status_upserts.get((dialect_name, kind))
+    if stmt is not None:
+        return stmt
+
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.mysql import insert
+
+    # Sobre la tabla (Core): con una lista de parámetros no pasa por el bulk insert del ORM
+    table = DeviceStatus.__table__
+    stmt = insert(table)
+    guarded = READING_STATUS_COLUMNS if kind == "reading" else CONNECTION_STATUS_COLUMNS
+    new = stmt.excluded if dialect_name == "sqlite" else stmt.inserted
+    current = table.c
+
+    # MySQL asigna de izquierda a derecha y cada asignación ve las anteriores:
+    # por eso la columna guarda de cada grupo se actualiza al final
+    assignments = [("updated_at", func.now())]
+    for guard, columns in guarded.items():
+        newer = new[guard] >= func.coalesce(current[guard], 0)
+        assignments.extend((column, case((newer, new[column]), else_=current[column])) for column in columns)
+
+    if dialect_name == "sqlite":
+        stmt = stmt.on_conflict_do_update(index_elements=["device_id"], set_=dict(assignments))
+    else:
+        stmt = stmt.on_duplicate_key_update(assignments)
+    columns = ["device_id"] + [column for group in guarded.values() for column in group]
+    stmt = _status_upserts[(dialect_name, kind)] = precompiled(stmt, dialect, columns)
+    return stmt
+
+
+def reading_status_upsert(dialect, ids: List[int], rows: List[Dict[str, Any]], at: datetime):
+    """
+    Upsert de device_status para lecturas recién insertadas (`ids` en el orden
+    de `rows`, guardadas con el timestamp `at`): una fila por casco con su
+    última lectura y su última con pulso y temperatura. Retorna (sentencia,
+    parámetros) para `execute`.
+
+    Los parámetros van ordenados por device_id: dos lotes concurrentes con
+    cascos en común bloquean las filas en el mismo orden y no se traban.
+    """
+    last: Dict[int, int] = {}
+    vitals: Dict[int, Any] = {}
+    for reading_id, row in zip(ids, rows):
+        device_id = row["device_id"]
+        last[device_id] = reading_id
+        if row.get("pulse") is not None and row.get("body_temp") is not None:
+            vitals[device_id] = (reading_id, row)
+
+    params = []
+    for device_id in sorted(last):
+        reading_id = last[device_id]
+        vitals_id, vitals_row = vitals.get(device_id, (None, {}))
+        params.append({
+            "device_id": device_id,
+            "last_reading_id": reading_id,
+            "last_reading_at": at,
+            "vitals_reading_id": vitals_id,
+            "vitals_user_id": vitals_row.get("user_id"),
+            "pulse": vitals_row.get("pulse"),
+            "body_temp": vitals_row.get("body_temp"),
+            "vitals_at": at if vitals_id is not None else None,
+        })
+    return _status_upsert(dialect, "reading"), params
+
+
+def connection_status_upsert(dialect, connection: Any):
+    """Upsert de device_status con el registro de conexión guardado; retorna (sentencia, parámetros)"""
+    params = {
+        "device_id": connection.device_id,
+        "connection_id": connection.id,
+        "connection_status": connection.status,
+        "connection_at": connection.timestamp,
+    }
+    return _status_upsert(dialect, "connection"), params
 
 
 class DeviceRepository(BaseRepository[Device]):
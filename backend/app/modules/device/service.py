@@ -12,6 +12,7 @@ from app.modules.device.models import (
     DeviceSchema,
 )
 from app.modules.device.repository import DeviceRepository
+from app.modules.reading.state import worker_state
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +38,24 @@ class DeviceService(BaseService[Device, DeviceCreateSchema, DeviceUpdateSchema,
     def _to_response_schema(self, entity: Device) -> DeviceSchema:
         return DeviceSchema.from_orm(entity)
 
+    def create(self, data: DeviceCreateSchema) -> DeviceSchema:
+        device = super().create(data)
+        worker_state.set_device(device.id, device.user_id, device.is_active, device.battery)
+        return device
+
+    def update(self, id: int, data: DeviceUpdateSchema) -> DeviceSchema:
+        device = super().update(id, data)
+        # Reasignación o baja del casco: el dashboard en memoria lo ve al instante
+        worker_state.set_device(device.id, device.user_id, device.is_active, device.battery)
+        return device
+
+    def delete(self, id: int) -> Dict[str, str]:
+        result = super().delete(id)
+        device = self.repository.get_by_id(id)
+        if device:
+            worker_state.set_device(device.id, device.user_id, device.is_active, device.battery)
+        return result
+
     def get_by_user(self, user_id: int) -> List[DeviceSchema]:
         try:
             items = self.repository.get_by_user(user_id)
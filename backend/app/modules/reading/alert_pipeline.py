@@ -0,0 +1,209 @@
+# Etapa asíncrona de alertas: evaluación, persistencia y broadcast fuera de la ingesta
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Etapas que reporta el handler además de la espera en cola
+STAGES = ("queue_wait", "evaluate", "persist", "broadcast", "total")
+
+
+class _LatencyStat:
+    __slots__ = ("count", "total_ms", "max_ms", "last_ms")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def add(self, ms: float):
+        self.count += 1
+        self.total_ms += ms
+        self.last_ms = ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "last": round(self.last_ms, 3),
+            "avg": round(self.total_ms / self.count, 3) if self.count else 0,
+            "max": round(self.max_ms, 3),
+        }
+
+
+class AlertPipeline:
+    """
+    Colas acotadas y tareas de fondo que procesan las alertas de las lecturas ya
+    guardadas. Las lecturas se reparten por user_id entre `workers` colas, así las
+    de un mismo minero se evalúan en orden (la máquina de estados lo necesita).
+    Cada tarea toma hasta `batch_max` lecturas y las pasa por tres funciones, que
+    completan el dict de tiempos por etapa (evaluate, persist, broadcast):
+
+    - `evaluate(lecturas, tiempos)` devuelve las alertas pendientes. Corre una
+      sola vez por lote: avanza la máquina de estados, el detector de caídas y
+      la exposición acumulada.
+    - `deliver(pendientes, tiempos)` las guarda y las envía; devuelve cuántas
+      guardó. Si falla se reintenta hasta `retries` veces, con una espera que
+      empieza en `retry_backoff` segundos y se duplica en cada intento.
+    - `discard(pendientes)` se llama si el último intento también falla, para
+      que la próxima lectura vuelva a generar las alertas que no se guardaron.
+
+    Si una cola se llena, `submit` espera a que haya lugar: la ingesta se frena
+    en vez de perder alertas.
+    """
+
+    def __init__(
+        self,
+        evaluate: Callable[[List[Any], Dict[str, float]], Awaitable[List[Any]]],
+        deliver: Callable[[List[Any], Dict[str, float]], Awaitable[int]],
+        discard: Callable[[List[Any]], None],
+        workers: int = 2,
+        max_size: int = 10000,
+        batch_max: int = 500,
+        retries: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        self.evaluate = evaluate
+        self.deliver = deliver
+        self.discard = discard
+        self.workers = max(1, workers)
+        self.max_size = max_size
+        self.batch_max = batch_max
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+
+        self._submitted = 0
+        self._backpressure = 0
+        self._processed = 0
+        self._failed = 0
+        self._retries = 0
+        self._alerts = 0
+        self._batches = 0
+        self._latency = {stage: _LatencyStat() for stage in STAGES}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and not all(task.done() for task in self._tasks)
+
+    async def start(self):
+        """Inicia una tarea de fondo por cola"""
+        if self.running:
+            return
+        per_queue = max(1, self.max_size // self.workers)
+        self._queues = [asyncio.Queue(maxsize=per_queue) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._run(queue)) for queue in self._queues]
+        logger.info(f"Pipeline de alertas iniciado (workers={self.workers}, capacidad={self.max_size})")
+
+    async def stop(self):
+        """Detiene las tareas después de procesar lo que quede en las colas"""
+        if not self._tasks:
+            return
+        # Marca de fin al final de cada cola: cada tarea termina al llegar a ella
+        for queue in self._queues:
+            await queue.put(None)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Pipeline de alertas detenido")
+
+    async def submit(self, readings: Sequence[Any]):
+        """Encola lecturas guardadas para evaluar sus alertas"""
+        now = time.perf_counter()
+        for reading in readings:
+            queue = self._queues[reading.user_id % self.workers]
+            item = (now, reading)
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self._backpressure += 1
+                await queue.put(item)
+            self._submitted += 1
+
+    def _drain(self, queue: asyncio.Queue, first: Any) -> List[Any]:
+        """Junta hasta `batch_max` elementos sin esperar; corta en la marca de fin"""
+        batch = [first]
+        while first is not None and len(batch) < self.batch_max:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            batch.append(item)
+            if item is None:
+                break
+        return batch
+
+    async def _run(self, queue: asyncio.Queue):
+        while True:
+            batch = self._drain(queue, await queue.get())
+            stopping = batch[-1] is None
+            if stopping:
+                batch.pop()
+            await self._process(batch)
+            if stopping:
+                return
+
+    async def _process(self, batch: List[Tuple[float, Any]]):
+        if not batch:
+            return
+        started = time.perf_counter()
+        for enqueued_at, _ in batch:
+            self._latency["queue_wait"].add((started - enqueued_at) * 1000)
+
+        timings: Dict[str, float] = {}
+        try:
+            pending = await self.evaluate([reading for _, reading in batch], timings)
+            alerts = await self._deliver(pending, timings) if pending else 0
+            self._alerts += alerts
+            self._processed += len(batch)
+        except Exception as e:
+            self._failed += len(batch)
+            logger.error(f"Error al procesar alertas de {len(batch)} lecturas: {str(e)}")
+
+        for stage, ms in timings.items():
+            self._latency[stage].add(ms)
+        self._latency["total"].add((time.perf_counter() - started) * 1000)
+        self._batches += 1
+
+    async def _deliver(self, pending: List[Any], timings: Dict[str, float]) -> int:
+        """Guarda y envía las alertas evaluadas, con reintentos; sin guardar, las descarta"""
+        attempt = 0
+        try:
+            while True:
+                try:
+                    return await self.deliver(pending, timings)
+                except Exception as e:
+                    if attempt >= self.retries:
+                        raise
+                    delay = self.retry_backoff * 2 ** attempt
+                    attempt += 1
+                    self._retries += 1
+                    logger.warning(f"Error al guardar alertas de {len(pending)} lecturas, "
+                                   f"reintento {attempt} en {delay:.1f}s: {str(e)}")
+                    await asyncio.sleep(delay)
+        except BaseException:
+            # También ante una cancelación: las alertas no quedaron guardadas
+            self.discard(pending)
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profundidad de las colas, contadores y latencia por etapa"""
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "queue_depth": [queue.qsize() for queue in self._queues],
+            "capacity": self.max_size,
+            "batch_max": self.batch_max,
+            "submitted": self._submitted,
+            "backpressure_waits": self._backpressure,
+            "processed": self._processed,
+            "failed": self._failed,
+            "retries": self._retries,
+            "alerts": self._alerts,
+            "batches": self._batches,
+            "latency_ms": {stage: stat.as_dict() for stage, stat in self._latency.items()},
+        }
@@ -0,0 +1,164 @@
+# Máquina de estados de alertas por (usuario, tipo de alerta)
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+# Orden de severidad para detectar escaladas
+SEVERITY_LEVELS = {None: 0, "warning": 1, "critical": 2}
+
+
+class _AlertState:
+    """Estado de un tipo de alerta de un usuario"""
+
+    __slots__ = ("severity", "pending", "emitted_at")
+
+    def __init__(self):
+        # Severidad activa (None = sin alerta)
+        self.severity: Optional[str] = None
+        # Lecturas consecutivas sobre el umbral antes de entrar en alerta
+        self.pending = 0
+        self.emitted_at = 0.0
+
+
+class AlertStateTracker:
+    """
+    Decide qué alertas evaluadas se guardan y se envían. Una condición sostenida
+    genera una sola alerta al entrar, otra si escala de warning a critical y un
+    recordatorio cada `realert_interval` segundos mientras siga activa. La salida
+    la decide la histéresis de cada regla (ver sensor/rules.py): al volver por
+    debajo del umbral de salida el estado se limpia sin generar alerta.
+
+    Entrar en warning exige `debounce_samples` lecturas consecutivas sobre el
+    umbral; critical entra de inmediato. Los usuarios se desalojan por LRU
+    cuando se supera `max_users`.
+
+    `observe` da la alerta por emitida. Si después no se guarda, quien la
+    guarda llama a `rollback` para que la próxima lectura sobre el umbral la
+    vuelva a generar.
+    """
+
+    def __init__(self, debounce_samples: int = 2, realert_interval: float = 300, max_users: int = 5000):
+        self.debounce_samples = max(1, debounce_samples)
+        self.realert_interval = realert_interval
+        self.max_users = max_users
+        self._users: "OrderedDict[int, Dict[str, _AlertState]]" = OrderedDict()
+        # Tipo de alerta -> usuarios con alerta activa o lecturas pendientes
+        self._busy: Dict[str, Set[int]] = {}
+        self._emitted = 0
+        self._suppressed = 0
+        self._rolled_back = 0
+        self._evictions = 0
+
+    def active_severity(self, user_id: int, alert_type: str) -> Optional[str]:
+        """Severidad activa del (usuario, tipo); las reglas la usan para aplicar la histéresis"""
+        states = self._users.get(user_id)
+        if states is None:
+            return None
+        state = states.get(alert_type)
+        return state.severity if state is not None else None
+
+    def busy_users(self, alert_type: str) -> Set[int]:
+        """
+        Usuarios con ese tipo de alerta activa o con lecturas pendientes. Para
+        los demás, observar una severidad None no cambia nada (sensor/rules.py
+        los salta al evaluar un lote).
+        """
+        return self._busy.get(alert_type, set())
+
+    def _state(self, user_id: int, alert_type: str) -> _AlertState:
+        states = self._users.get(user_id)
+        if states is None:
+            states = {}
+            self._users[user_id] = states
+            if len(self._users) > self.max_users:
+                evicted_id, evicted = self._users.popitem(last=False)
+                for evicted_type in evicted:
+                    self._busy.get(evicted_type, set()).discard(evicted_id)
+                self._evictions += 1
+        else:
+            self._users.move_to_end(user_id)
+
+        state = states.get(alert_type)
+        if state is None:
+            state = states[alert_type] = _AlertState()
+        return state
+
+    def observe(self, user_id: int, alert_type: str, severity: Optional[str], now: Optional[float] = None) -> Optional[str]:
+        """
+        Registra la severidad evaluada de una lectura. Devuelve la transición que
+        debe guardarse y enviarse ("enter", "escalate" o "repeat") o None si se suprime.
+        """
+        if severity is None:
+            states = self._users.get(user_id)
+            state = states.get(alert_type) if states is not None else None
+            if state is not None:
+                state.severity = None
+                state.pending = 0
+                self._busy.get(alert_type, set()).discard(user_id)
+            return None
+
+        if now is None:
+            now = time.monotonic()
+        state = self._state(user_id, alert_type)
+        self._busy.setdefault(alert_type, set()).add(user_id)
+
+        transition = None
+        if state.severity is None:
+            state.pending += 1
+            if severity == "critical" or state.pending >= self.debounce_samples:
+                transition = "enter"
+        elif SEVERITY_LEVELS[severity] > SEVERITY_LEVELS[state.severity]:
+            transition = "escalate"
+        elif now - state.emitted_at >= self.realert_interval:
+            transition = "repeat"
+
+        if transition is None:
+            if state.severity is not None:
+                # Desescalada (critical -> warning) o condición sostenida: solo actualiza el estado
+                state.severity = severity
+            self._suppressed += 1
+            return None
+
+        state.severity = severity
+        state.pending = 0
+        state.emitted_at = now
+        self._emitted += 1
+        return transition
+
+    def rollback(self, user_id: int, alert_type: str):
+        """
+        La transición que devolvió `observe` no llegó a guardarse: olvida la
+        alerta emitida y deja el (usuario, tipo) a una lectura de volver a
+        entrar, sin debounce, aunque la alerta fuera una escalada o un recordatorio.
+        """
+        states = self._users.get(user_id)
+        state = states.get(alert_type) if states is not None else None
+        if state is None or state.severity is None:
+            return
+        state.severity = None
+        state.pending = self.debounce_samples - 1
+        state.emitted_at = 0.0
+        self._busy.setdefault(alert_type, set()).add(user_id)
+        self._emitted -= 1
+        self._rolled_back += 1
+
+    def forget(self, user_id: int):
+        """Descarta el estado de un usuario (lecturas de un trabajador que no existe)"""
+        states = self._users.pop(user_id, None)
+        for alert_type in states or ():
+            self._busy.get(alert_type, set()).discard(user_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._users),
+            "max_users": self.max_users,
+            "active_alerts": sum(
+                1 for states in self._users.values() for state in states.values() if state.severity is not None
+            ),
+            "emitted": self._emitted,
+            "suppressed": self._suppressed,
+            "rolled_back": self._rolled_back,
+            "user_evictions": self._evictions,
+            "debounce_samples": self.debounce_samples,
+            "realert_interval_seconds": self.realert_interval,
+        }
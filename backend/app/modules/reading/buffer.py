@@ -0,0 +1,193 @@
+# Buffer de escritura diferida (write-behind) para lecturas
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.shared.exceptions import BusinessLogicError
+
+logger = logging.getLogger(__name__)
+
+
+class ReadingBufferFullError(BusinessLogicError):
+    """Excepción cuando el buffer de lecturas alcanzó su capacidad máxima"""
+    pass
+
+
+class ReadingWriteBuffer:
+    """
+    Buffer acotado en memoria para lecturas ya validadas.
+    Una tarea de fondo vacía el buffer cada `flush_interval_ms` milisegundos o
+    en cuanto se acumulan `flush_max_rows` filas, entregando cada grupo al
+    `flush_handler` para que se escriba en una sola transacción.
+
+    Las lecturas encoladas ya se confirmaron al casco: un flush fallido se
+    reintenta hasta `retries` veces, con una espera que empieza en
+    `retry_backoff` segundos y se duplica en cada intento, y `stop` espera a
+    que la tarea termine el flush en curso y vacíe el buffer.
+    """
+
+    def __init__(
+        self,
+        flush_handler: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+        flush_interval_ms: int = 200,
+        flush_max_rows: int = 500,
+        max_size: int = 10000,
+        retries: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        self.flush_handler = flush_handler
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_rows = flush_max_rows
+        self.max_size = max_size
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._full_event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # Estadísticas de flush
+        self._enqueued = 0
+        self._rejected = 0
+        self._flushes = 0
+        self._rows_flushed = 0
+        self._rows_failed = 0
+        self._retries = 0
+        self._last_flush_size = 0
+        self._max_flush_size = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Inicia la tarea de fondo que vacía el buffer"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._full_event = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Buffer de lecturas iniciado (intervalo={int(self.flush_interval * 1000)}ms, "
+            f"max_filas={self.flush_max_rows}, capacidad={self.max_size})"
+        )
+
+    async def stop(self):
+        """Detiene la tarea de fondo después de escribir lo que quede en el buffer"""
+        if self._task is None:
+            return
+        # Sin cancelar: un flush en curso tiene filas ya sacadas de la cola
+        self._stopping = True
+        self._full_event.set()
+        await self._task
+        self._task = None
+        logger.info("Buffer de lecturas detenido")
+
+    def enqueue(self, row: Dict[str, Any]) -> int:
+        """
+        Encola una lectura validada. Devuelve la profundidad actual del buffer.
+        Lanza ReadingBufferFullError si el buffer está lleno.
+        """
+        if not self.running:
+            raise BusinessLogicError("El buffer de lecturas no está iniciado")
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise ReadingBufferFullError(
+                f"Buffer de lecturas lleno ({self.max_size} lecturas pendientes)"
+            )
+        self._enqueued += 1
+
+        depth = self._queue.qsize()
+        if depth >= self.flush_max_rows:
+            self._full_event.set()
+        return depth
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        """Saca hasta `flush_max_rows` filas del buffer sin esperar"""
+        batch = []
+        while len(batch) < self.flush_max_rows:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            # Esperar al intervalo, a que se junten suficientes filas o a stop()
+            try:
+                await asyncio.wait_for(self._full_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full_event.clear()
+
+            # Al detenerse se vacía todo el buffer antes de terminar
+            while not self._queue.empty():
+                await self._flush(self._drain())
+                if not self._stopping and self._queue.qsize() < self.flush_max_rows:
+                    break
+            if self._stopping and self._queue.empty():
+                return
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                await self.flush_handler(batch)
+                self._rows_flushed += len(batch)
+                break
+            except Exception as e:
+                if attempt == self.retries:
+                    self._rows_failed += len(batch)
+                    logger.error(f"Error al escribir lote de {len(batch)} lecturas del buffer "
+                                 f"tras {attempt + 1} intentos: {str(e)}")
+                    break
+                delay = self.retry_backoff * 2 ** attempt
+                self._retries += 1
+                logger.warning(f"Error al escribir lote de {len(batch)} lecturas del buffer, "
+                               f"reintento {attempt + 1} en {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self._flushes += 1
+        self._last_flush_size = len(batch)
+        self._max_flush_size = max(self._max_flush_size, len(batch))
+        self._last_flush_ms = elapsed_ms
+        self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de tamaño y latencia de los flush"""
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "capacity": self.max_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "flush_max_rows": self.flush_max_rows,
+            "enqueued": self._enqueued,
+            "rejected": self._rejected,
+            "flushes": self._flushes,
+            "rows_flushed": self._rows_flushed,
+            "rows_failed": self._rows_failed,
+            "flush_retries": self._retries,
+            "flush_size": {
+                "last": self._last_flush_size,
+                "avg": round((self._rows_flushed + self._rows_failed) / self._flushes, 2) if self._flushes else 0,
+                "max": self._max_flush_size,
+            },
+            "flush_latency_ms": {
+                "last": round(self._last_flush_ms, 3),
+                "avg": round(self._total_flush_ms / self._flushes, 3) if self._flushes else 0,
+                "max": round(self._max_flush_ms, 3),
+            },
+        }
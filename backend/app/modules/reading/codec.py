@@ -0,0 +1,151 @@
+# Codec binario compacto para lecturas del ESP32 (/readings/ws/reading)
+"""
+Formato de frame binario v1 (little-endian):
+
+    Cabecera (2 bytes)
+        uint8   versión del protocolo (1)
+        uint8   cantidad de lecturas en el frame (1-255)
+
+    Por cada lectura
+        uint16  bitmap de presencia de los sensores (bit 0 = mq7 ... bit 8 = gz);
+                el bit 15 indica que la lectura lleva número de secuencia y
+                el bit 14 que lleva el id del arranque del casco
+        uint32  user_id
+        uint32  device_id
+        uint32  boot_id (solo si el bit 14 está activo)
+        uint32  seq (solo si el bit 15 está activo)
+        valores presentes, en el orden del bitmap:
+            mq7        float32
+            pulse      uint16
+            body_temp  float32
+            ax, ay, az float32
+            gx, gy, gz float32
+
+Una lectura completa ocupa 44 bytes frente a ~150 del JSON equivalente.
+"""
+import struct
+from typing import Any, Dict, List, Tuple
+
+from app.shared.exceptions import ValidationError
+
+PROTOCOL_VERSION = 1
+
+# Subprotocolos WebSocket que puede negociar el cliente
+SUBPROTOCOL_BINARY = "mineguard.bin.v1"
+SUBPROTOCOL_JSON = "mineguard.json.v1"
+
+# Orden fijo de los sensores en el bitmap y su formato struct
+SENSOR_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("mq7", "f"),
+    ("pulse", "H"),
+    ("body_temp", "f"),
+    ("ax", "f"),
+    ("ay", "f"),
+    ("az", "f"),
+    ("gx", "f"),
+    ("gy", "f"),
+    ("gz", "f"),
+)
+SENSOR_MASK = (1 << len(SENSOR_FIELDS)) - 1
+SEQ_FLAG = 1 << 15
+BOOT_FLAG = 1 << 14
+
+_HEADER = struct.Struct("<BB")
+_RECORD_HEADER = struct.Struct("<HII")
+_SEQ = struct.Struct("<I")
+
+# Struct precompilado por bitmap (a lo sumo 512 combinaciones)
+_value_structs: Dict[int, Tuple[struct.Struct, Tuple[str, ...]]] = {}
+
+
+def _value_struct(bitmap: int) -> Tuple[struct.Struct, Tuple[str, ...]]:
+    cached = _value_structs.get(bitmap)
+    if cached is None:
+        fields = tuple(name for bit, (name, _) in enumerate(SENSOR_FIELDS) if bitmap & (1 << bit))
+        fmt = "<" + "".join(code for bit, (_, code) in enumerate(SENSOR_FIELDS) if bitmap & (1 << bit))
+        cached = (struct.Struct(fmt), fields)
+        _value_structs[bitmap] = cached
+    return cached
+
+
+def decode_frame(frame: bytes) -> List[Dict[str, Any]]:
+    """
+    Decodifica un frame binario directamente a filas listas para el INSERT,
+    sin construir modelos Pydantic. Lanza ValidationError si el frame está mal formado.
+    """
+    if len(frame) < _HEADER.size:
+        raise ValidationError("Frame binario demasiado corto")
+
+    version, count = _HEADER.unpack_from(frame, 0)
+    if version != PROTOCOL_VERSION:
+        raise ValidationError(f"Versión de protocolo no soportada: {version}")
+    if count == 0:
+        raise ValidationError("Frame binario sin lecturas")
+
+    rows = []
+    offset = _HEADER.size
+    try:
+        for _ in range(count):
+            bitmap, user_id, device_id = _RECORD_HEADER.unpack_from(frame, offset)
+            offset += _RECORD_HEADER.size
+            if bitmap & ~(SENSOR_MASK | SEQ_FLAG | BOOT_FLAG):
+                raise ValidationError(f"Bitmap de sensores inválido: {bitmap:#06x}")
+
+            boot_id = 0
+            if bitmap & BOOT_FLAG:
+                boot_id = _SEQ.unpack_from(frame, offset)[0]
+                offset += _SEQ.size
+
+            seq = None
+            if bitmap & SEQ_FLAG:
+                seq = _SEQ.unpack_from(frame, offset)[0]
+                offset += _SEQ.size
+
+            values, fields = _value_struct(bitmap & SENSOR_MASK)
+            row = dict(zip(fields, values.unpack_from(frame, offset)))
+            offset += values.size
+
+            row["user_id"] = user_id
+            row["device_id"] = device_id
+            row["boot_id"] = boot_id
+            if seq is not None:
+                row["seq"] = seq
+            rows.append(row)
+    except struct.error:
+        raise ValidationError("Frame binario truncado")
+
+    if offset != len(frame):
+        raise ValidationError("Frame binario con bytes sobrantes")
+    return rows
+
+
+def encode_frame(readings: List[Dict[str, Any]]) -> bytes:
+    """
+    Codifica lecturas al formato binario v1 (usado por el firmware y los simuladores).
+    Los sensores ausentes o en None no se envían.
+    """
+    if not 0 < len(readings) <= 255:
+        raise ValueError("Un frame binario lleva entre 1 y 255 lecturas")
+
+    parts = [_HEADER.pack(PROTOCOL_VERSION, len(readings))]
+    for reading in readings:
+        bitmap = 0
+        for bit, (name, _) in enumerate(SENSOR_FIELDS):
+            if reading.get(name) is not None:
+                bitmap |= 1 << bit
+        values, fields = _value_struct(bitmap)
+        boot_id = reading.get("boot_id")
+        if boot_id:
+            bitmap |= BOOT_FLAG
+        seq = reading.get("seq")
+        if seq is not None:
+            bitmap |= SEQ_FLAG
+        parts.append(_RECORD_HEADER.pack(bitmap, reading["user_id"], reading["device_id"]))
+        if boot_id:
+            parts.append(_SEQ.pack(boot_id))
+        if seq is not None:
+            parts.append(_SEQ.pack(seq))
+        parts.append(values.pack(*(
+            int(reading[name]) if name == "pulse" else float(reading[name]) for name in fields
+        )))
+    return b"".join(parts)
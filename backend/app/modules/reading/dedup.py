@@ -0,0 +1,82 @@
+# Ventana de deduplicación de lecturas por número de secuencia del dispositivo
+from collections import OrderedDict, deque
+from typing import Any, Dict
+
+
+class _DeviceWindow:
+    """Últimos números de secuencia aceptados de un dispositivo en su arranque actual"""
+
+    __slots__ = ("boot_id", "seen", "order")
+
+    def __init__(self, boot_id: int):
+        self.boot_id = boot_id
+        self.seen = set()
+        self.order = deque()
+
+
+class DeviceSequenceCache:
+    """
+    Cache acotada en memoria de los últimos `window` números de secuencia
+    aceptados por dispositivo. Los dispositivos se desalojan por LRU cuando
+    se supera `max_devices`. La restricción única (device_id, boot_id, seq) de
+    la tabla reading cubre lo que la ventana ya no recuerda.
+
+    El seq solo es monotónico dentro de un arranque del casco: al reiniciarse
+    vuelve a empezar con otro boot_id, y la ventana del dispositivo se vacía
+    en lugar de tomar los nuevos números como reintentos.
+    """
+
+    def __init__(self, window: int = 256, max_devices: int = 5000):
+        self.window = window
+        self.max_devices = max_devices
+        self._devices: "OrderedDict[int, _DeviceWindow]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._reboots = 0
+
+    def is_duplicate(self, device_id: int, boot_id: int, seq: int) -> bool:
+        """Indica si el (device_id, boot_id, seq) ya fue aceptado recientemente"""
+        device = self._devices.get(device_id)
+        if device is not None and device.boot_id == boot_id and seq in device.seen:
+            self._devices.move_to_end(device_id)
+            self._hits += 1
+            return True
+        self._misses += 1
+        return False
+
+    def remember(self, device_id: int, boot_id: int, seq: int):
+        """Registra un (device_id, boot_id, seq) ya guardado en la base de datos"""
+        device = self._devices.get(device_id)
+        if device is None:
+            device = _DeviceWindow(boot_id)
+            self._devices[device_id] = device
+            if len(self._devices) > self.max_devices:
+                self._devices.popitem(last=False)
+                self._evictions += 1
+        else:
+            self._devices.move_to_end(device_id)
+            if device.boot_id != boot_id:
+                # El casco se reinició: su seq vuelve a empezar
+                device.boot_id = boot_id
+                device.seen.clear()
+                device.order.clear()
+                self._reboots += 1
+
+        if seq in device.seen:
+            return
+        device.seen.add(seq)
+        device.order.append(seq)
+        if len(device.order) > self.window:
+            device.seen.discard(device.order.popleft())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "devices": len(self._devices),
+            "max_devices": self.max_devices,
+            "window": self.window,
+            "duplicates_detected": self._hits,
+            "lookups": self._hits + self._misses,
+            "device_evictions": self._evictions,
+            "device_reboots": self._reboots,
+        }
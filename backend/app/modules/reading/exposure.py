@@ -0,0 +1,200 @@
+# Exposición acumulada a CO por trabajador (TWA de 8 horas y STEL de 15 minutos)
+"""
+Integrador incremental de la concentración de CO (mq7, ppm) por trabajador.
+Cada lectura aporta concentración × tiempo transcurrido desde la anterior
+(acotado a `max_gap_s`, el tiempo sin datos no suma exposición). Todo es O(1)
+por lectura y nunca se vuelve a consultar la tabla reading:
+
+- TWA de 8 h: dosis acumulada desde el inicio del turno del trabajador
+  (user_shift) dividida por 8 horas. Sin turno asignado, la dosis se ancla al
+  inicio de la sesión del casco (primera lectura tras `session_gap_s` sin datos).
+- STEL de 15 min: ventana deslizante de 60 casilleros de 15 s con suma corriente.
+
+Alertas (una por turno para el TWA; el STEL se rearma al bajar del 80% del límite):
+- co_exposure_twa: warning al alcanzar el nivel de acción (50% del límite), critical al límite
+- co_exposure_stel: critical al alcanzar el límite de corta duración
+"""
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.config import settings
+from app.modules.user_shift.calendar import shift_calendar
+
+TWA_PERIOD_S = 8 * 3600
+STEL_PERIOD_S = 15 * 60
+STEL_BUCKET_S = 15
+STEL_BUCKETS = STEL_PERIOD_S // STEL_BUCKET_S
+ACTION_LEVEL = 0.5
+STEL_REARM = 0.8
+
+
+class _Exposure:
+    """Estado de exposición de un trabajador"""
+
+    __slots__ = (
+        "anchor", "anchored_to_shift", "dose", "last_at", "last_value", "peak",
+        "stel_buckets", "stel_sum", "stel_bucket", "twa_level", "stel_alerted",
+    )
+
+    def __init__(self, anchor: datetime, anchored_to_shift: bool):
+        self.anchor = anchor
+        self.anchored_to_shift = anchored_to_shift
+        # ppm·s acumulados desde `anchor`
+        self.dose = 0.0
+        self.last_at: Optional[datetime] = None
+        self.last_value = 0.0
+        self.peak = 0.0
+        self.stel_buckets = array("d", bytes(8 * STEL_BUCKETS))
+        self.stel_sum = 0.0
+        self.stel_bucket = 0
+        # Nivel de TWA ya alertado en el turno: None, "warning" o "critical"
+        self.twa_level: Optional[str] = None
+        self.stel_alerted = False
+
+    def reset_shift(self, anchor: datetime, anchored_to_shift: bool):
+        self.anchor = anchor
+        self.anchored_to_shift = anchored_to_shift
+        self.dose = 0.0
+        self.peak = 0.0
+        self.twa_level = None
+
+    def add_stel(self, at: datetime, dose: float) -> float:
+        bucket = int(at.timestamp()) // STEL_BUCKET_S
+        if bucket > self.stel_bucket:
+            # Vaciar los casilleros que salieron de la ventana (a lo sumo toda la ventana)
+            for step in range(1, min(bucket - self.stel_bucket, STEL_BUCKETS) + 1):
+                index = (self.stel_bucket + step) % STEL_BUCKETS
+                self.stel_sum -= self.stel_buckets[index]
+                self.stel_buckets[index] = 0.0
+            self.stel_bucket = bucket
+        self.stel_buckets[bucket % STEL_BUCKETS] += dose
+        self.stel_sum = max(self.stel_sum + dose, 0.0)
+        return self.stel_sum / STEL_PERIOD_S
+
+    @property
+    def twa(self) -> float:
+        return self.dose / TWA_PERIOD_S
+
+    @property
+    def stel(self) -> float:
+        return self.stel_sum / STEL_PERIOD_S
+
+
+class CoExposureTracker:
+    def __init__(
+        self,
+        twa_limit_ppm: float = 25,
+        stel_limit_ppm: float = 100,
+        sample_period_s: float = 2.5,
+        max_gap_s: float = 10,
+        session_gap_s: float = 3600,
+    ):
+        self.twa_limit = twa_limit_ppm
+        self.stel_limit = stel_limit_ppm
+        self.sample_period_s = sample_period_s
+        self.max_gap_s = max_gap_s
+        self.session_gap = timedelta(seconds=session_gap_s)
+        self._workers: Dict[int, _Exposure] = {}
+
+    def _anchor(self, user_id: int, at: datetime, state: Optional[_Exposure]):
+        """Inicio del período del TWA: el turno del usuario o la sesión del casco"""
+        shift_start = shift_calendar.current_shift_start(user_id, at)
+        if shift_start is not None:
+            return shift_start, True
+        if state is None or state.anchored_to_shift or state.last_at is None or at - state.last_at > self.session_gap:
+            return at, False
+        return state.anchor, False
+
+    def process(self, readings: Sequence[Any], now: Optional[datetime] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Incorpora el CO de cada lectura y devuelve, alineadas con `readings`,
+        las alertas de exposición que se alcanzaron con ella. Las lecturas se
+        ubican en el tiempo al procesarse (hora local, como los turnos).
+        Llamar antes a `shift_calendar.ensure_loaded()`.
+        """
+        if now is None:
+            now = datetime.now()
+        results: List[List[Dict[str, Any]]] = [[] for _ in readings]
+        for index, reading in enumerate(readings):
+            if reading.mq7 is not None:
+                results[index] = self._add(reading.user_id, float(reading.mq7), now)
+        return results
+
+    def _add(self, user_id: int, value: float, at: datetime) -> List[Dict[str, Any]]:
+        state = self._workers.get(user_id)
+        anchor, anchored_to_shift = self._anchor(user_id, at, state)
+        if state is None:
+            state = self._workers[user_id] = _Exposure(anchor, anchored_to_shift)
+        elif anchor != state.anchor:
+            state.reset_shift(anchor, anchored_to_shift)
+
+        # Tiempo que representa la lectura; las del mismo lote comparten `at` y cuentan un período
+        if state.last_at is None:
+            elapsed = self.sample_period_s
+        else:
+            elapsed = (at - state.last_at).total_seconds()
+            if elapsed <= 0:
+                elapsed = self.sample_period_s
+        dose = value * min(elapsed, self.max_gap_s)
+
+        state.dose += dose
+        state.last_at = max(at, state.last_at) if state.last_at else at
+        state.last_value = value
+        state.peak = max(state.peak, value)
+        stel = state.add_stel(at, dose)
+
+        alerts = []
+        twa = state.twa
+        if twa >= self.twa_limit and state.twa_level != "critical":
+            state.twa_level = "critical"
+            alerts.append(self._alert("co_exposure_twa", "critical", twa,
+                                      f"Exposición a CO (TWA 8 h) en el límite: {twa:.1f} ppm"))
+        elif twa >= self.twa_limit * ACTION_LEVEL and state.twa_level is None:
+            state.twa_level = "warning"
+            alerts.append(self._alert("co_exposure_twa", "warning", twa,
+                                      f"Exposición a CO (TWA 8 h) en nivel de acción: {twa:.1f} ppm"))
+
+        if stel >= self.stel_limit and not state.stel_alerted:
+            state.stel_alerted = True
+            alerts.append(self._alert("co_exposure_stel", "critical", stel,
+                                      f"Exposición a CO de corta duración (STEL 15 min) en el límite: {stel:.1f} ppm"))
+        elif stel < self.stel_limit * STEL_REARM:
+            state.stel_alerted = False
+        return alerts
+
+    @staticmethod
+    def _alert(alert_type: str, severity: str, value: float, message: str) -> Dict[str, Any]:
+        return {"type": alert_type, "severity": severity, "value": round(value, 2), "message": message}
+
+    def snapshot(self, user_ids: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        """Exposición actual de los trabajadores con lecturas (o solo de `user_ids`)"""
+        now = datetime.now()
+        ids = list(self._workers) if user_ids is None else [uid for uid in user_ids if uid in self._workers]
+        items = []
+        for user_id in ids:
+            state = self._workers[user_id]
+            # Descontar del STEL lo que ya salió de la ventana de 15 minutos
+            state.add_stel(now, 0.0)
+            items.append({
+                "user_id": user_id,
+                "twa_ppm": round(state.twa, 2),
+                "stel_ppm": round(state.stel, 2),
+                "twa_percent": round(state.twa / self.twa_limit * 100, 1),
+                "stel_percent": round(state.stel / self.stel_limit * 100, 1),
+                "peak_ppm": round(state.peak, 1),
+                "last_ppm": round(state.last_value, 1),
+                "period_start": state.anchor,
+                "anchored_to_shift": state.anchored_to_shift,
+                "last_reading_at": state.last_at,
+            })
+        return items
+
+
+co_exposure = CoExposureTracker(
+    twa_limit_ppm=settings.CO_TWA_LIMIT_PPM,
+    stel_limit_ppm=settings.CO_STEL_LIMIT_PPM,
+    sample_period_s=settings.READING_SAMPLE_PERIOD_S,
+    max_gap_s=settings.CO_EXPOSURE_MAX_GAP_S,
+    session_gap_s=settings.CO_EXPOSURE_SESSION_GAP_S,
+)
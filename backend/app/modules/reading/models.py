@@ -1,14 +1,19 @@
 # Modelos del módulo Reading
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
-from sqlalchemy import Column, Integer, BigInteger, Float, TIMESTAMP, ForeignKey
+from typing import Optional, List
+from sqlalchemy import Column, Integer, BigInteger, Float, TIMESTAMP, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import declared_attr
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 
 class Reading(Base):
     __tablename__ = "reading"
+    __table_args__ = (
+        # Respaldo de la deduplicación en memoria: un (device_id, boot_id, seq) solo se guarda una vez
+        UniqueConstraint("device_id", "boot_id", "seq", name="uq_reading_device_boot_seq"),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True, unique=True)
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
@@ -29,9 +34,57 @@ class Reading(Base):
     gy = Column(Float, nullable=True, comment="Giroscopio eje Y")
     gz = Column(Float, nullable=True, comment="Giroscopio eje Z")
 
+    # Número de secuencia monotónico del dispositivo (reintentos idempotentes)
+    seq = Column(BigInteger, nullable=True, comment="Número de secuencia del dispositivo")
+    # El seq reinicia con cada arranque del casco; 0 si el dispositivo no lo informa
+    boot_id = Column(BigInteger, nullable=False, default=0, server_default="0", comment="Arranque del dispositivo al que pertenece el seq")
+
     timestamp = Column(TIMESTAMP, nullable=False, server_default=func.now())
 
 
+class ReadingRollupMixin:
+    """
+    Sumas, conteos, mínimo y máximo de pulso, temperatura y CO de las lecturas
+    de un trabajador en un período (ver app.modules.reading.rollup). `period`
+    cuenta horas o días desde 1970-01-01 UTC según la tabla.
+    """
+    period = Column(Integer, primary_key=True, autoincrement=False)
+
+    @declared_attr
+    def user_id(cls):
+        return Column(Integer, ForeignKey("user.id"), primary_key=True, autoincrement=False)
+
+    reading_count = Column(Integer, nullable=False, default=0)
+
+    pulse_count = Column(Integer, nullable=False, default=0)
+    pulse_sum = Column(BigInteger, nullable=False, default=0)
+    pulse_min = Column(Integer, nullable=True)
+    pulse_max = Column(Integer, nullable=True)
+
+    body_temp_count = Column(Integer, nullable=False, default=0)
+    body_temp_sum = Column(Float, nullable=False, default=0)
+    body_temp_min = Column(Float, nullable=True)
+    body_temp_max = Column(Float, nullable=True)
+
+    mq7_count = Column(Integer, nullable=False, default=0)
+    mq7_sum = Column(Float, nullable=False, default=0)
+    mq7_min = Column(Float, nullable=True)
+    mq7_max = Column(Float, nullable=True)
+
+    # Lecturas con pulso y temperatura a la vez (promedios de signos vitales pareados)
+    vitals_count = Column(Integer, nullable=False, default=0)
+    vitals_pulse_sum = Column(BigInteger, nullable=False, default=0)
+    vitals_body_temp_sum = Column(Float, nullable=False, default=0)
+
+
+class ReadingHourlyRollup(ReadingRollupMixin, Base):
+    __tablename__ = "reading_rollup_hourly"
+
+
+class ReadingDailyRollup(ReadingRollupMixin, Base):
+    __tablename__ = "reading_rollup_daily"
+
+
 class ReadingCreateSchema(BaseModel):
     user_id: int = Field(..., description="ID del usuario/minero")
     device_id: int = Field(..., description="ID del dispositivo/casco")
@@ -44,6 +97,28 @@ class ReadingCreateSchema(BaseModel):
     gx: Optional[float] = Field(None, description="Giroscopio eje X")
     gy: Optional[float] = Field(None, description="Giroscopio eje Y")
     gz: Optional[float] = Field(None, description="Giroscopio eje Z")
+    seq: Optional[int] = Field(None, ge=0, description="Número de secuencia monotónico del dispositivo (opcional)")
+    boot_id: int = Field(0, ge=0, le=2**32 - 1, description="Identificador del arranque del dispositivo; el seq reinicia en cada arranque")
+
+
+# Máximo de lecturas aceptadas en un solo lote (un INSERT multi-fila)
+READING_BATCH_MAX_SIZE = 1000
+
+
+class ReadingBatchCreateSchema(BaseModel):
+    readings: List[ReadingCreateSchema] = Field(
+        ...,
+        min_length=1,
+        max_length=READING_BATCH_MAX_SIZE,
+        description="Lecturas a insertar en una sola transacción"
+    )
+
+
+class ReadingBatchResultSchema(BaseModel):
+    inserted: int = Field(..., description="Cantidad de lecturas insertadas")
+    ids: List[int] = Field(..., description="IDs asignados a las lecturas insertadas, en el orden del lote")
+    duplicates: int = Field(0, description="Lecturas descartadas por (device_id, boot_id, seq) repetido")
+    alerts: int = Field(0, description="Alertas generadas por el lote (0 si se procesan en el pipeline de alertas)")
 
 
 class ReadingUpdateSchema(BaseModel):
@@ -71,6 +146,8 @@ class ReadingSchema(BaseModel):
     gx: Optional[float] = None
     gy: Optional[float] = None
     gz: Optional[float] = None
+    seq: Optional[int] = None
+    boot_id: Optional[int] = None
     timestamp: datetime
 
     class Config:
@@ -0,0 +1,191 @@
+# Detector de caídas e impactos sobre los datos del acelerómetro y giroscopio
+"""
+Cada dispositivo tiene una ventana circular con sus últimas `window` muestras
+(ax, ay, az, gx, gy, gz) dentro de un único arreglo NumPy. Por cada lote de
+lecturas se escriben las muestras y se calculan, vectorizado sobre todos los
+dispositivos del lote:
+
+- magnitud de la aceleración |a| (m/s²) y su pico / mínimo en la ventana
+- jerk: variación de |a| respecto de la muestra anterior, por segundo
+- cambio de orientación: ángulo entre el vector de aceleración actual y el
+  promedio de las muestras anteriores de la ventana (la gravedad marca la
+  orientación del casco)
+- magnitud de la velocidad angular |g| (rad/s)
+
+Reglas:
+- impact_detected: |a| >= impact_g·g o jerk >= jerk_threshold
+- fall_detected: cambio de orientación >= fall_angle_deg, con un pico de
+  aceleración (>= fall_peak_g·g), una caída libre (<= freefall_g·g) o un
+  giro brusco (>= gyro_threshold) en la ventana. La caída reemplaza al impacto.
+
+Después de una alerta el dispositivo no genera otra durante `window` muestras,
+así la ventana se renueva con la nueva orientación antes de volver a evaluar.
+"""
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+GRAVITY = 9.80665
+AXES = ("ax", "ay", "az", "gx", "gy", "gz")
+_axes_of = attrgetter(*AXES)
+
+
+class MotionDetector:
+    def __init__(
+        self,
+        window: int = 8,
+        max_devices: int = 5000,
+        sample_period_s: float = 2.5,
+        impact_g: float = 3.0,
+        jerk_threshold: float = 10.0,
+        fall_angle_deg: float = 60.0,
+        fall_peak_g: float = 2.0,
+        freefall_g: float = 0.5,
+        gyro_threshold: float = 3.0,
+        min_samples: int = 3,
+    ):
+        self.window = window
+        self.max_devices = max_devices
+        self.sample_period_s = sample_period_s
+        self.impact = impact_g * GRAVITY
+        self.jerk_threshold = jerk_threshold
+        self.fall_cos = float(np.cos(np.radians(fall_angle_deg)))
+        self.fall_peak = fall_peak_g * GRAVITY
+        self.freefall = freefall_g * GRAVITY
+        self.gyro_threshold = gyro_threshold
+        self.min_samples = min_samples
+
+        # device_id -> fila del arreglo, con desalojo LRU
+        self._slots: "OrderedDict[int, int]" = OrderedDict()
+        self._samples = np.full((max_devices, window, len(AXES)), np.nan, dtype=np.float32)
+        self._head = np.zeros(max_devices, dtype=np.int64)
+        self._count = np.zeros(max_devices, dtype=np.int64)
+        self._cooldown = np.zeros(max_devices, dtype=np.int64)
+
+        self._samples_seen = 0
+        self._falls = 0
+        self._impacts = 0
+        self._evictions = 0
+
+    def _slot(self, device_id: int) -> int:
+        slot = self._slots.get(device_id)
+        if slot is not None:
+            self._slots.move_to_end(device_id)
+            return slot
+
+        if len(self._slots) < self.max_devices:
+            slot = len(self._slots)
+        else:
+            _, slot = self._slots.popitem(last=False)
+            self._evictions += 1
+            self._samples[slot] = np.nan
+            self._head[slot] = 0
+            self._count[slot] = 0
+            self._cooldown[slot] = 0
+        self._slots[device_id] = slot
+        return slot
+
+    def process(self, readings: Sequence[Any]) -> List[List[Dict[str, Any]]]:
+        """
+        Incorpora las muestras de movimiento del lote y devuelve, alineadas con
+        `readings`, las alertas de caída o impacto de cada lectura.
+        Las lecturas sin acelerómetro completo no se evalúan.
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in readings]
+
+        # Rondas con a lo sumo una lectura por dispositivo, en el orden en que llegaron
+        rounds: List[List[int]] = []
+        occurrences: Dict[int, int] = {}
+        for index, reading in enumerate(readings):
+            if reading.ax is None or reading.ay is None or reading.az is None:
+                continue
+            n = occurrences.get(reading.device_id, 0)
+            occurrences[reading.device_id] = n + 1
+            if n == len(rounds):
+                rounds.append([])
+            rounds[n].append(index)
+
+        for indexes in rounds:
+            self._process_round(readings, indexes, results)
+        return results
+
+    def _process_round(self, readings: Sequence[Any], indexes: List[int], results: List[List[Dict[str, Any]]]):
+        slots = np.fromiter((self._slot(readings[i].device_id) for i in indexes), dtype=np.int64, count=len(indexes))
+        # None -> NaN al convertir a float
+        values = np.array([_axes_of(readings[i]) for i in indexes], dtype=np.float64)
+
+        # Escribir la muestra actual en la posición de cada ventana
+        current = self._head[slots] % self.window
+        self._samples[slots, current] = values
+        self._head[slots] += 1
+        self._count[slots] = np.minimum(self._count[slots] + 1, self.window)
+        self._samples_seen += len(indexes)
+
+        windows = self._samples[slots].astype(np.float64)
+        rows = np.arange(len(indexes))
+        accel = windows[:, :, :3]
+        magnitude = np.linalg.norm(accel, axis=2)
+
+        cur_accel = accel[rows, current]
+        cur_mag = magnitude[rows, current]
+        prev_mag = magnitude[rows, (current - 1) % self.window]
+        jerk = np.abs(cur_mag - prev_mag) / self.sample_period_s
+        gyro = np.linalg.norm(windows[rows, current, 3:], axis=1)
+
+        # Orientación de referencia: promedio de las muestras anteriores de la ventana
+        previous = np.ones(magnitude.shape, dtype=bool)
+        previous[rows, current] = False
+        previous &= ~np.isnan(magnitude)
+        baseline = np.where(previous[:, :, None], accel, 0.0).sum(axis=1)
+        norms = np.linalg.norm(baseline, axis=1) * cur_mag
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cos_angle = np.einsum("ij,ij->i", baseline, cur_accel) / norms
+        angle = np.degrees(np.arccos(np.clip(np.nan_to_num(cos_angle, nan=1.0), -1.0, 1.0)))
+
+        with np.errstate(invalid="ignore"):
+            peak = np.nanmax(magnitude, axis=1)
+            trough = np.nanmin(magnitude, axis=1)
+
+        ready = (self._count[slots] >= self.min_samples) & (self._cooldown[slots] == 0)
+        jerk = np.nan_to_num(jerk, nan=0.0)
+        impact = ready & ((cur_mag >= self.impact) | (jerk >= self.jerk_threshold))
+        fall = (
+            ready
+            & (np.nan_to_num(cos_angle, nan=1.0) <= self.fall_cos)
+            & ((peak >= self.fall_peak) | (trough <= self.freefall) | (np.nan_to_num(gyro) >= self.gyro_threshold))
+        )
+        impact &= ~fall
+
+        alerted = fall | impact
+        self._cooldown[slots] = np.where(alerted, self.window, np.maximum(self._cooldown[slots] - 1, 0))
+
+        for row in np.flatnonzero(fall):
+            self._falls += 1
+            results[indexes[row]].append({
+                "type": "fall_detected",
+                "severity": "critical",
+                "value": round(float(angle[row]), 1),
+                "message": f"Caída detectada: cambio de orientación de {angle[row]:.0f}°",
+            })
+        for row in np.flatnonzero(impact):
+            self._impacts += 1
+            g_force = float(cur_mag[row]) / GRAVITY
+            results[indexes[row]].append({
+                "type": "impact_detected",
+                "severity": "critical" if cur_mag[row] >= 2 * self.impact else "warning",
+                "value": round(g_force, 2),
+                "message": f"Impacto detectado: {g_force:.1f} g",
+            })
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "devices": len(self._slots),
+            "max_devices": self.max_devices,
+            "window": self.window,
+            "samples": self._samples_seen,
+            "falls_detected": self._falls,
+            "impacts_detected": self._impacts,
+            "device_evictions": self._evictions,
+        }
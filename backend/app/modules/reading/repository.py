@@ -1,16 +1,90 @@
 # Repositorio del módulo Reading
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import and_
-from app.shared.base_repository import BaseRepository
+from typing import List, Optional, Dict, Any
+from sqlalchemy import and_, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.shared.base_repository import BaseRepository, async_auto_increment_step, auto_increment_step, inserted_ids
 from app.modules.reading.models import Reading
-from app.core.database import SessionLocal
+from app.modules.reading.rollup import rollup_upserts
+from app.modules.device.repository import reading_status_upsert
+from app.core.database import SessionLocal, AsyncSessionLocal
+
+# Columnas que admite un INSERT multi-fila de lecturas
+READING_INSERT_COLUMNS = (
+    "user_id", "device_id",
+    "mq7", "pulse", "body_temp",
+    "ax", "ay", "az",
+    "gx", "gy", "gz",
+    "seq", "boot_id", "timestamp",
+)
+
+
+def stamp_rows(rows: List[Dict[str, Any]]) -> datetime:
+    """
+    Asigna a las lecturas del lote la hora de la ingesta (reloj de la aplicación)
+    y la devuelve. El mismo valor va a la fila de reading, a device_status, a los
+    agregados y, por las entidades en memoria, al estado vivo de los cascos.
+    Se trunca al segundo como la columna TIMESTAMP, así lo que se carga después
+    de la base es igual a lo que ya estaba en memoria.
+    """
+    at = datetime.now().replace(microsecond=0)
+    for row in rows:
+        row["timestamp"] = at
+    return at
+
+
+def build_multi_row_insert(rows: List[Dict[str, Any]]):
+    """INSERT multi-fila de lecturas; todas las filas llevan las mismas columnas"""
+    values = [{col: row.get(col) for col in READING_INSERT_COLUMNS} for row in rows]
+    for value in values:
+        # Sin boot_id la lectura cuenta como el arranque 0 (columna NOT NULL)
+        if value["boot_id"] is None:
+            value["boot_id"] = 0
+    return insert(Reading).values(values)
 
 
 class ReadingRepository(BaseRepository[Reading]):
     def __init__(self):
         super().__init__(Reading)
 
+    def create_many(self, rows: List[Dict[str, Any]], db: Optional[Session] = None) -> List[int]:
+        """
+        Inserta varias lecturas con un único INSERT multi-fila y devuelve sus IDs
+        en el mismo orden de `rows`.
+        InnoDB reserva un bloque de AUTO_INCREMENT para un INSERT simple de varias
+        filas, así que los IDs se derivan de LAST_INSERT_ID() (primer ID del bloque)
+        y de auto_increment_increment (ver base_repository.auto_increment_step).
+        En la misma transacción actualiza device_status de los cascos del lote y
+        suma el lote a los agregados horarios y diarios (app.modules.reading.rollup).
+        """
+        if not rows:
+            return []
+
+        at = stamp_rows(rows)
+        stmt = build_multi_row_insert(rows)
+
+        def _insert(session: Session) -> List[int]:
+            result = session.execute(stmt)
+            ids = inserted_ids(result, len(rows), auto_increment_step(session))
+            dialect = result.context.dialect
+            session.execute(*reading_status_upsert(dialect, ids, rows, at))
+            for upsert, params in rollup_upserts(dialect, rows, at):
+                session.execute(upsert, params)
+            return ids
+
+        if db is None:
+            with SessionLocal() as db:
+                try:
+                    ids = _insert(db)
+                    db.commit()
+                    return ids
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    raise e
+        return _insert(db)
+
     def get_by_device(self, device_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Reading]:
         """
         Obtiene lecturas de todos los sensores para un dispositivo específico
@@ -36,3 +110,103 @@ class ReadingRepository(BaseRepository[Reading]):
         """
         with SessionLocal() as db:
             return db.query(self.model).filter(self.model.device_id == device_id).order_by(self.model.timestamp.desc()).first()
+
+
+class AsyncReadingRepository:
+    """
+    Variante asíncrona de ReadingRepository para la ruta de ingesta.
+    Usa AsyncSessionLocal (aiomysql) para no bloquear el event loop en los commits.
+    """
+
+    def __init__(self):
+        self.model = Reading
+
+    async def create(self, data: Dict[str, Any], db: Optional[AsyncSession] = None) -> Reading:
+        """
+        Crea una lectura y la devuelve con su ID y la hora de la ingesta (stamp_rows).
+        En la misma transacción actualiza device_status del casco y los agregados.
+        """
+        data.pop("updated_at", None)
+        data.pop("created_at", None)
+        at = stamp_rows([data])
+
+        async def _create(session: AsyncSession) -> Reading:
+            instance = self.model(**data)
+            session.add(instance)
+            await session.flush()
+            dialect = session.bind.dialect
+            await session.execute(*reading_status_upsert(dialect, [instance.id], [data], at))
+            for upsert, params in rollup_upserts(dialect, [data], at):
+                await session.execute(upsert, params)
+            return instance
+
+        if db is None:
+            async with AsyncSessionLocal() as db:
+                try:
+                    instance = await _create(db)
+                    await db.commit()
+                    await db.refresh(instance)
+                    return instance
+                except SQLAlchemyError as e:
+                    await db.rollback()
+                    raise e
+        return await _create(db)
+
+    async def create_many(self, rows: List[Dict[str, Any]], db: Optional[AsyncSession] = None) -> List[int]:
+        """
+        Inserta varias lecturas con un único INSERT multi-fila y devuelve sus IDs
+        en el mismo orden de `rows`; actualiza device_status y los agregados
+        (ver ReadingRepository.create_many).
+        """
+        if not rows:
+            return []
+
+        at = stamp_rows(rows)
+        stmt = build_multi_row_insert(rows)
+
+        async def _insert(session: AsyncSession) -> List[int]:
+            result = await session.execute(stmt)
+            ids = inserted_ids(result, len(rows), await async_auto_increment_step(session))
+            dialect = result.context.dialect
+            await session.execute(*reading_status_upsert(dialect, ids, rows, at))
+            for upsert, params in rollup_upserts(dialect, rows, at):
+                await session.execute(upsert, params)
+            return ids
+
+        if db is None:
+            async with AsyncSessionLocal() as db:
+                try:
+                    ids = await _insert(db)
+                    await db.commit()
+                    return ids
+                except SQLAlchemyError as e:
+                    await db.rollback()
+                    raise e
+        return await _insert(db)
+
+    async def get_by_device_seq(self, device_id: int, boot_id: int, seq: int) -> Optional[Reading]:
+        """
+        Obtiene la lectura guardada para un (device_id, boot_id, seq)
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(self.model).where(
+                    self.model.device_id == device_id,
+                    self.model.boot_id == boot_id,
+                    self.model.seq == seq
+                )
+            )
+            return result.scalars().first()
+
+    async def get_latest_by_device(self, device_id: int) -> Optional[Reading]:
+        """
+        Obtiene la última lectura de un dispositivo sin bloquear el event loop
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(self.model)
+                .where(self.model.device_id == device_id)
+                .order_by(self.model.timestamp.desc())
+                .limit(1)
+            )
+            return result.scalars().first()
@@ -0,0 +1,226 @@
+# Agregados horarios y diarios de lecturas por trabajador
+"""
+Sumas, conteos, mínimo y máximo de pulso, temperatura y CO por (período,
+trabajador) en reading_rollup_hourly y reading_rollup_daily. Los promedios
+biométricos del dashboard leen estas filas en lugar de recorrer 30 días de la
+tabla reading.
+
+- La ingesta (ReadingRepository/AsyncReadingRepository.create_many y create)
+  suma cada lote a la hora y al día actuales en la misma transacción que las
+  lecturas: una fila por trabajador del lote y tabla.
+- El período sale del timestamp que la ingesta le pone a las lecturas del
+  lote, como horas o días desde 1970-01-01 UTC; el dashboard arma sus rangos
+  con el mismo reloj (current_period).
+- El área se toma del trabajador al consultar, como hacían las consultas
+  sobre reading: un trabajador que cambia de área se cuenta en la nueva.
+- Lo que no pasa por la ingesta (lecturas editadas o borradas, datos cargados
+  a mano) se corrige reconstruyendo:
+
+    python -m app.modules.reading.rollup            # todo el historial
+    python -m app.modules.reading.rollup --days 30  # desde hace 30 días
+"""
+import argparse
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, case, cast, delete, func, select
+
+from app.core.database import SessionLocal, precompiled
+from app.modules.reading.models import Reading, ReadingHourlyRollup, ReadingDailyRollup
+
+logger = logging.getLogger(__name__)
+
+HOUR_SECONDS = 3600
+DAY_SECONDS = 86400
+
+# Tabla -> duración de su período en segundos
+ROLLUP_TABLES = (
+    (ReadingHourlyRollup, HOUR_SECONDS),
+    (ReadingDailyRollup, DAY_SECONDS),
+)
+
+METRICS = ("pulse", "body_temp", "mq7")
+SUM_COLUMNS = (
+    "reading_count",
+    "pulse_count", "pulse_sum", "body_temp_count", "body_temp_sum", "mq7_count", "mq7_sum",
+    "vitals_count", "vitals_pulse_sum", "vitals_body_temp_sum",
+)
+MIN_COLUMNS = ("pulse_min", "body_temp_min", "mq7_min")
+MAX_COLUMNS = ("pulse_max", "body_temp_max", "mq7_max")
+
+# Sentencias de upsert ya construidas por (dialecto, tabla)
+_upserts: Dict[Tuple[str, str], Any] = {}
+
+
+def period_of(dialect_name: str, timestamp, seconds: int):
+    """Período (horas o días desde 1970-01-01 UTC) de un timestamp de la base"""
+    if dialect_name == "sqlite":
+        epoch = cast(func.strftime("%s", timestamp), Integer)
+    else:
+        epoch = func.unix_timestamp(timestamp, type_=Integer)
+    return epoch // seconds
+
+
+def current_period(seconds: int, now: Optional[float] = None) -> int:
+    """Período de `now` (segundos desde 1970), o el actual según el reloj de la aplicación"""
+    return int((time.time() if now is None else now) // seconds)
+
+
+def aggregate_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Sumas, conteos, mínimos y máximos de un lote de lecturas, uno por
+    trabajador y ordenados por user_id: dos lotes concurrentes bloquean las
+    filas del período en el mismo orden y no se traban.
+    """
+    by_user: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        user_id = row["user_id"]
+        agg = by_user.get(user_id)
+        if agg is None:
+            agg = by_user[user_id] = {"user_id": user_id, **dict.fromkeys(SUM_COLUMNS, 0),
+                                      **dict.fromkeys(MIN_COLUMNS + MAX_COLUMNS)}
+        agg["reading_count"] += 1
+        for metric in METRICS:
+            value = row.get(metric)
+            if value is None:
+                continue
+            agg[f"{metric}_count"] += 1
+            agg[f"{metric}_sum"] += value
+            low, high = agg[f"{metric}_min"], agg[f"{metric}_max"]
+            agg[f"{metric}_min"] = value if low is None or value < low else low
+            agg[f"{metric}_max"] = value if high is None or value > high else high
+        if row.get("pulse") is not None and row.get("body_temp") is not None:
+            agg["vitals_count"] += 1
+            agg["vitals_pulse_sum"] += row["pulse"]
+            agg["vitals_body_temp_sum"] += row["body_temp"]
+    return [by_user[user_id] for user_id in sorted(by_user)]
+
+
+def _upsert(dialect, model, seconds: int):
+    """
+    INSERT ... ON DUPLICATE KEY UPDATE (MySQL) / ON CONFLICT DO UPDATE (SQLite)
+    que suma el lote a la fila de su período. Se construye y compila una vez
+    por tabla y se ejecuta con un juego de parámetros por trabajador.
+    """
+    dialect_name = dialect.name
+    key = (dialect_name, model.__tablename__)
+    stmt = _upserts.get(key)
+    if stmt is not None:
+        return stmt
+
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        least, greatest = func.min, func.max
+    else:
+        from sqlalchemy.dialects.mysql import insert
+        least, greatest = func.least, func.greatest
+
+    # Sobre la tabla (Core): con una lista de parámetros no pasa por el bulk insert del ORM
+    table = model.__table__
+    stmt = insert(table)
+    new = stmt.excluded if dialect_name == "sqlite" else stmt.inserted
+    current = table.c
+
+    assignments = {column: current[column] + new[column] for column in SUM_COLUMNS}
+    # LEAST/GREATEST con un NULL dan NULL: se queda con el valor que no lo sea
+    for columns, pick in ((MIN_COLUMNS, least), (MAX_COLUMNS, greatest)):
+        for column in columns:
+            assignments[column] = func.coalesce(pick(current[column], new[column]), current[column], new[column])
+
+    if dialect_name == "sqlite":
+        stmt = stmt.on_conflict_do_update(index_elements=["period", "user_id"], set_=assignments)
+    else:
+        stmt = stmt.on_duplicate_key_update(assignments)
+    columns = ("period", "user_id") + SUM_COLUMNS + MIN_COLUMNS + MAX_COLUMNS
+    stmt = _upserts[key] = precompiled(stmt, dialect, columns)
+    return stmt
+
+
+def rollup_upserts(dialect, rows: List[Dict[str, Any]], at: datetime) -> List[Tuple[Any, List[Dict[str, Any]]]]:
+    """(sentencia, parámetros) que suman `rows`, guardadas con el timestamp `at`, a su hora y a su día"""
+    aggregated = aggregate_rows(rows)
+    epoch = at.timestamp()
+    upserts = []
+    for model, seconds in ROLLUP_TABLES:
+        period = current_period(seconds, epoch)
+        upserts.append((_upsert(dialect, model, seconds), [{**agg, "period": period} for agg in aggregated]))
+    return upserts
+
+
+def _aggregate_select(dialect_name: str, seconds: int, since_period: Optional[int]):
+    """Agregados desde la tabla reading, agrupados por (período, trabajador)"""
+    vitals = Reading.pulse.isnot(None) & Reading.body_temp.isnot(None)
+    readings = select(
+        period_of(dialect_name, Reading.timestamp, seconds).label("period"),
+        Reading.user_id, Reading.pulse, Reading.body_temp, Reading.mq7,
+        case((vitals, 1), else_=0).label("is_vitals"),
+    )
+    if since_period is not None:
+        readings = readings.where(period_of(dialect_name, Reading.timestamp, seconds) >= since_period)
+    r = readings.subquery()
+
+    columns = [r.c.period, r.c.user_id, func.count().label("reading_count")]
+    for metric in METRICS:
+        value = r.c[metric]
+        columns += [
+            func.count(value).label(f"{metric}_count"),
+            func.coalesce(func.sum(value), 0).label(f"{metric}_sum"),
+            func.min(value).label(f"{metric}_min"),
+            func.max(value).label(f"{metric}_max"),
+        ]
+    columns += [
+        func.coalesce(func.sum(r.c.is_vitals), 0).label("vitals_count"),
+        func.coalesce(func.sum(case((r.c.is_vitals == 1, r.c.pulse), else_=0)), 0).label("vitals_pulse_sum"),
+        func.coalesce(func.sum(case((r.c.is_vitals == 1, r.c.body_temp), else_=0)), 0).label("vitals_body_temp_sum"),
+    ]
+    return select(*columns).group_by(r.c.period, r.c.user_id)
+
+
+def rebuild(days: Optional[int] = None) -> Dict[str, int]:
+    """
+    Recalcula los agregados desde la tabla reading: todo el historial o, con
+    `days`, desde el inicio del día de hace `days` días. Borra e inserta en una
+    sola transacción por tabla; retorna cuántas filas quedaron en cada una.
+    """
+    from sqlalchemy import insert
+
+    since_day = current_period(DAY_SECONDS) - days if days is not None else None
+    counts: Dict[str, int] = {}
+    with SessionLocal() as db:
+        dialect_name = db.get_bind().dialect.name
+        for model, seconds in ROLLUP_TABLES:
+            # Períodos enteros desde el inicio de ese día
+            since = since_day * (DAY_SECONDS // seconds) if since_day is not None else None
+            aggregated = _aggregate_select(dialect_name, seconds, since)
+            try:
+                clear = delete(model)
+                if since is not None:
+                    clear = clear.where(model.period >= since)
+                db.execute(clear)
+                db.execute(insert(model.__table__).from_select([c.name for c in aggregated.selected_columns], aggregated))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            counts[model.__tablename__] = db.query(func.count()).select_from(model).scalar()
+            logger.info(f"Agregados reconstruidos en {model.__tablename__}: {counts[model.__tablename__]} filas")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruye los agregados horarios y diarios de lecturas")
+    parser.add_argument("--days", type=int, default=None,
+                        help="Solo desde el inicio del día de hace N días (por defecto, todo el historial)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = rebuild(args.days)
+    for table, count in counts.items():
+        print(f"{table}: {count} filas")
+    print(f"Listo en {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,38 @@
 # Router del módulo Reading
 from fastapi import APIRouter, Depends, status, Query, WebSocket, WebSocketDisconnect
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from datetime import datetime
-from app.modules.reading.models import ReadingCreateSchema, ReadingUpdateSchema, ReadingSchema
+from app.modules.reading.models import (
+    ReadingCreateSchema, ReadingUpdateSchema, ReadingSchema,
+    ReadingBatchCreateSchema, ReadingBatchResultSchema
+)
 from app.modules.reading.service import ReadingService
+from app.modules.reading.state import worker_state
+from app.modules.reading.codec import decode_frame, SUBPROTOCOL_BINARY, SUBPROTOCOL_JSON
 from app.core.security import get_current_user
 import json
 
 reading_router = APIRouter()
 service = ReadingService()
 
+# Conexiones activas de /ws/reading con el formato negociado por cada una
+ingest_connections: Dict[str, Dict[str, Any]] = {}
+
+
+@reading_router.on_event("startup")
+async def start_background_tasks():
+    await worker_state.start()
+    await service.start_alert_pipeline()
+    await service.start_write_behind()
+
+
+@reading_router.on_event("shutdown")
+async def stop_background_tasks():
+    # Primero el buffer: su último flush todavía encola alertas
+    await service.stop_write_behind()
+    await service.stop_alert_pipeline()
+    await worker_state.stop()
+
 
 # =====================================================
 #                RUTAS HTTP EXISTENTES
@@ -20,6 +43,61 @@ def get_all(current_user=Depends(get_current_user)):
     return service.get_all()
 
 
+@reading_router.get("/buffer/stats")
+def write_buffer_stats(current_user=Depends(get_current_user)):
+    """
+    Estadísticas del buffer de escritura diferida: profundidad, tamaño y latencia de los flush.
+    """
+    return service.get_write_buffer_stats()
+
+
+@reading_router.get("/dedup/stats")
+def dedup_stats(current_user=Depends(get_current_user)):
+    """
+    Estadísticas de la ventana de deduplicación por número de secuencia del dispositivo.
+    """
+    return service.get_dedup_stats()
+
+
+@reading_router.get("/state/stats")
+def worker_state_stats(current_user=Depends(get_current_user)):
+    """
+    Estadísticas del estado en memoria de cascos y trabajadores: cascos y usuarios
+    cargados, consultas respondidas desde memoria y sincronización entre procesos.
+    """
+    return worker_state.get_stats()
+
+
+@reading_router.get("/alerts/state/stats")
+def alert_state_stats(current_user=Depends(get_current_user)):
+    """
+    Estadísticas de la supresión de alertas: alertas activas por (usuario, tipo),
+    alertas emitidas y lecturas suprimidas por histéresis, debounce o intervalo de re-alerta.
+    """
+    return service.get_alert_state_stats()
+
+
+@reading_router.get("/alerts/pipeline/stats")
+def alert_pipeline_stats(current_user=Depends(get_current_user)):
+    """
+    Estadísticas del pipeline de alertas: profundidad de las colas, lecturas
+    procesadas y latencia por etapa (espera en cola, evaluación, persistencia, broadcast).
+    """
+    return service.get_alert_pipeline_stats()
+
+
+@reading_router.get("/ws/connections")
+def ingest_ws_connections(current_user=Depends(get_current_user)):
+    """
+    Conexiones activas de /readings/ws/reading con su formato negociado (json|binary),
+    frames, bytes y lecturas recibidas.
+    """
+    return {
+        "active_connections": len(ingest_connections),
+        "connections": ingest_connections
+    }
+
+
 @reading_router.get("/{reading_id}", response_model=ReadingSchema)
 def get_by_id(reading_id: int, current_user=Depends(get_current_user)):
     return service.get_by_id(reading_id)
@@ -60,11 +138,22 @@ def by_user(user_id: int, limit: int = 100, current_user=Depends(get_current_use
 async def create(payload: ReadingCreateSchema, current_user=Depends(get_current_user)):
     """
     Crea una nueva lectura con todos los valores de sensores.
-    Acepta: user_id, device_id, mq7, pulse, ax, ay, az, gx, gy, gz
+    Acepta: user_id, device_id, mq7, pulse, ax, ay, az, gx, gy, gz, seq y boot_id (opcionales).
+    Si el (device_id, boot_id, seq) ya fue guardado se devuelve la lectura existente.
     """
     return await service.create(payload)
 
 
+@reading_router.post("/batch", response_model=ReadingBatchResultSchema, status_code=status.HTTP_201_CREATED)
+async def create_batch(payload: ReadingBatchCreateSchema, current_user=Depends(get_current_user)):
+    """
+    Crea un lote de lecturas (hasta 1000) en una sola transacción con un INSERT multi-fila.
+    Las alertas se evalúan sobre todo el lote.
+    Formato: {"readings": [{"user_id": 1, "device_id": 1, "pulse": 72, ...}, ...]}
+    """
+    return await service.create_batch(payload)
+
+
 
 # =====================================================
 #                 WEBSOCKET PARA ESP32
@@ -86,15 +175,64 @@ async def websocket_reading(websocket: WebSocket):
         "az": -0.21,
         "gx": 0.02,
         "gy": 0.01,
-        "gz": 0.00
+        "gz": 0.00,
+        "seq": 1042,
+        "boot_id": 3735928559
     }
+    "seq" es opcional: número de secuencia monotónico del dispositivo; los reintentos
+    con un seq ya guardado se confirman con "ok" sin volver a insertarse. Como el seq
+    reinicia cuando el casco arranca, "boot_id" identifica el arranque (un valor
+    aleatorio de 32 bits por arranque); sin él las lecturas cuentan como arranque 0.
+    También acepta lotes, como lista de lecturas o {"readings": [...]};
+    en ese caso responde "ok:<cantidad insertada>".
+
+    Frames binarios: el cliente puede negociar el subprotocolo "mineguard.bin.v1"
+    y enviar frames binarios compactos (ver app/modules/reading/codec.py);
+    cada frame se inserta como un lote y se responde "ok:<cantidad insertada>".
     """
-    await websocket.accept()
-    print("ESP32 conectado al WebSocket /ws/reading")
+    # Negociar formato por subprotocolo (sin subprotocolo se detecta con el primer frame)
+    requested = websocket.scope.get("subprotocols", [])
+    subprotocol = next((p for p in (SUBPROTOCOL_BINARY, SUBPROTOCOL_JSON) if p in requested), None)
+    await websocket.accept(subprotocol=subprotocol)
+
+    connection_id = f"{websocket.client.host}:{websocket.client.port}" if websocket.client else str(id(websocket))
+    info = {
+        "format": {SUBPROTOCOL_BINARY: "binary", SUBPROTOCOL_JSON: "json"}.get(subprotocol),
+        "subprotocol": subprotocol,
+        "connected_at": datetime.utcnow().isoformat(),
+        "frames": 0,
+        "bytes": 0,
+        "readings": 0,
+    }
+    ingest_connections[connection_id] = info
+    print(f"ESP32 conectado al WebSocket /ws/reading ({connection_id}, formato={info['format'] or 'auto'})")
 
     try:
         while True:
-            raw_msg = await websocket.receive_text()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            raw_bytes = message.get("bytes")
+            if raw_bytes is not None:
+                # Frame binario compacto: directo a filas del INSERT, sin Pydantic
+                info["format"] = info["format"] or "binary"
+                info["frames"] += 1
+                info["bytes"] += len(raw_bytes)
+                try:
+                    rows = decode_frame(raw_bytes)
+                    result = await service.create_from_rows(rows)
+                    info["readings"] += result.inserted
+                    await websocket.send_text(f"ok:{result.inserted}")
+                except Exception as e:
+                    print("Error procesando frame binario:", e)
+                    await websocket.send_text("error")
+                continue
+
+            raw_msg = message.get("text") or ""
+            info["format"] = info["format"] or "json"
+            info["frames"] += 1
+            info["bytes"] += len(raw_msg)
 
             # Intentar parsear el JSON
             try:
@@ -105,11 +243,37 @@ async def websocket_reading(websocket: WebSocket):
                 continue
 
             try:
+                # Lote de lecturas: una sola transacción para todo el frame
+                if isinstance(data, list) or (isinstance(data, dict) and "readings" in data):
+                    batch_payload = ReadingBatchCreateSchema(
+                        readings=data if isinstance(data, list) else data["readings"]
+                    )
+                    result = await service.create_batch(batch_payload)
+                    info["readings"] += result.inserted
+
+                    print(f"Lote de lecturas guardado correctamente ({result.inserted} lecturas)")
+
+                    await websocket.send_text(f"ok:{result.inserted}")
+                    continue
+
                 # Validar con el schema real del backend
                 reading_payload = ReadingCreateSchema(**data)
 
+                # Reintento del firmware ya guardado: confirmar sin tocar la BD
+                if service.is_duplicate(reading_payload):
+                    await websocket.send_text("ok")
+                    continue
+
+                # Escritura diferida: se confirma en cuanto la lectura queda encolada
+                if service.write_behind_enabled:
+                    await service.create_deferred(reading_payload)
+                    info["readings"] += 1
+                    await websocket.send_text("ok")
+                    continue
+
                 # Guardar en la base de datos usando tu service real
                 saved = await service.create(reading_payload)
+                info["readings"] += 1
 
                 print(f"Lectura guardada correctamente (ID={saved.id})")
 
@@ -123,3 +287,5 @@ async def websocket_reading(websocket: WebSocket):
 
     except WebSocketDisconnect:
         print("ESP32 desconectado del WebSocket /ws/reading")
+    finally:
+        ingest_connections.pop(connection_id, None)
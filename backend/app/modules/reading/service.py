@@ -1,23 +1,164 @@
 # Servicio del módulo Reading
 import logging
 import asyncio
+import math
+import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 
 from app.shared.base_service import BaseService
 from app.shared.exceptions import ValidationError
-from app.modules.reading.models import Reading, ReadingCreateSchema, ReadingUpdateSchema, ReadingSchema
-from app.modules.reading.repository import ReadingRepository
+from app.modules.reading.models import (
+    Reading, ReadingCreateSchema, ReadingUpdateSchema, ReadingSchema,
+    ReadingBatchCreateSchema, ReadingBatchResultSchema
+)
+from app.modules.reading.repository import ReadingRepository, AsyncReadingRepository
+from app.modules.reading.buffer import ReadingWriteBuffer, ReadingBufferFullError
+from app.modules.reading.dedup import DeviceSequenceCache
+from app.modules.reading.alert_state import AlertStateTracker
+from app.modules.reading.alert_pipeline import AlertPipeline
+from app.modules.reading.motion import GRAVITY, MotionDetector
+from app.modules.reading.exposure import co_exposure
+from app.modules.user_shift.calendar import shift_calendar
+from app.modules.sensor.rules import alert_rules
+from app.modules.alert.repository import AsyncAlertRepository
+from app.modules.users.cache import worker_info_cache
+from app.modules.dashboard.live import live_telemetry
+from app.modules.reading.state import worker_state
+from app.core.config import settings
 from app.core.websocket import manager
 
 logger = logging.getLogger(__name__)
 
+# Valores de sensores de una lectura
+SENSOR_VALUE_FIELDS = ("mq7", "pulse", "body_temp", "ax", "ay", "az", "gx", "gy", "gz")
+
+# Escala completa del MPU6050 tal como lo configura el firmware (casco_v4.ino):
+# ±8 g (4096 LSB/g) y ±500 °/s (65.5 LSB/(°/s)). Un golpe o una caída llegan
+# hasta la saturación del sensor y tienen que pasar la validación.
+ACCEL_RANGE_MS2 = 32768 / 4096 * GRAVITY         # ≈ 78.5 m/s²
+GYRO_RANGE_RADS = math.radians(32768 / 65.5)     # ≈ 8.73 rad/s
+
+
+def _sequence_key(row: Dict[str, Any]):
+    """(device_id, boot_id, seq) de una fila; sin boot_id cuenta como el arranque 0"""
+    return row["device_id"], row.get("boot_id", 0), row["seq"]
+
 
 class ReadingService(BaseService[Reading, ReadingCreateSchema, ReadingUpdateSchema, ReadingSchema]):
     def __init__(self):
         self.repository = ReadingRepository()
         super().__init__(self.repository)
+        # Repositorio asíncrono para la ruta de ingesta (no bloquea el event loop)
+        self.async_repository = AsyncReadingRepository()
+        self.alert_repository = AsyncAlertRepository()
+        # Escritura diferida opcional (READING_WRITE_BEHIND)
+        self.write_buffer = ReadingWriteBuffer(
+            self._flush_buffered,
+            flush_interval_ms=settings.READING_FLUSH_INTERVAL_MS,
+            flush_max_rows=settings.READING_FLUSH_MAX_ROWS,
+            max_size=settings.READING_BUFFER_MAX_SIZE,
+            retries=settings.READING_FLUSH_RETRIES,
+            retry_backoff=settings.READING_FLUSH_RETRY_BACKOFF_MS / 1000,
+        )
+        # Ventana de números de secuencia por dispositivo para descartar reintentos
+        self.sequence_cache = DeviceSequenceCache(
+            window=settings.READING_DEDUP_WINDOW,
+            max_devices=settings.READING_DEDUP_MAX_DEVICES,
+        )
+        # Estado de alertas por usuario: solo las transiciones se guardan y se envían
+        self.alert_state = AlertStateTracker(
+            debounce_samples=settings.ALERT_DEBOUNCE_SAMPLES,
+            realert_interval=settings.ALERT_REALERT_INTERVAL_SECONDS,
+            max_users=settings.ALERT_STATE_MAX_USERS,
+        )
+        # Caídas e impactos a partir del acelerómetro y giroscopio
+        self.motion_detector = MotionDetector(
+            window=settings.MOTION_WINDOW_SAMPLES,
+            max_devices=settings.MOTION_MAX_DEVICES,
+            sample_period_s=settings.READING_SAMPLE_PERIOD_S,
+            impact_g=settings.MOTION_IMPACT_G,
+            fall_angle_deg=settings.MOTION_FALL_ANGLE_DEG,
+        )
+        # Etapa de alertas desacoplada de la ingesta (ALERT_PIPELINE)
+        self.alert_pipeline = AlertPipeline(
+            self._evaluate_alerts,
+            self._deliver_alerts,
+            self._discard_alerts,
+            workers=settings.ALERT_PIPELINE_WORKERS,
+            max_size=settings.ALERT_QUEUE_MAX_SIZE,
+            batch_max=settings.ALERT_PIPELINE_BATCH_MAX,
+            retries=settings.ALERT_PIPELINE_RETRIES,
+            retry_backoff=settings.ALERT_PIPELINE_RETRY_BACKOFF_MS / 1000,
+        )
+
+    @property
+    def write_behind_enabled(self) -> bool:
+        return settings.READING_WRITE_BEHIND and self.write_buffer.running
+
+    async def start_write_behind(self):
+        """Inicia el buffer de escritura diferida si está habilitado en la configuración"""
+        if settings.READING_WRITE_BEHIND:
+            await self.write_buffer.start()
+
+    async def stop_write_behind(self):
+        """Detiene el buffer de escritura diferida escribiendo lo pendiente"""
+        await self.write_buffer.stop()
+
+    async def start_alert_pipeline(self):
+        """Inicia las tareas de la etapa de alertas si está habilitada en la configuración"""
+        if settings.ALERT_PIPELINE:
+            await self.alert_pipeline.start()
+
+    async def stop_alert_pipeline(self):
+        """Detiene la etapa de alertas procesando lo que quede encolado"""
+        await self.alert_pipeline.stop()
+
+    def get_alert_pipeline_stats(self) -> Dict[str, Any]:
+        """Estadísticas de colas y latencia por etapa del pipeline de alertas"""
+        return {"enabled": settings.ALERT_PIPELINE, **self.alert_pipeline.get_stats()}
+
+    async def create_deferred(self, data: ReadingCreateSchema) -> int:
+        """
+        Valida una lectura y la encola en el buffer de escritura diferida.
+        Retorna en cuanto la lectura queda encolada (profundidad actual del buffer);
+        la inserción y la evaluación de alertas ocurren en el siguiente flush.
+        """
+        validated_data = self._validate_create_data(data)
+        if self.is_duplicate(data):
+            return self.write_buffer.get_stats()["queue_depth"]
+        try:
+            return self.write_buffer.enqueue(validated_data)
+        except ReadingBufferFullError as e:
+            # Buffer saturado: escribir directamente para no perder la lectura
+            logger.warning(f"{str(e)}; escribiendo la lectura de forma directa")
+            await self.create(data)
+            return 0
+
+    async def _flush_buffered(self, rows: List[Dict[str, Any]]):
+        """Escribe un grupo del buffer en una transacción y evalúa sus alertas"""
+        await self._insert_rows(rows)
+
+    def get_write_buffer_stats(self) -> Dict[str, Any]:
+        """Estadísticas del buffer de escritura diferida"""
+        return {"enabled": settings.READING_WRITE_BEHIND, **self.write_buffer.get_stats()}
+
+    def is_duplicate(self, data: ReadingCreateSchema) -> bool:
+        """
+        Indica si la lectura es un reintento de un (device_id, boot_id, seq) ya guardado.
+        Solo consulta la ventana en memoria, nunca la base de datos.
+        """
+        return data.seq is not None and self.sequence_cache.is_duplicate(data.device_id, data.boot_id, data.seq)
+
+    def get_alert_state_stats(self) -> Dict[str, Any]:
+        """Estadísticas de la máquina de estados de alertas y del detector de caídas"""
+        return {**self.alert_state.get_stats(), "motion": self.motion_detector.get_stats()}
+
+    def get_dedup_stats(self) -> Dict[str, Any]:
+        """Estadísticas de la ventana de deduplicación por dispositivo"""
+        return self.sequence_cache.get_stats()
     
     async def create(self, data: ReadingCreateSchema) -> ReadingSchema:
         """
@@ -28,13 +169,36 @@ class ReadingService(BaseService[Reading, ReadingCreateSchema, ReadingUpdateSche
             # Validar y preparar datos
             validated_data = self._validate_create_data(data)
             
-            # Crear entidad
-            entity = self.repository.create(validated_data)
+            device_id = validated_data["device_id"]
+            boot_id = validated_data.get("boot_id", 0)
+            seq = validated_data.get("seq")
+
+            # Reintento de una lectura ya guardada: devolver la existente sin duplicarla
+            if seq is not None and self.sequence_cache.is_duplicate(device_id, boot_id, seq):
+                existing = await self.async_repository.get_by_device_seq(device_id, boot_id, seq)
+                if existing:
+                    logger.info(f"{self.model_name} duplicado ignorado - dispositivo {device_id}, seq {seq}")
+                    return self._to_response_schema(existing)
+
+            # Crear entidad (sesión asíncrona)
+            try:
+                entity = await self.async_repository.create(validated_data)
+            except IntegrityError:
+                # La restricción única (device_id, boot_id, seq) detectó un reintento fuera de la ventana
+                existing = await self.async_repository.get_by_device_seq(device_id, boot_id, seq) if seq is not None else None
+                if existing is None:
+                    raise
+                self.sequence_cache.remember(device_id, boot_id, seq)
+                logger.info(f"{self.model_name} duplicado ignorado - dispositivo {device_id}, seq {seq}")
+                return self._to_response_schema(existing)
+
+            if seq is not None:
+                self.sequence_cache.remember(device_id, boot_id, seq)
             
             logger.info(f"{self.model_name} creado exitosamente - ID: {entity.id}")
             
-            # Verificar y enviar alertas en tiempo real (async)
-            await self._check_and_broadcast_alerts(entity)
+            # Alertas en la etapa asíncrona (o en línea si el pipeline no está en marcha)
+            await self._dispatch_alerts([entity])
             
             return self._to_response_schema(entity)
             
@@ -53,126 +217,271 @@ class ReadingService(BaseService[Reading, ReadingCreateSchema, ReadingUpdateSche
                 detail=f"Error interno del servidor al crear {self.model_name}"
             )
     
+    async def create_batch(self, data: ReadingBatchCreateSchema) -> ReadingBatchResultSchema:
+        """
+        Crea un lote de lecturas con un único INSERT multi-fila en una sola transacción
+        y evalúa las alertas de todo el lote de una vez.
+        """
+        try:
+            # Validar todas las lecturas antes de tocar la base de datos
+            rows = []
+            for index, item in enumerate(data.readings):
+                try:
+                    rows.append(self._validate_create_data(item))
+                except ValidationError as e:
+                    raise ValidationError(f"readings[{index}]: {e.message}")
+
+            return await self._insert_rows(rows)
+
+        except HTTPException:
+            raise
+        except (ValidationError,) as e:
+            logger.error(f"Error al crear lote de {self.model_name}s: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            logger.error(f"Error al crear lote de {self.model_name}s: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error interno del servidor al crear lote de {self.model_name}s"
+            )
+
+    async def create_from_rows(self, rows: List[Dict[str, Any]]) -> ReadingBatchResultSchema:
+        """
+        Crea lecturas ya decodificadas (frames binarios del ESP32) sin construir
+        modelos Pydantic: valida rangos sobre los dicts y los inserta en un solo INSERT.
+        Lanza ValidationError si alguna lectura es inválida.
+        """
+        for index, row in enumerate(rows):
+            try:
+                self._validate_reading_values(row)
+            except ValidationError as e:
+                raise ValidationError(f"readings[{index}]: {e.message}")
+        return await self._insert_rows(rows)
+
+    async def _insert_rows(self, rows: List[Dict[str, Any]]) -> ReadingBatchResultSchema:
+        """
+        Inserta filas validadas con un INSERT multi-fila y evalúa sus alertas.
+        Descarta antes los (device_id, boot_id, seq) repetidos, dentro del lote o ya vistos.
+        """
+        rows, duplicates = self._drop_duplicates(rows)
+        if not rows:
+            return ReadingBatchResultSchema(inserted=0, ids=[], duplicates=duplicates)
+
+        try:
+            ids = await self.async_repository.create_many(rows)
+        except IntegrityError:
+            # Algún (device_id, boot_id, seq) ya estaba en la BD: insertar fila por fila
+            rows, ids, db_duplicates = await self._insert_rows_one_by_one(rows)
+            duplicates += db_duplicates
+
+        for row in rows:
+            if row.get("seq") is not None:
+                self.sequence_cache.remember(*_sequence_key(row))
+
+        logger.info(f"Lote de {len(ids)} {self.model_name}s creado exitosamente")
+
+        # Entidades en memoria (sin volver a consultar la BD) para evaluar alertas
+        readings = [Reading(id=reading_id, **row) for reading_id, row in zip(ids, rows)]
+        alerts = await self._dispatch_alerts(readings)
+
+        return ReadingBatchResultSchema(inserted=len(ids), ids=ids, duplicates=duplicates, alerts=alerts)
+
+    def _drop_duplicates(self, rows: List[Dict[str, Any]]):
+        """Separa las filas nuevas de los reintentos según la ventana de secuencias"""
+        fresh = []
+        seen_in_batch = set()
+        duplicates = 0
+        for row in rows:
+            if row.get("seq") is not None:
+                key = _sequence_key(row)
+                if key in seen_in_batch or self.sequence_cache.is_duplicate(*key):
+                    duplicates += 1
+                    continue
+                seen_in_batch.add(key)
+            fresh.append(row)
+        return fresh, duplicates
+
+    async def _insert_rows_one_by_one(self, rows: List[Dict[str, Any]]):
+        """
+        Inserta fila por fila descartando las que ya existen por (device_id, boot_id, seq).
+        Solo se usa cuando el INSERT multi-fila choca con la restricción única.
+        """
+        inserted_rows, ids, duplicates = [], [], 0
+        for row in rows:
+            try:
+                ids.extend(await self.async_repository.create_many([row]))
+                inserted_rows.append(row)
+            except IntegrityError:
+                if row.get("seq") is None or await self.async_repository.get_by_device_seq(*_sequence_key(row)) is None:
+                    raise
+                self.sequence_cache.remember(*_sequence_key(row))
+                duplicates += 1
+        return inserted_rows, ids, duplicates
+
+    async def _dispatch_alerts(self, readings: List[Reading]) -> int:
+        """
+        Entrega lecturas guardadas a la etapa de alertas. Con el pipeline en marcha
+        solo se encolan (la respuesta de ingesta no espera a las alertas) y devuelve 0;
+        si no, se procesan en línea y devuelve cuántas alertas se generaron.
+        """
+        # Últimos valores por casco y trabajador en memoria (dashboard, /ws/live)
+        worker_state.observe(readings)
+        live_telemetry.observe(readings)
+        if self.alert_pipeline.running:
+            await self.alert_pipeline.submit(readings)
+            return 0
+        return await self._check_and_broadcast_alerts_batch(readings)
+
     async def _check_and_broadcast_alerts(self, reading: Reading):
         """
         Verifica si una lectura tiene valores críticos y envía alertas por WebSocket.
-        Umbrales:
-        - Temperatura: >38.4°C (warning), >39.2°C (critical)
-        - Ritmo cardíaco alto: >130 bpm (warning), >140 bpm (critical)
-        - Ritmo cardíaco bajo: <50 bpm (warning), <45 bpm (critical)
-        - CO (mq7): >50 ppm (warning), >100 ppm (critical)
-        """
-        from app.core.database import SessionLocal
-        from app.modules.auth.models import User
-        from app.modules.area.models import Area
+        """
+        await self._check_and_broadcast_alerts_batch([reading])
+
+    async def _check_and_broadcast_alerts_batch(self, readings: List[Reading]) -> int:
+        """Procesa las alertas de un lote en línea; los errores se registran y no se propagan"""
+        try:
+            return await self._process_alerts(readings, {})
+        except Exception as e:
+            logger.error(f"Error al procesar alertas: {str(e)}")
+            return 0
+
+    async def _process_alerts(self, readings: List[Reading], timings: Dict[str, float]) -> int:
+        """
+        Evalúa las alertas de un conjunto de lecturas, las guarda en una sola
+        transacción (haya o no dashboards conectados) y las envía por WebSocket.
+        Completa `timings` con los milisegundos de cada etapa y devuelve cuántas
+        alertas se guardaron. Si no se pudieron guardar, la máquina de estados
+        las olvida antes de propagar el error.
+        """
+        pending = await self._evaluate_alerts(readings, timings)
+        if not pending:
+            return 0
+        try:
+            return await self._deliver_alerts(pending, timings)
+        except BaseException:
+            # También ante una cancelación: la alerta no quedó guardada
+            self._discard_alerts(pending)
+            raise
+
+    async def _deliver_alerts(self, pending: List[Any], timings: Dict[str, float]) -> int:
+        """
+        Guarda las alertas evaluadas y las envía; devuelve cuántas se guardaron.
+        Solo falla si no se guardaron, así el pipeline puede reintentarla sin duplicarlas.
+        """
+        saved = await self._persist_alerts(pending, timings)
+        try:
+            return await self._broadcast_alerts(saved, timings)
+        except Exception as e:
+            # Ya están guardadas: quien se reconecte las recibe desde la base
+            logger.error(f"Error al enviar {len(saved)} alertas guardadas: {str(e)}")
+            return len(saved)
+
+    async def _evaluate_alerts(self, readings: List[Reading], timings: Dict[str, float]) -> List[Any]:
+        """Alertas de cada lectura que tiene alguna, como [(lectura, alertas)]"""
+        # Umbrales por dispositivo (tabla de reglas cacheada, ver sensor/rules.py);
+        # las condiciones sostenidas se suprimen en self.alert_state
+        started = time.perf_counter()
+        evaluated = await alert_rules.evaluate_batch(readings, self.alert_state)
+        # Caídas e impactos: eventos con su propio período de enfriamiento por casco
+        motion = self.motion_detector.process(readings)
+        # Exposición acumulada a CO (TWA del turno y STEL de 15 minutos)
+        await shift_calendar.ensure_loaded()
+        exposure = co_exposure.process(readings)
+        pending = [
+            (reading, alerts + motion_alerts + exposure_alerts)
+            for reading, alerts, motion_alerts, exposure_alerts in zip(readings, evaluated, motion, exposure)
+            if alerts or motion_alerts or exposure_alerts
+        ]
+        timings["evaluate"] = (time.perf_counter() - started) * 1000
+        return pending
+
+    def _discard_alerts(self, pending: List[Any]):
+        """Alertas evaluadas que no se guardaron: la próxima lectura las vuelve a generar"""
+        for reading, alerts in pending:
+            for alert_data in alerts:
+                # Solo las de las reglas pasan por la máquina de estados
+                if "transition" in alert_data:
+                    self.alert_state.rollback(reading.user_id, alert_data["type"])
+
+    async def _persist_alerts(self, pending: List[Any], timings: Dict[str, float]) -> List[Any]:
+        """
+        Guarda las alertas evaluadas en una transacción y devuelve las guardadas
+        como [(id, alerta, trabajador, timestamp)].
+        """
+        from sqlalchemy import select
+        from app.core.database import AsyncSessionLocal
         from app.modules.alert.models import Alert
-        
-        alerts_to_send = []
-        
-        # Verificar temperatura corporal
-        if reading.body_temp is not None:
-            if reading.body_temp > 39.2:
-                alerts_to_send.append({
-                    "type": "high_body_temperature",
-                    "severity": "critical",
-                    "value": float(reading.body_temp),
-                    "message": f"Temperatura corporal crítica: {reading.body_temp:.1f}°C"
-                })
-            elif reading.body_temp > 38.4:
-                alerts_to_send.append({
-                    "type": "high_body_temperature",
-                    "severity": "warning",
-                    "value": float(reading.body_temp),
-                    "message": f"Temperatura corporal elevada: {reading.body_temp:.1f}°C"
-                })
-        
-        # Verificar ritmo cardíaco
-        if reading.pulse is not None:
-            if reading.pulse > 140:
-                alerts_to_send.append({
-                    "type": "heart_rate_high",
-                    "severity": "critical",
-                    "value": float(reading.pulse),
-                    "message": f"Ritmo cardíaco muy alto: {reading.pulse:.0f} bpm"
-                })
-            elif reading.pulse > 130:
-                alerts_to_send.append({
-                    "type": "heart_rate_high",
-                    "severity": "warning",
-                    "value": float(reading.pulse),
-                    "message": f"Ritmo cardíaco alto: {reading.pulse:.0f} bpm"
-                })
-            elif reading.pulse < 45:
-                alerts_to_send.append({
-                    "type": "heart_rate_low",
-                    "severity": "critical",
-                    "value": float(reading.pulse),
-                    "message": f"Ritmo cardíaco muy bajo: {reading.pulse:.0f} bpm"
-                })
-            elif reading.pulse < 50:
-                alerts_to_send.append({
-                    "type": "heart_rate_low",
-                    "severity": "warning",
-                    "value": float(reading.pulse),
-                    "message": f"Ritmo cardíaco bajo: {reading.pulse:.0f} bpm"
-                })
-        
-        # Verificar CO (gases tóxicos)
-        if reading.mq7 is not None:
-            if reading.mq7 > 100:
-                alerts_to_send.append({
-                    "type": "toxic_gas",
-                    "severity": "critical",
-                    "value": float(reading.mq7),
-                    "message": f"Nivel de CO crítico: {reading.mq7:.0f} ppm"
-                })
-            elif reading.mq7 > 50:
-                alerts_to_send.append({
-                    "type": "toxic_gas",
-                    "severity": "warning",
-                    "value": float(reading.mq7),
-                    "message": f"Nivel de CO elevado: {reading.mq7:.0f} ppm"
-                })
-        
-        # Si hay alertas, obtener información del usuario y broadcast
-        if alerts_to_send and len(manager.active_connections) > 0:
-            db = SessionLocal()
-            try:
-                user = db.query(User).filter(User.id == reading.user_id).first()
-                if user:
-                    area = db.query(Area).filter(Area.id == user.area_id).first() if user.area_id else None
-                    
-                    for alert_data in alerts_to_send:
-                        # Crear la alerta en la base de datos
-                        alert = Alert(
-                            alert_type=alert_data["type"],
-                            severity="high" if alert_data["severity"] == "critical" else "medium",
-                            message=alert_data["message"],
-                            reading_id=reading.id,
-                            user_id=reading.user_id
-                        )
-                        db.add(alert)
-                        db.commit()
-                        db.refresh(alert)
-                        
-                        # Preparar datos para WebSocket
-                        ws_alert_data = {
-                            "id": alert.id,
-                            "type": alert_data["type"],
-                            "severity": alert_data["severity"],
-                            "worker_name": f"{user.first_name} {user.last_name}",
-                            "area": area.name if area else None,
-                            "value": alert_data["value"],
-                            "timestamp": alert.timestamp.isoformat()
-                        }
-                        
-                        # Broadcast a todos los clientes WebSocket
-                        await manager.broadcast_alert(ws_alert_data)
-                        logger.info(f"Alerta enviada por WebSocket: {alert_data['type']} - {user.first_name} {user.last_name}")
-            except Exception as e:
-                logger.error(f"Error al enviar alerta por WebSocket: {str(e)}")
-            finally:
-                db.close()
+
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            # Nombre, área y supervisor del trabajador desde la cache en proceso
+            workers = await worker_info_cache.get_many({reading.user_id for reading, _ in pending}, db)
+
+            rows, created = [], []
+            for reading, alerts_to_send in pending:
+                worker = workers.get(reading.user_id)
+                if not worker:
+                    # Sin trabajador no hay alerta: la lectura no avanza la máquina de estados
+                    self.alert_state.forget(reading.user_id)
+                    continue
+                for alert_data in alerts_to_send:
+                    rows.append({
+                        "alert_type": alert_data["type"],
+                        "severity": "high" if alert_data["severity"] == "critical" else "medium",
+                        "message": alert_data["message"],
+                        "value": alert_data["value"],
+                        "reading_id": reading.id,
+                        "user_id": reading.user_id,
+                    })
+                    created.append((alert_data, worker))
+
+            if not rows:
+                return []
+
+            # Todas las alertas del lote en un INSERT multi-fila y una sola transacción
+            alert_ids = await self.alert_repository.create_many(rows, db)
+            # Timestamps asignados por el servidor, en una sola consulta
+            result = await db.execute(select(Alert.id, Alert.timestamp).where(Alert.id.in_(alert_ids)))
+            timestamps = {row.id: row.timestamp for row in result}
+            await db.commit()
+        timings["persist"] = (time.perf_counter() - started) * 1000
+        return [
+            (alert_id, alert_data, worker, timestamps.get(alert_id))
+            for alert_id, (alert_data, worker) in zip(alert_ids, created)
+        ]
+
+    async def _broadcast_alerts(self, saved: List[Any], timings: Dict[str, float]) -> int:
+        """Envía por WebSocket las alertas guardadas; devuelve cuántas son"""
+        # Se publican aunque no haya clientes: quedan en memoria para las reconexiones
+        started = time.perf_counter()
+        for alert_id, alert_data, worker, alert_timestamp in saved:
+
+            # Preparar datos para WebSocket
+            ws_alert_data = {
+                "id": alert_id,
+                "type": alert_data["type"],
+                "severity": alert_data["severity"],
+                "worker_name": worker.worker_name,
+                "area": worker.area_name,
+                "value": alert_data["value"],
+                "timestamp": alert_timestamp.isoformat() if alert_timestamp else None
+            }
+
+            # Solo a los clientes suscritos al área, al supervisor o al trabajador
+            await manager.broadcast_alert(
+                ws_alert_data,
+                area_id=worker.area_id,
+                supervisor_id=worker.supervisor_id,
+                user_id=worker.user_id,
+            )
+            logger.info(f"Alerta enviada por WebSocket: {alert_data['type']} - {worker.worker_name}")
+        timings["broadcast"] = (time.perf_counter() - started) * 1000
+
+        return len(saved)
 
     def _validate_create_data(self, data: ReadingCreateSchema) -> Dict[str, Any]:
         """
@@ -180,12 +489,24 @@ class ReadingService(BaseService[Reading, ReadingCreateSchema, ReadingUpdateSche
         Ahora valida user_id y device_id, y los rangos de los valores de sensores.
         """
         payload = data.dict(exclude_none=True)
-        
+        return self._validate_reading_values(payload)
+
+    def _validate_reading_values(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Valida user_id, device_id y los rangos de sensores sobre un dict de lectura.
+        Compartido por el schema JSON y por los frames binarios ya decodificados.
+        """
         # Validar user_id y device_id
         if payload.get("user_id", 0) <= 0:
             raise ValidationError("user_id inválido o faltante")
         if payload.get("device_id", 0) <= 0:
             raise ValidationError("device_id inválido o faltante")
+
+        # NaN e infinito (posibles en los float32 del frame binario) pasan cualquier comparación de rango
+        for field in SENSOR_VALUE_FIELDS:
+            value = payload.get(field)
+            if value is not None and not math.isfinite(value):
+                raise ValidationError(f"{field} no es un número finito")
         
         # Validar rangos de valores de sensores
         if "mq7" in payload and payload["mq7"] is not None:
@@ -196,17 +517,17 @@ class ReadingService(BaseService[Reading, ReadingCreateSchema, ReadingUpdateSche
             if payload["pulse"] < 0 or payload["pulse"] > 300:
                 raise ValidationError("pulse fuera de rango (0-300 bpm)")
         
-        # Validar acelerómetro (rango típico: -20 a +20 m/s²)
+        # Validar acelerómetro (escala completa del sensor: ±8 g)
         for axis in ["ax", "ay", "az"]:
             if axis in payload and payload[axis] is not None:
-                if payload[axis] < -20 or payload[axis] > 20:
-                    raise ValidationError(f"{axis} fuera de rango (-20 a +20 m/s²)")
+                if abs(payload[axis]) > ACCEL_RANGE_MS2:
+                    raise ValidationError(f"{axis} fuera de rango (±{ACCEL_RANGE_MS2:.1f} m/s²)")
         
-        # Validar giroscopio (rango típico: -10 a +10 rad/s)
+        # Validar giroscopio (escala completa del sensor: ±500 °/s)
         for axis in ["gx", "gy", "gz"]:
             if axis in payload and payload[axis] is not None:
-                if payload[axis] < -10 or payload[axis] > 10:
-                    raise ValidationError(f"{axis} fuera de rango (-10 a +10 rad/s)")
+                if abs(payload[axis]) > GYRO_RANGE_RADS:
+                    raise ValidationError(f"{axis} fuera de rango (±{GYRO_RANGE_RADS:.2f} rad/s)")
         
         return payload
 
@@ -220,6 +541,9 @@ class ReadingService(BaseService[Reading, ReadingCreateSchema, ReadingUpdateSche
             raise ValidationError("user_id inválido")
         if "device_id" in payload and payload["device_id"] <= 0:
             raise ValidationError("device_id inválido")
+        for field in SENSOR_VALUE_FIELDS:
+            if field in payload and not math.isfinite(payload[field]):
+                raise ValidationError(f"{field} no es un número finito")
         
         # Validar rangos si se actualizan
         if "mq7" in payload and (payload["mq7"] < 0 or payload["mq7"] > 10000):
@@ -261,6 +585,9 @@ class ReadingService(BaseService[Reading, ReadingCreateSchema, ReadingUpdateSche
         Obtiene la última lectura de un dispositivo.
         """
         try:
+            if worker_state.knows_device(device_id):
+                row = worker_state.latest_by_device(device_id)
+                return ReadingSchema(**row) if row else None
             item = self.repository.get_latest_by_device(device_id)
             return self._to_response_schema(item) if item else None
         except Exception as e:
@@ -0,0 +1,446 @@
+# Estado vivo por casco y por trabajador, alimentado por la ingesta
+"""
+Última lectura, últimos signos vitales válidos, batería y estado de conexión de
+cada casco, y última lectura de cada trabajador, en memoria. Responde sin ir a
+la base los endpoints que más se consultan: /readings/by-device/{id}/latest,
+/dashboard/my-readings, /dashboard/active-workers y /dashboard/device-stats.
+
+- Al iniciar se carga desde la base (tres consultas).
+- La ingesta (`observe`) y ConnectionService/DeviceService lo actualizan al
+  instante. Cada actualización se compara por (timestamp, id) o por timestamp,
+  así lo que llega fuera de orden no pisa un valor más nuevo. Las lecturas
+  llevan el timestamp que les puso la ingesta al insertarlas (stamp_rows en
+  reading/repository.py), el mismo que queda en la base, así que las
+  observadas y las cargadas de la base se comparan con el mismo reloj.
+- Cada `refresh_s` se releen los cascos (usuario, activo, batería) y los datos
+  de los trabajadores; UserService y AreaService marcan estos últimos para
+  releerlos en la próxima consulta.
+- Con varios workers de uvicorn, las lecturas y conexiones observadas se envían
+  a los demás procesos por el backplane cada `sync_ms`.
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.websocket import manager
+
+logger = logging.getLogger(__name__)
+
+STATE_CHANNEL = "worker_state"
+
+READING_COLUMNS = ("id", "user_id", "device_id", "mq7", "pulse", "body_temp", "ax", "ay", "az", "gx", "gy", "gz", "seq")
+
+
+def reading_row(reading: Any) -> Dict[str, Any]:
+    """
+    Columnas de una lectura como dict, listo para ReadingSchema. Lee el
+    __dict__ de la entidad: las de la ingesta están recién creadas o refrescadas
+    y un atributo sin asignar es NULL, sin pasar por el descriptor de SQLAlchemy.
+    """
+    values = vars(reading)
+    row = {column: values.get(column) for column in READING_COLUMNS}
+    row["timestamp"] = values["timestamp"]
+    return row
+
+
+def _newer(row: Dict[str, Any], current: Optional[Dict[str, Any]]) -> bool:
+    return current is None or (row["timestamp"], row["id"]) >= (current["timestamp"], current["id"])
+
+
+def _has_vitals(row: Dict[str, Any]) -> bool:
+    return row["pulse"] is not None and row["body_temp"] is not None
+
+
+class _Device:
+    __slots__ = ("device_id", "user_id", "is_active", "battery", "status", "status_at", "reading", "vitals")
+
+    def __init__(self, device_id: int, user_id: Optional[int], is_active: bool = True, battery: Optional[int] = None):
+        self.device_id = device_id
+        self.user_id = user_id
+        self.is_active = is_active
+        self.battery = battery
+        self.status: Optional[str] = None
+        self.status_at: Optional[datetime] = None
+        # Última lectura y última con pulso y temperatura (dicts de reading_row)
+        self.reading: Optional[Dict[str, Any]] = None
+        self.vitals: Optional[Dict[str, Any]] = None
+
+
+class _Worker:
+    """Datos del trabajador que muestra el dashboard"""
+
+    __slots__ = ("user_id", "name", "employee_number", "area", "supervisor_id", "is_active")
+
+    def __init__(self, user_id: int, first_name: str, last_name: str, employee_number: str,
+                 area: Optional[str], supervisor_id: Optional[int], user_active: bool, area_active: Optional[bool]):
+        self.user_id = user_id
+        self.name = f"{first_name} {last_name}"
+        self.employee_number = employee_number
+        self.area = area
+        self.supervisor_id = supervisor_id
+        # Usuario activo y área activa (o sin área), como filtra la consulta del dashboard
+        self.is_active = bool(user_active) and area_active is not False
+
+
+class WorkerStateStore:
+    def __init__(self, refresh_s: float = 30, sync_ms: int = 250):
+        self.refresh_seconds = refresh_s
+        self.sync_seconds = sync_ms / 1000
+        self.ready = False
+        self._devices: Dict[int, _Device] = {}
+        self._latest_by_user: Dict[int, Dict[str, Any]] = {}
+        # Usuarios con al menos una lectura con pulso y temperatura
+        self._with_vitals: Set[int] = set()
+        self._workers: Dict[int, _Worker] = {}
+        self._workers_stale = False
+        # La ingesta escribe desde el event loop; conexiones, dispositivos y consultas desde el threadpool
+        self._lock = threading.Lock()
+        # Lecturas y conexiones observadas aquí, pendientes de enviar a los demás procesos
+        self._outbox: List[List[Any]] = []
+        self._tasks: List[asyncio.Task] = []
+
+        self._hits = 0
+        self._misses = 0
+        self._synced_out = 0
+        self._synced_in = 0
+
+        manager.add_listener(STATE_CHANNEL, self._apply_remote)
+
+    # ------------------------------------------------------------------ entradas
+
+    def observe(self, readings: Iterable[Any]):
+        """Incorpora lecturas guardadas (llamado desde la ingesta)"""
+        # De un lote solo importa la última lectura por casco y la última con signos vitales
+        last: Dict[int, Any] = {}
+        last_vitals: Dict[int, Any] = {}
+        for reading in readings:
+            values = vars(reading)
+            device_id = values["device_id"]
+            last[device_id] = reading
+            if values.get("pulse") is not None and values.get("body_temp") is not None:
+                last_vitals[device_id] = reading
+        rows = [reading_row(reading) for reading in last.values()]
+        rows.extend(reading_row(reading) for device_id, reading in last_vitals.items()
+                    if last[device_id] is not reading)
+        share = manager.backplane.has_peers
+        with self._lock:
+            for row in rows:
+                self._apply_reading(row)
+                if share:
+                    self._outbox.append(["reading", row])
+
+    def _apply_reading(self, row: Dict[str, Any]):
+        device = self._devices.get(row["device_id"])
+        if device is None:
+            device = self._devices[row["device_id"]] = _Device(row["device_id"], row["user_id"])
+        if _newer(row, device.reading):
+            device.reading = row
+        if _has_vitals(row):
+            self._with_vitals.add(row["user_id"])
+            if _newer(row, device.vitals):
+                device.vitals = row
+        if _newer(row, self._latest_by_user.get(row["user_id"])):
+            self._latest_by_user[row["user_id"]] = row
+
+    def set_connection(self, device_id: int, status: str, at: datetime):
+        """Nuevo registro de conexión del casco (ConnectionService)"""
+        with self._lock:
+            self._apply_connection(device_id, status, at)
+            if manager.backplane.has_peers:
+                self._outbox.append(["connection", device_id, status, at])
+
+    def _apply_connection(self, device_id: int, status: str, at: datetime):
+        device = self._devices.get(device_id)
+        if device is None:
+            device = self._devices[device_id] = _Device(device_id, None)
+        if device.status_at is None or at >= device.status_at:
+            device.status = status
+            device.status_at = at
+
+    def set_device(self, device_id: int, user_id: int, is_active: bool, battery: Optional[int]):
+        """Datos del casco (DeviceService y la relectura periódica)"""
+        with self._lock:
+            device = self._devices.get(device_id)
+            if device is None:
+                self._devices[device_id] = _Device(device_id, user_id, is_active, battery)
+                return
+            device.user_id = user_id
+            device.is_active = is_active
+            device.battery = battery
+
+    def invalidate_workers(self):
+        """Nombre, área o estado de algún trabajador cambió (UserService, AreaService)"""
+        self._workers_stale = True
+
+    def remember(self, reading: Any):
+        """Última lectura de un usuario leída de la base tras un fallo de la cache"""
+        row = reading_row(reading)
+        with self._lock:
+            if _newer(row, self._latest_by_user.get(row["user_id"])):
+                self._latest_by_user[row["user_id"]] = row
+
+    def _apply_remote(self, items: List[List[Any]]):
+        """Lecturas y conexiones observadas por otro proceso"""
+        with self._lock:
+            for item in items:
+                if item[0] == "reading":
+                    row = item[1]
+                    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                    self._apply_reading(row)
+                else:
+                    self._apply_connection(item[1], item[2], datetime.fromisoformat(item[3]))
+        self._synced_in += len(items)
+
+    # ------------------------------------------------------------------ consultas
+
+    def knows_device(self, device_id: int) -> bool:
+        return self.ready and device_id in self._devices
+
+    def device_user(self, device_id: int) -> Optional[int]:
+        device = self._devices.get(device_id)
+        return device.user_id if device is not None else None
+
+    def battery(self, device_id: int) -> Optional[int]:
+        device = self._devices.get(device_id)
+        return device.battery if device is not None else None
+
+    def latest_by_device(self, device_id: int) -> Optional[Dict[str, Any]]:
+        """Última lectura de un casco conocido (`knows_device`); None si no tiene lecturas"""
+        self._hits += 1
+        device = self._devices.get(device_id)
+        return device.reading if device is not None else None
+
+    def latest_by_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Última lectura del usuario; None si no está en memoria (hay que ir a la base)"""
+        row = self._latest_by_user.get(user_id) if self.ready else None
+        if row is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return row
+
+    def _online(self, supervisor_id: Optional[int] = None) -> List[Any]:
+        """Cascos activos en línea de trabajadores activos con alguna lectura con signos vitales"""
+        with self._lock:
+            online = [
+                (device.device_id, device.user_id, device.battery, device.status_at, device.vitals)
+                for device in self._devices.values()
+                if device.status == "online" and device.is_active and device.user_id in self._with_vitals
+            ]
+        missing = [user_id for _, user_id, _, _, _ in online if user_id not in self._workers]
+        if missing or self._workers_stale:
+            self._load_workers(None if self._workers_stale else missing)
+        self._hits += 1
+
+        results = []
+        for item in online:
+            worker = self._workers.get(item[1])
+            if worker is None or not worker.is_active:
+                continue
+            if supervisor_id is not None and worker.supervisor_id != supervisor_id:
+                continue
+            results.append((worker, *item))
+        return results
+
+    def active_workers(self, supervisor_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Trabajadores con su casco activo en línea y alguna lectura con signos
+        vitales, con el mismo formato que DashboardRepository.get_active_workers.
+        """
+        results = []
+        for worker, device_id, user_id, battery, connected_at, vitals in self._online(supervisor_id):
+            # Signos vitales del trabajador actual del casco
+            if vitals is not None and vitals["user_id"] != user_id:
+                vitals = None
+            results.append({
+                'id': user_id,
+                'nombre': worker.name,
+                'numeroEmpleado': worker.employee_number,
+                'area': worker.area,
+                'ritmoCardiaco': vitals["pulse"] if vitals else None,
+                'temperaturaCorporal': vitals["body_temp"] if vitals else None,
+                'nivelBateria': battery,
+                'tiempoActivo_ts': connected_at,
+                'cascoId': device_id,
+            })
+        return results
+
+    def device_stats(self) -> Dict[str, Any]:
+        """Mismo resultado que DashboardRepository.get_device_stats (solo cuenta)"""
+        with self._lock:
+            total_devices = sum(1 for device in self._devices.values() if device.is_active)
+        active_devices_count = len(self._online())
+        connection_rate = round((active_devices_count / total_devices * 100), 2) if total_devices > 0 else 0.0
+        return {
+            'active_devices': active_devices_count,
+            'total_devices': total_devices,
+            'connection_rate': connection_rate
+        }
+
+    # ------------------------------------------------------------------ carga desde la base
+
+    def _load_workers(self, user_ids: Optional[List[int]] = None):
+        """Datos de los trabajadores (todos, o solo `user_ids`) en una consulta"""
+        from app.core.database import SessionLocal
+        from app.modules.auth.models import User
+        from app.modules.area.models import Area
+
+        with SessionLocal() as db:
+            q = (
+                db.query(User.id, User.first_name, User.last_name, User.employee_number, Area.name,
+                         User.supervisor_id, User.is_active, Area.is_active)
+                .outerjoin(Area, Area.id == User.area_id)
+            )
+            if user_ids is not None:
+                q = q.filter(User.id.in_(user_ids))
+            workers = {row[0]: _Worker(*row) for row in q.all()}
+        if user_ids is None:
+            self._workers = workers
+            self._workers_stale = False
+        else:
+            self._workers.update(workers)
+
+    def _load_devices(self):
+        from app.core.database import SessionLocal
+        from app.modules.device.models import Device
+
+        with SessionLocal() as db:
+            rows = db.query(Device.id, Device.user_id, Device.is_active, Device.battery).all()
+        for row in rows:
+            self.set_device(*row)
+
+    def _load_all(self):
+        """
+        Carga inicial: cascos con su última conexión y los ids de su última lectura
+        y de su última con signos vitales (device_status); por usuario, su última
+        lectura y si tiene alguna con signos vitales (subconsultas correlacionadas
+        sobre idx_user_timestamp); y luego esas lecturas.
+        """
+        from sqlalchemy import select
+        from sqlalchemy.orm import aliased
+        from app.core.database import SessionLocal
+        from app.modules.auth.models import User
+        from app.modules.device.models import Device, DeviceStatus
+        from app.modules.reading.models import Reading
+
+        def latest(reading, *conditions):
+            return (
+                select(reading.id)
+                .where(*conditions)
+                .order_by(reading.timestamp.desc(), reading.id.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+
+        by_user = aliased(Reading)
+        with SessionLocal() as db:
+            devices = (
+                db.query(
+                    Device.id, Device.user_id, Device.is_active, Device.battery,
+                    DeviceStatus.connection_status, DeviceStatus.connection_at,
+                    DeviceStatus.last_reading_id, DeviceStatus.vitals_reading_id,
+                )
+                .outerjoin(DeviceStatus, DeviceStatus.device_id == Device.id)
+                .all()
+            )
+            users = (
+                db.query(
+                    User.id,
+                    latest(by_user, by_user.user_id == User.id).correlate(User),
+                    select(by_user.id)
+                    .where(by_user.user_id == User.id, by_user.pulse.isnot(None), by_user.body_temp.isnot(None))
+                    .correlate(User)
+                    .exists(),
+                )
+                .filter(User.id.in_(select(Device.user_id)))
+                .all()
+            )
+            reading_ids = {rid for row in devices for rid in row[6:8] if rid} | {row[1] for row in users if row[1]}
+            readings = {}
+            ids = list(reading_ids)
+            for start in range(0, len(ids), 1000):
+                for reading in db.query(Reading).filter(Reading.id.in_(ids[start:start + 1000])).all():
+                    readings[reading.id] = reading_row(reading)
+
+        with self._lock:
+            for device_id, user_id, is_active, battery, status, status_at, reading_id, vitals_id in devices:
+                device = self._devices.get(device_id)
+                if device is None:
+                    device = self._devices[device_id] = _Device(device_id, user_id, is_active, battery)
+                else:
+                    device.user_id, device.is_active, device.battery = user_id, is_active, battery
+                if status_at is not None:
+                    self._apply_connection(device_id, status, status_at)
+                for rid in (reading_id, vitals_id):
+                    if rid in readings:
+                        self._apply_reading(readings[rid])
+            for user_id, reading_id, has_vitals in users:
+                if has_vitals:
+                    self._with_vitals.add(user_id)
+                if reading_id in readings:
+                    self._apply_reading(readings[reading_id])
+        self._load_workers()
+
+    # ------------------------------------------------------------------ ciclo de vida
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await asyncio.to_thread(self._load_devices)
+                await asyncio.to_thread(self._load_workers)
+            except Exception as e:
+                logger.error(f"Error releyendo el estado de cascos y trabajadores: {str(e)}")
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_seconds)
+            if not self._outbox:
+                continue
+            with self._lock:
+                items, self._outbox = self._outbox, []
+            try:
+                await manager.publish_data(STATE_CHANNEL, items)
+                self._synced_out += len(items)
+            except Exception as e:
+                logger.error(f"Error enviando el estado de cascos a otros procesos: {str(e)}")
+
+    async def start(self):
+        """Carga el estado desde la base e inicia la relectura y la sincronización (al iniciar)"""
+        if self._tasks:
+            return
+        try:
+            await asyncio.to_thread(self._load_all)
+            self.ready = True
+        except Exception as e:
+            # Sin carga inicial las consultas siguen yendo a la base
+            logger.error(f"No se pudo cargar el estado de cascos y trabajadores: {str(e)}")
+        self._tasks = [asyncio.create_task(self._refresh_loop()), asyncio.create_task(self._sync_loop())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "devices": len(self._devices),
+            "online": sum(1 for device in self._devices.values() if device.status == "online"),
+            "users": len(self._latest_by_user),
+            "workers": len(self._workers),
+            "hits": self._hits,
+            "misses": self._misses,
+            "synced_out": self._synced_out,
+            "synced_in": self._synced_in,
+        }
+
+
+worker_state = WorkerStateStore(
+    refresh_s=settings.WORKER_STATE_REFRESH_S,
+    sync_ms=settings.WORKER_STATE_SYNC_MS,
+)
@@ -13,6 +13,8 @@ class SensorTypeEnum(str, enum.Enum):
     PULSE = "pulse"
     ACCELEROMETER = "accelerometer"
     GYROSCOPE = "gyroscope"
+    BODY_TEMP = "body_temp"
+    BATTERY = "battery"
 
 
 class Sensor(Base):
@@ -32,7 +34,7 @@ class Sensor(Base):
 
 class SensorCreateSchema(BaseModel):
     device_id: int = Field(..., description="ID del dispositivo")
-    sensor_type: SensorTypeEnum = Field(..., description="Tipo de sensor (mq7, pulse, accelerometer, gyroscope)")
+    sensor_type: SensorTypeEnum = Field(..., description="Tipo de sensor (mq7, pulse, accelerometer, gyroscope, body_temp, battery)")
     name: str = Field(..., description="Nombre del sensor")
     unit: str = Field(..., description="Unidad de medida (ppm, bpm, m/s², rad/s)")
     min_threshold: Optional[float] = Field(None, description="Umbral mínimo aceptable")
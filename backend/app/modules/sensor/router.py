@@ -38,6 +38,11 @@ def create(payload: SensorCreateSchema, current_user=Depends(get_current_user)):
     - pulse: Sensor de pulso (unidad: bpm)
     - accelerometer: Acelerómetro (unidad: m/s²)
     - gyroscope: Giroscopio (unidad: rad/s)
+    - body_temp: Temperatura corporal (unidad: °C)
+    - battery: Batería (unidad: %)
+
+    Los umbrales de mq7, pulse y body_temp reemplazan a los globales en las
+    alertas de ese dispositivo.
     """
     return service.create(payload)
 
@@ -0,0 +1,358 @@
+# Motor de reglas de alertas compilado desde la configuración de sensores
+"""
+Cada dispositivo tiene una tabla de reglas compilada a partir de los umbrales
+globales por defecto y de sus filas `sensor` activas. Las tablas se cachean en
+memoria; SensorService las invalida al crear, actualizar o borrar un sensor y
+un TTL acota lo que puede tardar en verse un cambio hecho desde otro proceso.
+
+Umbrales por defecto (warning / critical):
+- Temperatura corporal alta: >38.4°C / >39.2°C
+- Ritmo cardíaco alto: >130 bpm / >140 bpm
+- Ritmo cardíaco bajo: <50 bpm / <45 bpm
+- CO (mq7): >50 ppm / >100 ppm
+
+Un sensor con `max_threshold` (o `min_threshold`) reemplaza el umbral de
+warning de la regla correspondiente; el de critical conserva el mismo margen
+que tiene por defecto respecto al de warning.
+
+Cada regla tiene una banda de histéresis: una alerta activa solo se despeja
+(o baja de critical a warning) cuando el valor cruza el umbral de vuelta por
+más de la banda, así un valor que oscila alrededor del umbral no la reabre.
+
+Un lote se evalúa por tabla de reglas: los umbrales se comparan con NumPy sobre
+todas las lecturas del grupo y solo se recorren en Python las que disparan
+alguna regla o cuyo usuario tiene estado pendiente en el AlertStateTracker.
+"""
+import asyncio
+import logging
+import time
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.modules.sensor.models import Sensor, SensorTypeEnum
+
+logger = logging.getLogger(__name__)
+
+
+class AlertRule:
+    """Regla de umbral sobre un campo de la lectura"""
+
+    __slots__ = ("field", "alert_type", "above", "warning", "critical", "hysteresis",
+                 "warning_message", "critical_message")
+
+    def __init__(self, field: str, alert_type: str, above: bool, warning: float, critical: float,
+                 hysteresis: float, warning_message: str, critical_message: str):
+        self.field = field
+        self.alert_type = alert_type
+        # True: alerta por encima del umbral; False: por debajo
+        self.above = above
+        self.warning = warning
+        self.critical = critical
+        self.hysteresis = hysteresis
+        self.warning_message = warning_message
+        self.critical_message = critical_message
+
+    def with_warning(self, warning: float) -> "AlertRule":
+        """Copia de la regla con otro umbral de warning y el mismo margen hasta critical"""
+        return AlertRule(
+            self.field, self.alert_type, self.above, warning, warning + (self.critical - self.warning),
+            self.hysteresis, self.warning_message, self.critical_message,
+        )
+
+    def severity(self, value: float, active: Optional[str] = None) -> Optional[str]:
+        """
+        Severidad del valor. `active` es la severidad en curso del usuario para
+        este tipo de alerta: mientras siga activa se sale con el umbral desplazado
+        por la banda de histéresis.
+        """
+        critical_band = self.hysteresis if active == "critical" else 0
+        warning_band = self.hysteresis if active is not None else 0
+        if self.above:
+            if value > self.critical - critical_band:
+                return "critical"
+            if value > self.warning - warning_band:
+                return "warning"
+        else:
+            if value < self.critical + critical_band:
+                return "critical"
+            if value < self.warning + warning_band:
+                return "warning"
+        return None
+
+
+# Reglas globales, agrupadas por campo en orden de evaluación.
+# Dentro de un campo se aplica la primera regla que dispare.
+DEFAULT_RULES: Tuple[Tuple[str, Tuple[AlertRule, ...]], ...] = (
+    ("body_temp", (
+        AlertRule("body_temp", "high_body_temperature", True, 38.4, 39.2, 0.3,
+                  "Temperatura corporal elevada: {:.1f}°C", "Temperatura corporal crítica: {:.1f}°C"),
+    )),
+    ("pulse", (
+        AlertRule("pulse", "heart_rate_high", True, 130, 140, 5,
+                  "Ritmo cardíaco alto: {:.0f} bpm", "Ritmo cardíaco muy alto: {:.0f} bpm"),
+        AlertRule("pulse", "heart_rate_low", False, 50, 45, 3,
+                  "Ritmo cardíaco bajo: {:.0f} bpm", "Ritmo cardíaco muy bajo: {:.0f} bpm"),
+    )),
+    ("mq7", (
+        AlertRule("mq7", "toxic_gas", True, 50, 100, 5,
+                  "Nivel de CO elevado: {:.0f} ppm", "Nivel de CO crítico: {:.0f} ppm"),
+    )),
+)
+
+# Tipo de sensor configurable -> campo de la lectura al que aplican sus umbrales
+SENSOR_FIELDS: Dict[SensorTypeEnum, str] = {
+    SensorTypeEnum.BODY_TEMP: "body_temp",
+    SensorTypeEnum.PULSE: "pulse",
+    SensorTypeEnum.MQ7: "mq7",
+}
+
+RuleTable = Tuple[Tuple[str, Tuple[AlertRule, ...]], ...]
+
+# Código de severidad de los arreglos vectorizados (índice = nivel)
+SEVERITIES = (None, "warning", "critical")
+SEVERITY_CODES = {severity: code for code, severity in enumerate(SEVERITIES)}
+
+# Grupos más chicos se evalúan lectura por lectura: armar los arreglos cuesta más de lo que ahorra
+VECTORIZE_MIN_READINGS = 16
+
+
+def compile_rules(sensors: Iterable[Sensor]) -> RuleTable:
+    """Compila las filas sensor de un dispositivo sobre las reglas por defecto"""
+    overrides: Dict[str, Sensor] = {}
+    for sensor in sensors:
+        field = SENSOR_FIELDS.get(sensor.sensor_type)
+        if field and sensor.is_active:
+            overrides[field] = sensor
+
+    if not overrides:
+        return DEFAULT_RULES
+
+    table = []
+    for field, rules in DEFAULT_RULES:
+        sensor = overrides.get(field)
+        if sensor is not None:
+            compiled = []
+            for rule in rules:
+                threshold = sensor.max_threshold if rule.above else sensor.min_threshold
+                compiled.append(rule if threshold is None else rule.with_warning(threshold))
+            rules = tuple(compiled)
+        table.append((field, rules))
+    return tuple(table)
+
+
+def _alert(rule: AlertRule, severity: str, value: float) -> Dict[str, Any]:
+    return {
+        "type": rule.alert_type,
+        "severity": severity,
+        "value": float(value),
+        "message": (rule.critical_message if severity == "critical" else rule.warning_message).format(value),
+    }
+
+
+def evaluate(table: RuleTable, reading: Any, state: Any = None) -> List[Dict[str, Any]]:
+    """
+    Evalúa una lectura contra su tabla de reglas en una sola pasada.
+    Con `state` (un AlertStateTracker, ver reading/alert_state.py) se aplica la
+    histéresis y solo se devuelven las alertas que son transiciones de estado.
+    """
+    alerts = []
+    for field, rules in table:
+        value = getattr(reading, field)
+        if value is None:
+            continue
+        matched = False
+        for rule in rules:
+            if state is None:
+                severity = rule.severity(value)
+                if severity is not None:
+                    alerts.append(_alert(rule, severity, value))
+                    break
+                continue
+
+            # Con estado se actualizan todas las reglas del campo para que las demás se despejen
+            severity = None
+            if not matched:
+                severity = rule.severity(value, state.active_severity(reading.user_id, rule.alert_type))
+                matched = severity is not None
+            transition = state.observe(reading.user_id, rule.alert_type, severity)
+            if transition is not None:
+                alert = _alert(rule, severity, value)
+                alert["transition"] = transition
+                alerts.append(alert)
+    return alerts
+
+
+def severity_codes(rule: AlertRule, values: np.ndarray) -> np.ndarray:
+    """
+    Severidad de cada valor (0 ninguna, 1 warning, 2 critical) en una matriz de
+    3 filas, una por severidad activa del usuario (ninguna, warning, critical),
+    igual que AlertRule.severity. Los NaN (sensor ausente) no disparan.
+    """
+    # Por debajo del umbral equivale a que el valor negado lo supere
+    sign = 1.0 if rule.above else -1.0
+    signed = values * sign
+    codes = np.zeros((3, len(values)), dtype=np.int8)
+    for active in range(3):
+        critical_band = rule.hysteresis if active == 2 else 0
+        warning_band = rule.hysteresis if active >= 1 else 0
+        row = codes[active]
+        row[signed > sign * rule.warning - warning_band] = 1
+        row[signed > sign * rule.critical - critical_band] = 2
+    return codes
+
+
+def evaluate_many(table: RuleTable, readings: Sequence[Any], state: Any = None) -> List[List[Dict[str, Any]]]:
+    """
+    Evalúa varias lecturas con la misma tabla de reglas; mismo resultado que
+    `evaluate` lectura por lectura. Las comparaciones contra los umbrales se
+    hacen sobre arreglos y con `state` solo se observan las lecturas de los
+    usuarios que disparan la regla en el lote o que ya tenían estado.
+    """
+    results: List[List[Dict[str, Any]]] = [[] for _ in readings]
+    user_ids = np.array([reading.user_id for reading in readings]) if state is not None else None
+    # Una pasada por el lote para todos los campos; None -> NaN
+    fields = attrgetter(*(field for field, _ in table))
+    matrix = np.array([fields(reading) for reading in readings], dtype=float).reshape(len(readings), -1)
+    for column, (field, rules) in enumerate(table):
+        values = matrix[:, column]
+        present = ~np.isnan(values)
+        unmatched = present.copy()
+        for rule in rules:
+            codes = severity_codes(rule, values)
+            if state is None:
+                hits = np.flatnonzero(unmatched & (codes[0] > 0))
+                # Escalares de Python: indexar y formatear escalares de NumPy es varias veces más lento
+                for i, code, value in zip(hits.tolist(), codes[0, hits].tolist(), values[hits].tolist()):
+                    results[i].append(_alert(rule, SEVERITIES[code], value))
+                unmatched[hits] = False
+                continue
+
+            # Un usuario sin estado que no dispara la regla en el lote no cambia nada al observarlo
+            fires = unmatched & (codes.max(axis=0) > 0)
+            users = state.busy_users(rule.alert_type).union(user_ids[fires].tolist())
+            if not users:
+                continue
+            candidates = np.flatnonzero(present & np.isin(user_ids, list(users)))
+            for i in candidates:
+                user_id = int(user_ids[i])
+                severity = None
+                if unmatched[i]:
+                    active = state.active_severity(user_id, rule.alert_type)
+                    severity = SEVERITIES[codes[SEVERITY_CODES[active], i]]
+                    if severity is not None:
+                        unmatched[i] = False
+                transition = state.observe(user_id, rule.alert_type, severity)
+                if transition is not None:
+                    alert = _alert(rule, severity, values[i])
+                    alert["transition"] = transition
+                    results[i].append(alert)
+    return results
+
+
+class AlertRuleEngine:
+    """
+    Tablas de reglas por dispositivo cacheadas en memoria. La carga trae todas
+    las filas sensor en una sola consulta; los dispositivos sin sensores
+    configurados comparten las reglas por defecto.
+    """
+
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._tables: Dict[int, RuleTable] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._loads = 0
+
+    def invalidate(self):
+        """Descarta las tablas compiladas; se recargan en la próxima evaluación"""
+        self._loaded_at = None
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    async def _load(self):
+        from sqlalchemy import select
+        from app.core.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Sensor).where(Sensor.sensor_type.in_(list(SENSOR_FIELDS)))
+            )
+            sensors = result.scalars().all()
+
+        by_device: Dict[int, List[Sensor]] = {}
+        for sensor in sensors:
+            by_device.setdefault(sensor.device_id, []).append(sensor)
+        self._tables = {device_id: compile_rules(rows) for device_id, rows in by_device.items()}
+        self._loaded_at = time.monotonic()
+        self._loads += 1
+
+    async def ensure_loaded(self):
+        if self._is_fresh():
+            return
+        async with self._lock:
+            if self._is_fresh():
+                return
+            try:
+                await self._load()
+            except Exception as e:
+                # Se sigue alertando con las tablas anteriores (o las globales) hasta el próximo TTL
+                logger.error(f"Error al cargar las reglas de alertas: {e}")
+                self._loaded_at = time.monotonic()
+
+    def rules_for(self, device_id: int) -> RuleTable:
+        return self._tables.get(device_id, DEFAULT_RULES)
+
+    async def evaluate(self, reading: Any, state: Any = None) -> List[Dict[str, Any]]:
+        return (await self.evaluate_batch([reading], state))[0]
+
+    async def evaluate_batch(self, readings: Sequence[Any], state: Any = None) -> List[List[Dict[str, Any]]]:
+        """
+        Alertas de cada lectura del lote. Las lecturas se agrupan por tabla de
+        reglas (los dispositivos sin sensores configurados comparten la global)
+        y cada grupo se evalúa vectorizado. Dentro de un grupo se respeta el
+        orden del lote, que es el que importa para el estado de cada usuario.
+        """
+        await self.ensure_loaded()
+        if len(readings) < VECTORIZE_MIN_READINGS:
+            return [evaluate(self.rules_for(reading.device_id), reading, state) for reading in readings]
+
+        device_ids = [reading.device_id for reading in readings]
+        tables = {device_id: self.rules_for(device_id) for device_id in set(device_ids)}
+        if len({id(table) for table in tables.values()}) == 1:
+            # Caso común: todos los dispositivos del lote comparten la tabla
+            return evaluate_many(next(iter(tables.values())), readings, state)
+
+        # Índices del lote por tabla
+        groups: Dict[int, Tuple[RuleTable, List[int]]] = {}
+        for index, device_id in enumerate(device_ids):
+            table = tables[device_id]
+            group = groups.get(id(table))
+            if group is None:
+                group = groups[id(table)] = (table, [])
+            group[1].append(index)
+
+        results: List[List[Dict[str, Any]]] = [[] for _ in readings]
+        for table, indexes in groups.values():
+            if len(indexes) < VECTORIZE_MIN_READINGS:
+                for index in indexes:
+                    results[index] = evaluate(table, readings[index], state)
+                continue
+            group_results = evaluate_many(table, [readings[index] for index in indexes], state)
+            for index, alerts in zip(indexes, group_results):
+                results[index] = alerts
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "devices_with_overrides": len(self._tables),
+            "loads": self._loads,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+alert_rules = AlertRuleEngine(ttl_seconds=settings.ALERT_RULES_TTL_SECONDS)
@@ -7,6 +7,7 @@ from app.shared.base_service import BaseService
 from app.shared.exceptions import ValidationError
 from app.modules.sensor.models import Sensor, SensorCreateSchema, SensorUpdateSchema, SensorSchema
 from app.modules.sensor.repository import SensorRepository
+from app.modules.sensor.rules import alert_rules
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,22 @@ class SensorService(BaseService[Sensor, SensorCreateSchema, SensorUpdateSchema,
         
         return payload
 
+    def create(self, data: SensorCreateSchema) -> SensorSchema:
+        result = super().create(data)
+        # Los umbrales cambiaron: recompilar las reglas de alertas
+        alert_rules.invalidate()
+        return result
+
+    def update(self, id: int, data: SensorUpdateSchema) -> SensorSchema:
+        result = super().update(id, data)
+        alert_rules.invalidate()
+        return result
+
+    def delete(self, id: int) -> Dict[str, str]:
+        result = super().delete(id)
+        alert_rules.invalidate()
+        return result
+
     def _to_response_schema(self, entity: Sensor) -> SensorSchema:
         return SensorSchema.from_orm(entity)
 
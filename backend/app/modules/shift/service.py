@@ -4,6 +4,7 @@ from typing import Dict, Any
 from app.shared.base_service import BaseService
 from app.modules.shift.models import Shift, ShiftCreateSchema, ShiftUpdateSchema, ShiftSchema
 from app.modules.shift.repository import ShiftRepository
+from app.modules.user_shift.calendar import shift_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -19,5 +20,21 @@ class ShiftService(BaseService[Shift, ShiftCreateSchema, ShiftUpdateSchema, Shif
     def _validate_update_data(self, id: int, data: ShiftUpdateSchema) -> Dict[str, Any]:
         return {k: v for k, v in data.dict().items() if v is not None}
 
+    def create(self, data: ShiftCreateSchema) -> ShiftSchema:
+        result = super().create(data)
+        # Los horarios de los turnos anclan la exposición a CO de cada trabajador
+        shift_calendar.invalidate()
+        return result
+
+    def update(self, id: int, data: ShiftUpdateSchema) -> ShiftSchema:
+        result = super().update(id, data)
+        shift_calendar.invalidate()
+        return result
+
+    def delete(self, id: int) -> Dict[str, str]:
+        result = super().delete(id)
+        shift_calendar.invalidate()
+        return result
+
     def _to_response_schema(self, entity: Shift) -> ShiftSchema:
         return ShiftSchema.from_orm(entity)
@@ -0,0 +1,79 @@
+# Calendario de turnos por usuario cacheado en memoria
+import asyncio
+import logging
+import time
+from datetime import datetime, time as time_of_day, timedelta
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ShiftCalendar:
+    """
+    Horas de inicio de los turnos activos de cada usuario (user_shift + shift),
+    cargadas en una sola consulta y cacheadas con TTL. UserShiftService y
+    ShiftService la invalidan al modificar asignaciones o turnos.
+    """
+
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._starts: Dict[int, List[time_of_day]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    async def ensure_loaded(self):
+        if self._is_fresh():
+            return
+        async with self._lock:
+            if self._is_fresh():
+                return
+            try:
+                await self._load()
+            except Exception as e:
+                # Sin calendario la exposición se ancla al inicio de la sesión del casco
+                logger.error(f"Error al cargar los turnos de los usuarios: {e}")
+            self._loaded_at = time.monotonic()
+
+    async def _load(self):
+        from sqlalchemy import select
+        from app.core.database import AsyncSessionLocal
+        from app.modules.user_shift.models import UserShift
+        from app.modules.shift.models import Shift
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(UserShift.user_id, Shift.start_time)
+                .join(Shift, Shift.id == UserShift.shift_id)
+                .where(Shift.is_active == True)
+            )
+            rows = result.all()
+
+        starts: Dict[int, List[time_of_day]] = {}
+        for user_id, start_time in rows:
+            starts.setdefault(user_id, []).append(start_time)
+        self._starts = starts
+
+    def current_shift_start(self, user_id: int, at: datetime) -> Optional[datetime]:
+        """Inicio más reciente (<= `at`) de alguno de los turnos del usuario; None si no tiene turnos"""
+        starts = self._starts.get(user_id)
+        if not starts:
+            return None
+        latest = None
+        for start_time in starts:
+            start = datetime.combine(at.date(), start_time)
+            if start > at:
+                start -= timedelta(days=1)
+            if latest is None or start > latest:
+                latest = start
+        return latest
+
+
+shift_calendar = ShiftCalendar(ttl_seconds=settings.SHIFT_CALENDAR_TTL_SECONDS)
@@ -11,6 +11,7 @@ from app.modules.user_shift.models import (
     UserShiftSchema,
 )
 from app.modules.user_shift.repository import UserShiftRepository
+from app.modules.user_shift.calendar import shift_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,22 @@ class UserShiftService(BaseService[UserShift, UserShiftCreateSchema, UserShiftUp
     def _validate_update_data(self, id: int, data: UserShiftUpdateSchema) -> Dict[str, Any]:
         return {k: v for k, v in data.dict().items() if v is not None}
 
+    def create(self, data: UserShiftCreateSchema) -> UserShiftSchema:
+        result = super().create(data)
+        # Las asignaciones de turnos anclan la exposición a CO de cada trabajador
+        shift_calendar.invalidate()
+        return result
+
+    def update(self, id: int, data: UserShiftUpdateSchema) -> UserShiftSchema:
+        result = super().update(id, data)
+        shift_calendar.invalidate()
+        return result
+
+    def delete(self, id: int) -> Dict[str, str]:
+        result = super().delete(id)
+        shift_calendar.invalidate()
+        return result
+
     def _to_response_schema(self, entity: UserShift) -> UserShiftSchema:
         return UserShiftSchema.from_orm(entity)
 
@@ -0,0 +1,103 @@
+# Cache en proceso de los datos del trabajador que acompañan a cada alerta
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerInfo:
+    """Nombre, área y supervisor de un trabajador, tal como se usan en las alertas"""
+
+    __slots__ = ("user_id", "first_name", "last_name", "area_id", "area_name", "supervisor_id", "expires_at")
+
+    def __init__(self, user_id: int, first_name: str, last_name: str,
+                 area_id: Optional[int], area_name: Optional[str],
+                 supervisor_id: Optional[int], expires_at: float):
+        self.user_id = user_id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.area_id = area_id
+        self.area_name = area_name
+        self.supervisor_id = supervisor_id
+        self.expires_at = expires_at
+
+    @property
+    def worker_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+
+class WorkerInfoCache:
+    """
+    Nombre, área y supervisor por user_id con vencimiento por TTL. Los
+    faltantes se cargan en una sola consulta (user LEFT JOIN area).
+    UserService y AreaService invalidan las entradas afectadas al modificar
+    usuarios o áreas; el TTL cubre los cambios hechos desde otro proceso.
+    """
+
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, WorkerInfo] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def invalidate_user(self, user_id: int):
+        self._entries.pop(user_id, None)
+
+    def invalidate_area(self, area_id: int):
+        for user_id in [uid for uid, info in self._entries.items() if info.area_id == area_id]:
+            del self._entries[user_id]
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_many(self, user_ids: Iterable[int], db: Any = None) -> Dict[int, WorkerInfo]:
+        """Datos de los usuarios pedidos; los que no existen no aparecen en el resultado"""
+        now = time.monotonic()
+        found: Dict[int, WorkerInfo] = {}
+        missing = []
+        for user_id in set(user_ids):
+            info = self._entries.get(user_id)
+            if info is not None and info.expires_at > now:
+                found[user_id] = info
+                self._hits += 1
+            else:
+                missing.append(user_id)
+
+        if missing:
+            self._misses += len(missing)
+            for info in await self._load(missing, now + self.ttl_seconds, db):
+                self._entries[info.user_id] = info
+                found[info.user_id] = info
+        return found
+
+    async def _load(self, user_ids, expires_at: float, db: Any = None):
+        from sqlalchemy import select
+        from app.core.database import AsyncSessionLocal
+        from app.modules.auth.models import User
+        from app.modules.area.models import Area
+
+        stmt = (
+            select(User.id, User.first_name, User.last_name, User.area_id, Area.name, User.supervisor_id)
+            .outerjoin(Area, Area.id == User.area_id)
+            .where(User.id.in_(user_ids))
+        )
+        if db is None:
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(stmt)).all()
+        else:
+            rows = (await db.execute(stmt)).all()
+        return [WorkerInfo(*row, expires_at) for row in rows]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+worker_info_cache = WorkerInfoCache(ttl_seconds=settings.WORKER_CACHE_TTL_SECONDS)
@@ -13,6 +13,8 @@ from app.modules.users.models import (
     UserListSchema
 )
 from app.modules.users.repository import UserRepository
+from app.modules.users.cache import worker_info_cache
+from app.modules.reading.state import worker_state
 from app.core.security import get_password_hash
 
 logger = logging.getLogger(__name__)
@@ -76,6 +78,21 @@ class UserService(BaseService[User, UserCreateSchema, UserUpdateSchema, UserSche
         
         return user_data
     
+    def _invalidate_worker(self, user_id: int):
+        """Nombre, área o estado del usuario cambiaron: las alertas y el estado vivo deben releerlos"""
+        worker_info_cache.invalidate_user(user_id)
+        worker_state.invalidate_workers()
+
+    def update(self, id: int, data: UserUpdateSchema) -> UserSchema:
+        result = super().update(id, data)
+        self._invalidate_worker(id)
+        return result
+
+    def delete(self, id: int) -> Dict[str, str]:
+        result = super().delete(id)
+        self._invalidate_worker(id)
+        return result
+
     def _to_response_schema(self, entity: User) -> UserSchema:
         """Convierte entidad User a UserSchema"""
         return UserSchema.from_orm(entity)
@@ -190,4 +207,6 @@ class UserService(BaseService[User, UserCreateSchema, UserUpdateSchema, UserSche
     
     def soft_delete(self, user_id: int) -> Dict[str, str]:
         """Elimina un usuario (soft delete) - cambia is_active a 0"""
-        return self.delete(user_id)
\ No newline at end of file
+        result = super().delete(user_id)
+        self._invalidate_worker(user_id)
+        return result
\ No newline at end of file
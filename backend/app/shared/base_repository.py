@@ -1,5 +1,6 @@
 # Repositorio base con operaciones CRUD comunes
 from typing import Generic, TypeVar, Type, List, Optional, Dict, Any
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from app.core.database import SessionLocal
@@ -9,6 +10,64 @@ T = TypeVar('T')  # Para el modelo/entidad
 CreateSchemaType = TypeVar('CreateSchemaType')
 UpdateSchemaType = TypeVar('UpdateSchemaType')
 
+
+# Variables de AUTO_INCREMENT del servidor, leídas una vez por base (URL del engine)
+AUTO_INCREMENT_QUERY = text("SELECT @@auto_increment_increment, @@innodb_autoinc_lock_mode")
+_auto_increment_steps: Dict[Any, int] = {}
+
+
+def _auto_increment_step(increment: Any, lock_mode: Any) -> int:
+    """
+    Paso entre los IDs de un INSERT multi-fila. InnoDB reserva un bloque de
+    IDs para un INSERT simple (número de filas conocido) con
+    innodb_autoinc_lock_mode 0 o 1, y también con 2 (el valor por defecto de
+    MySQL 8 y el que exige Galera) mientras no corran INSERT ... SELECT o LOAD
+    DATA sobre la misma tabla: la app no los hace sobre reading ni alert. Con
+    auto_increment_increment > 1 (replicación multi-primario, Galera) los IDs
+    del bloque van de a ese paso.
+    """
+    if int(lock_mode) not in (0, 1, 2):
+        raise RuntimeError(f"innodb_autoinc_lock_mode={lock_mode} no admitido para derivar IDs de un INSERT multi-fila")
+    step = int(increment)
+    if step < 1:
+        raise RuntimeError(f"auto_increment_increment={increment} no admitido")
+    return step
+
+
+def auto_increment_step(session: Session) -> int:
+    """Paso de AUTO_INCREMENT de la base de `session` (1 fuera de MySQL); consulta una sola vez"""
+    bind = session.get_bind()
+    if bind.dialect.name != "mysql":
+        return 1
+    step = _auto_increment_steps.get(bind.url)
+    if step is None:
+        step = _auto_increment_steps[bind.url] = _auto_increment_step(*session.execute(AUTO_INCREMENT_QUERY).one())
+    return step
+
+
+async def async_auto_increment_step(session: Any) -> int:
+    """Variante de auto_increment_step para una AsyncSession"""
+    bind = session.bind
+    if bind.dialect.name != "mysql":
+        return 1
+    step = _auto_increment_steps.get(bind.url)
+    if step is None:
+        row = (await session.execute(AUTO_INCREMENT_QUERY)).one()
+        step = _auto_increment_steps[bind.url] = _auto_increment_step(*row)
+    return step
+
+
+def inserted_ids(result, count: int, step: int = 1) -> List[int]:
+    """
+    IDs de un INSERT multi-fila a partir del lastrowid del cursor, de a `step`
+    (auto_increment_step). MySQL devuelve el primer ID del bloque; SQLite (BD
+    local de benchmarks) el último.
+    """
+    if result.context.dialect.name == "sqlite":
+        return list(range(result.lastrowid - count + 1, result.lastrowid + 1))
+    return list(range(result.lastrowid, result.lastrowid + count * step, step))
+
+
 class BaseRepository(Generic[T]):
     def __init__(self, model: Type[T]):
         self.model = model
@@ -0,0 +1,393 @@
+"""
+Generador de carga asíncrono para la ingesta de lecturas (sucesor de simulate_readings.py)
+
+Simula miles de cascos virtuales enviando lecturas de forma concurrente por:
+  - http   POST /readings/            (una lectura por petición)
+  - ws     /readings/ws/reading       (JSON, una conexión por casco)
+  - batch  POST /readings/batch       (el casco acumula --batch-size lecturas)
+
+Al terminar imprime (o guarda con --output) un reporte JSON con latencia de
+confirmación p50/p95/p99, throughput y tasa de errores por transporte.
+
+Ejemplos:
+  python load_generator.py --helmets 500 --duration 60
+  python load_generator.py --helmets 2000 --mix http=1,ws=3,batch=1 --ramp linear --ramp-seconds 30
+  python load_generator.py --helmets 300 --alert-ratio 0.2 --interval 2.5 --output reporte.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+import websockets
+
+DEFAULT_BASE_URL = "http://localhost:8000"
+TRANSPORTS = ("http", "ws", "batch")
+
+
+# =====================================================
+#                GENERACIÓN DE LECTURAS
+# =====================================================
+
+def generate_reading(user_id: int, device_id: int, boot_id: int, seq: int, alert_ratio: float) -> Dict[str, Any]:
+    """Genera una lectura con valores normales o, con probabilidad alert_ratio, de alerta"""
+    reading = {
+        "user_id": user_id,
+        "device_id": device_id,
+        "seq": seq,
+        "boot_id": boot_id,
+        "pulse": random.randint(60, 100),
+        "body_temp": round(random.uniform(36.2, 37.4), 2),
+        "mq7": round(random.uniform(10, 40), 2),
+        # Acelerómetro (reposo/movimiento leve, gravedad en Z)
+        "ax": round(random.uniform(-2.0, 2.0), 4),
+        "ay": round(random.uniform(-2.0, 2.0), 4),
+        "az": round(random.uniform(8.0, 12.0), 4),
+        # Giroscopio (rad/s)
+        "gx": round(random.uniform(-0.05, 0.05), 4),
+        "gy": round(random.uniform(-0.05, 0.05), 4),
+        "gz": round(random.uniform(-0.05, 0.05), 4),
+    }
+
+    if random.random() < alert_ratio:
+        alert_type = random.choice(["heart_rate_high", "heart_rate_low", "toxic_gas", "high_body_temperature"])
+        if alert_type == "heart_rate_high":
+            reading["pulse"] = random.randint(131, 180)
+        elif alert_type == "heart_rate_low":
+            reading["pulse"] = random.randint(35, 49)
+        elif alert_type == "toxic_gas":
+            reading["mq7"] = round(random.uniform(55, 150), 2)
+        else:
+            reading["body_temp"] = round(random.uniform(38.5, 40.0), 2)
+
+    return reading
+
+
+# =====================================================
+#                    MÉTRICAS
+# =====================================================
+
+class TransportStats:
+    """Latencias y contadores de un transporte"""
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.requests = 0
+        self.readings_ok = 0
+        self.errors = 0
+        self.error_samples: Dict[str, int] = {}
+
+    def record_ok(self, latency_ms: float, readings: int):
+        self.requests += 1
+        self.readings_ok += readings
+        self.latencies_ms.append(latency_ms)
+
+    def record_error(self, reason: str):
+        self.requests += 1
+        self.errors += 1
+        self.error_samples[reason] = self.error_samples.get(reason, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "requests": self.requests,
+            "readings_ok": self.readings_ok,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "throughput_readings_per_s": round(self.readings_ok / elapsed, 2) if elapsed > 0 else 0.0,
+            "ack_latency_ms": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": round(latencies[-1], 3) if latencies else None,
+            },
+            "errors_by_reason": self.error_samples,
+        }
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return round(sorted_values[index], 3)
+
+
+# =====================================================
+#                  CASCOS VIRTUALES
+# =====================================================
+
+class LoadGenerator:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.base_url = args.base_url.rstrip("/")
+        self.ws_url = self.base_url.replace("https://", "wss://").replace("http://", "ws://") + "/readings/ws/reading"
+        self.user_ids = parse_id_range(args.user_ids)
+        self.mix = parse_mix(args.mix)
+        self.stats = {transport: TransportStats() for transport in TRANSPORTS}
+        self.headers: Dict[str, str] = {}
+        self.deadline = 0.0
+        # Cada corrida es un arranque nuevo de los cascos: su seq empieza en 0 sin
+        # chocar con los (device_id, boot_id, seq) de corridas previas
+        self.boot_id = random.getrandbits(32)
+
+    async def login(self, client: httpx.AsyncClient) -> bool:
+        if not self.args.employee_number:
+            return True
+        response = await client.post(
+            f"{self.base_url}/auth/login",
+            json={"employee_number": self.args.employee_number, "password": self.args.password},
+        )
+        if response.status_code != 200:
+            print(f"Error en login: {response.status_code} - {response.text}", file=sys.stderr)
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    def start_delay(self, index: int) -> float:
+        """Retraso de arranque del casco según el perfil de rampa"""
+        helmets = self.args.helmets
+        if self.args.ramp == "linear":
+            return self.args.ramp_seconds * index / helmets
+        if self.args.ramp == "step":
+            steps = max(1, self.args.ramp_steps)
+            step = index * steps // helmets
+            return self.args.ramp_seconds * step / steps
+        return 0.0
+
+    def next_reading(self, index: int, counter: int) -> Dict[str, Any]:
+        user_id = self.user_ids[index % len(self.user_ids)]
+        # Varios cascos virtuales pueden compartir dispositivo: seq intercalado por casco
+        seq = counter * self.args.helmets + index
+        return generate_reading(user_id, user_id, self.boot_id, seq, self.args.alert_ratio)
+
+    async def wait_next(self, started: float, counter: int) -> bool:
+        """Espera al siguiente tick del casco; False si terminó la prueba"""
+        next_at = started + counter * self.args.interval
+        now = time.monotonic()
+        if next_at >= self.deadline:
+            return False
+        if next_at > now:
+            await asyncio.sleep(next_at - now)
+        return True
+
+    async def helmet_http(self, index: int, client: httpx.AsyncClient):
+        stats = self.stats["http"]
+        await asyncio.sleep(self.start_delay(index) + random.uniform(0, self.args.interval))
+        started = time.monotonic()
+        counter = 0
+        while await self.wait_next(started, counter):
+            reading = self.next_reading(index, counter)
+            counter += 1
+            sent = time.perf_counter()
+            try:
+                response = await client.post(f"{self.base_url}/readings/", json=reading, headers=self.headers)
+                if response.status_code in (200, 201):
+                    stats.record_ok((time.perf_counter() - sent) * 1000, 1)
+                else:
+                    stats.record_error(f"http_{response.status_code}")
+            except httpx.HTTPError as e:
+                stats.record_error(type(e).__name__)
+
+    async def helmet_batch(self, index: int, client: httpx.AsyncClient):
+        stats = self.stats["batch"]
+        await asyncio.sleep(self.start_delay(index) + random.uniform(0, self.args.interval))
+        started = time.monotonic()
+        counter = 0
+        pending: List[Dict[str, Any]] = []
+
+        async def send_batch(readings: List[Dict[str, Any]]):
+            sent = time.perf_counter()
+            try:
+                response = await client.post(
+                    f"{self.base_url}/readings/batch", json={"readings": readings}, headers=self.headers
+                )
+                if response.status_code in (200, 201):
+                    stats.record_ok((time.perf_counter() - sent) * 1000, len(readings))
+                else:
+                    stats.record_error(f"http_{response.status_code}")
+            except httpx.HTTPError as e:
+                stats.record_error(type(e).__name__)
+
+        while await self.wait_next(started, counter):
+            pending.append(self.next_reading(index, counter))
+            counter += 1
+            if len(pending) >= self.args.batch_size:
+                await send_batch(pending)
+                pending = []
+
+        # Enviar lo que quedó acumulado al terminar la prueba
+        if pending:
+            await send_batch(pending)
+
+    async def helmet_ws(self, index: int):
+        stats = self.stats["ws"]
+        await asyncio.sleep(self.start_delay(index) + random.uniform(0, self.args.interval))
+        try:
+            async with websockets.connect(self.ws_url, open_timeout=self.args.timeout) as ws:
+                started = time.monotonic()
+                counter = 0
+                while await self.wait_next(started, counter):
+                    reading = self.next_reading(index, counter)
+                    counter += 1
+                    sent = time.perf_counter()
+                    await ws.send(json.dumps(reading))
+                    reply = await asyncio.wait_for(ws.recv(), timeout=self.args.timeout)
+                    if isinstance(reply, str) and reply.startswith("ok"):
+                        stats.record_ok((time.perf_counter() - sent) * 1000, 1)
+                    else:
+                        stats.record_error(f"reply_{reply}")
+        except asyncio.TimeoutError:
+            stats.record_error("timeout")
+        except (OSError, websockets.WebSocketException) as e:
+            stats.record_error(type(e).__name__)
+
+    async def run(self) -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=self.args.max_connections, max_keepalive_connections=self.args.max_connections)
+        async with httpx.AsyncClient(timeout=self.args.timeout, limits=limits) as client:
+            if not await self.login(client):
+                raise SystemExit(1)
+
+            # Reparto de cascos por transporte según los pesos de --mix
+            transports = assign_transports(self.args.helmets, self.mix)
+            started = time.monotonic()
+            self.deadline = started + self.args.ramp_seconds * (self.args.ramp != "none") + self.args.duration
+
+            tasks = []
+            for index, transport in enumerate(transports):
+                if transport == "http":
+                    tasks.append(self.helmet_http(index, client))
+                elif transport == "batch":
+                    tasks.append(self.helmet_batch(index, client))
+                else:
+                    tasks.append(self.helmet_ws(index))
+            await asyncio.gather(*tasks)
+            elapsed = time.monotonic() - started
+
+        per_transport = {t: self.stats[t].report(elapsed) for t in TRANSPORTS if transports.count(t)}
+        all_latencies = sorted(l for t in TRANSPORTS for l in self.stats[t].latencies_ms)
+        total_requests = sum(s.requests for s in self.stats.values())
+        total_errors = sum(s.errors for s in self.stats.values())
+        total_ok = sum(s.readings_ok for s in self.stats.values())
+
+        return {
+            "target": self.base_url,
+            "config": {
+                "helmets": self.args.helmets,
+                "interval_s": self.args.interval,
+                "duration_s": self.args.duration,
+                "ramp": self.args.ramp,
+                "ramp_seconds": self.args.ramp_seconds,
+                "mix": {t: transports.count(t) for t in TRANSPORTS},
+                "batch_size": self.args.batch_size,
+                "alert_ratio": self.args.alert_ratio,
+            },
+            "elapsed_s": round(elapsed, 3),
+            "total": {
+                "requests": total_requests,
+                "readings_ok": total_ok,
+                "errors": total_errors,
+                "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+                "throughput_readings_per_s": round(total_ok / elapsed, 2) if elapsed > 0 else 0.0,
+                "ack_latency_ms": {
+                    "p50": percentile(all_latencies, 50),
+                    "p95": percentile(all_latencies, 95),
+                    "p99": percentile(all_latencies, 99),
+                },
+            },
+            "transports": per_transport,
+        }
+
+
+# =====================================================
+#                      CLI
+# =====================================================
+
+def parse_id_range(value: str) -> List[int]:
+    """'4-21' o '4,5,9' -> lista de IDs"""
+    ids: List[int] = []
+    for part in value.split(","):
+        part = part.strip()
+        if "-" in part:
+            start, end = part.split("-", 1)
+            ids.extend(range(int(start), int(end) + 1))
+        elif part:
+            ids.append(int(part))
+    if not ids:
+        raise argparse.ArgumentTypeError("--user-ids no puede estar vacío")
+    return ids
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """'http=1,ws=3,batch=1' -> pesos por transporte"""
+    mix: Dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in TRANSPORTS:
+            raise argparse.ArgumentTypeError(f"Transporte desconocido en --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def assign_transports(helmets: int, mix: Dict[str, float]) -> List[str]:
+    """Reparte los cascos entre transportes proporcionalmente a los pesos"""
+    total = sum(mix.values())
+    transports: List[str] = []
+    for name, weight in mix.items():
+        transports.extend([name] * int(round(helmets * weight / total)))
+    # Ajustar redondeos
+    while len(transports) < helmets:
+        transports.append(max(mix, key=mix.get))
+    transports = transports[:helmets]
+    random.shuffle(transports)
+    return transports
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generador de carga de cascos virtuales para MineGuard")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="URL del backend (por defecto local)")
+    parser.add_argument("--helmets", type=int, default=100, help="Cantidad de cascos virtuales")
+    parser.add_argument("--interval", type=float, default=2.5, help="Segundos entre lecturas de cada casco")
+    parser.add_argument("--duration", type=float, default=60, help="Duración a carga completa en segundos")
+    parser.add_argument("--mix", default="ws=1", help="Pesos por transporte, p. ej. http=1,ws=3,batch=1")
+    parser.add_argument("--batch-size", type=int, default=20, help="Lecturas por petición en modo batch")
+    parser.add_argument("--alert-ratio", type=float, default=0.1, help="Proporción de lecturas que disparan alerta")
+    parser.add_argument("--ramp", choices=("none", "linear", "step"), default="none", help="Perfil de arranque")
+    parser.add_argument("--ramp-seconds", type=float, default=30, help="Duración de la rampa")
+    parser.add_argument("--ramp-steps", type=int, default=5, help="Escalones del perfil step")
+    parser.add_argument("--user-ids", default="4-21", help="IDs de usuario/dispositivo, p. ej. 4-21 o 4,5,6")
+    parser.add_argument("--employee-number", default="0322103782", help="Usuario para el token (vacío = sin login)")
+    parser.add_argument("--password", default="12345678")
+    parser.add_argument("--timeout", type=float, default=10, help="Timeout por petición en segundos")
+    parser.add_argument("--max-connections", type=int, default=200, help="Conexiones HTTP simultáneas")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla aleatoria para corridas repetibles")
+    parser.add_argument("--output", default=None, help="Archivo donde guardar el reporte JSON")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    print(
+        f"Simulando {args.helmets} cascos contra {args.base_url} "
+        f"(mix={args.mix}, intervalo={args.interval}s, duración={args.duration}s, rampa={args.ramp})",
+        file=sys.stderr,
+    )
+    report = asyncio.run(LoadGenerator(args).run())
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Reporte guardado en {args.output}", file=sys.stderr)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
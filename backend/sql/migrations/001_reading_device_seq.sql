@@ -0,0 +1,7 @@
+-- Número de secuencia por dispositivo para ingesta idempotente.
+-- La restricción única respalda la ventana de deduplicación en memoria;
+-- las lecturas sin seq (NULL) no se ven afectadas.
+
+ALTER TABLE `reading`
+  ADD COLUMN `seq` bigint DEFAULT NULL COMMENT 'Número de secuencia del dispositivo' AFTER `gz`,
+  ADD UNIQUE KEY `uq_reading_device_seq` (`device_id`,`seq`);
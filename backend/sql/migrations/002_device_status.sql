@@ -0,0 +1,51 @@
+-- Estado actual de cada casco en una tabla angosta, una fila por dispositivo.
+-- La mantienen la ingesta de lecturas y ConnectionService en la misma
+-- transacción que la escritura; el dashboard la une en lugar de agrupar
+-- toda la tabla connection (MAX(timestamp) GROUP BY device_id) en cada consulta.
+-- La batería sigue en `device`: solo la escribe DeviceService.
+
+CREATE TABLE `device_status` (
+  `device_id` int NOT NULL,
+  `last_reading_id` bigint DEFAULT NULL COMMENT 'Última lectura del casco',
+  `last_reading_at` timestamp NULL DEFAULT NULL,
+  `vitals_reading_id` bigint DEFAULT NULL COMMENT 'Última lectura con pulso y temperatura',
+  `vitals_user_id` int DEFAULT NULL,
+  `pulse` int DEFAULT NULL,
+  `body_temp` double DEFAULT NULL,
+  `vitals_at` timestamp NULL DEFAULT NULL,
+  `connection_id` int DEFAULT NULL COMMENT 'Último registro de conexión del casco',
+  `connection_status` enum('online','offline') DEFAULT NULL,
+  `connection_at` timestamp NULL DEFAULT NULL,
+  `updated_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`device_id`),
+  KEY `idx_connection_status` (`connection_status`),
+  CONSTRAINT `device_status_ibfk_1` FOREIGN KEY (`device_id`) REFERENCES `device` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='Estado actual de cada casco (proyección mantenida por la ingesta y las conexiones)';
+
+-- Carga inicial desde los datos existentes (una sola vez)
+INSERT INTO `device_status` (
+  `device_id`, `last_reading_id`, `last_reading_at`,
+  `vitals_reading_id`, `vitals_user_id`, `pulse`, `body_temp`, `vitals_at`,
+  `connection_id`, `connection_status`, `connection_at`
+)
+SELECT
+  d.`id`, lr.`id`, lr.`timestamp`,
+  vr.`id`, vr.`user_id`, vr.`pulse`, vr.`body_temp`, vr.`timestamp`,
+  c.`id`, c.`status`, c.`timestamp`
+FROM `device` d
+LEFT JOIN `reading` lr ON lr.`id` = (
+  SELECT r.`id` FROM `reading` r
+  WHERE r.`device_id` = d.`id`
+  ORDER BY r.`timestamp` DESC, r.`id` DESC LIMIT 1
+)
+LEFT JOIN `reading` vr ON vr.`id` = (
+  SELECT r.`id` FROM `reading` r
+  WHERE r.`device_id` = d.`id` AND r.`user_id` = d.`user_id`
+    AND r.`pulse` IS NOT NULL AND r.`body_temp` IS NOT NULL
+  ORDER BY r.`timestamp` DESC, r.`id` DESC LIMIT 1
+)
+LEFT JOIN `connection` c ON c.`id` = (
+  SELECT c2.`id` FROM `connection` c2
+  WHERE c2.`device_id` = d.`id`
+  ORDER BY c2.`timestamp` DESC, c2.`id` DESC LIMIT 1
+);
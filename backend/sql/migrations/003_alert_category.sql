@@ -0,0 +1,21 @@
+-- Categoría de dashboard de cada alerta, resuelta al insertar
+-- (app/modules/alert/categories.py). Los gráficos de alertas por tipo agrupan
+-- por (semana, categoría) en una sola pasada sobre idx_timestamp_category en
+-- lugar de una consulta por categoría con LOWER(alert_type) IN (...).
+
+ALTER TABLE `alert`
+  ADD COLUMN `category` varchar(20) DEFAULT NULL COMMENT 'Categoría del dashboard, resuelta al insertar' AFTER `alert_type`,
+  ADD KEY `idx_timestamp_category` (`timestamp`,`category`);
+
+-- Alertas anteriores: mismas listas de tipos que ALERT_CATEGORIES
+UPDATE `alert` SET `category` = CASE
+  WHEN LOWER(`alert_type`) IN ('toxic_gas', 'toxic gas', 'gases toxicos', 'gases_toxicos', 'toxicgas',
+                               'co_exposure_twa', 'co_exposure_stel') THEN 'toxic_gas'
+  WHEN LOWER(`alert_type`) IN ('heart_rate_anomaly', 'heart rate anomaly', 'heart_rate_high', 'heart rate high',
+                               'heart_rate_low', 'heart rate low', 'ritmo_cardiaco_anormal', 'ritmo cardiaco anormal') THEN 'heart_rate'
+  WHEN LOWER(`alert_type`) IN ('high_body_temperature', 'body temperature high', 'temperatura_corporal_alta',
+                               'temperatura corporal alta') THEN 'body_temperature'
+  WHEN LOWER(`alert_type`) IN ('fall_detected', 'impact_detected', 'caida', 'impacto', 'caidas_impactos',
+                               'caidas impactos') THEN 'fall_impact'
+END
+WHERE `category` IS NULL;
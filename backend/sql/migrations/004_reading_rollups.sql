@@ -0,0 +1,57 @@
+-- Agregados horarios y diarios de lecturas por trabajador (sumas, conteos,
+-- mínimo y máximo de pulso, temperatura y CO) para los promedios biométricos
+-- del dashboard. La ingesta los actualiza en la misma transacción que las
+-- lecturas (app/modules/reading/rollup.py). Después de crear las tablas,
+-- cargarlas desde las lecturas existentes con:
+--
+--   python -m app.modules.reading.rollup
+--
+-- (o solo los últimos días con --days N)
+
+CREATE TABLE `reading_rollup_hourly` (
+  `period` int NOT NULL COMMENT 'Horas desde 1970-01-01 UTC',
+  `user_id` int NOT NULL,
+  `reading_count` int NOT NULL DEFAULT '0',
+  `pulse_count` int NOT NULL DEFAULT '0',
+  `pulse_sum` bigint NOT NULL DEFAULT '0',
+  `pulse_min` int DEFAULT NULL,
+  `pulse_max` int DEFAULT NULL,
+  `body_temp_count` int NOT NULL DEFAULT '0',
+  `body_temp_sum` double NOT NULL DEFAULT '0',
+  `body_temp_min` double DEFAULT NULL,
+  `body_temp_max` double DEFAULT NULL,
+  `mq7_count` int NOT NULL DEFAULT '0',
+  `mq7_sum` double NOT NULL DEFAULT '0',
+  `mq7_min` double DEFAULT NULL,
+  `mq7_max` double DEFAULT NULL,
+  `vitals_count` int NOT NULL DEFAULT '0' COMMENT 'Lecturas con pulso y temperatura',
+  `vitals_pulse_sum` bigint NOT NULL DEFAULT '0',
+  `vitals_body_temp_sum` double NOT NULL DEFAULT '0',
+  PRIMARY KEY (`period`,`user_id`),
+  KEY `user_id` (`user_id`),
+  CONSTRAINT `reading_rollup_hourly_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `user` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='Agregados horarios de lecturas por trabajador';
+
+CREATE TABLE `reading_rollup_daily` (
+  `period` int NOT NULL COMMENT 'Días desde 1970-01-01 UTC',
+  `user_id` int NOT NULL,
+  `reading_count` int NOT NULL DEFAULT '0',
+  `pulse_count` int NOT NULL DEFAULT '0',
+  `pulse_sum` bigint NOT NULL DEFAULT '0',
+  `pulse_min` int DEFAULT NULL,
+  `pulse_max` int DEFAULT NULL,
+  `body_temp_count` int NOT NULL DEFAULT '0',
+  `body_temp_sum` double NOT NULL DEFAULT '0',
+  `body_temp_min` double DEFAULT NULL,
+  `body_temp_max` double DEFAULT NULL,
+  `mq7_count` int NOT NULL DEFAULT '0',
+  `mq7_sum` double NOT NULL DEFAULT '0',
+  `mq7_min` double DEFAULT NULL,
+  `mq7_max` double DEFAULT NULL,
+  `vitals_count` int NOT NULL DEFAULT '0' COMMENT 'Lecturas con pulso y temperatura',
+  `vitals_pulse_sum` bigint NOT NULL DEFAULT '0',
+  `vitals_body_temp_sum` double NOT NULL DEFAULT '0',
+  PRIMARY KEY (`period`,`user_id`),
+  KEY `user_id` (`user_id`),
+  CONSTRAINT `reading_rollup_daily_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `user` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='Agregados diarios de lecturas por trabajador';
@@ -0,0 +1,10 @@
+-- El seq de un casco solo es monotónico dentro de un arranque: al reiniciarse
+-- vuelve a empezar y chocaba con (device_id, seq) ya guardados, que se
+-- confirmaban como reintentos y se descartaban. La clave única incluye ahora
+-- el boot_id que el dispositivo genera en cada arranque; las lecturas
+-- anteriores y los clientes que no lo envían quedan en el arranque 0.
+
+ALTER TABLE `reading`
+  ADD COLUMN `boot_id` bigint NOT NULL DEFAULT '0' COMMENT 'Arranque del dispositivo al que pertenece el seq' AFTER `seq`,
+  DROP KEY `uq_reading_device_seq`,
+  ADD UNIQUE KEY `uq_reading_device_boot_seq` (`device_id`,`boot_id`,`seq`);
@@ -0,0 +1,21 @@
+-- Valor que disparó cada alerta, guardado al insertar: el reenvío a los
+-- clientes de /ws/alerts que se reconectan (app/modules/alert/replay.py) lo
+-- envía tal cual, igual que el mensaje en vivo. Antes se sacaba de la lectura
+-- y solo existía para las alertas de umbral; caídas, impactos y exposición
+-- acumulada a CO se reenviaban sin valor.
+
+ALTER TABLE `alert`
+  ADD COLUMN `value` double DEFAULT NULL COMMENT 'Valor que disparó la alerta' AFTER `message`;
+
+-- Alertas de umbral anteriores: el campo de la lectura que evalúa su regla
+-- (DEFAULT_RULES en app/modules/sensor/rules.py). Las de caídas, impactos y
+-- exposición no se pueden reconstruir desde una sola lectura y quedan en NULL.
+UPDATE `alert` a
+  JOIN `reading` r ON r.`id` = a.`reading_id`
+SET a.`value` = CASE a.`alert_type`
+  WHEN 'toxic_gas' THEN r.`mq7`
+  WHEN 'heart_rate_high' THEN r.`pulse`
+  WHEN 'heart_rate_low' THEN r.`pulse`
+  WHEN 'high_body_temperature' THEN r.`body_temp`
+END
+WHERE a.`value` IS NULL;
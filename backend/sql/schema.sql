@@ -25,8 +25,10 @@ DROP TABLE IF EXISTS `alert`;
 CREATE TABLE `alert` (
   `id` int NOT NULL AUTO_INCREMENT,
   `alert_type` varchar(50) NOT NULL,
+  `category` varchar(20) DEFAULT NULL COMMENT 'Categoría del dashboard, resuelta al insertar',
   `severity` enum('low','medium','high','critical') NOT NULL,
   `message` text NOT NULL COMMENT 'Descripción de la alerta',
+  `value` double DEFAULT NULL COMMENT 'Valor que disparó la alerta',
   `reading_id` bigint NOT NULL,
   `user_id` int NOT NULL,
   `timestamp` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
@@ -35,6 +37,7 @@ CREATE TABLE `alert` (
   KEY `reading_id` (`reading_id`),
   KEY `idx_user_timestamp` (`user_id`,`timestamp`),
   KEY `idx_severity` (`severity`),
+  KEY `idx_timestamp_category` (`timestamp`,`category`),
   CONSTRAINT `alert_ibfk_1` FOREIGN KEY (`reading_id`) REFERENCES `reading` (`id`),
   CONSTRAINT `alert_ibfk_2` FOREIGN KEY (`user_id`) REFERENCES `user` (`id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='Alertas generadas automáticamente de lecturas críticas';
@@ -101,6 +104,32 @@ CREATE TABLE `device` (
 ) ENGINE=InnoDB AUTO_INCREMENT=22 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='Cascos inteligentes asignados a usuarios';
 /*!40101 SET character_set_client = @saved_cs_client */;
 
+--
+-- Table structure for table `device_status`
+--
+
+DROP TABLE IF EXISTS `device_status`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `device_status` (
+  `device_id` int NOT NULL,
+  `last_reading_id` bigint DEFAULT NULL COMMENT 'Última lectura del casco',
+  `last_reading_at` timestamp NULL DEFAULT NULL,
+  `vitals_reading_id` bigint DEFAULT NULL COMMENT 'Última lectura con pulso y temperatura',
+  `vitals_user_id` int DEFAULT NULL,
+  `pulse` int DEFAULT NULL,
+  `body_temp` double DEFAULT NULL,
+  `vitals_at` timestamp NULL DEFAULT NULL,
+  `connection_id` int DEFAULT NULL COMMENT 'Último registro de conexión del casco',
+  `connection_status` enum('online','offline') DEFAULT NULL,
+  `connection_at` timestamp NULL DEFAULT NULL,
+  `updated_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`device_id`),
+  KEY `idx_connection_status` (`connection_status`),
+  CONSTRAINT `device_status_ibfk_1` FOREIGN KEY (`device_id`) REFERENCES `device` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='Estado actual de cada casco (proyección mantenida por la ingesta y las conexiones)';
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `incident_report`
 --
@@ -228,9 +257,12 @@ CREATE TABLE `reading` (
   `gx` double DEFAULT NULL COMMENT 'Giroscopio eje X (rad/s)',
   `gy` double DEFAULT NULL COMMENT 'Giroscopio eje Y (rad/s)',
   `gz` double DEFAULT NULL COMMENT 'Giroscopio eje Z (rad/s)',
+  `seq` bigint DEFAULT NULL COMMENT 'Número de secuencia del dispositivo',
+  `boot_id` bigint NOT NULL DEFAULT '0' COMMENT 'Arranque del dispositivo al que pertenece el seq',
   `timestamp` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
   PRIMARY KEY (`id`),
   UNIQUE KEY `id` (`id`),
+  UNIQUE KEY `uq_reading_device_boot_seq` (`device_id`,`boot_id`,`seq`),
   KEY `idx_user_timestamp` (`user_id`,`timestamp`),
   KEY `idx_device_timestamp` (`device_id`,`timestamp`),
   CONSTRAINT `reading_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `user` (`id`),
@@ -238,6 +270,70 @@ CREATE TABLE `reading` (
 ) ENGINE=InnoDB AUTO_INCREMENT=50002 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='Lecturas agrupadas de todos los sensores del casco';
 /*!40101 SET character_set_client = @saved_cs_client */;
 
+--
+-- Table structure for table `reading_rollup_daily`
+--
+
+DROP TABLE IF EXISTS `reading_rollup_daily`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `reading_rollup_daily` (
+  `period` int NOT NULL COMMENT 'Días desde 1970-01-01 UTC',
+  `user_id` int NOT NULL,
+  `reading_count` int NOT NULL DEFAULT '0',
+  `pulse_count` int NOT NULL DEFAULT '0',
+  `pulse_sum` bigint NOT NULL DEFAULT '0',
+  `pulse_min` int DEFAULT NULL,
+  `pulse_max` int DEFAULT NULL,
+  `body_temp_count` int NOT NULL DEFAULT '0',
+  `body_temp_sum` double NOT NULL DEFAULT '0',
+  `body_temp_min` double DEFAULT NULL,
+  `body_temp_max` double DEFAULT NULL,
+  `mq7_count` int NOT NULL DEFAULT '0',
+  `mq7_sum` double NOT NULL DEFAULT '0',
+  `mq7_min` double DEFAULT NULL,
+  `mq7_max` double DEFAULT NULL,
+  `vitals_count` int NOT NULL DEFAULT '0' COMMENT 'Lecturas con pulso y temperatura',
+  `vitals_pulse_sum` bigint NOT NULL DEFAULT '0',
+  `vitals_body_temp_sum` double NOT NULL DEFAULT '0',
+  PRIMARY KEY (`period`,`user_id`),
+  KEY `user_id` (`user_id`),
+  CONSTRAINT `reading_rollup_daily_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `user` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='Agregados diarios de lecturas por trabajador';
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `reading_rollup_hourly`
+--
+
+DROP TABLE IF EXISTS `reading_rollup_hourly`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `reading_rollup_hourly` (
+  `period` int NOT NULL COMMENT 'Horas desde 1970-01-01 UTC',
+  `user_id` int NOT NULL,
+  `reading_count` int NOT NULL DEFAULT '0',
+  `pulse_count` int NOT NULL DEFAULT '0',
+  `pulse_sum` bigint NOT NULL DEFAULT '0',
+  `pulse_min` int DEFAULT NULL,
+  `pulse_max` int DEFAULT NULL,
+  `body_temp_count` int NOT NULL DEFAULT '0',
+  `body_temp_sum` double NOT NULL DEFAULT '0',
+  `body_temp_min` double DEFAULT NULL,
+  `body_temp_max` double DEFAULT NULL,
+  `mq7_count` int NOT NULL DEFAULT '0',
+  `mq7_sum` double NOT NULL DEFAULT '0',
+  `mq7_min` double DEFAULT NULL,
+  `mq7_max` double DEFAULT NULL,
+  `vitals_count` int NOT NULL DEFAULT '0' COMMENT 'Lecturas con pulso y temperatura',
+  `vitals_pulse_sum` bigint NOT NULL DEFAULT '0',
+  `vitals_body_temp_sum` double NOT NULL DEFAULT '0',
+  PRIMARY KEY (`period`,`user_id`),
+  KEY `user_id` (`user_id`),
+  CONSTRAINT `reading_rollup_hourly_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `user` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='Agregados horarios de lecturas por trabajador';
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `role`
 --
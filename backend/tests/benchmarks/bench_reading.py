@@ -0,0 +1,126 @@
+"""
+Casos de benchmark de la ruta caliente de lecturas y alertas.
+Cada caso devuelve (función, iteraciones); la función puede ser async.
+"""
+import json
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Tuple, Union
+
+from app.core.websocket import manager
+from app.modules.reading.alert_state import AlertStateTracker
+from app.modules.reading.motion import MotionDetector
+from app.modules.reading.models import Reading, ReadingCreateSchema, ReadingSchema
+from app.modules.reading.service import ReadingService
+from app.modules.sensor.rules import alert_rules
+
+BenchFn = Callable[[], Union[None, Awaitable[None]]]
+
+NORMAL_READING: Dict[str, Any] = {
+    "user_id": 11, "device_id": 11,
+    "mq7": 18.5, "pulse": 78, "body_temp": 36.7,
+    "ax": 0.12, "ay": 9.81, "az": -0.21,
+    "gx": 0.02, "gy": 0.01, "gz": 0.0,
+}
+
+# Dispara alertas de temperatura, pulso y CO a la vez
+ALERTING_READING: Dict[str, Any] = {**NORMAL_READING, "pulse": 150, "body_temp": 39.5, "mq7": 120.0}
+
+
+class FakeWebSocket:
+    """WebSocket en memoria que solo cuenta los mensajes enviados"""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_json(self, data):
+        # Lo mismo que hace Starlette antes de enviar
+        json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        self.sent += 1
+
+    async def send_text(self, data):
+        self.sent += 1
+
+    async def send_bytes(self, data):
+        self.sent += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def use_clients(count: int):
+    """
+    Deja exactamente `count` clientes falsos conectados al ConnectionManager.
+    Se reutilizan entre llamadas: cada conexión tiene su tarea de envío y
+    crearlas no es parte de lo que se mide. run_suite las cierra al final.
+    """
+    if len(manager.active_connections) == count:
+        return
+    await manager.close_all()
+    for i in range(count):
+        await manager.connect(FakeWebSocket(), f"bench_client_{i}")
+
+
+def build_cases(service: ReadingService) -> Dict[str, Tuple[BenchFn, int]]:
+    """Casos disponibles por nombre"""
+    normal_payload = ReadingCreateSchema(**NORMAL_READING)
+    entity = Reading(id=1, timestamp=datetime(2025, 12, 2, 10, 30), **NORMAL_READING)
+    alerting_entity = Reading(id=1, **ALERTING_READING)
+
+    def validate_create_data():
+        service._validate_create_data(normal_payload)
+
+    async def reading_create():
+        await service.create(normal_payload)
+
+    def reading_schema_from_orm():
+        ReadingSchema.from_orm(entity)
+
+    alerting_batch = [Reading(id=i, **ALERTING_READING) for i in range(1000)]
+
+    async def evaluate_alert_rules():
+        await alert_rules.evaluate_batch(alerting_batch)
+
+    # Caso común: un lote sin ninguna alerta
+    normal_batch = [Reading(id=i, **NORMAL_READING) for i in range(1000)]
+
+    async def evaluate_alert_rules_normal():
+        await alert_rules.evaluate_batch(normal_batch)
+
+    # Un tick con todos los cascos: una muestra por dispositivo, casco en reposo
+    motion_detector = MotionDetector(max_devices=5000)
+    motion_tick = [
+        Reading(id=i, device_id=i, user_id=i, **{k: NORMAL_READING[k] for k in ("ax", "ay", "az", "gx", "gy", "gz")})
+        for i in range(5000)
+    ]
+
+    def motion_process():
+        motion_detector.process(motion_tick)
+
+    def check_alerts(clients: int) -> BenchFn:
+        async def run():
+            # Estado limpio: cada llamada es una transición que se guarda y se envía
+            service.alert_state = AlertStateTracker(debounce_samples=1)
+            await use_clients(clients)
+            await service._check_and_broadcast_alerts(alerting_entity)
+        return run
+
+    async def check_alerts_sustained():
+        await use_clients(0)
+        # Condición sostenida del mismo minero: la máquina de estados la suprime
+        await service._check_and_broadcast_alerts(alerting_entity)
+
+    return {
+        "reading_service.validate_create_data": (validate_create_data, 20000),
+        "reading_service.create": (reading_create, 300),
+        "reading_service.check_and_broadcast_alerts[clients=0]": (check_alerts(0), 200),
+        "reading_service.check_and_broadcast_alerts[clients=10]": (check_alerts(10), 100),
+        "reading_service.check_and_broadcast_alerts[clients=1000]": (check_alerts(1000), 10),
+        "reading_service.check_and_broadcast_alerts[sustained]": (check_alerts_sustained, 2000),
+        "alert_rules.evaluate_batch[readings=1000]": (evaluate_alert_rules, 50),
+        "alert_rules.evaluate_batch[readings=1000,normal]": (evaluate_alert_rules_normal, 100),
+        "motion_detector.process[devices=5000]": (motion_process, 20),
+        "reading_schema.from_orm": (reading_schema_from_orm, 20000),
+    }
@@ -0,0 +1,160 @@
+"""
+Suite de benchmarks de la ingesta de lecturas y el pipeline de alertas.
+
+Corre contra una BD SQLite local creada desde sql/schema.sql (ver stand_in_db.py),
+nunca contra la base remota. Uso, desde backend/:
+
+    python -m tests.benchmarks.run_benchmarks                      # correr e imprimir
+    python -m tests.benchmarks.run_benchmarks --save baseline      # guardar baselines/baseline.json
+    python -m tests.benchmarks.run_benchmarks --compare baseline   # comparar y marcar regresiones
+    python -m tests.benchmarks.run_benchmarks --only alerts        # filtrar casos por nombre
+
+Con --compare el proceso termina con código 1 si algún caso es más lento que
+la línea base por encima de --threshold (15% por defecto).
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+from tests.benchmarks.stand_in_db import create_stand_in_database
+
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+DB_PATH = Path(tempfile.gettempdir()) / "mineguard_bench.db"
+
+# La app lee la URL de la BD al importarse: apuntarla a la BD local antes de importar
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+
+async def measure(fn, iterations: int, rounds: int) -> Dict[str, Any]:
+    """Mide `rounds` rondas de `iterations` llamadas y reporta microsegundos por operación"""
+    is_async = inspect.iscoroutinefunction(fn)
+
+    # Calentamiento
+    for _ in range(max(1, iterations // 10)):
+        if is_async:
+            await fn()
+        else:
+            fn()
+
+    per_op_us = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        if is_async:
+            for _ in range(iterations):
+                await fn()
+        else:
+            for _ in range(iterations):
+                fn()
+        per_op_us.append((time.perf_counter() - started) / iterations * 1e6)
+
+    return {
+        "iterations": iterations,
+        "rounds": rounds,
+        "median_us": round(statistics.median(per_op_us), 3),
+        "mean_us": round(statistics.mean(per_op_us), 3),
+        "min_us": round(min(per_op_us), 3),
+        "stdev_us": round(statistics.stdev(per_op_us), 3) if rounds > 1 else 0.0,
+        "ops_per_s": round(1e6 / statistics.median(per_op_us), 1),
+    }
+
+
+async def run_suite(only: str, rounds: int) -> Dict[str, Any]:
+    create_stand_in_database(DB_PATH)
+
+    # Importar la app solo después de configurar la BD local (app.main registra todos los modelos)
+    import app.main  # noqa: F401
+    from app.core.database import async_engine, engine
+    from app.core.websocket import manager
+    from app.modules.reading.service import ReadingService
+    from tests.benchmarks.bench_reading import build_cases
+
+    service = ReadingService()
+    results = {}
+    try:
+        for name, (fn, iterations) in build_cases(service).items():
+            if only and only not in name:
+                continue
+            results[name] = await measure(fn, iterations, rounds)
+            print(f"{name:<60} {results[name]['median_us']:>12.3f} µs/op", file=sys.stderr)
+    finally:
+        await manager.close_all()
+        await async_engine.dispose()
+        engine.dispose()
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Imprime la comparación caso por caso; devuelve True si hay regresiones"""
+    regressions = False
+    print(f"\n{'caso':<60} {'base µs':>12} {'actual µs':>12} {'cambio':>9}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<60} {'-':>12} {result['median_us']:>12.3f} {'nuevo':>9}")
+            continue
+        ratio = result["median_us"] / base["median_us"] if base["median_us"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESIÓN"
+            regressions = True
+        elif ratio < 1 - threshold:
+            flag = "  mejora"
+        print(f"{name:<60} {base['median_us']:>12.3f} {result['median_us']:>12.3f} {(ratio - 1) * 100:>8.1f}%{flag}")
+    return regressions
+
+
+def baseline_path(name: str) -> Path:
+    path = Path(name)
+    if path.suffix == ".json" or path.parent != Path("."):
+        return path
+    return BASELINES_DIR / f"{name}.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de la ingesta de lecturas y alertas")
+    parser.add_argument("--save", metavar="NOMBRE", help="Guardar resultados como línea base")
+    parser.add_argument("--compare", metavar="NOMBRE", help="Comparar contra una línea base guardada")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Tolerancia de regresión (0.15 = 15%%)")
+    parser.add_argument("--rounds", type=int, default=5, help="Rondas por caso")
+    parser.add_argument("--only", default="", help="Correr solo los casos cuyo nombre contenga este texto")
+    args = parser.parse_args()
+
+    # Los logs por lectura ensucian la salida y no son parte de lo que se mide
+    logging.disable(logging.INFO)
+
+    current = asyncio.run(run_suite(args.only, args.rounds))
+
+    if args.save:
+        path = baseline_path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(current, indent=2), encoding="utf-8")
+        print(f"Línea base guardada en {path}", file=sys.stderr)
+
+    if args.compare:
+        baseline = json.loads(baseline_path(args.compare).read_text(encoding="utf-8"))
+        if compare(current, baseline, args.threshold):
+            sys.exit(1)
+    elif not args.save:
+        print(json.dumps(current, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Base de datos local de reemplazo para los benchmarks.
+
+Traduce el dump MySQL de sql/schema.sql a SQLite (tipos, AUTO_INCREMENT,
+UNIQUE KEY / KEY) y siembra roles, áreas, usuarios y cascos sintéticos.
+Así los benchmarks usan las mismas tablas e índices que producción sin
+depender de la base de datos remota.
+"""
+import re
+import sqlite3
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+SCHEMA_PATH = BACKEND_DIR / "sql" / "schema.sql"
+
+_CREATE_TABLE_RE = re.compile(r"CREATE TABLE `(\w+)` \((.*?)\n\)[^;]*;", re.S)
+_COLUMN_RE = re.compile(r"^`(\w+)` (\w+)(?:\([^)]*\))?(.*)$")
+_KEY_RE = re.compile(r"^(UNIQUE KEY|KEY) `(\w+)` \((.*)\)$")
+
+_TYPE_MAP = {
+    "int": "INTEGER", "bigint": "INTEGER", "tinyint": "INTEGER", "smallint": "INTEGER",
+    "double": "REAL", "float": "REAL", "decimal": "REAL",
+}
+
+
+def _column_sql(name: str, mysql_type: str, rest: str, primary_key: bool) -> str:
+    sqlite_type = _TYPE_MAP.get(mysql_type.lower(), "TEXT")
+    if primary_key:
+        return f'"{name}" INTEGER PRIMARY KEY AUTOINCREMENT'
+
+    # Quitar lo que SQLite no entiende, conservar NOT NULL / DEFAULT
+    rest = re.sub(r"COMMENT '(?:[^'\\]|\\.)*'", "", rest)
+    rest = re.sub(r"CHARACTER SET \w+|COLLATE \w+|ON UPDATE CURRENT_TIMESTAMP|AUTO_INCREMENT", "", rest)
+    rest = rest.replace("DEFAULT_GENERATED", "")
+    return f'"{name}" {sqlite_type} {" ".join(rest.split())}'.strip()
+
+
+def translate_schema(mysql_sql: str) -> List[str]:
+    """Convierte los CREATE TABLE del dump MySQL en sentencias SQLite"""
+    statements: List[str] = []
+    for table, body in _CREATE_TABLE_RE.findall(mysql_sql):
+        lines = [line.strip().rstrip(",") for line in body.strip().splitlines()]
+        primary_keys = set()
+        for line in lines:
+            match = re.match(r"^PRIMARY KEY \((.*)\)$", line)
+            if match:
+                primary_keys = {col.strip("` ") for col in match.group(1).split(",")}
+
+        columns, constraints, indexes = [], [], []
+        for line in lines:
+            column = _COLUMN_RE.match(line)
+            if column:
+                name, mysql_type, rest = column.groups()
+                columns.append(_column_sql(name, mysql_type, rest, name in primary_keys and len(primary_keys) == 1))
+                continue
+            key = _KEY_RE.match(line)
+            if key:
+                kind, key_name, cols = key.groups()
+                cols = cols.replace("`", '"')
+                if kind == "UNIQUE KEY":
+                    constraints.append(f"UNIQUE ({cols})")
+                else:
+                    indexes.append(f'CREATE INDEX "{table}_{key_name}" ON "{table}" ({cols})')
+            elif line.startswith("PRIMARY KEY") and len(primary_keys) > 1:
+                constraints.append(line.replace("`", '"'))
+            # CONSTRAINT ... FOREIGN KEY: SQLite no las aplica por defecto, se omiten
+
+        statements.append(f'CREATE TABLE "{table}" (\n  ' + ",\n  ".join(columns + constraints) + "\n)")
+        statements.extend(indexes)
+    return statements
+
+
+def create_stand_in_database(path: Path, workers: int = 300, areas: int = 10) -> None:
+    """Crea (o recrea) la BD SQLite desde schema.sql y siembra datos de referencia"""
+    if path.exists():
+        path.unlink()
+
+    connection = sqlite3.connect(path)
+    try:
+        for statement in translate_schema(SCHEMA_PATH.read_text(encoding="utf-8")):
+            connection.execute(statement)
+
+        connection.execute(
+            "INSERT INTO role (id, name, description) VALUES (1, 'Admin', 'Administrador'), "
+            "(2, 'User', 'Usuario'), (3, 'Supervisor', 'Supervisor')"
+        )
+        connection.execute("INSERT INTO position (id, name) VALUES (1, 'Minero'), (2, 'Supervisor')")
+        connection.executemany(
+            "INSERT INTO area (id, name) VALUES (?, ?)",
+            [(area_id, f"Área {area_id}") for area_id in range(1, areas + 1)],
+        )
+        # Un supervisor por área y el resto mineros con su casco
+        connection.executemany(
+            "INSERT INTO user (id, employee_number, first_name, last_name, email, password, "
+            "role_id, area_id, position_id, supervisor_id) VALUES (?, ?, ?, ?, ?, 'x', ?, ?, ?, ?)",
+            [
+                (
+                    user_id, f"BENCH{user_id:05d}", "Minero", f"Bench {user_id}", f"bench{user_id}@mineguard.com",
+                    3 if user_id <= areas else 2,
+                    (user_id - 1) % areas + 1,
+                    2 if user_id <= areas else 1,
+                    None if user_id <= areas else (user_id - 1) % areas + 1,
+                )
+                for user_id in range(1, workers + areas + 1)
+            ],
+        )
+        connection.executemany(
+            "INSERT INTO device (id, model, user_id) VALUES (?, 'casco_v4', ?)",
+            [(user_id, user_id) for user_id in range(1, workers + areas + 1)],
+        )
+        connection.commit()
+    finally:
+        connection.close()
@@ -0,0 +1,127 @@
+"""
+Tests unitarios del backplane WebSocket entre procesos (core/backplane.py).
+Los "workers" son varios UnixSocketBackplane en el mismo proceso: el lock de
+archivo se toma por descriptor, así que la elección del hub funciona igual.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.backplane import Backplane, InMemoryBackplane, UnixSocketBackplane, create_backplane
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def wait_until(predicate, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condición no alcanzada a tiempo")
+        await asyncio.sleep(0.01)
+
+
+def worker(path, inbox):
+    backplane = UnixSocketBackplane(str(path), retry_interval=0.05)
+
+    async def deliver(envelope):
+        inbox.append(envelope["text"])
+        return 1
+
+    backplane.attach(deliver)
+    return backplane
+
+
+@pytest.mark.unit
+def test_backplane_is_abstract():
+    with pytest.raises(TypeError):
+        Backplane()
+
+    class Incomplete(Backplane):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.unit
+def test_in_memory_backplane_delivers_locally():
+    received = []
+
+    async def deliver(envelope):
+        received.append(envelope["text"])
+        return 3
+
+    backplane = InMemoryBackplane()
+    backplane.attach(deliver)
+    assert run(backplane.publish({"kind": "broadcast", "text": "hola"})) == 3
+    assert received == ["hola"]
+    assert not backplane.has_peers
+    assert backplane.get_stats()["published"] == 1
+
+
+@pytest.mark.unit
+def test_create_backplane_falls_back_to_memory(tmp_path):
+    assert isinstance(create_backplane("unix", str(tmp_path / "ws.sock")), UnixSocketBackplane)
+    assert isinstance(create_backplane("redis", str(tmp_path / "ws.sock")), InMemoryBackplane)
+
+
+@pytest.mark.unit
+def test_unix_backplane_elects_hub_relays_and_fails_over(tmp_path):
+    path = tmp_path / "ws.sock"
+    inboxes = {name: [] for name in ("a", "b", "c")}
+
+    async def scenario():
+        a, b, c = (worker(path, inboxes[name]) for name in ("a", "b", "c"))
+
+        # Elección: el primero que toma el lock es el hub, los demás se conectan a él
+        await a.start()
+        await wait_until(lambda: a.is_hub)
+        await b.start()
+        await c.start()
+        await wait_until(lambda: len(a._peers) == 2 and b.has_peers and c.has_peers)
+        assert (b.is_hub, c.is_hub) == (False, False)
+        assert b.get_stats()["role"] == "worker"
+        assert a.get_stats()["peers"] == 2
+
+        # Reenvío: lo publicado por un worker llega al hub y, a través de él, al otro worker
+        assert await b.publish({"kind": "broadcast", "text": "desde b"}) == 1
+        await wait_until(lambda: "desde b" in inboxes["a"] and "desde b" in inboxes["c"])
+        assert await a.publish({"kind": "broadcast", "text": "desde el hub"}) == 1
+        await wait_until(lambda: "desde el hub" in inboxes["b"] and "desde el hub" in inboxes["c"])
+
+        # Caída del hub: uno de los workers toma el lock y el otro se reconecta a él
+        await a.stop()
+        await wait_until(lambda: b.is_hub or c.is_hub)
+        hub, other = (b, c) if b.is_hub else (c, b)
+        await wait_until(lambda: other.has_peers and len(hub._peers) == 1)
+        assert other.get_stats()["reconnects"] >= 1
+
+        await other.publish({"kind": "broadcast", "text": "tras la caída"})
+        hub_inbox = inboxes["b"] if hub is b else inboxes["c"]
+        await wait_until(lambda: "tras la caída" in hub_inbox)
+
+        await b.stop()
+        await c.stop()
+
+    run(scenario())
+    # Cada mensaje llegó una sola vez a cada worker (incluida la entrega local de quien publica)
+    assert inboxes["a"] == ["desde b", "desde el hub"]
+    assert inboxes["b"] == inboxes["c"] == ["desde b", "desde el hub", "tras la caída"]
+    assert not path.exists()
+
+
+@pytest.mark.unit
+def test_worker_without_hub_still_delivers_locally(tmp_path):
+    """Sin hub todavía, la publicación no se pierde para los clientes del propio proceso"""
+    inbox = []
+
+    async def scenario():
+        backplane = worker(tmp_path / "ws.sock", inbox)
+        assert not backplane.has_peers
+        assert await backplane.publish({"kind": "broadcast", "text": "local"}) == 1
+
+    run(scenario())
+    assert inbox == ["local"]
@@ -0,0 +1,68 @@
+"""
+Tests unitarios de la derivación de IDs de un INSERT multi-fila
+(shared/base_repository.py): el paso de AUTO_INCREMENT se lee una vez del
+servidor y un innodb_autoinc_lock_mode desconocido se rechaza.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+from app.shared import base_repository
+from app.shared.base_repository import auto_increment_step, inserted_ids
+
+
+def result(dialect, lastrowid):
+    return SimpleNamespace(lastrowid=lastrowid, context=SimpleNamespace(dialect=SimpleNamespace(name=dialect)))
+
+
+class FakeSession:
+    """Session mínima: un bind MySQL y un contador de consultas"""
+
+    def __init__(self, increment, lock_mode, url="mysql://a/b"):
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name="mysql"), url=url)
+        self.row = (increment, lock_mode)
+        self.queries = 0
+
+    def get_bind(self):
+        return self.bind
+
+    def execute(self, stmt):
+        self.queries += 1
+        return SimpleNamespace(one=lambda: self.row)
+
+
+@pytest.fixture(autouse=True)
+def steps(monkeypatch):
+    monkeypatch.setattr(base_repository, "_auto_increment_steps", {})
+
+
+@pytest.mark.unit
+def test_inserted_ids_follow_the_server_step():
+    assert inserted_ids(result("mysql", 10), 3) == [10, 11, 12]
+    assert inserted_ids(result("mysql", 10), 3, step=2) == [10, 12, 14]
+    # SQLite devuelve el último ID del bloque
+    assert inserted_ids(result("sqlite", 12), 3) == [10, 11, 12]
+
+
+@pytest.mark.unit
+def test_step_is_read_once_per_database():
+    session = FakeSession(increment=2, lock_mode=2)
+    assert auto_increment_step(session) == 2
+    assert auto_increment_step(session) == 2
+    assert session.queries == 1
+
+
+@pytest.mark.unit
+def test_unknown_lock_mode_is_rejected():
+    with pytest.raises(RuntimeError):
+        auto_increment_step(FakeSession(increment=1, lock_mode=3))
+
+
+@pytest.mark.unit
+def test_non_mysql_step_is_one():
+    session = FakeSession(increment=5, lock_mode=1)
+    session.bind.dialect.name = "sqlite"
+    assert auto_increment_step(session) == 1
+    assert session.queries == 0
@@ -0,0 +1,230 @@
+"""
+Tests unitarios de las suscripciones por tópico de /ws/alerts (core/websocket.py).
+Incluye la unión de alcances, el filtro de severidad, el índice de tópicos de
+broadcast_alert y la lectura de la suscripción desde el query string.
+"""
+
+import asyncio
+from datetime import datetime
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.websocket import ConnectionManager, Subscription
+
+
+class RecordingWebSocket:
+    """WebSocket en memoria que guarda los mensajes enviados"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text):
+        self.messages.append(orjson.loads(text))
+
+    async def close(self, code=1000):
+        pass
+
+    @property
+    def alert_ids(self):
+        return [message["data"]["id"] for message in self.messages if message["type"] == "alert"]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def drain():
+    """Deja correr las tareas de envío de cada cliente"""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def alert(alert_id, severity="warning"):
+    return {"id": alert_id, "type": "toxic_gas", "severity": severity}
+
+
+# ---------------------------------------------------------------------------
+# Subscription
+# ---------------------------------------------------------------------------
+
+@pytest.mark.unit
+def test_parse_accepts_lists_and_comma_separated_values():
+    subscription = Subscription.parse({
+        "area_id": ["3,4", "5"],
+        "supervisor_id": " 7 ",
+        "user_id": [],
+        "severity": "CRITICAL,warning",
+        "client_id": "tablet_1",
+    })
+    assert subscription.as_dict() == {
+        "area_id": [3, 4, 5],
+        "supervisor_id": [7],
+        "user_id": [],
+        "severity": ["critical", "warning"],
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("params, topic", [
+    ({"area_id": "3,x"}, "area_id"),
+    ({"supervisor_id": ["1.5"]}, "supervisor_id"),
+    ({"user_id": "abc"}, "user_id"),
+])
+def test_parse_rejects_non_integer_ids(params, topic):
+    with pytest.raises(ValueError, match=topic):
+        Subscription.parse(params)
+
+
+@pytest.mark.unit
+def test_scopes_are_a_union():
+    """Basta con coincidir en el área, el supervisor o el trabajador"""
+    subscription = Subscription(area_id=[3], supervisor_id=[7], user_id=[42])
+    assert subscription.matches("warning", {"area_id": 3, "supervisor_id": None, "user_id": 1})
+    assert subscription.matches("warning", {"area_id": 9, "supervisor_id": 7, "user_id": 1})
+    assert subscription.matches("warning", {"area_id": None, "supervisor_id": None, "user_id": 42})
+    assert not subscription.matches("warning", {"area_id": 9, "supervisor_id": 8, "user_id": 1})
+    assert sorted(subscription.topics) == [("area_id", 3), ("supervisor_id", 7), ("user_id", 42)]
+
+
+@pytest.mark.unit
+def test_severity_filters_on_top_of_scopes():
+    subscription = Subscription(area_id=[3], severity=["critical"])
+    assert subscription.matches("critical", {"area_id": 3})
+    assert not subscription.matches("warning", {"area_id": 3})
+    assert not subscription.matches("critical", {"area_id": 4})
+
+
+@pytest.mark.unit
+def test_unscoped_subscription_receives_whole_mine():
+    assert Subscription().matches("warning", {"area_id": 1, "supervisor_id": 2, "user_id": 3})
+    assert Subscription(severity=["critical"]).matches("critical", {"area_id": None})
+    assert not Subscription(severity=["critical"]).matches("warning", {"area_id": None})
+
+
+# ---------------------------------------------------------------------------
+# Índice de tópicos de broadcast_alert
+# ---------------------------------------------------------------------------
+
+@pytest.mark.unit
+def test_broadcast_alert_reaches_only_matching_clients():
+    async def scenario():
+        manager = ConnectionManager()
+        sockets = {
+            "all": RecordingWebSocket(),
+            "area3": RecordingWebSocket(),
+            "area3_critical": RecordingWebSocket(),
+            "supervisor7": RecordingWebSocket(),
+            "area3_or_user42": RecordingWebSocket(),
+        }
+        subscriptions = {
+            "all": Subscription(),
+            "area3": Subscription(area_id=[3]),
+            "area3_critical": Subscription(area_id=[3], severity=["critical"]),
+            "supervisor7": Subscription(supervisor_id=[7]),
+            "area3_or_user42": Subscription(area_id=[3], user_id=[42]),
+        }
+        for name, websocket in sockets.items():
+            await manager.connect(websocket, name, subscriptions[name])
+
+        await manager.broadcast_alert(alert(1), area_id=3, supervisor_id=8, user_id=1)
+        await manager.broadcast_alert(alert(2, "critical"), area_id=3, supervisor_id=7, user_id=42)
+        await manager.broadcast_alert(alert(3), area_id=5, supervisor_id=7, user_id=42)
+        await manager.broadcast_alert(alert(4), area_id=None, supervisor_id=None, user_id=None)
+        await drain()
+        await manager.close_all()
+        return {name: websocket.alert_ids for name, websocket in sockets.items()}
+
+    assert run(scenario()) == {
+        "all": [1, 2, 3, 4],
+        "area3": [1, 2],
+        "area3_critical": [2],
+        "supervisor7": [2, 3],
+        # Coincide por área y por trabajador: la alerta 2 llega una sola vez
+        "area3_or_user42": [1, 2, 3],
+    }
+
+
+@pytest.mark.unit
+def test_resubscribe_moves_client_between_topics():
+    async def scenario():
+        manager = ConnectionManager()
+        websocket = RecordingWebSocket()
+        await manager.connect(websocket, "tablet", Subscription(area_id=[3]))
+        assert manager.get_stats()["topics"] == 1
+
+        manager.subscribe(websocket, Subscription(area_id=[4, 5]))
+        await manager.broadcast_alert(alert(1), area_id=3)
+        await manager.broadcast_alert(alert(2), area_id=5)
+        await drain()
+        stats = manager.get_stats()
+        assert (stats["topics"], stats["unscoped_connections"]) == (2, 0)
+
+        manager.disconnect(websocket)
+        assert manager.get_stats()["topics"] == 0
+        await manager.close_all()
+        return websocket.alert_ids
+
+    assert run(scenario()) == [2]
+
+
+# ---------------------------------------------------------------------------
+# Query string de /ws/alerts
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def ws_client():
+    # Sin `with`: no corren los eventos de inicio (backplane, piso del historial en la BD)
+    from app.main import app
+    return TestClient(app)
+
+
+@pytest.mark.unit
+def test_query_string_builds_subscription(ws_client):
+    url = "/ws/alerts?client_id=tablet_1&area_id=3,4&area_id=5&severity=CRITICAL"
+    with ws_client.websocket_connect(url) as websocket:
+        message = websocket.receive_json()
+    assert message["type"] == "connection_established"
+    assert message["subscription"] == {
+        "area_id": [3, 4, 5], "supervisor_id": [], "user_id": [], "severity": ["critical"],
+    }
+    assert message["replay"] is None
+
+
+@pytest.mark.unit
+def test_invalid_query_string_is_rejected_with_1008(ws_client):
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        with ws_client.websocket_connect("/ws/alerts?client_id=tablet_1&area_id=norte") as websocket:
+            websocket.receive_json()
+    assert excinfo.value.code == 1008
+
+
+@pytest.mark.unit
+def test_subscribe_message_replaces_subscription(ws_client):
+    with ws_client.websocket_connect("/ws/alerts?client_id=tablet_2") as websocket:
+        assert websocket.receive_json()["subscription"]["area_id"] == []
+        websocket.send_text('{"action": "subscribe", "user_id": [42], "severity": "warning"}')
+        assert websocket.receive_json() == {
+            "type": "subscribed",
+            "subscription": {"area_id": [], "supervisor_id": [], "user_id": [42], "severity": ["warning"]},
+        }
+        websocket.send_text('{"action": "subscribe", "area_id": "x"}')
+        error = websocket.receive_json()
+    assert error["type"] == "error"
+    assert "area_id" in error["message"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("path", ["/ws/alerts", "/ws/live"])
+def test_ping_answers_pong_with_timestamp(ws_client, path):
+    with ws_client.websocket_connect(f"{path}?client_id=tablet_3") as websocket:
+        websocket.receive_json()
+        websocket.send_text("ping")
+        pong = websocket.receive_json()
+    assert pong["type"] == "pong"
+    assert datetime.fromisoformat(pong["timestamp"])
@@ -0,0 +1,311 @@
+"""
+Tests unitarios del reenvío de alertas perdidas al reconectarse a /ws/alerts.
+Incluye el historial en memoria (AlertHistory), la consulta a la base por
+debajo del piso, el tope WS_REPLAY_LIMIT y el paso sin duplicados del reenvío
+a las alertas en vivo.
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from app.core.websocket import AlertHistory, ConnectionManager, Subscription, encode_message
+from app.modules.alert import replay
+
+ALL = Subscription()
+
+
+class RecordingWebSocket:
+    """WebSocket en memoria que guarda los ids de las alertas recibidas"""
+
+    def __init__(self):
+        self.alert_ids = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text):
+        message = orjson.loads(text)
+        if message["type"] == "alert":
+            self.alert_ids.append(message["data"]["id"])
+
+    async def close(self, code=1000):
+        pass
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def drain():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def alert(alert_id, severity="warning"):
+    return {"id": alert_id, "type": "toxic_gas", "severity": severity}
+
+
+def stored(alert_id):
+    """Mensaje de una alerta como lo arma la consulta a la base"""
+    return alert_id, encode_message({"type": "alert", "data": alert(alert_id)})
+
+
+class FakeLoader:
+    """Consulta a la base simulada: registra los argumentos y devuelve las alertas pedidas"""
+
+    def __init__(self, ids, during=None):
+        self.ids = list(ids)
+        self.during = during
+        self.calls = []
+
+    async def __call__(self, last_alert_id, subscription, limit):
+        self.calls.append((last_alert_id, limit))
+        if self.during is not None:
+            # Alertas que llegan mientras la consulta está en curso
+            await self.during()
+        newer = [alert_id for alert_id in self.ids if alert_id > last_alert_id]
+        return [stored(alert_id) for alert_id in newer[-(limit + 1):]]
+
+
+# ---------------------------------------------------------------------------
+# AlertHistory
+# ---------------------------------------------------------------------------
+
+@pytest.mark.unit
+def test_history_covers_only_from_floor():
+    history = AlertHistory(capacity=10)
+    assert not history.covers(100)
+    history.reset(100)
+    assert history.covers(100)
+    assert history.covers(150)
+    assert not history.covers(99)
+
+
+@pytest.mark.unit
+def test_history_keeps_id_order_and_ignores_duplicates():
+    history = AlertHistory(capacity=10)
+    history.reset(100)
+    for alert_id in (101, 104, 102, 104, 100, 103):
+        history.record(alert_id, "warning", {}, str(alert_id))
+    assert [alert_id for alert_id, _ in history.since(100, ALL, limit=10)] == [101, 102, 103, 104]
+
+
+@pytest.mark.unit
+def test_evicting_oldest_raises_floor():
+    history = AlertHistory(capacity=3)
+    history.reset(100)
+    for alert_id in range(101, 106):
+        history.record(alert_id, "warning", {}, str(alert_id))
+    assert history.floor == 102
+    assert not history.covers(101)
+    assert [alert_id for alert_id, _ in history.since(102, ALL, limit=10)] == [103, 104, 105]
+
+
+@pytest.mark.unit
+def test_since_filters_by_subscription_and_returns_limit_plus_one():
+    history = AlertHistory(capacity=100)
+    history.reset(0)
+    for alert_id in range(1, 21):
+        history.record(alert_id, "critical" if alert_id % 2 else "warning", {"area_id": 3}, str(alert_id))
+    critical = Subscription(severity=["critical"])
+    assert [alert_id for alert_id, _ in history.since(10, critical, limit=2)] == [15, 17, 19]
+    assert history.since(0, Subscription(area_id=[4]), limit=5) == []
+
+
+# ---------------------------------------------------------------------------
+# Reenvío al conectar
+# ---------------------------------------------------------------------------
+
+@pytest.mark.unit
+def test_replay_from_memory():
+    async def scenario():
+        manager = ConnectionManager()
+        manager.alert_history.reset(100)
+        for alert_id in range(101, 106):
+            # Sin clientes conectados la alerta solo queda en memoria
+            await manager.broadcast_alert(alert(alert_id), area_id=3)
+        websocket = RecordingWebSocket()
+        summary = await manager.connect(websocket, "tablet", last_alert_id=102)
+        await drain()
+        await manager.close_all()
+        return summary, websocket.alert_ids
+
+    summary, received = run(scenario())
+    assert received == [103, 104, 105]
+    assert summary == {"replayed": 3, "source": "memory", "truncated": False, "last_alert_id": 105}
+
+
+@pytest.mark.unit
+def test_replay_below_floor_queries_database():
+    """Un last_alert_id anterior al piso va a la base y se completa con lo que hay en memoria"""
+    async def scenario():
+        manager = ConnectionManager()
+        # La base tiene hasta la 102; la memoria arranca en 100 y ya recibió 101 a 104
+        loader = FakeLoader(range(1, 103))
+        manager.set_replay_loader(loader)
+        manager.alert_history.reset(100)
+        for alert_id in range(101, 105):
+            await manager.broadcast_alert(alert(alert_id))
+        websocket = RecordingWebSocket()
+        summary = await manager.connect(websocket, "tablet", last_alert_id=96)
+        await drain()
+        await manager.close_all()
+        return loader.calls, summary, websocket.alert_ids
+
+    calls, summary, received = run(scenario())
+    assert calls == [(96, 50)]
+    # 101 y 102 vienen de la base y también están en memoria: se envían una sola vez
+    assert received == [97, 98, 99, 100, 101, 102, 103, 104]
+    assert summary == {"replayed": 8, "source": "database", "truncated": False, "last_alert_id": 104}
+
+
+@pytest.mark.unit
+def test_replay_without_floor_or_loader_sends_nothing():
+    async def scenario():
+        manager = ConnectionManager()
+        websocket = RecordingWebSocket()
+        summary = await manager.connect(websocket, "tablet", last_alert_id=10)
+        await manager.close_all()
+        return summary
+
+    assert run(scenario()) == {"replayed": 0, "source": "database", "truncated": False, "last_alert_id": 10}
+
+
+@pytest.mark.unit
+def test_replay_is_capped_to_newest_alerts():
+    """Con más de WS_REPLAY_LIMIT alertas perdidas se envían las más nuevas y se avisa el truncado"""
+    async def scenario():
+        manager = ConnectionManager(replay_limit=5)
+        manager.set_replay_loader(FakeLoader(range(1, 31)))
+        manager.alert_history.reset(30)
+        for alert_id in range(31, 41):
+            await manager.broadcast_alert(alert(alert_id))
+        from_memory, from_database = RecordingWebSocket(), RecordingWebSocket()
+        memory_summary = await manager.connect(from_memory, "a", last_alert_id=30)
+        database_summary = await manager.connect(from_database, "b", last_alert_id=0)
+        await drain()
+        await manager.close_all()
+        return memory_summary, database_summary, from_memory.alert_ids, from_database.alert_ids
+
+    memory_summary, database_summary, from_memory, from_database = run(scenario())
+    assert from_memory == from_database == [36, 37, 38, 39, 40]
+    assert memory_summary["truncated"] and database_summary["truncated"]
+    assert memory_summary["replayed"] == database_summary["replayed"] == 5
+
+
+@pytest.mark.unit
+def test_replay_limit_leaves_room_in_queue():
+    assert ConnectionManager(queue_size=20, replay_limit=50).replay_limit == 10
+    assert ConnectionManager(queue_size=100, replay_limit=50).replay_limit == 50
+
+
+@pytest.mark.unit
+def test_handoff_to_live_delivery_has_no_duplicates():
+    """
+    Lo que llega durante la consulta a la base se toma de la memoria y lo que
+    llega después de registrar al cliente, en vivo; cada alerta una sola vez
+    """
+    async def scenario():
+        manager = ConnectionManager()
+        watcher = RecordingWebSocket()
+        await manager.connect(watcher, "watcher")
+
+        async def alerts_during_query():
+            await manager.broadcast_alert(alert(11))
+            await manager.broadcast_alert(alert(12))
+
+        manager.set_replay_loader(FakeLoader(range(1, 11), during=alerts_during_query))
+        manager.alert_history.reset(10)
+
+        websocket = RecordingWebSocket()
+        summary = await manager.connect(websocket, "tablet", last_alert_id=7)
+        await manager.broadcast_alert(alert(13))
+        await drain()
+        await manager.close_all()
+        return summary, websocket.alert_ids, watcher.alert_ids
+
+    summary, received, watcher = run(scenario())
+    assert received == [8, 9, 10, 11, 12, 13]
+    assert summary["last_alert_id"] == 12
+    assert watcher == [11, 12, 13]
+
+
+# ---------------------------------------------------------------------------
+# alert/replay.py
+# ---------------------------------------------------------------------------
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.unit
+def test_load_missed_alerts_builds_live_messages(monkeypatch):
+    """Las filas de la base se envían con el mismo formato y severidad que las alertas en vivo"""
+    captured = {}
+
+    async def get_after(last_id, db, **filters):
+        captured.update(filters, last_id=last_id)
+        return [SimpleNamespace(
+            id=8, alert_type="toxic_gas", severity="high", first_name="Juan", last_name="Pérez",
+            area_name="Túnel Norte", timestamp=datetime(2025, 12, 2, 10, 30), value=120.0,
+        ), SimpleNamespace(
+            id=9, alert_type="fall_detected", severity="high", first_name="Juan", last_name="Pérez",
+            area_name="Túnel Norte", timestamp=datetime(2025, 12, 2, 10, 31), value=78.5,
+        )]
+
+    monkeypatch.setattr(replay, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(replay._repository, "get_after", get_after)
+
+    subscription = Subscription(area_id=[3], severity=["critical"])
+    messages = run(replay.load_missed_alerts(7, subscription, limit=50))
+
+    assert captured == {
+        "last_id": 7, "area_ids": frozenset({3}), "supervisor_ids": frozenset(), "user_ids": frozenset(),
+        "severities": ["high"], "limit": 51,
+    }
+    assert [alert_id for alert_id, _ in messages] == [8, 9]
+    assert orjson.loads(messages[0][1]) == {
+        "type": "alert",
+        "data": {
+            "id": 8, "type": "toxic_gas", "severity": "critical", "worker_name": "Juan Pérez",
+            "area": "Túnel Norte", "value": 120.0, "timestamp": "2025-12-02T10:30:00",
+        },
+        "timestamp": "2025-12-02T10:30:00",
+    }
+    # Las alertas que no son de umbral también llevan el valor guardado
+    assert orjson.loads(messages[1][1])["data"]["value"] == 78.5
+
+
+@pytest.mark.unit
+def test_init_alert_replay_sets_floor(monkeypatch):
+    async def get_max_id(db):
+        return 1234
+
+    monkeypatch.setattr(replay, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(replay._repository, "get_max_id", get_max_id)
+    manager = ConnectionManager()
+    run(replay.init_alert_replay(manager))
+    assert manager.alert_history.floor == 1234
+    assert manager._replay_loader is replay.load_missed_alerts
+
+
+@pytest.mark.unit
+def test_init_alert_replay_without_database_leaves_no_floor(monkeypatch):
+    """Sin piso toda reconexión consulta la base"""
+    async def get_max_id(db):
+        raise ConnectionError("BD no disponible")
+
+    monkeypatch.setattr(replay, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(replay._repository, "get_max_id", get_max_id)
+    manager = ConnectionManager()
+    run(replay.init_alert_replay(manager))
+    assert manager.alert_history.floor is None
+    assert not manager.alert_history.covers(10 ** 9)
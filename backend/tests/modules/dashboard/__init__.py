@@ -0,0 +1 @@
+# Dashboard module tests
@@ -0,0 +1,98 @@
+"""
+Tests unitarios de la telemetría en vivo de /ws/live (dashboard/live.py) con
+varios procesos: cada uno numera sus frames para sus propios clientes y los
+cambios de los demás le llegan como datos, no como frames.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+from app.core.websocket import manager
+from app.modules.dashboard.live import LIVE_CHANNEL, LiveTelemetry
+from app.modules.reading.models import Reading
+from app.modules.users.cache import worker_info_cache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Process:
+    """Un LiveTelemetry con lo que envió a sus clientes y lo que publicó a los demás"""
+
+    def __init__(self):
+        self.live = LiveTelemetry()
+        self.frames = []
+        self.published = []
+
+    async def tick(self, monkeypatch):
+        async def send_local(message, channel):
+            assert channel == LIVE_CHANNEL
+            self.frames.append(message)
+            return 1
+
+        async def publish_data(channel, data):
+            self.published.append(data)
+
+        monkeypatch.setattr(manager, "send_local", send_local)
+        monkeypatch.setattr(manager, "publish_data", publish_data)
+        await self.live.tick()
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    monkeypatch.setattr(manager, "_listeners", dict(manager._listeners))
+
+    async def get_many(user_ids, db=None):
+        return {}
+    monkeypatch.setattr(worker_info_cache, "get_many", get_many)
+    return Process(), Process()
+
+
+def reading(user_id, pulse):
+    return Reading(id=1, user_id=user_id, device_id=user_id, pulse=pulse, timestamp=datetime(2025, 3, 10, 15, 30))
+
+
+@pytest.mark.unit
+def test_each_process_numbers_its_own_frames(processes, monkeypatch):
+    a, b = processes
+
+    async def scenario():
+        a.live.observe([reading(7, 80)])
+        await a.tick(monkeypatch)
+        # El backplane entrega a B lo publicado por A
+        for data in a.published:
+            b.live._apply_remote(data)
+        b.live.observe([reading(8, 70)])
+        await b.tick(monkeypatch)
+
+        a.live.observe([reading(7, 85)])
+        await a.tick(monkeypatch)
+        for data in a.published[1:]:
+            b.live._apply_remote(data)
+        await b.tick(monkeypatch)
+
+    run(scenario())
+    assert [frame["seq"] for frame in a.frames] == [1, 2]
+    assert [frame["seq"] for frame in b.frames] == [1, 2]
+    # B envía los cambios de A a sus clientes con su propia numeración
+    assert {w["id"]: w.get("ritmoCardiaco") for w in b.frames[0]["workers"]} == {7: 80, 8: 70}
+    assert b.frames[1]["workers"] == [{"id": 7, "ritmoCardiaco": 85}]
+    # ...pero solo publica lo originado en B
+    assert [[w["id"] for w in data] for data in b.published] == [[8]]
+    assert b.live.snapshot_message()["seq"] == 2
+
+
+@pytest.mark.unit
+def test_remote_change_without_local_clients_is_not_republished(processes, monkeypatch):
+    a, b = processes
+    b.live._apply_remote([{"id": 7, "ritmoCardiaco": 80}])
+    # Un valor que B ya tiene no genera frame
+    b.live._apply_remote([{"id": 7, "ritmoCardiaco": 80}])
+    run(b.tick(monkeypatch))
+    run(b.tick(monkeypatch))
+    assert [frame["seq"] for frame in b.frames] == [1]
+    assert b.published == []
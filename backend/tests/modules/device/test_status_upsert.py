@@ -0,0 +1,73 @@
+"""
+Tests unitarios del upsert de device_status (device/repository.py).
+Se ejecuta sobre SQLite en memoria con el mismo ON CONFLICT que usa la BD local.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+from app.modules.device.models import DeviceStatus
+from app.modules.device.repository import reading_status_upsert
+
+AT = datetime(2025, 3, 10, 15, 30)
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    DeviceStatus.__table__.create(engine)
+    yield engine
+    engine.dispose()
+
+
+def status(engine):
+    with engine.connect() as connection:
+        rows = connection.execute(select(DeviceStatus.__table__)).mappings().all()
+    return {row["device_id"]: row for row in rows}
+
+
+@pytest.mark.unit
+def test_params_are_sorted_by_device():
+    """Un parámetro por casco, en orden de device_id, con la última lectura y los últimos vitales"""
+    rows = [
+        {"device_id": 9, "user_id": 1, "pulse": 80, "body_temp": 36.5},
+        {"device_id": 2, "user_id": 2, "pulse": 70, "body_temp": None},
+        {"device_id": 9, "user_id": 1, "pulse": None, "body_temp": None},
+        {"device_id": 5, "user_id": 3, "pulse": 90, "body_temp": 37.0},
+        {"device_id": 2, "user_id": 2},
+    ]
+    _, params = reading_status_upsert(create_engine("sqlite://").dialect, [101, 102, 103, 104, 105], rows, AT)
+    assert [(p["device_id"], p["last_reading_id"], p["vitals_reading_id"]) for p in params] == [
+        (2, 105, None),
+        (5, 104, 104),
+        (9, 103, 101),
+    ]
+    assert (params[2]["pulse"], params[2]["body_temp"], params[2]["vitals_at"]) == (80, 36.5, AT)
+    # Sin vitales en el lote, vitals_at queda NULL y el upsert conserva los guardados
+    assert (params[0]["last_reading_at"], params[0]["vitals_at"]) == (AT, None)
+
+
+@pytest.mark.unit
+def test_older_write_does_not_move_status_back(engine):
+    """Una escritura que confirma tarde (ids menores) no retrocede el estado guardado"""
+    with engine.begin() as connection:
+        connection.execute(*reading_status_upsert(
+            engine.dialect, [20], [{"device_id": 1, "user_id": 4, "pulse": 75, "body_temp": 36.6}],
+            datetime(2025, 3, 10, 15, 30)))
+        connection.execute(*reading_status_upsert(
+            engine.dialect, [10, 11], [
+                {"device_id": 1, "user_id": 4, "pulse": 120, "body_temp": 38.0},
+                {"device_id": 2, "user_id": 5, "pulse": 60, "body_temp": 36.1},
+            ], datetime(2025, 3, 10, 15, 29)))
+        # Una lectura más nueva sin vitales avanza la última lectura y conserva los vitales
+        connection.execute(*reading_status_upsert(
+            engine.dialect, [30], [{"device_id": 1, "user_id": 4}], datetime(2025, 3, 10, 15, 31)))
+
+    rows = status(engine)
+    assert (rows[1]["last_reading_id"], rows[1]["vitals_reading_id"], rows[1]["pulse"]) == (30, 20, 75)
+    assert (rows[2]["last_reading_id"], rows[2]["vitals_reading_id"], rows[2]["pulse"]) == (11, 11, 60)
+    # Los timestamps son los de la ingesta de cada lectura, no la hora de la base
+    assert (rows[1]["last_reading_at"], rows[1]["vitals_at"]) == (datetime(2025, 3, 10, 15, 31), datetime(2025, 3, 10, 15, 30))
+    assert (rows[2]["last_reading_at"], rows[2]["vitals_at"]) == (datetime(2025, 3, 10, 15, 29),) * 2
@@ -0,0 +1,137 @@
+"""
+Tests unitarios de la etapa de guardado de alertas de ReadingService: una
+alerta que no se guarda (error de la base o trabajador desconocido) no debe
+quedar como emitida en la máquina de estados.
+"""
+
+import asyncio
+
+import pytest
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+import app.core.database as database
+from app.modules.reading.alert_state import AlertStateTracker
+from app.modules.reading.models import Reading
+from app.modules.reading.service import ReadingService
+from app.modules.users.cache import WorkerInfo, worker_info_cache
+
+ALERT = "toxic_gas"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeSession:
+    def __init__(self):
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        return []
+
+    async def commit(self):
+        self.committed = True
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = ReadingService()
+    service.alert_state = AlertStateTracker(debounce_samples=1)
+    monkeypatch.setattr(database, "AsyncSessionLocal", FakeSession)
+    return service
+
+
+def evaluated(service, user_id=1):
+    """Lo que devuelve _evaluate_alerts para una lectura con CO crítico"""
+    reading = Reading(id=10, user_id=user_id, device_id=1, mq7=120.0)
+    transition = service.alert_state.observe(user_id, ALERT, "critical")
+    assert transition == "enter"
+    alert = {"type": ALERT, "severity": "critical", "value": 120.0, "message": "CO", "transition": transition}
+
+    async def evaluate(readings, timings):
+        return [(reading, [alert])]
+    return evaluate
+
+
+def known_workers(monkeypatch, *user_ids):
+    async def get_many(ids, db=None):
+        return {uid: WorkerInfo(uid, "Juan", "Pérez", 3, "Norte", None, 0) for uid in ids if uid in user_ids}
+    monkeypatch.setattr(worker_info_cache, "get_many", get_many)
+
+
+@pytest.mark.unit
+def test_failed_insert_rolls_back_transition(service, monkeypatch):
+    known_workers(monkeypatch, 1)
+    monkeypatch.setattr(service, "_evaluate_alerts", evaluated(service))
+
+    async def create_many(rows, db):
+        raise ConnectionError("BD no disponible")
+    monkeypatch.setattr(service.alert_repository, "create_many", create_many)
+
+    with pytest.raises(ConnectionError):
+        run(service._process_alerts([], {}))
+    # La próxima lectura sobre el umbral vuelve a generar la alerta
+    assert service.alert_state.active_severity(1, ALERT) is None
+    assert service.alert_state.observe(1, ALERT, "warning") == "enter"
+
+
+@pytest.mark.unit
+def test_unknown_worker_does_not_advance_state(service, monkeypatch):
+    known_workers(monkeypatch)
+    monkeypatch.setattr(service, "_evaluate_alerts", evaluated(service))
+
+    async def create_many(rows, db):
+        raise AssertionError("no hay alertas que guardar")
+    monkeypatch.setattr(service.alert_repository, "create_many", create_many)
+
+    assert run(service._process_alerts([], {})) == 0
+    assert service.alert_state.get_stats()["users"] == 0
+
+
+@pytest.mark.unit
+def test_saved_alert_stays_emitted(service, monkeypatch):
+    known_workers(monkeypatch, 1)
+    monkeypatch.setattr(service, "_evaluate_alerts", evaluated(service))
+    sent, saved = [], []
+
+    async def create_many(rows, db):
+        saved.extend(rows)
+        return [99]
+
+    async def broadcast_alert(data, **scope):
+        sent.append(data["id"])
+
+    monkeypatch.setattr(service.alert_repository, "create_many", create_many)
+    monkeypatch.setattr("app.modules.reading.service.manager.broadcast_alert", broadcast_alert)
+
+    assert run(service._process_alerts([], {})) == 1
+    assert sent == [99]
+    # Se guarda el mismo valor que se envía en vivo (lo usa el reenvío de alertas)
+    assert saved[0]["value"] == 120.0
+    assert service.alert_state.active_severity(1, ALERT) == "critical"
+    assert service.alert_state.observe(1, ALERT, "critical") is None
+
+
+@pytest.mark.unit
+def test_broadcast_error_after_saving_is_not_retried(service, monkeypatch):
+    """Una alerta ya guardada no vuelve a la máquina de estados ni se reintenta si falla el envío"""
+    known_workers(monkeypatch, 1)
+    monkeypatch.setattr(service, "_evaluate_alerts", evaluated(service))
+
+    async def create_many(rows, db):
+        return [99]
+
+    async def broadcast_alert(data, **scope):
+        raise RuntimeError("backplane caído")
+
+    monkeypatch.setattr(service.alert_repository, "create_many", create_many)
+    monkeypatch.setattr("app.modules.reading.service.manager.broadcast_alert", broadcast_alert)
+
+    assert run(service._process_alerts([], {})) == 1
+    assert service.alert_state.active_severity(1, ALERT) == "critical"
@@ -0,0 +1,79 @@
+"""
+Tests unitarios de la etapa asíncrona de alertas (reading/alert_pipeline.py):
+la evaluación corre una vez por lote y el guardado se reintenta; si todos los
+intentos fallan, las alertas se descartan para que la próxima lectura las genere.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.modules.reading.alert_pipeline import AlertPipeline
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Stages:
+    """evaluate/deliver/discard que registran sus llamadas; deliver falla `failures` veces"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.evaluated, self.delivered, self.discarded = [], [], []
+
+    async def evaluate(self, readings, timings):
+        self.evaluated.append([reading.id for reading in readings])
+        return [(reading, [{"type": "toxic_gas"}]) for reading in readings if reading.id % 2]
+
+    async def deliver(self, pending, timings):
+        self.delivered.append([reading.id for reading, _ in pending])
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("BD no disponible")
+        return len(pending)
+
+    def discard(self, pending):
+        self.discarded.append([reading.id for reading, _ in pending])
+
+
+def process(stages, readings, retries=3):
+    async def scenario():
+        pipeline = AlertPipeline(stages.evaluate, stages.deliver, stages.discard, workers=1, retries=retries, retry_backoff=0)
+        await pipeline.start()
+        await pipeline.submit(readings)
+        await pipeline.stop()
+        return pipeline.get_stats()
+    return run(scenario())
+
+
+def readings(*ids):
+    return [SimpleNamespace(id=reading_id, user_id=1) for reading_id in ids]
+
+
+@pytest.mark.unit
+def test_failed_save_is_retried_without_reevaluating():
+    stages = Stages(failures=2)
+    stats = process(stages, readings(1, 2, 3))
+    assert stages.evaluated == [[1, 2, 3]]
+    assert stages.delivered == [[1, 3]] * 3
+    assert stages.discarded == []
+    assert (stats["processed"], stats["failed"], stats["retries"], stats["alerts"]) == (3, 0, 2, 2)
+
+
+@pytest.mark.unit
+def test_exhausted_retries_discard_alerts():
+    stages = Stages(failures=10)
+    stats = process(stages, readings(1, 2, 3), retries=2)
+    assert stages.delivered == [[1, 3]] * 3
+    assert stages.discarded == [[1, 3]]
+    assert (stats["processed"], stats["failed"], stats["retries"], stats["alerts"]) == (0, 3, 2, 0)
+
+
+@pytest.mark.unit
+def test_batch_without_alerts_skips_delivery():
+    stages = Stages()
+    stats = process(stages, readings(2, 4))
+    assert stages.delivered == []
+    assert stats["processed"] == 2
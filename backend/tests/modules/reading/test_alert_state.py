@@ -0,0 +1,156 @@
+"""
+Tests unitarios de la máquina de estados de alertas (reading/alert_state.py).
+Incluye el debounce, la escalada, la salida por histéresis y el recordatorio
+periódico de una alerta sostenida.
+"""
+
+import pytest
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+from app.modules.reading.alert_state import AlertStateTracker
+from app.modules.reading.models import Reading
+from app.modules.sensor.rules import DEFAULT_RULES, evaluate
+
+ALERT = "heart_rate_high"
+
+
+def pulse_alerts(tracker, *pulses, user_id=1):
+    """Evalúa lecturas de pulso con las reglas globales y devuelve (severidad, transición) de cada una"""
+    result = []
+    for pulse in pulses:
+        alerts = evaluate(DEFAULT_RULES, Reading(user_id=user_id, device_id=1, pulse=pulse), tracker)
+        result.append([(a["severity"], a["transition"]) for a in alerts])
+    return result
+
+
+@pytest.mark.unit
+def test_warning_needs_debounce_samples():
+    """Warning entra recién con `debounce_samples` lecturas consecutivas sobre el umbral"""
+    tracker = AlertStateTracker(debounce_samples=3)
+    assert [tracker.observe(1, ALERT, "warning", now=t) for t in range(4)] == [None, None, "enter", None]
+
+
+@pytest.mark.unit
+def test_debounce_restarts_when_value_drops():
+    """Una lectura normal en medio reinicia la cuenta de lecturas pendientes"""
+    tracker = AlertStateTracker(debounce_samples=2)
+    assert tracker.observe(1, ALERT, "warning", now=0) is None
+    assert tracker.observe(1, ALERT, None, now=1) is None
+    assert tracker.observe(1, ALERT, "warning", now=2) is None
+    assert tracker.observe(1, ALERT, "warning", now=3) == "enter"
+
+
+@pytest.mark.unit
+def test_critical_enters_immediately():
+    tracker = AlertStateTracker(debounce_samples=5)
+    assert tracker.observe(1, ALERT, "critical", now=0) == "enter"
+    assert tracker.active_severity(1, ALERT) == "critical"
+
+
+@pytest.mark.unit
+def test_escalation_and_deescalation():
+    """Warning -> critical es una transición; critical -> warning solo actualiza el estado"""
+    tracker = AlertStateTracker(debounce_samples=1)
+    assert tracker.observe(1, ALERT, "warning", now=0) == "enter"
+    assert tracker.observe(1, ALERT, "critical", now=1) == "escalate"
+    assert tracker.observe(1, ALERT, "warning", now=2) is None
+    assert tracker.active_severity(1, ALERT) == "warning"
+    # Volver a critical desde warning es otra escalada
+    assert tracker.observe(1, ALERT, "critical", now=3) == "escalate"
+
+
+@pytest.mark.unit
+def test_sustained_alert_repeats_every_interval():
+    """Una condición sostenida se suprime y se recuerda cada `realert_interval` segundos"""
+    tracker = AlertStateTracker(debounce_samples=1, realert_interval=300)
+    transitions = [tracker.observe(1, ALERT, "warning", now=t) for t in (0, 100, 299, 300, 450, 600)]
+    assert transitions == ["enter", None, None, "repeat", None, "repeat"]
+    stats = tracker.get_stats()
+    assert (stats["emitted"], stats["suppressed"]) == (3, 3)
+
+
+@pytest.mark.unit
+def test_states_are_per_user_and_alert_type():
+    tracker = AlertStateTracker(debounce_samples=1)
+    assert tracker.observe(1, ALERT, "warning", now=0) == "enter"
+    assert tracker.observe(2, ALERT, "warning", now=0) == "enter"
+    assert tracker.observe(1, "toxic_gas", "warning", now=0) == "enter"
+    assert tracker.busy_users(ALERT) == {1, 2}
+
+
+@pytest.mark.unit
+def test_hysteresis_keeps_alert_until_exit_threshold():
+    """heart_rate_high: warning 130, critical 140, banda 5. Solo se sale por debajo de 125"""
+    tracker = AlertStateTracker(debounce_samples=2, realert_interval=3600)
+    assert pulse_alerts(tracker, 135, 135, 128, 126, 124) == [
+        [], [("warning", "enter")], [], [], [],
+    ]
+    assert tracker.active_severity(1, ALERT) is None
+    # Tras despejarse, volver a entrar exige de nuevo el debounce
+    assert pulse_alerts(tracker, 132, 132) == [[], [("warning", "enter")]]
+
+
+@pytest.mark.unit
+def test_hysteresis_on_critical_exit():
+    """Critical baja a warning recién por debajo de 135; un valor que oscila en 140 no reabre la alerta"""
+    tracker = AlertStateTracker(debounce_samples=2, realert_interval=3600)
+    assert pulse_alerts(tracker, 145, 138, 141, 137) == [[("critical", "enter")], [], [], []]
+    assert tracker.active_severity(1, ALERT) == "critical"
+    assert pulse_alerts(tracker, 134) == [[]]
+    assert tracker.active_severity(1, ALERT) == "warning"
+    assert pulse_alerts(tracker, 141) == [[("critical", "escalate")]]
+
+
+@pytest.mark.unit
+def test_evicted_user_leaves_busy_set():
+    """Al desalojar un usuario por LRU deja de contarse como pendiente"""
+    tracker = AlertStateTracker(debounce_samples=1, max_users=2)
+    for user_id in (1, 2, 3):
+        tracker.observe(user_id, ALERT, "warning", now=0)
+    assert tracker.busy_users(ALERT) == {2, 3}
+    assert tracker.get_stats()["user_evictions"] == 1
+    # Al volver, el usuario desalojado entra de nuevo
+    assert tracker.observe(1, ALERT, "warning", now=1) == "enter"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("setup, transition", [
+    ([("warning", 0)], "enter"),
+    ([("warning", 0), ("critical", 1)], "escalate"),
+    ([("warning", 0), ("warning", 400)], "repeat"),
+])
+def test_rollback_makes_next_reading_realert(setup, transition):
+    """Una alerta que no se guardó vuelve a salir con la próxima lectura, sin debounce ni intervalo"""
+    tracker = AlertStateTracker(debounce_samples=3, realert_interval=300)
+    for _ in range(2):
+        tracker.observe(1, ALERT, "warning", now=-1)
+    returned = [tracker.observe(1, ALERT, severity, now=t) for severity, t in setup]
+    assert returned[-1] == transition
+
+    tracker.rollback(1, ALERT)
+    assert tracker.active_severity(1, ALERT) is None
+    assert 1 in tracker.busy_users(ALERT)
+    assert tracker.observe(1, ALERT, setup[-1][0], now=401) == "enter"
+    assert tracker.get_stats()["rolled_back"] == 1
+
+
+@pytest.mark.unit
+def test_rollback_without_active_alert_is_noop():
+    tracker = AlertStateTracker(debounce_samples=2)
+    tracker.rollback(1, ALERT)
+    tracker.observe(1, ALERT, "warning", now=0)
+    tracker.rollback(1, ALERT)
+    stats = tracker.get_stats()
+    assert (stats["users"], stats["rolled_back"]) == (1, 0)
+
+
+@pytest.mark.unit
+def test_forget_drops_user_state():
+    tracker = AlertStateTracker(debounce_samples=1)
+    tracker.observe(1, ALERT, "critical", now=0)
+    tracker.observe(1, "toxic_gas", "warning", now=0)
+    tracker.forget(1)
+    assert tracker.active_severity(1, ALERT) is None
+    assert 1 not in tracker.busy_users(ALERT) and 1 not in tracker.busy_users("toxic_gas")
+    assert tracker.get_stats()["users"] == 0
+    tracker.forget(2)
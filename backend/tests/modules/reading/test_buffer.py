@@ -0,0 +1,87 @@
+"""
+Tests unitarios del buffer de escritura diferida (reading/buffer.py): las
+lecturas encoladas ya se confirmaron al casco, así que ni un stop() durante un
+flush ni un error pasajero de la base deben perderlas.
+"""
+
+import asyncio
+
+import pytest
+
+from app.modules.reading.buffer import ReadingWriteBuffer
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class SlowWriter:
+    """flush_handler que tarda y falla las primeras `failures` veces"""
+
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.written = []
+        self.started = asyncio.Event()
+
+    async def __call__(self, batch):
+        self.started.set()
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("BD no disponible")
+        self.written.extend(row["seq"] for row in batch)
+
+
+def rows(count):
+    return [{"device_id": 1, "seq": seq} for seq in range(count)]
+
+
+@pytest.mark.unit
+def test_stop_waits_for_flush_in_progress():
+    async def scenario():
+        writer = SlowWriter(delay=0.1)
+        buffer = ReadingWriteBuffer(writer, flush_interval_ms=10, flush_max_rows=4)
+        await buffer.start()
+        for row in rows(10):
+            buffer.enqueue(row)
+        # stop() llega con un grupo ya sacado de la cola y a medio escribir
+        await writer.started.wait()
+        await buffer.stop()
+        return writer.written, buffer.get_stats()
+
+    written, stats = run(scenario())
+    assert written == list(range(10))
+    assert (stats["rows_flushed"], stats["rows_failed"], stats["queue_depth"]) == (10, 0, 0)
+    assert not stats["running"]
+
+
+@pytest.mark.unit
+def test_failed_flush_is_retried():
+    async def scenario():
+        writer = SlowWriter(failures=2)
+        buffer = ReadingWriteBuffer(writer, flush_interval_ms=10, retries=3, retry_backoff=0.01)
+        await buffer.start()
+        for row in rows(3):
+            buffer.enqueue(row)
+        await buffer.stop()
+        return writer.written, buffer.get_stats()
+
+    written, stats = run(scenario())
+    assert written == [0, 1, 2]
+    assert (stats["rows_flushed"], stats["rows_failed"], stats["flush_retries"]) == (3, 0, 2)
+
+
+@pytest.mark.unit
+def test_rows_fail_only_after_retries():
+    async def scenario():
+        writer = SlowWriter(failures=10)
+        buffer = ReadingWriteBuffer(writer, flush_interval_ms=10, retries=2, retry_backoff=0.01)
+        await buffer.start()
+        for row in rows(3):
+            buffer.enqueue(row)
+        await buffer.stop()
+        return buffer.get_stats()
+
+    stats = run(scenario())
+    assert (stats["rows_flushed"], stats["rows_failed"], stats["flush_retries"]) == (0, 3, 2)
@@ -0,0 +1,97 @@
+"""
+Tests unitarios del codec binario de lecturas (frames del ESP32).
+Incluye ida y vuelta, frames mal formados y valores no finitos.
+"""
+
+import math
+import struct
+
+import pytest
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+from app.modules.reading.codec import BOOT_FLAG, PROTOCOL_VERSION, SEQ_FLAG, decode_frame, encode_frame
+from app.modules.reading.service import ReadingService
+from app.shared.exceptions import ValidationError
+
+FULL_READING = {
+    "user_id": 11, "device_id": 21, "boot_id": 0,
+    "mq7": 18.5, "pulse": 78, "body_temp": 36.75,
+    "ax": 0.125, "ay": 9.75, "az": -0.25,
+    "gx": 0.5, "gy": -0.25, "gz": 0.0,
+}
+
+
+@pytest.fixture(scope="module")
+def service():
+    return ReadingService()
+
+
+@pytest.mark.unit
+def test_round_trip_full_reading():
+    """Una lectura completa vuelve igual (valores representables en float32)"""
+    assert decode_frame(encode_frame([FULL_READING])) == [FULL_READING]
+
+
+@pytest.mark.unit
+def test_round_trip_partial_readings_with_seq():
+    """Los sensores ausentes no viajan; el seq solo aparece si se envió y sin boot_id es el arranque 0"""
+    readings = [
+        {"user_id": 1, "device_id": 2, "pulse": 90, "seq": 4_000_000_000, "boot_id": 0xDEADBEEF},
+        {"user_id": 3, "device_id": 4, "mq7": 12.5, "pulse": None},
+    ]
+    assert decode_frame(encode_frame(readings)) == [
+        {"user_id": 1, "device_id": 2, "pulse": 90, "seq": 4_000_000_000, "boot_id": 0xDEADBEEF},
+        {"user_id": 3, "device_id": 4, "mq7": 12.5, "boot_id": 0},
+    ]
+
+
+@pytest.mark.unit
+def test_full_reading_is_44_bytes():
+    """Cabecera de 2 bytes más 44 por lectura completa sin seq"""
+    assert len(encode_frame([FULL_READING])) == 2 + 44
+
+
+@pytest.mark.unit
+def test_encode_rejects_empty_and_oversized_frames():
+    with pytest.raises(ValueError):
+        encode_frame([])
+    with pytest.raises(ValueError):
+        encode_frame([FULL_READING] * 256)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("frame, message", [
+    (b"", "demasiado corto"),
+    (b"\x01", "demasiado corto"),
+    (bytes([PROTOCOL_VERSION + 1, 1]), "Versión"),
+    (bytes([PROTOCOL_VERSION, 0]), "sin lecturas"),
+    (bytes([PROTOCOL_VERSION, 1]) + struct.pack("<HII", 1 << 12, 1, 1), "Bitmap"),
+    (bytes([PROTOCOL_VERSION, 1]) + struct.pack("<HII", 1 << 13, 1, 1), "Bitmap"),
+    (bytes([PROTOCOL_VERSION, 1]) + struct.pack("<HII", 0b1, 1, 1) + b"\x00\x00", "truncado"),
+    (bytes([PROTOCOL_VERSION, 1]) + struct.pack("<HII", SEQ_FLAG, 1, 1), "truncado"),
+    (bytes([PROTOCOL_VERSION, 1]) + struct.pack("<HIII", BOOT_FLAG | SEQ_FLAG, 1, 1, 7), "truncado"),
+    (bytes([PROTOCOL_VERSION, 2]) + struct.pack("<HII", 0, 1, 1), "truncado"),
+    (encode_frame([FULL_READING]) + b"\x00", "sobrantes"),
+])
+def test_decode_rejects_malformed_frames(frame, message):
+    """Los frames mal formados se rechazan con ValidationError, nunca con struct.error"""
+    with pytest.raises(ValidationError, match=message):
+        decode_frame(frame)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("value", [math.nan, math.inf, -math.inf])
+@pytest.mark.parametrize("field", ["mq7", "body_temp", "ax", "gz"])
+def test_non_finite_values_are_rejected(service, field, value):
+    """Un float32 NaN o infinito llega decodificado y no pasa la validación"""
+    row = decode_frame(encode_frame([{**FULL_READING, field: value}]))[0]
+    assert not math.isfinite(row[field])
+    with pytest.raises(ValidationError, match=field):
+        service._validate_reading_values(row)
+
+
+@pytest.mark.unit
+def test_decoded_reading_validates(service):
+    """Una lectura decodificada normal pasa la validación sin cambios"""
+    row = decode_frame(encode_frame([FULL_READING]))[0]
+    assert service._validate_reading_values(row) == FULL_READING
@@ -0,0 +1,58 @@
+"""
+Tests unitarios de la ventana de deduplicación por número de secuencia.
+Incluye reintentos, el reinicio del casco (nuevo boot_id) y el desalojo LRU.
+"""
+
+import pytest
+
+from app.modules.reading.dedup import DeviceSequenceCache
+
+
+@pytest.mark.unit
+def test_retry_in_same_boot_is_duplicate():
+    """Un (device_id, boot_id, seq) ya guardado se reconoce como reintento"""
+    cache = DeviceSequenceCache(window=8)
+    cache.remember(1, 100, 41)
+    assert cache.is_duplicate(1, 100, 41)
+    assert not cache.is_duplicate(1, 100, 42)
+    assert not cache.is_duplicate(2, 100, 41)
+
+
+@pytest.mark.unit
+def test_reboot_resets_sequence_window():
+    """Tras reiniciarse, el casco vuelve a enviar seq bajos que no son reintentos"""
+    cache = DeviceSequenceCache(window=8)
+    for seq in range(1000, 1008):
+        cache.remember(1, 100, seq)
+
+    # Nuevo arranque: el seq vuelve a empezar y nada se toma por duplicado
+    assert not any(cache.is_duplicate(1, 200, seq) for seq in range(1000, 1008))
+    cache.remember(1, 200, 0)
+    assert cache.is_duplicate(1, 200, 0)
+    assert not cache.is_duplicate(1, 200, 1)
+
+    # La ventana del arranque anterior ya no existe
+    assert not cache.is_duplicate(1, 100, 1007)
+    assert cache.get_stats()["device_reboots"] == 1
+
+
+@pytest.mark.unit
+def test_window_forgets_oldest_sequences():
+    """Solo se recuerdan los últimos `window` números; el resto lo cubre la BD"""
+    cache = DeviceSequenceCache(window=3)
+    for seq in range(5):
+        cache.remember(1, 0, seq)
+    assert [cache.is_duplicate(1, 0, seq) for seq in range(5)] == [False, False, True, True, True]
+
+
+@pytest.mark.unit
+def test_devices_are_evicted_lru():
+    """Al superar max_devices se desaloja el dispositivo usado hace más tiempo"""
+    cache = DeviceSequenceCache(window=4, max_devices=2)
+    cache.remember(1, 0, 1)
+    cache.remember(2, 0, 1)
+    assert cache.is_duplicate(1, 0, 1)  # el 1 pasa a ser el más reciente
+    cache.remember(3, 0, 1)
+    assert cache.is_duplicate(1, 0, 1)
+    assert not cache.is_duplicate(2, 0, 1)
+    assert cache.get_stats()["device_evictions"] == 1
@@ -188,3 +188,129 @@ def test_delete_reading(client: TestClient):
     # Verificar eliminación
     response = client.get(f"/readings/{reading_id}", headers=headers)
     assert response.status_code == 404
+
+
+@pytest.mark.reading
+def test_create_reading_batch(client: TestClient):
+    """Prueba crear un lote de readings en una sola petición"""
+    # Login con usuario existente
+    login_data = {"employee_number": "0322103782", "password": "123456"}
+    response = client.post("/auth/login", json=login_data)
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    # Obtener user_id del usuario actual
+    response = client.get("/auth/me", headers=headers)
+    user_id = response.json()["id"]
+    
+    # Crear lote
+    batch_data = {
+        "readings": [
+            {"user_id": user_id, "device_id": 1, "pulse": 70 + i, "mq7": 12.5}
+            for i in range(5)
+        ]
+    }
+    response = client.post("/readings/batch", json=batch_data, headers=headers)
+    assert response.status_code == 201
+    data = response.json()
+    assert data["inserted"] == 5
+    assert len(data["ids"]) == 5
+    
+    # Los IDs corresponden al orden del lote
+    response = client.get(f"/readings/{data['ids'][2]}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["pulse"] == 72
+
+
+@pytest.mark.reading
+def test_create_reading_batch_invalid_item(client: TestClient):
+    """Prueba que un lote con una lectura fuera de rango se rechace completo"""
+    # Login con usuario existente
+    login_data = {"employee_number": "0322103782", "password": "123456"}
+    response = client.post("/auth/login", json=login_data)
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    batch_data = {
+        "readings": [
+            {"user_id": 1, "device_id": 1, "pulse": 72},
+            {"user_id": 1, "device_id": 1, "pulse": 999}
+        ]
+    }
+    response = client.post("/readings/batch", json=batch_data, headers=headers)
+    assert response.status_code == 400
+    assert "readings[1]" in response.json()["detail"]
+
+
+@pytest.mark.reading
+def test_create_reading_duplicate_seq_is_idempotent(client: TestClient):
+    """Prueba que reenviar un reading con el mismo (device_id, seq) no lo duplique"""
+    # Login con usuario existente
+    login_data = {"employee_number": "0322103782", "password": "123456"}
+    response = client.post("/auth/login", json=login_data)
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    # Obtener user_id del usuario actual
+    response = client.get("/auth/me", headers=headers)
+    user_id = response.json()["id"]
+    
+    reading_data = {
+        "user_id": user_id,
+        "device_id": 1,
+        "pulse": 75,
+        "seq": random.randint(10**9, 2 * 10**9)
+    }
+    response = client.post("/readings/", json=reading_data, headers=headers)
+    assert response.status_code == 201
+    first_id = response.json()["id"]
+    
+    # Reintento del firmware
+    response = client.post("/readings/", json=reading_data, headers=headers)
+    assert response.status_code == 201
+    assert response.json()["id"] == first_id
+    
+    # En lote también se descarta
+    response = client.post("/readings/batch", json={"readings": [reading_data]}, headers=headers)
+    assert response.status_code == 201
+    assert response.json()["inserted"] == 0
+    assert response.json()["duplicates"] == 1
+
+
+@pytest.mark.reading
+def test_create_reading_after_device_reboot_is_not_duplicate(client: TestClient):
+    """Prueba que tras reiniciarse el casco (nuevo boot_id) un seq ya usado se guarde como lectura nueva"""
+    # Login con usuario existente
+    login_data = {"employee_number": "0322103782", "password": "123456"}
+    response = client.post("/auth/login", json=login_data)
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    # Obtener user_id del usuario actual
+    response = client.get("/auth/me", headers=headers)
+    user_id = response.json()["id"]
+    
+    reading_data = {
+        "user_id": user_id,
+        "device_id": 1,
+        "pulse": 75,
+        "seq": 0,
+        "boot_id": random.randint(1, 2**32 - 1)
+    }
+    response = client.post("/readings/", json=reading_data, headers=headers)
+    assert response.status_code == 201
+    first_id = response.json()["id"]
+    
+    # El casco se reinicia y su contador vuelve a 0 con otro boot_id
+    rebooted = {**reading_data, "boot_id": reading_data["boot_id"] - 1}
+    response = client.post("/readings/", json=rebooted, headers=headers)
+    assert response.status_code == 201
+    assert response.json()["id"] != first_id
+    assert response.json()["boot_id"] == rebooted["boot_id"]
+    
+    # En lote también se guarda
+    rebooted = {**reading_data, "boot_id": reading_data["boot_id"] - 1, "seq": 1}
+    response = client.post("/readings/batch", json={"readings": [rebooted]}, headers=headers)
+    assert response.status_code == 201
+    assert response.json()["inserted"] == 1
+    assert response.json()["duplicates"] == 0
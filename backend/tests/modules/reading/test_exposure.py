@@ -0,0 +1,174 @@
+"""
+Tests unitarios de la exposición acumulada a CO (reading/exposure.py).
+Incluye el integrador del TWA, el reinicio de la dosis con el turno (también
+cuando el turno cruza la medianoche) y la expiración de los casilleros del STEL.
+"""
+
+from datetime import datetime, time, timedelta
+
+import pytest
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+from app.modules.reading.exposure import STEL_BUCKET_S, STEL_PERIOD_S, CoExposureTracker, _Exposure
+from app.modules.reading.models import Reading
+from app.modules.user_shift.calendar import shift_calendar
+
+# Múltiplo de 15 s: los casilleros del STEL quedan alineados con las lecturas
+START = datetime(2025, 3, 10, 8, 0, 0)
+
+
+@pytest.fixture(autouse=True)
+def no_shifts(monkeypatch):
+    """Sin turnos salvo que el test los cargue; el calendario global no toca la BD"""
+    monkeypatch.setattr(shift_calendar, "_starts", {})
+
+
+def co(value, user_id=1):
+    return Reading(user_id=user_id, device_id=user_id, mq7=value)
+
+
+def feed(tracker, value, start, seconds, step=10, user_id=1):
+    """Una lectura cada `step` segundos durante `seconds`; devuelve los tipos y severidades alertados"""
+    alerts = []
+    for offset in range(0, seconds, step):
+        for alert in tracker.process([co(value, user_id)], now=start + timedelta(seconds=offset))[0]:
+            alerts.append((alert["type"], alert["severity"]))
+    return alerts
+
+
+# ---------------------------------------------------------------------------
+# TWA
+# ---------------------------------------------------------------------------
+
+@pytest.mark.unit
+def test_twa_integrates_concentration_over_time():
+    """Una hora a 40 ppm equivale a 5 ppm de TWA de 8 horas"""
+    tracker = CoExposureTracker(sample_period_s=10, max_gap_s=10)
+    feed(tracker, 40, START, 3600)
+    state = tracker._workers[1]
+    assert state.dose == pytest.approx(40 * 3600)
+    assert state.twa == pytest.approx(5.0)
+
+
+@pytest.mark.unit
+def test_gaps_without_data_are_capped():
+    """Un hueco sin lecturas solo suma `max_gap_s` de exposición"""
+    tracker = CoExposureTracker(sample_period_s=2.5, max_gap_s=10)
+    tracker.process([co(100)], now=START)
+    tracker.process([co(100)], now=START + timedelta(minutes=5))
+    assert tracker._workers[1].dose == pytest.approx(100 * 2.5 + 100 * 10)
+
+
+@pytest.mark.unit
+def test_readings_in_same_batch_count_one_period_each():
+    tracker = CoExposureTracker(sample_period_s=2.5)
+    tracker.process([co(20), co(20), co(20)], now=START)
+    assert tracker._workers[1].dose == pytest.approx(3 * 20 * 2.5)
+
+
+@pytest.mark.unit
+def test_twa_alerts_once_per_level():
+    """Warning al nivel de acción (50 %) y critical al límite, una sola vez cada uno"""
+    # Límite de 1 ppm: el nivel de acción son 14400 ppm·s y el límite 28800
+    tracker = CoExposureTracker(twa_limit_ppm=1, stel_limit_ppm=10_000, sample_period_s=10)
+    assert feed(tracker, 100, START, 140) == []
+    assert feed(tracker, 100, START + timedelta(seconds=140), 10) == [("co_exposure_twa", "warning")]
+    assert feed(tracker, 100, START + timedelta(seconds=150), 130) == []
+    assert feed(tracker, 100, START + timedelta(seconds=280), 10) == [("co_exposure_twa", "critical")]
+    assert feed(tracker, 100, START + timedelta(seconds=290), 600) == []
+
+
+@pytest.mark.unit
+def test_without_shift_dose_restarts_with_new_session():
+    """Sin turno la dosis se ancla a la sesión del casco y se reinicia tras `session_gap_s` sin datos"""
+    tracker = CoExposureTracker(sample_period_s=10, session_gap_s=3600)
+    feed(tracker, 50, START, 600)
+    state = tracker._workers[1]
+    assert (state.anchor, state.anchored_to_shift) == (START, False)
+    later = START + timedelta(hours=2)
+    tracker.process([co(50)], now=later)
+    assert state.anchor == later
+    assert state.dose == pytest.approx(50 * 10)
+
+
+# ---------------------------------------------------------------------------
+# Anclaje al turno
+# ---------------------------------------------------------------------------
+
+@pytest.mark.unit
+def test_night_shift_keeps_dose_across_midnight(monkeypatch):
+    """Un turno que empieza a las 22:00 sigue acumulando después de la medianoche"""
+    monkeypatch.setattr(shift_calendar, "_starts", {1: [time(22, 0)]})
+    tracker = CoExposureTracker(twa_limit_ppm=1, stel_limit_ppm=10_000, sample_period_s=10)
+    night = datetime(2025, 3, 10, 23, 55)
+
+    feed(tracker, 100, night, 600)   # de 23:55 a 00:05
+    state = tracker._workers[1]
+    assert state.anchor == datetime(2025, 3, 10, 22, 0)
+    assert state.anchored_to_shift
+    assert state.dose == pytest.approx(100 * 600)
+    assert state.twa_level == "critical"
+
+    # Nuevo turno a las 22:00 del día siguiente: la dosis y las alertas del TWA se reinician
+    next_shift = datetime(2025, 3, 11, 22, 0)
+    alerts = feed(tracker, 100, next_shift, 150)
+    assert state.anchor == next_shift
+    assert state.dose == pytest.approx(100 * 150)
+    assert alerts == [("co_exposure_twa", "warning")]
+
+
+@pytest.mark.unit
+def test_shift_change_within_the_day_resets_dose(monkeypatch):
+    monkeypatch.setattr(shift_calendar, "_starts", {1: [time(6, 0), time(14, 0)]})
+    tracker = CoExposureTracker(sample_period_s=10)
+    feed(tracker, 30, datetime(2025, 3, 10, 13, 50), 1200)   # de 13:50 a 14:10
+    state = tracker._workers[1]
+    assert state.anchor == datetime(2025, 3, 10, 14, 0)
+    # Solo cuenta lo leído desde las 14:00
+    assert state.dose == pytest.approx(30 * 10 * 60)
+
+
+# ---------------------------------------------------------------------------
+# STEL
+# ---------------------------------------------------------------------------
+
+@pytest.mark.unit
+def test_stel_buckets_expire_after_fifteen_minutes():
+    """Lo sumado en un casillero deja de contar exactamente al salir de la ventana de 15 minutos"""
+    state = _Exposure(START, False)
+    assert state.add_stel(START, 9000.0) == pytest.approx(10.0)
+    assert state.add_stel(START + timedelta(seconds=STEL_PERIOD_S - STEL_BUCKET_S), 0.0) == pytest.approx(10.0)
+    assert state.add_stel(START + timedelta(seconds=STEL_PERIOD_S), 0.0) == 0.0
+
+
+@pytest.mark.unit
+def test_stel_slides_and_long_gap_clears_window():
+    state = _Exposure(START, False)
+    for minute in range(15):
+        state.add_stel(START + timedelta(minutes=minute), 900.0)
+    assert state.stel == pytest.approx(15.0)
+    # Un minuto más tarde salió el primer casillero
+    assert state.add_stel(START + timedelta(minutes=15), 0.0) == pytest.approx(14.0)
+    # Tras más de una ventana sin datos no queda nada
+    assert state.add_stel(START + timedelta(hours=3), 0.0) == 0.0
+    assert sum(state.stel_buckets) == 0.0
+
+
+@pytest.mark.unit
+def test_stel_alert_rearms_below_eighty_percent():
+    """El STEL alerta una vez al llegar al límite y se rearma cuando la ventana se vacía del pico"""
+    tracker = CoExposureTracker(twa_limit_ppm=10_000, stel_limit_ppm=100, sample_period_s=10)
+    # 400 ppm durante 4 minutos: 96000 ppm·s / 900 s ≈ 107 ppm
+    alerts = feed(tracker, 400, START, 240)
+    assert alerts == [("co_exposure_stel", "critical")]
+    state = tracker._workers[1]
+    # Aire limpio: mientras no expire ningún casillero la alerta sigue armada
+    feed(tracker, 0, START + timedelta(seconds=240), 650)
+    assert state.stel == pytest.approx(400 * 240 / 900)
+    assert state.stel_alerted
+    # Al salir de la ventana los casilleros del pico, el STEL vuelve a 0 y la alerta se rearma
+    feed(tracker, 0, START + timedelta(seconds=890), 310)
+    assert state.stel == 0.0
+    assert not state.stel_alerted
+    # Un nuevo pico vuelve a alertar
+    assert feed(tracker, 400, START + timedelta(seconds=1200), 240) == [("co_exposure_stel", "critical")]
@@ -0,0 +1,97 @@
+"""
+Tests unitarios de la detección de caídas e impactos (reading/motion.py).
+Las secuencias pasan primero por la validación de ReadingService con los
+rangos del MPU6050 del casco (±8 g, ±500 °/s) y luego por MotionDetector.process().
+"""
+
+import pytest
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+from app.modules.reading.models import Reading
+from app.modules.reading.motion import GRAVITY, MotionDetector
+from app.modules.reading.service import ACCEL_RANGE_MS2, GYRO_RANGE_RADS, ReadingService
+from app.shared.exceptions import ValidationError
+
+# Casco puesto y quieto: la gravedad sobre el eje Y
+UPRIGHT = (0.1, 9.8, 0.3, 0.02, 0.01, 0.0)
+# Casco en el suelo de costado: la gravedad pasa al eje X
+ON_SIDE = (9.8, 0.2, 0.5, 0.0, 0.01, 0.0)
+
+
+@pytest.fixture(scope="module")
+def service():
+    return ReadingService()
+
+
+def feed(service, detector, samples, device_id=1):
+    """Valida cada muestra como lo hace la ingesta y la procesa; devuelve las alertas de cada lectura"""
+    alerts = []
+    for ax, ay, az, gx, gy, gz in samples:
+        payload = service._validate_reading_values({
+            "user_id": device_id, "device_id": device_id,
+            "ax": ax, "ay": ay, "az": az, "gx": gx, "gy": gy, "gz": gz,
+        })
+        alerts.append(detector.process([Reading(**payload)])[0])
+    return alerts
+
+
+def types(alerts):
+    return [[a["type"] for a in reading_alerts] for reading_alerts in alerts]
+
+
+@pytest.mark.unit
+def test_validation_accepts_sensor_full_scale(service):
+    """Los valores de saturación del sensor son válidos; lo que lo supera no"""
+    assert round(ACCEL_RANGE_MS2, 1) == 78.5
+    assert round(GYRO_RANGE_RADS, 2) == 8.73
+    payload = {"user_id": 1, "device_id": 1, "ax": -ACCEL_RANGE_MS2, "ay": 60.0, "gz": -GYRO_RANGE_RADS}
+    assert service._validate_reading_values(dict(payload)) == payload
+
+    with pytest.raises(ValidationError, match="az fuera de rango"):
+        service._validate_reading_values({"user_id": 1, "device_id": 1, "az": 9 * GRAVITY})
+    with pytest.raises(ValidationError, match="gx fuera de rango"):
+        service._validate_reading_values({"user_id": 1, "device_id": 1, "gx": 9.0})
+
+
+@pytest.mark.unit
+def test_side_impact_that_knocks_worker_down_is_a_fall(service):
+    """Golpe lateral de ~4.6 g con giro brusco y el casco queda de costado: una sola alerta de caída"""
+    detector = MotionDetector()
+    alerts = feed(service, detector, [UPRIGHT] * 4 + [(44.0, 12.0, 3.0, 6.5, -7.2, 1.1)] + [ON_SIDE] * 5)
+    assert types(alerts) == [[]] * 4 + [["fall_detected"]] + [[]] * 5
+    fall = alerts[4][0]
+    assert fall["severity"] == "critical"
+    assert fall["value"] > 60
+
+
+@pytest.mark.unit
+def test_free_fall_then_ground_impact_is_a_fall(service):
+    """Caída libre (|a| casi 0) y luego el golpe contra el piso con el casco dado vuelta"""
+    detector = MotionDetector()
+    alerts = feed(service, detector, [UPRIGHT] * 3 + [
+        (0.5, 1.0, 0.3, 2.0, 1.5, 0.4),        # caída libre
+        (35.0, -10.0, 20.0, 8.5, -8.0, 3.0),   # impacto contra el piso, giro cerca de la saturación
+        (9.5, -2.0, 1.0, 0.1, 0.0, 0.0),
+    ])
+    assert types(alerts) == [[], [], [], [], ["fall_detected"], []]
+    assert detector.get_stats()["falls_detected"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("peak, severity", [(45.0, "warning"), (68.0, "critical")])
+def test_blow_to_top_of_helmet_is_an_impact(service, peak, severity):
+    """Un golpe sobre el casco sin cambio de orientación es un impacto; sobre 6 g es critical"""
+    detector = MotionDetector()
+    alerts = feed(service, detector, [UPRIGHT] * 3 + [(1.5, peak, 2.0, 0.3, 0.2, 0.1)] + [UPRIGHT] * 2)
+    assert types(alerts) == [[], [], [], ["impact_detected"], [], []]
+    impact = alerts[3][0]
+    assert impact["severity"] == severity
+    assert impact["value"] == pytest.approx(peak / GRAVITY, abs=0.05)
+
+
+@pytest.mark.unit
+def test_walking_does_not_alert(service):
+    """El movimiento normal al caminar (oscilación de ~0.3 g) no genera alertas"""
+    detector = MotionDetector()
+    walking = [(0.8 * (-1) ** i, 9.8 + 2.5 * (-1) ** i, 0.6, 0.4, -0.3, 0.2) for i in range(12)]
+    assert types(feed(service, detector, walking)) == [[]] * 12
@@ -0,0 +1,168 @@
+"""
+Tests unitarios de los agregados horarios y diarios de lecturas (reading/rollup.py)
+y de la ventana que arma el dashboard sobre ellos (bordes horarios + días completos).
+Se ejecutan sobre SQLite en memoria, con el mismo ON CONFLICT que la BD local.
+"""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+from app.modules.dashboard.repository import DashboardRepository
+from app.modules.reading.models import ReadingDailyRollup, ReadingHourlyRollup
+from app.modules.reading.rollup import DAY_SECONDS, HOUR_SECONDS, aggregate_rows, rollup_upserts
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    ReadingHourlyRollup.__table__.create(engine)
+    ReadingDailyRollup.__table__.create(engine)
+    yield engine
+    engine.dispose()
+
+
+def epoch(*args) -> float:
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+# ---------------------------------------------------------------------------
+# aggregate_rows / rollup_upserts
+# ---------------------------------------------------------------------------
+
+@pytest.mark.unit
+def test_aggregate_rows_per_user_sorted():
+    rows = [
+        {"user_id": 7, "pulse": 80, "body_temp": 36.5, "mq7": 10.0},
+        {"user_id": 3, "pulse": 60},
+        {"user_id": 7, "pulse": 100, "body_temp": None, "mq7": 30.0},
+        {"user_id": 7, "body_temp": 37.5},
+        {"user_id": 5},
+    ]
+    aggregated = aggregate_rows(rows)
+    assert [agg["user_id"] for agg in aggregated] == [3, 5, 7]
+
+    empty = aggregated[1]
+    assert empty["reading_count"] == 1
+    assert (empty["pulse_count"], empty["pulse_sum"], empty["pulse_min"], empty["pulse_max"]) == (0, 0, None, None)
+
+    agg = aggregated[2]
+    assert agg["reading_count"] == 3
+    assert (agg["pulse_count"], agg["pulse_sum"], agg["pulse_min"], agg["pulse_max"]) == (2, 180, 80, 100)
+    assert (agg["body_temp_count"], agg["body_temp_min"], agg["body_temp_max"]) == (2, 36.5, 37.5)
+    assert agg["body_temp_sum"] == pytest.approx(74.0)
+    assert (agg["mq7_count"], agg["mq7_sum"], agg["mq7_min"], agg["mq7_max"]) == (2, 40.0, 10.0, 30.0)
+    # Solo la primera lectura trae pulso y temperatura a la vez
+    assert (agg["vitals_count"], agg["vitals_pulse_sum"], agg["vitals_body_temp_sum"]) == (1, 80, 36.5)
+
+
+@pytest.mark.unit
+def test_rollup_upserts_accumulate_into_same_period(engine):
+    """Dos lotes en el mismo período se suman; mínimo y máximo ignoran los NULL"""
+    at = datetime(2025, 3, 10, 15, 30)
+    batches = [
+        [{"user_id": 1, "pulse": 90, "body_temp": 36.8}, {"user_id": 2, "mq7": 5.0}],
+        [{"user_id": 1, "pulse": 70}, {"user_id": 2, "pulse": 120, "mq7": 15.0}],
+    ]
+    with engine.begin() as connection:
+        for batch in batches:
+            for stmt, params in rollup_upserts(engine.dialect, batch, at):
+                connection.execute(stmt, params)
+
+    with engine.connect() as connection:
+        for model, seconds in ((ReadingHourlyRollup, HOUR_SECONDS), (ReadingDailyRollup, DAY_SECONDS)):
+            rows = {row.user_id: row for row in connection.execute(select(model.__table__)).all()}
+            assert {row.period for row in rows.values()} == {int(at.timestamp() // seconds)}
+            assert (rows[1].reading_count, rows[1].pulse_sum, rows[1].pulse_min, rows[1].pulse_max) == (2, 160, 70, 90)
+            assert (rows[1].body_temp_count, rows[1].vitals_count) == (1, 1)
+            assert (rows[2].pulse_count, rows[2].pulse_min, rows[2].pulse_max) == (1, 120, 120)
+            assert (rows[2].mq7_count, rows[2].mq7_sum, rows[2].mq7_min, rows[2].mq7_max) == (2, 20.0, 5.0, 15.0)
+
+
+@pytest.mark.unit
+def test_rollup_period_comes_from_ingest_timestamp(engine):
+    """El período es el del timestamp del lote (el mismo de las lecturas), no la hora de la base"""
+    with engine.begin() as connection:
+        for at in (datetime(2025, 3, 10, 14, 59, 59), datetime(2025, 3, 10, 15, 0)):
+            for stmt, params in rollup_upserts(engine.dialect, [{"user_id": 1, "pulse": 80}], at):
+                connection.execute(stmt, params)
+
+    with engine.connect() as connection:
+        hourly = connection.execute(select(ReadingHourlyRollup.period, ReadingHourlyRollup.reading_count)).all()
+        daily = connection.execute(select(ReadingDailyRollup.period, ReadingDailyRollup.reading_count)).all()
+    hour = int(datetime(2025, 3, 10, 15, 0).timestamp() // HOUR_SECONDS)
+    assert sorted(hourly) == [(hour - 1, 1), (hour, 1)]
+    assert daily == [(int(datetime(2025, 3, 10, 15, 0).timestamp() // DAY_SECONDS), 2)]
+
+
+# ---------------------------------------------------------------------------
+# DashboardRepository._rollup_window
+# ---------------------------------------------------------------------------
+
+# 2025-03-10 15:30 UTC; con days=2 el rango empieza el 2025-03-08 a las 15:30
+NOW = epoch(2025, 3, 10, 15, 30)
+
+HOURLY = {
+    (2025, 3, 8, 14): 1,      # antes del inicio del rango
+    (2025, 3, 8, 15): 2,      # borde inicial: hora del inicio del rango
+    (2025, 3, 8, 23): 4,      # borde inicial: resto del día incompleto
+    (2025, 3, 9, 10): 8,      # día completo: lo cubre la tabla diaria
+    (2025, 3, 10, 0): 16,     # día en curso
+    (2025, 3, 10, 15): 32,    # hora en curso
+}
+DAILY = {
+    (2025, 3, 8): 64,         # día incompleto: lo cubre la tabla horaria
+    (2025, 3, 9): 128,        # día completo
+    (2025, 3, 10): 256,       # día en curso: lo cubre la tabla horaria
+}
+
+
+def insert_rollups(engine, user_id=1):
+    with engine.begin() as connection:
+        for hour, value in HOURLY.items():
+            period = int(epoch(*hour) // HOUR_SECONDS)
+            connection.execute(ReadingHourlyRollup.__table__.insert().values(
+                period=period, user_id=user_id, pulse_count=1, pulse_sum=value))
+        for day, value in DAILY.items():
+            period = int(epoch(*day) // DAY_SECONDS)
+            connection.execute(ReadingDailyRollup.__table__.insert().values(
+                period=period, user_id=user_id, pulse_count=1, pulse_sum=value))
+
+
+def window_values(engine, monkeypatch, days):
+    monkeypatch.setattr(time, "time", lambda: NOW)
+    window = DashboardRepository._rollup_window(days)
+    with engine.connect() as connection:
+        return sorted(connection.execute(select(window.c.pulse_sum)).scalars())
+
+
+@pytest.mark.unit
+def test_rollup_window_joins_hourly_edges_and_full_days(engine, monkeypatch):
+    insert_rollups(engine)
+    assert window_values(engine, monkeypatch, days=2) == [2, 4, 16, 32, 128]
+
+
+@pytest.mark.unit
+def test_rollup_window_within_today_uses_hourly_only(engine, monkeypatch):
+    """Un rango que no cubre ningún día completo sale entero de la tabla horaria"""
+    insert_rollups(engine)
+    assert window_values(engine, monkeypatch, days=0) == [32]
+    # 15 horas atrás: desde las 00:30 de hoy, sin días completos
+    monkeypatch.setattr(time, "time", lambda: NOW)
+    window = DashboardRepository._rollup_window(15 / 24)
+    with engine.connect() as connection:
+        assert connection.execute(select(func.sum(window.c.pulse_sum))).scalar() == 16 + 32
+
+
+@pytest.mark.unit
+def test_rollup_window_aligned_to_midnight(engine, monkeypatch):
+    """Si el rango empieza justo a medianoche ese día ya es completo y sale de la tabla diaria"""
+    insert_rollups(engine)
+    monkeypatch.setattr(time, "time", lambda: epoch(2025, 3, 10, 0, 0))
+    window = DashboardRepository._rollup_window(1)
+    with engine.connect() as connection:
+        # El 9 completo de la diaria y las horas del día en curso de la horaria
+        assert sorted(connection.execute(select(window.c.pulse_sum)).scalars()) == [16, 32, 128]
@@ -0,0 +1,82 @@
+"""
+Tests unitarios del timestamp de las lecturas en el estado vivo de cascos y
+trabajadores (reading/state.py): la ingesta le pone la hora a cada lote
+(stamp_rows) y el estado en memoria usa ese mismo valor, así que se compara
+bien con lo que después se carga de la base.
+"""
+
+from datetime import datetime
+
+import pytest
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+from app.core.websocket import manager
+from app.modules.reading.models import Reading
+from app.modules.reading.repository import build_multi_row_insert, stamp_rows
+from app.modules.reading.state import WorkerStateStore, reading_row
+
+
+@pytest.fixture
+def store(monkeypatch):
+    # El store se registra como oyente del backplane: no pisar el del singleton
+    monkeypatch.setattr(manager, "_listeners", dict(manager._listeners))
+    return WorkerStateStore()
+
+
+def reading(reading_id, device_id=1, user_id=10, timestamp=None, **values):
+    return Reading(id=reading_id, device_id=device_id, user_id=user_id, timestamp=timestamp, **values)
+
+
+@pytest.mark.unit
+def test_stamp_rows_sets_one_timestamp_per_batch():
+    rows = [{"device_id": 1, "user_id": 10}, {"device_id": 2, "user_id": 11}]
+    at = stamp_rows(rows)
+    assert at.microsecond == 0
+    assert [row["timestamp"] for row in rows] == [at, at]
+    # El INSERT lleva el mismo valor que queda en las filas (y en las entidades en memoria)
+    values = build_multi_row_insert(rows).compile().params
+    assert {value for key, value in values.items() if key.startswith("timestamp")} == {at}
+
+
+@pytest.mark.unit
+def test_reading_row_requires_timestamp():
+    """Sin timestamp de la ingesta no se inventa uno"""
+    with pytest.raises(KeyError):
+        reading_row(Reading(id=1, device_id=1, user_id=10))
+    at = datetime(2025, 3, 10, 15, 30)
+    assert reading_row(reading(1, timestamp=at))["timestamp"] == at
+
+
+@pytest.mark.unit
+def test_observe_uses_ingest_timestamp(store):
+    at = datetime(2025, 3, 10, 15, 30)
+    store.observe([
+        reading(5, timestamp=at, pulse=80, body_temp=36.5),
+        reading(6, timestamp=at),
+    ])
+    assert store.latest_by_device(1)["id"] == 6
+    assert store.latest_by_device(1)["timestamp"] == at
+    assert store._devices[1].vitals["id"] == 5
+    assert store._latest_by_user[10]["timestamp"] == at
+
+
+@pytest.mark.unit
+def test_database_rows_compare_with_observed_ones(store):
+    """
+    Lo cargado de la base tiene el mismo timestamp que lo observado: una
+    lectura vieja no pisa a la observada y una más nueva sí la reemplaza
+    """
+    at = datetime(2025, 3, 10, 15, 30)
+    store.observe([reading(20, timestamp=at)])
+
+    store.remember(reading(20, timestamp=at))
+    store.remember(reading(19, timestamp=at))
+    assert store._latest_by_user[10]["id"] == 20
+
+    store.remember(reading(21, timestamp=datetime(2025, 3, 10, 15, 31)))
+    assert store._latest_by_user[10]["id"] == 21
+
+    # Una lectura observada tarde con timestamp anterior tampoco retrocede el estado
+    store.observe([reading(22, timestamp=datetime(2025, 3, 10, 15, 29))])
+    assert store._latest_by_user[10]["id"] == 21
+    assert store.latest_by_device(1)["id"] == 20
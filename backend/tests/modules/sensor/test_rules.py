@@ -0,0 +1,197 @@
+"""
+Tests unitarios del motor de reglas de alertas (sensor/rules.py).
+Incluye la compilación de umbrales por sensor, la invalidación de la cache y
+la evaluación vectorizada de lotes frente a la evaluación lectura por lectura.
+"""
+
+import asyncio
+import random
+import time
+
+import numpy as np
+import pytest
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+from app.modules.reading.alert_state import AlertStateTracker
+from app.modules.reading.models import Reading
+from app.modules.sensor.models import Sensor, SensorTypeEnum
+from app.modules.sensor.rules import (
+    DEFAULT_RULES, AlertRuleEngine, compile_rules, evaluate, severity_codes, SEVERITIES,
+)
+
+
+def sensor(sensor_type, min_threshold=None, max_threshold=None, is_active=True, device_id=1):
+    return Sensor(device_id=device_id, sensor_type=sensor_type, min_threshold=min_threshold,
+                  max_threshold=max_threshold, is_active=is_active)
+
+
+def rules_by_type(table):
+    return {rule.alert_type: rule for _, rules in table for rule in rules}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# ---------------------------------------------------------------------------
+# compile_rules
+# ---------------------------------------------------------------------------
+
+@pytest.mark.unit
+def test_compile_without_overrides_returns_default_table():
+    """Sin sensores con umbrales se comparte la tabla global"""
+    assert compile_rules([]) is DEFAULT_RULES
+    assert compile_rules([sensor(SensorTypeEnum.ACCELEROMETER, max_threshold=5)]) is DEFAULT_RULES
+    assert compile_rules([sensor(SensorTypeEnum.PULSE, max_threshold=100, is_active=False)]) is DEFAULT_RULES
+
+
+@pytest.mark.unit
+def test_max_threshold_replaces_warning_and_keeps_critical_margin():
+    """max_threshold reemplaza el warning de la regla 'por encima'; critical mantiene el margen"""
+    rules = rules_by_type(compile_rules([sensor(SensorTypeEnum.PULSE, max_threshold=120)]))
+    high = rules["heart_rate_high"]
+    assert (high.warning, high.critical) == (120, 130)
+    # La regla 'por debajo' del mismo campo no cambia sin min_threshold
+    assert rules["heart_rate_low"] is rules_by_type(DEFAULT_RULES)["heart_rate_low"]
+    # Las demás reglas tampoco
+    assert rules["toxic_gas"] is rules_by_type(DEFAULT_RULES)["toxic_gas"]
+
+
+@pytest.mark.unit
+def test_min_threshold_replaces_low_rule():
+    rules = rules_by_type(compile_rules([sensor(SensorTypeEnum.PULSE, min_threshold=55, max_threshold=150)]))
+    assert (rules["heart_rate_low"].warning, rules["heart_rate_low"].critical) == (55, 50)
+    assert (rules["heart_rate_high"].warning, rules["heart_rate_high"].critical) == (150, 160)
+
+
+@pytest.mark.unit
+def test_overrides_apply_per_field_and_keep_order():
+    """Cada tipo de sensor ajusta su campo; el orden de evaluación se conserva"""
+    table = compile_rules([
+        sensor(SensorTypeEnum.MQ7, max_threshold=35),
+        sensor(SensorTypeEnum.BODY_TEMP, max_threshold=38.0),
+    ])
+    assert [field for field, _ in table] == [field for field, _ in DEFAULT_RULES]
+    rules = rules_by_type(table)
+    assert (rules["toxic_gas"].warning, rules["toxic_gas"].critical) == (35, 85)
+    assert rules["high_body_temperature"].warning == 38.0
+    assert rules["high_body_temperature"].critical == pytest.approx(38.8)
+
+
+@pytest.mark.unit
+def test_device_override_changes_alerts():
+    """Un pulso de 125 bpm solo alerta en el casco con umbral propio"""
+    reading = Reading(user_id=1, device_id=1, pulse=125)
+    assert evaluate(DEFAULT_RULES, reading) == []
+    alerts = evaluate(compile_rules([sensor(SensorTypeEnum.PULSE, max_threshold=120)]), reading)
+    assert [(a["type"], a["severity"]) for a in alerts] == [("heart_rate_high", "warning")]
+
+
+# ---------------------------------------------------------------------------
+# Cache e invalidación
+# ---------------------------------------------------------------------------
+
+class CountingEngine(AlertRuleEngine):
+    """Motor que carga sensores en memoria en lugar de consultar la BD"""
+
+    def __init__(self, sensors, ttl_seconds=300):
+        super().__init__(ttl_seconds=ttl_seconds)
+        self.sensors = sensors
+        self.fail = False
+
+    async def _load(self):
+        if self.fail:
+            raise RuntimeError("BD no disponible")
+        by_device = {}
+        for row in self.sensors:
+            by_device.setdefault(row.device_id, []).append(row)
+        self._tables = {device_id: compile_rules(rows) for device_id, rows in by_device.items()}
+        self._loaded_at = time.monotonic()
+        self._loads += 1
+
+
+@pytest.mark.unit
+def test_tables_are_cached_until_invalidated():
+    engine = CountingEngine([sensor(SensorTypeEnum.PULSE, max_threshold=120, device_id=7)])
+    run(engine.ensure_loaded())
+    run(engine.ensure_loaded())
+    assert engine.get_stats()["loads"] == 1
+    assert rules_by_type(engine.rules_for(7))["heart_rate_high"].warning == 120
+    assert engine.rules_for(8) is DEFAULT_RULES
+
+    # Un sensor cambió (SensorService llama a invalidate): se recompila en la próxima evaluación
+    engine.sensors = [sensor(SensorTypeEnum.PULSE, max_threshold=110, device_id=7)]
+    engine.invalidate()
+    alerts = run(engine.evaluate(Reading(user_id=1, device_id=7, pulse=115)))
+    assert engine.get_stats()["loads"] == 2
+    assert [a["type"] for a in alerts] == ["heart_rate_high"]
+
+
+@pytest.mark.unit
+def test_expired_ttl_reloads():
+    engine = CountingEngine([], ttl_seconds=0)
+    run(engine.ensure_loaded())
+    run(engine.ensure_loaded())
+    assert engine.get_stats()["loads"] == 2
+
+
+@pytest.mark.unit
+def test_failed_load_keeps_previous_tables():
+    engine = CountingEngine([sensor(SensorTypeEnum.PULSE, max_threshold=120, device_id=7)])
+    run(engine.ensure_loaded())
+    engine.fail = True
+    engine.invalidate()
+    run(engine.ensure_loaded())
+    assert rules_by_type(engine.rules_for(7))["heart_rate_high"].warning == 120
+
+
+# ---------------------------------------------------------------------------
+# Evaluación vectorizada
+# ---------------------------------------------------------------------------
+
+@pytest.mark.unit
+def test_severity_codes_match_rule_severity():
+    """Las tres filas de códigos coinciden con AlertRule.severity para cada severidad activa"""
+    values = np.concatenate([np.linspace(30, 160, 521), [np.nan]])
+    for _, rules in DEFAULT_RULES:
+        for rule in rules:
+            codes = severity_codes(rule, values)
+            for row, active in enumerate(SEVERITIES):
+                expected = [None if np.isnan(v) else rule.severity(v, active) for v in values]
+                assert [SEVERITIES[c] for c in codes[row]] == expected
+
+
+def random_batch(size, users, seed):
+    rng = random.Random(seed)
+    batch = []
+    for i in range(size):
+        user_id = rng.randint(1, users)
+        batch.append(Reading(
+            id=i, user_id=user_id, device_id=user_id,
+            pulse=rng.choice([None, rng.randint(35, 155)]),
+            body_temp=rng.choice([None, round(rng.uniform(36.0, 40.0), 1)]),
+            mq7=rng.choice([None, round(rng.uniform(0, 130), 1)]),
+        ))
+    return batch
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("with_state", [False, True])
+def test_batch_evaluation_matches_one_by_one(with_state):
+    """El lote vectorizado da las mismas alertas, en el mismo orden, que evaluar cada lectura"""
+    engine = CountingEngine([
+        sensor(SensorTypeEnum.PULSE, min_threshold=55, max_threshold=120, device_id=2),
+        sensor(SensorTypeEnum.MQ7, max_threshold=30, device_id=3),
+    ])
+    run(engine.ensure_loaded())
+    batch_state = AlertStateTracker(debounce_samples=2, realert_interval=3600) if with_state else None
+    single_state = AlertStateTracker(debounce_samples=2, realert_interval=3600) if with_state else None
+
+    for seed in range(5):
+        # Pocos usuarios: cada uno aparece varias veces por lote y entre lotes
+        batch = random_batch(400, users=12, seed=seed)
+        expected = [evaluate(engine.rules_for(r.device_id), r, single_state) for r in batch]
+        assert run(engine.evaluate_batch(batch, batch_state)) == expected
+
+    if with_state:
+        assert batch_state.get_stats() == single_state.get_stats()
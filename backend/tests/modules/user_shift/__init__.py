@@ -0,0 +1 @@
+# User shift module tests
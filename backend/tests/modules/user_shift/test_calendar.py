@@ -0,0 +1,55 @@
+"""
+Tests unitarios del calendario de turnos (user_shift/calendar.py).
+Incluye el inicio del turno vigente cuando el turno cruza la medianoche.
+"""
+
+from datetime import datetime, time
+
+import pytest
+
+from app.modules.user_shift.calendar import ShiftCalendar
+
+
+@pytest.fixture
+def calendar():
+    calendar = ShiftCalendar()
+    calendar._starts = {
+        1: [time(6, 0), time(14, 0), time(22, 0)],
+        2: [time(22, 0)],
+    }
+    return calendar
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("at, expected", [
+    (datetime(2025, 3, 10, 6, 0), datetime(2025, 3, 10, 6, 0)),
+    (datetime(2025, 3, 10, 13, 59), datetime(2025, 3, 10, 6, 0)),
+    (datetime(2025, 3, 10, 14, 0), datetime(2025, 3, 10, 14, 0)),
+    (datetime(2025, 3, 10, 23, 30), datetime(2025, 3, 10, 22, 0)),
+    # Pasada la medianoche sigue el turno de noche del día anterior
+    (datetime(2025, 3, 11, 0, 0), datetime(2025, 3, 10, 22, 0)),
+    (datetime(2025, 3, 11, 5, 59), datetime(2025, 3, 10, 22, 0)),
+])
+def test_current_shift_start_with_three_shifts(calendar, at, expected):
+    assert calendar.current_shift_start(1, at) == expected
+
+
+@pytest.mark.unit
+def test_night_shift_crosses_midnight_and_month(calendar):
+    """Con un único turno de noche el inicio vigente es el de la noche anterior, aun cambiando de mes"""
+    assert calendar.current_shift_start(2, datetime(2025, 4, 1, 3, 0)) == datetime(2025, 3, 31, 22, 0)
+    assert calendar.current_shift_start(2, datetime(2025, 3, 31, 21, 59)) == datetime(2025, 3, 30, 22, 0)
+
+
+@pytest.mark.unit
+def test_user_without_shifts(calendar):
+    assert calendar.current_shift_start(3, datetime(2025, 3, 10, 12, 0)) is None
+
+
+@pytest.mark.unit
+def test_invalidate_marks_calendar_stale(calendar):
+    calendar._loaded_at = 0.0
+    calendar.ttl_seconds = float("inf")
+    assert calendar._is_fresh()
+    calendar.invalidate()
+    assert not calendar._is_fresh()
@@ -0,0 +1,31 @@
+"""
+Tests unitarios de la invalidación de los datos de trabajadores en memoria
+(users/cache.py y reading/state.py) al editar o dar de baja un usuario.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import app.main  # noqa: F401  (carga los modelos en el orden de la app)
+from app.modules.reading.state import worker_state
+from app.modules.users.cache import WorkerInfo, worker_info_cache
+from app.modules.users.service import UserService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = UserService()
+    monkeypatch.setattr(service.repository, "get_by_id", lambda id: SimpleNamespace(id=id))
+    monkeypatch.setattr(service.repository, "soft_delete", lambda id: None)
+    monkeypatch.setattr(worker_info_cache, "_entries", {7: WorkerInfo(7, "Juan", "Pérez", 3, "Norte", None, 0)})
+    monkeypatch.setattr(worker_state, "_workers_stale", False)
+    return service
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("method", ["delete", "soft_delete"])
+def test_delete_invalidates_worker(service, method):
+    getattr(service, method)(7)
+    assert 7 not in worker_info_cache._entries
+    assert worker_state._workers_stale is True